@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -49,6 +50,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'banks_app.query_budget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -78,25 +80,71 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'banks.wsgi.application'
 
+ASGI_APPLICATION = 'banks.asgi.application'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Connections are borrowed from a pool of every process, sized by the DB_POOL_* variables
+# (timeouts and lifetimes in seconds). With DB_POOL set to false every request opens its
+# own connection, kept open for DB_CONN_MAX_AGE seconds to be reused by later requests.
+
+DB_POOL = os.getenv('DB_POOL', 'true').lower() == 'true'
+
 DATABASES = {
     'default': {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": "banks_app.pooled_postgresql",
         "NAME": os.getenv('POSTGRES_DB'),
         "USER": os.getenv('POSTGRES_USER'),
         "PASSWORD": os.getenv('POSTGRES_PASSWORD'),
         "HOST": os.getenv('POSTGRES_HOST'),
         "PORT": os.getenv('POSTGRES_PORT'),
         "OPTIONS": {'options': '-c search_path=public,banks'},
+        "CONN_MAX_AGE": 0 if DB_POOL else int(os.getenv('DB_CONN_MAX_AGE', '0')),
+        "CONN_HEALTH_CHECKS": os.getenv('DB_CONN_HEALTH_CHECKS', 'false').lower() == 'true',
         "TEST": {
             "NAME": "test_db",
         },
     },
 }
 
+if DB_POOL:
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+        'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+        'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+        'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', '3600')),
+    }
+
+
+# Cache of rendered bank and client pages. Their versions are bumped by the worker
+# handling a change and must be seen by every other worker, so the cache lives in a
+# directory shared by all workers on the host. PAGE_CACHE_BACKEND can point to
+# django.core.cache.backends.redis.RedisCache to share it between hosts; with
+# django.core.cache.backends.locmem.LocMemCache it is local to the process and the
+# serve command runs one worker only.
+
+PAGE_CACHE_BACKEND = os.getenv('PAGE_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'pages': {
+        'BACKEND': PAGE_CACHE_BACKEND,
+        'LOCATION': os.getenv('PAGE_CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'banks_page_cache')),
+    },
+}
+
+if not PAGE_CACHE_BACKEND.endswith('RedisCache'):
+    CACHES['pages']['OPTIONS'] = {'MAX_ENTRIES': 10000}
+
+# Permissions of active users are cached per process, see banks_app.auth_cache.
+
+AUTHENTICATION_BACKENDS = [
+    'banks_app.auth_cache.CachedModelBackend',
+]
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -144,7 +192,19 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'banks_app.auth_cache.CachedTokenAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'banks_app.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'banks_app.renderers.MessagePackRenderer',
+        'banks_app.renderers.CompactJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'banks_app.parsers.ORJSONParser',
+        'banks_app.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 }
 
@@ -158,5 +218,17 @@ CRISPY_TEMPLATE_PACK = 'bootstrap4'
 CRISPY_ALLOWED_TEMPLATE_PACKS = 'bootstrap4'
 
 
+# Count the queries of every request against the budget of its view, see
+# banks_app.query_budget; off in production, turned on by the test runner
+QUERY_BUDGET_ENABLED = os.getenv('QUERY_BUDGET_ENABLED', 'false').lower() == 'true'
+
+# Raise instead of logging when a view exceeds its query budget or runs N+1 queries
+QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT', 'false').lower() == 'true'
+
+
 LOGOUT_REDIRECT_URL = '/login/'
 LOGIN_REDIRECT_URL = '/profile/'
+
+
+# Directory of the archived transactions and of their manifest, see banks_app.archive
+TRANSACTION_ARCHIVE_DIR = os.getenv('TRANSACTION_ARCHIVE_DIR', os.path.join(BASE_DIR, 'archive'))
@@ -1,64 +1,305 @@
-"""File with admin interface."""
+"""
+File with admin interface.
+
+The tables hold millions of rows, so no page of the admin reads a table whole:
+change lists join the relations they display, count rows by the estimate of the
+planner above config.ADMIN_EXACT_COUNT_LIMIT, and search through indexes only;
+foreign keys are chosen with autocomplete widgets instead of a select of every row,
+and inlines edit one page of the related rows at a time.
+"""
+
+from functools import cached_property
+from typing import Optional
+from uuid import UUID
 
 from django.contrib import admin
+from django.core.paginator import Page, Paginator
+from django.db import connections
+from django.forms.models import BaseInlineFormSet
+
+from banks_app import config, models, search
+
+
+def estimate_count(queryset) -> int:
+    """
+    Estimate the number of rows of a queryset by the plan of its query.
+
+    Args:
+        queryset (django.db.models.QuerySet): The queryset.
+
+    Returns:
+        int: Number of rows expected by the planner.
+    """
+    sql, sql_params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', sql_params)
+        plan = cursor.fetchone()[0]
+    return plan[0]['Plan']['Plan Rows']
+
+
+def parse_id(search_term: str) -> Optional[UUID]:
+    """
+    Read a pasted primary key from a search term.
+
+    Args:
+        search_term (str): The search term.
+
+    Returns:
+        Optional[UUID]: The key, None if the term is not a UUID.
+    """
+    try:
+        return UUID(search_term.strip())
+    except ValueError:
+        return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator counting large change lists by the estimate of the planner instead of COUNT(*)."""
+
+    @cached_property
+    def count(self) -> int:
+        """
+        Count the objects, exactly only when the planner expects few of them.
+
+        Returns:
+            int: Number of objects.
+        """
+        estimate = estimate_count(self.object_list)
+        if estimate < config.ADMIN_EXACT_COUNT_LIMIT:
+            return self.object_list.count()
+        return estimate
+
+
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """Inline formset editing one page of the related objects."""
+
+    page_number = None
+    per_page = config.ADMIN_INLINE_PAGE_SIZE
+
+    @classmethod
+    def page_param(cls) -> str:
+        """
+        Get the query parameter with the number of the page of the formset.
+
+        Returns:
+            str: Name of the parameter.
+        """
+        return f'{cls.get_default_prefix()}-page'
+
+    @cached_property
+    def page(self) -> Page:
+        """
+        Get the edited page of the related objects.
+
+        Returns:
+            Page: The page, the last one if the number is out of range.
+        """
+        return Paginator(super().get_queryset(), self.per_page).get_page(self.page_number)  # noqa: WPS613
+
+    def get_queryset(self):
+        """
+        Get the edited objects.
+
+        Returns:
+            django.db.models.QuerySet: Objects of the page.
+        """
+        return self.page.object_list
+
+
+class PaginatedInlineMixin:
+    """
+    Inline mixin editing the related objects page by page.
+
+    Relations of the rows other than the edited object are read-only and joined,
+    so a page is rendered without a query per row; related objects are added in
+    the admin of their own model.
+    """
+
+    formset = PaginatedInlineFormSet
+    template = 'admin/edit_inline/paginated_tabular.html'
+    extra = 0
+    show_change_link = True
+    list_select_related = ()
+
+    def relation_names(self, with_parent: bool = False) -> list[str]:
+        """
+        Get the relations of the rows.
+
+        Args:
+            with_parent (bool): Include the relation to the edited object.
 
-from banks_app import models
+        Returns:
+            list[str]: Names of the foreign keys.
+        """
+        return [
+            field.name
+            for field in self.model._meta.concrete_fields  # noqa: WPS437
+            if field.is_relation and (with_parent or field.related_model is not self.parent_model)
+        ]
 
+    def get_queryset(self, request):
+        """
+        Get the related objects joined with their relations, the edited object among them.
 
-class BankAccountInline(admin.TabularInline):
+        Args:
+            request (django.http.HttpRequest): Request object.
+
+        Returns:
+            django.db.models.QuerySet: The related objects.
+        """
+        return super().get_queryset(request).select_related(
+            *self.relation_names(with_parent=True), *self.list_select_related,
+        )
+
+    def get_readonly_fields(self, request, obj=None):  # noqa: WPS110
+        """
+        Get the read-only fields, the relations of the rows among them.
+
+        Args:
+            request (django.http.HttpRequest): Request object.
+            obj (django.db.models.Model): The edited object.
+
+        Returns:
+            tuple: Names of the read-only fields.
+        """
+        return (*super().get_readonly_fields(request, obj), *self.relation_names())
+
+    def has_add_permission(self, request, obj=None) -> bool:  # noqa: WPS110
+        """
+        Forbid adding related objects in the inline.
+
+        Args:
+            request (django.http.HttpRequest): Request object.
+            obj (django.db.models.Model): The edited object.
+
+        Returns:
+            bool: Always False.
+        """
+        return False
+
+    def get_formset(self, request, obj=None, **kwargs):  # noqa: WPS110, WPS615
+        """
+        Get the formset class editing the requested page.
+
+        Args:
+            request (django.http.HttpRequest): Request object.
+            obj (django.db.models.Model): The edited object.
+            kwargs: Arguments of the formset factory.
+
+        Returns:
+            type: The formset class.
+        """
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.page_number = request.GET.get(formset.page_param())
+        return formset
+
+
+class ScalableModelAdmin(admin.ModelAdmin):
+    """Model admin whose change list is ordered by an index, counted by estimate and never counted twice."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ('-pk',)
+
+
+class IdSearchMixin:
+    """Model admin mixin looking up a pasted id by the primary key instead of the search fields."""
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Find the object of a pasted id, or search the search fields.
+
+        Args:
+            request (django.http.HttpRequest): Request object.
+            queryset (django.db.models.QuerySet): Objects of the change list.
+            search_term (str): The search term.
+
+        Returns:
+            tuple: The found objects and whether they may have duplicates.
+        """
+        pk = parse_id(search_term)
+        if pk is None:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk=pk), False
+
+
+class BankAccountInline(PaginatedInlineMixin, admin.TabularInline):
     """Inline definition for displaying and editing BankAccount objects."""
 
     model = models.BankAccount
-    extra = 1
 
 
-class BankClientInline(admin.TabularInline):
+class BankClientInline(PaginatedInlineMixin, admin.TabularInline):
     """Inline definition for displaying and editing BankClient objects."""
 
     model = models.BankClient
-    extra = 1
 
 
-class TransactionClientInline(admin.TabularInline):
+class TransactionClientInline(PaginatedInlineMixin, admin.TabularInline):
     """Inline definition for displaying and editing TransactionClient objects."""
 
     model = models.TransactionClient
-    extra = 1
+    list_select_related = (
+        'transaction__initializer',
+        'transaction__from_bank_account_id',
+        'transaction__to_bank_account_id',
+    )
 
 
 @admin.register(models.Bank)
-class BankAdmin(admin.ModelAdmin):
+class BankAdmin(ScalableModelAdmin):
     """Admin interface definition for the Bank model."""
 
     model = models.Bank
     inlines = (BankClientInline,)
     list_display = ('title', 'foundation_date')
+    search_fields = ('title',)
 
 
 @admin.register(models.Client)
-class ClientAdmin(admin.ModelAdmin):
+class ClientAdmin(ScalableModelAdmin):
     """Admin interface definition for the Client model."""
 
     model = models.Client
     inlines = (TransactionClientInline, BankAccountInline)
     list_display = ('first_name', 'last_name', 'phone')
+    search_fields = search.CLIENT_FIELDS
+    raw_id_fields = ('user',)
+
+
+@admin.register(models.BankClient)
+class BankClientAdmin(ScalableModelAdmin):
+    """Admin interface definition for the BankClient model."""
+
+    model = models.BankClient
+    list_display = ('bank', 'client')
+    list_select_related = ('bank', 'client')
+    search_fields = tuple(f'client__{field}' for field in search.CLIENT_FIELDS)
+    autocomplete_fields = ('bank', 'client')
 
 
 @admin.register(models.BankAccount)
-class BankAccountAdmin(admin.ModelAdmin):
+class BankAccountAdmin(IdSearchMixin, ScalableModelAdmin):
     """Admin interface definition for the BankAccount model."""
 
     list_display = ('id', 'balance', 'bank', 'client')
-    search_fields = ('id', 'balance')
+    list_select_related = ('bank', 'client')
+    search_fields = tuple(f'client__{field}' for field in search.CLIENT_FIELDS)
+    autocomplete_fields = ('bank', 'client')
     model = models.BankAccount
 
 
 @admin.register(models.Transaction)
-class TransactionAdmin(admin.ModelAdmin):
-    """Admin interface definition for the Transaction model."""
+class TransactionAdmin(IdSearchMixin, ScalableModelAdmin):
+    """
+    Admin interface definition for the Transaction model.
+
+    Descriptions are searched by words through transaction_search_idx, search_fields
+    only turns the search box on.
+    """
 
     model = models.Transaction
-    inline = (TransactionClientInline,)
+    inlines = (TransactionClientInline,)
     list_display = (
         'initializer',
         'amount',
@@ -67,3 +308,24 @@ class TransactionAdmin(admin.ModelAdmin):
         'from_bank_account_id',
         'to_bank_account_id',
     )
+    list_select_related = ('initializer', 'from_bank_account_id', 'to_bank_account_id')
+    ordering = ('-transaction_date', '-id')
+    search_fields = ('description',)
+    autocomplete_fields = ('initializer', 'from_bank_account_id', 'to_bank_account_id')
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Find the transaction of a pasted id, or the transactions with the words in the description.
+
+        Args:
+            request (django.http.HttpRequest): Request object.
+            queryset (django.db.models.QuerySet): Objects of the change list.
+            search_term (str): The search term.
+
+        Returns:
+            tuple: The found objects and whether they may have duplicates.
+        """
+        text = search_term.strip()
+        if not text or parse_id(text) is not None:
+            return super().get_search_results(request, queryset, search_term)
+        return search.search_transactions(queryset, text), False
@@ -8,3 +8,7 @@ class BanksAppConfig(AppConfig):
 
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'banks_app'
+
+    def ready(self):
+        """Connect the receivers of the page and token caches, bank statistics and the ledger."""
+        from . import auth_cache, bank_stats, ledger, page_cache  # noqa: F401
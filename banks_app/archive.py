@@ -0,0 +1,553 @@
+"""
+This module contains the archive of old transactions.
+
+archive_transactions moves the transactions dated before a day out of the database in
+chunks. Every chunk is written in (date, id) order to a gzip compressed NDJSON file of
+the archive directory. The manifest, a JSON file next to the chunks, keeps the date
+range of every chunk and Bloom filters of its transaction ids and bank account ids, so
+a lookup by id or a statement of an account only opens the few chunks that may hold its
+rows. The rows of a chunk are deleted before it is written and entered in the manifest,
+and the deletion commits last: an interrupted run leaves a transaction in the database,
+in the archive or, if the commit itself fails, in both, but never in neither. Readers
+prefer the database and drop such duplicates. Runs hold an advisory lock per chunk, so
+concurrent runs do not overwrite the manifest of each other.
+
+Rows are deleted without signals, an archived transaction is still counted by the
+statistics of its bank and keeps its ledger entries.
+"""
+
+import base64
+import gzip
+import hashlib
+import heapq
+import os
+from datetime import date
+from decimal import Decimal
+from functools import lru_cache
+from operator import attrgetter
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional
+from uuid import UUID
+
+import orjson
+from django.conf import settings
+from django.db import connection, transaction
+
+from banks_app import config
+
+from . import models
+
+MANIFEST = 'manifest.json'
+CHUNK_SUFFIX = '.ndjson.gz'
+COMPRESS_LEVEL = 6
+BITS_IN_BYTE = 8
+HASH_BYTES = 8
+ROW_FIELDS = (
+    'transaction_date', 'id', 'amount', 'description',
+    'from_bank_account_id_id', 'to_bank_account_id_id', 'initializer_id',
+)
+TRANSACTION_TABLE = models.Transaction._meta.db_table  # noqa: WPS437
+TRANSACTION_CLIENT_TABLE = models.TransactionClient._meta.db_table  # noqa: WPS437
+DELETE_TRANSACTIONS = (
+    f'DELETE FROM {TRANSACTION_TABLE} '  # noqa: S608
+    'WHERE id = ANY(%s) AND transaction_date BETWEEN %s AND %s'
+)
+LOCK_ARCHIVE = 'SELECT pg_advisory_xact_lock(%s)'
+ARCHIVE_LOCK_KEY = 0x62616E6B73  # 'banks', one archive run at a time
+DELETE_TRANSACTION_CLIENTS = (
+    f'DELETE FROM {TRANSACTION_CLIENT_TABLE} WHERE transaction_id = ANY(%s)'  # noqa: S608
+)
+
+
+class BloomFilter:
+    """
+    Set of ids answering membership with false positives but without false negatives.
+
+    Attributes:
+        bits (bytearray): The bit array.
+    """
+
+    def __init__(self, bits: bytearray) -> None:
+        """
+        Create a filter from its bits.
+
+        Args:
+            bits (bytearray): The bit array.
+        """
+        self.bits = bits
+
+    @classmethod
+    def build(cls, keys: Iterable[UUID], count: int) -> 'BloomFilter':
+        """
+        Build the filter of ids.
+
+        Args:
+            keys (Iterable[UUID]): The ids.
+            count (int): The number of ids, sizing the filter.
+
+        Returns:
+            BloomFilter: The filter.
+        """
+        bloom = cls(bytearray(max(1, count * config.ARCHIVE_BLOOM_BITS_PER_KEY // BITS_IN_BYTE)))
+        for key in keys:
+            for position in bloom.positions(key):
+                bloom.bits[position // BITS_IN_BYTE] |= 1 << (position % BITS_IN_BYTE)
+        return bloom
+
+    @classmethod
+    def decode(cls, encoded: str) -> 'BloomFilter':
+        """
+        Read a filter stored in the manifest.
+
+        Args:
+            encoded (str): The base64 encoded bits.
+
+        Returns:
+            BloomFilter: The filter.
+        """
+        return cls(bytearray(base64.b64decode(encoded)))
+
+    def encode(self) -> str:
+        """
+        Encode the filter for the manifest.
+
+        Returns:
+            str: The base64 encoded bits.
+        """
+        return base64.b64encode(self.bits).decode()
+
+    def positions(self, key: UUID) -> Iterator[int]:
+        """
+        Get the bit positions of an id by double hashing.
+
+        Args:
+            key (UUID): The id.
+
+        Returns:
+            Iterator[int]: The positions.
+        """
+        digest = hashlib.blake2b(key.bytes, digest_size=HASH_BYTES * 2).digest()
+        first = int.from_bytes(digest[:HASH_BYTES], 'big')
+        step = int.from_bytes(digest[HASH_BYTES:], 'big') | 1
+        size = len(self.bits) * BITS_IN_BYTE
+        return ((first + index * step) % size for index in range(config.ARCHIVE_BLOOM_HASHES))
+
+    def __contains__(self, key: UUID) -> bool:
+        """
+        Check that an id may be in the filter.
+
+        Args:
+            key (UUID): The id.
+
+        Returns:
+            bool: False if the id is certainly not in the filter.
+        """
+        return all(
+            self.bits[position // BITS_IN_BYTE] & (1 << (position % BITS_IN_BYTE))
+            for position in self.positions(key)
+        )
+
+
+class ArchivedTransaction(NamedTuple):
+    """
+    A transaction read from the archive, ordered like the chunks by date and id.
+
+    Attributes:
+        transaction_date (date): The date of the transaction.
+        id (UUID): Id of the transaction.
+        amount (Decimal): The amount of the transaction.
+        description (Optional[str]): The description of the transaction.
+        from_bank_account_id (UUID): Id of the source bank account.
+        to_bank_account_id (UUID): Id of the target bank account.
+        initializer (UUID): Id of the client who initiated the transaction.
+    """
+
+    transaction_date: date
+    id: UUID
+    amount: Decimal
+    description: Optional[str]
+    from_bank_account_id: UUID
+    to_bank_account_id: UUID
+    initializer: UUID
+
+    @classmethod
+    def decode(cls, line: bytes) -> 'ArchivedTransaction':
+        """
+        Read a line of a chunk.
+
+        Args:
+            line (bytes): The JSON array of the row.
+
+        Returns:
+            ArchivedTransaction: The transaction.
+        """
+        fields = orjson.loads(line)
+        day, pk, amount, description = fields[:4]
+        accounts = [UUID(field) for field in fields[4:]]
+        return cls(date.fromisoformat(day), UUID(pk), Decimal(amount), description, *accounts)
+
+    def encode(self) -> bytes:
+        """
+        Write the transaction as a line of a chunk.
+
+        Returns:
+            bytes: The JSON array of the row with a newline.
+        """
+        return orjson.dumps([
+            self.transaction_date.isoformat(), str(self.id), str(self.amount), self.description,
+            str(self.from_bank_account_id), str(self.to_bank_account_id), str(self.initializer),
+        ]) + b'\n'
+
+    def to_model(self) -> models.Transaction:
+        """
+        Build an unsaved Transaction of the archived row.
+
+        Returns:
+            models.Transaction: The transaction.
+        """
+        return models.Transaction(
+            id=self.id,
+            amount=self.amount,
+            transaction_date=self.transaction_date,
+            description=self.description,
+            from_bank_account_id_id=self.from_bank_account_id,
+            to_bank_account_id_id=self.to_bank_account_id,
+            initializer_id=self.initializer,
+        )
+
+
+class ArchiveChunk(NamedTuple):
+    """
+    Entry of a chunk in the manifest.
+
+    Attributes:
+        name (str): Name of the chunk file in the archive directory.
+        rows (int): The number of transactions.
+        date_from (date): Date of the first transaction.
+        date_to (date): Date of the last transaction.
+        ids (BloomFilter): Filter of the transaction ids.
+        accounts (BloomFilter): Filter of the ids of source and target bank accounts.
+    """
+
+    name: str
+    rows: int
+    date_from: date
+    date_to: date
+    ids: BloomFilter
+    accounts: BloomFilter
+
+    @classmethod
+    def decode(cls, entry: dict) -> 'ArchiveChunk':
+        """
+        Read an entry of the manifest.
+
+        Args:
+            entry (dict): The JSON object of the entry.
+
+        Returns:
+            ArchiveChunk: The chunk.
+        """
+        return cls(
+            entry['name'], entry['rows'],
+            date.fromisoformat(entry['date_from']), date.fromisoformat(entry['date_to']),
+            BloomFilter.decode(entry['ids']), BloomFilter.decode(entry['accounts']),
+        )
+
+    def encode(self) -> dict:
+        """
+        Write the entry of the manifest.
+
+        Returns:
+            dict: The JSON object of the entry.
+        """
+        return {
+            'name': self.name,
+            'rows': self.rows,
+            'date_from': self.date_from.isoformat(),
+            'date_to': self.date_to.isoformat(),
+            'ids': self.ids.encode(),
+            'accounts': self.accounts.encode(),
+        }
+
+    def overlaps(self, date_from: Optional[date], date_to: Optional[date]) -> bool:
+        """
+        Check that the chunk may hold transactions of a period.
+
+        Args:
+            date_from (Optional[date]): First date of the period.
+            date_to (Optional[date]): Last date of the period.
+
+        Returns:
+            bool: True if the date ranges intersect.
+        """
+        starts_in_time = date_to is None or self.date_from <= date_to
+        return starts_in_time and (date_from is None or self.date_to >= date_from)
+
+
+def archive_directory() -> Path:
+    """
+    Get the archive directory.
+
+    Returns:
+        Path: The TRANSACTION_ARCHIVE_DIR setting.
+    """
+    return Path(settings.TRANSACTION_ARCHIVE_DIR)
+
+
+def stored_manifest() -> tuple[ArchiveChunk, ...]:
+    """
+    Read the manifest of the archive directory from the disk.
+
+    Returns:
+        tuple[ArchiveChunk, ...]: The chunks, empty without an archive.
+    """
+    path = archive_directory() / MANIFEST
+    if not path.exists():
+        return ()
+    return tuple(ArchiveChunk.decode(entry) for entry in orjson.loads(path.read_bytes())['chunks'])
+
+
+@lru_cache(maxsize=1)
+def cached_manifest(path: Path, version: tuple[int, int, int]) -> tuple[ArchiveChunk, ...]:
+    """
+    Read the manifest, cached until the file is replaced.
+
+    Args:
+        path (Path): Path of the manifest, part of the cache key.
+        version (tuple[int, int, int]): Modification time, size and inode of the file.
+
+    Returns:
+        tuple[ArchiveChunk, ...]: The chunks.
+    """
+    return stored_manifest()
+
+
+def read_manifest() -> tuple[ArchiveChunk, ...]:
+    """
+    Read the manifest of the archive directory for lookups.
+
+    Returns:
+        tuple[ArchiveChunk, ...]: The chunks, empty without an archive.
+    """
+    path = archive_directory() / MANIFEST
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return ()
+    return cached_manifest(path, (stat.st_mtime_ns, stat.st_size, stat.st_ino))
+
+
+def replace_file(path: Path, payload: bytes) -> None:
+    """
+    Write a file atomically through a temporary file synced to the disk.
+
+    Args:
+        path (Path): Path of the file.
+        payload (bytes): The content of the file.
+    """
+    temporary = path.with_name(f'.{path.name}.tmp')
+    with open(temporary, 'wb') as output:
+        output.write(payload)
+        output.flush()
+        os.fsync(output.fileno())
+    os.replace(temporary, path)
+
+
+def write_chunk(payments: list[ArchivedTransaction]) -> ArchiveChunk:
+    """
+    Write transactions to a new chunk file.
+
+    Args:
+        payments (list[ArchivedTransaction]): The transactions, ordered by date and id.
+
+    Returns:
+        ArchiveChunk: The entry of the chunk.
+    """
+    first = payments[0]
+    name = f'transactions_{first.transaction_date.isoformat()}_{first.id}{CHUNK_SUFFIX}'
+    lines = b''.join(payment.encode() for payment in payments)
+    replace_file(archive_directory() / name, gzip.compress(lines, compresslevel=COMPRESS_LEVEL))
+    accounts = {
+        account
+        for payment in payments
+        for account in (payment.from_bank_account_id, payment.to_bank_account_id)
+    }
+    return ArchiveChunk(
+        name, len(payments), first.transaction_date, payments[-1].transaction_date,
+        BloomFilter.build((payment.id for payment in payments), len(payments)),
+        BloomFilter.build(accounts, len(accounts)),
+    )
+
+
+def write_manifest(chunks: Iterable[ArchiveChunk]) -> None:
+    """
+    Replace the manifest.
+
+    Args:
+        chunks (Iterable[ArchiveChunk]): All chunks of the archive.
+    """
+    replace_file(archive_directory() / MANIFEST, orjson.dumps({
+        'chunks': [chunk.encode() for chunk in chunks],
+    }))
+
+
+def archive_chunk(before: date, chunk_size: int) -> int:
+    """
+    Move the oldest transactions dated before a day to a new chunk.
+
+    Args:
+        before (date): The day.
+        chunk_size (int): Maximum number of transactions of the chunk.
+
+    Returns:
+        int: The number of archived transactions, zero when none are left.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(LOCK_ARCHIVE, [ARCHIVE_LOCK_KEY])
+            payments = [
+                ArchivedTransaction(*row)
+                for row in models.Transaction.objects.filter(
+                    transaction_date__lt=before,
+                ).order_by('transaction_date', 'id').values_list(*ROW_FIELDS)[:chunk_size]
+            ]
+            if not payments:
+                return 0
+            ids = [payment.id for payment in payments]
+            cursor.execute(DELETE_TRANSACTION_CLIENTS, [ids])
+            cursor.execute(
+                DELETE_TRANSACTIONS, [ids, payments[0].transaction_date, payments[-1].transaction_date],
+            )
+        write_manifest([*stored_manifest(), write_chunk(payments)])
+    return len(payments)
+
+
+def archive_transactions(before: date, chunk_size: int = config.ARCHIVE_CHUNK_SIZE) -> int:
+    """
+    Move all transactions dated before a day to the archive, one chunk per database transaction.
+
+    Args:
+        before (date): The day.
+        chunk_size (int): Maximum number of transactions per chunk.
+
+    Returns:
+        int: The number of archived transactions.
+    """
+    archive_directory().mkdir(parents=True, exist_ok=True)
+    total = 0
+    archived = archive_chunk(before, chunk_size)
+    while archived:
+        total += archived
+        archived = archive_chunk(before, chunk_size)
+    return total
+
+
+def read_chunk(chunk: ArchiveChunk) -> Iterator[ArchivedTransaction]:
+    """
+    Stream the transactions of a chunk.
+
+    Args:
+        chunk (ArchiveChunk): The chunk.
+
+    Yields:
+        ArchivedTransaction: The transactions, ordered by date and id.
+    """
+    with gzip.open(archive_directory() / chunk.name, 'rb') as lines:
+        yield from (ArchivedTransaction.decode(line) for line in lines)
+
+
+def find_transaction(pk: str) -> Optional[models.Transaction]:
+    """
+    Find an archived transaction by id.
+
+    Args:
+        pk (str): Id of the transaction.
+
+    Returns:
+        Optional[models.Transaction]: An unsaved transaction, None if it is not archived.
+    """
+    try:
+        key = UUID(str(pk))
+    except ValueError:
+        return None
+    for chunk in read_manifest():
+        if key in chunk.ids:
+            for payment in read_chunk(chunk):
+                if payment.id == key:
+                    return payment.to_model()
+    return None
+
+
+def archived_ids(keys: Iterable[UUID]) -> set[UUID]:
+    """
+    Find which of some transaction ids are archived.
+
+    Every id is tested against the Bloom filters of the chunks, and only the chunks
+    that may hold some of the ids are read.
+
+    Args:
+        keys (Iterable[UUID]): The ids.
+
+    Returns:
+        set[UUID]: The archived ids among them.
+    """
+    wanted = set(keys)
+    archived = set()
+    for chunk in read_manifest():
+        candidates = {key for key in wanted if key in chunk.ids}
+        if candidates:
+            archived.update(payment.id for payment in read_chunk(chunk) if payment.id in candidates)
+    return archived
+
+
+def in_period(day: date, date_from: Optional[date], date_to: Optional[date]) -> bool:
+    """
+    Check that a date is in a period.
+
+    Args:
+        day (date): The date.
+        date_from (Optional[date]): First date of the period.
+        date_to (Optional[date]): Last date of the period.
+
+    Returns:
+        bool: True if the date is in the period.
+    """
+    return (date_from is None or day >= date_from) and (date_to is None or day <= date_to)
+
+
+def account_transactions(
+    account_id: UUID, date_from: Optional[date], date_to: Optional[date],
+) -> Iterator[ArchivedTransaction]:
+    """
+    Stream the archived transactions sent or received by an account in (date, id) order.
+
+    Args:
+        account_id (UUID): Id of the bank account.
+        date_from (Optional[date]): First date to include.
+        date_to (Optional[date]): Last date to include.
+
+    Returns:
+        Iterator[ArchivedTransaction]: The transactions.
+    """
+    chunks = [
+        read_chunk(chunk)
+        for chunk in read_manifest()
+        if chunk.overlaps(date_from, date_to) and account_id in chunk.accounts
+    ]
+    return (
+        payment
+        for payment in heapq.merge(*chunks, key=attrgetter('transaction_date', 'id'))
+        if account_id in {payment.from_bank_account_id, payment.to_bank_account_id}
+        and in_period(payment.transaction_date, date_from, date_to)
+    )
+
+
+def all_transactions() -> Iterator[ArchivedTransaction]:
+    """
+    Stream all archived transactions chunk by chunk.
+
+    Yields:
+        ArchivedTransaction: The transactions.
+    """
+    for chunk in read_manifest():
+        yield from read_chunk(chunk)
@@ -0,0 +1,195 @@
+"""
+This module contains the asynchronous read path of the REST API and the detail pages.
+
+Under ASGI, an async view waits for its queries on the event loop instead of holding a
+worker thread for the whole request, so slow reads do not limit the number of requests
+served at once. AsyncReadViewSetMixin gives a viewset native async ``list`` and
+``retrieve`` actions built on the async ORM (``aget`` and ``async for``). Everything
+else keeps the synchronous implementation: authentication, permissions and the write
+actions run through sync_to_async in the thread of the request, where they share the
+database connection with the async queries. Objects are loaded with their related
+objects before serialization, so serializers never query the database.
+AsyncCachedDetailMixin does the same for the cached HTML detail pages.
+"""
+
+from asgiref import sync
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.shortcuts import aget_object_or_404, render
+from rest_framework.response import Response
+
+from banks_app.page_cache import acached_page
+
+
+class AsyncReadViewSetMixin:
+    """
+    Viewset mixin serving ``list`` and ``retrieve`` with the async ORM.
+
+    The queryset of the viewset must load everything its serializer reads, with
+    select_related or prefetch_related, since lazy relations cannot be loaded while
+    serializing on the event loop. Pagination classes providing ``apaginate_queryset``
+    fetch pages with the async ORM, others are run in a thread.
+    """
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        """
+        Create the view function, marked as a coroutine function for Django.
+
+        Args:
+            actions (dict): Mapping of HTTP methods to actions.
+            **initkwargs: Attributes of the viewset instances.
+
+        Returns:
+            Callable: The view function, returning a coroutine.
+        """
+        view = super().as_view(actions, **initkwargs)
+        return sync.markcoroutinefunction(view)
+
+    async def dispatch(self, request, *args, **kwargs):
+        """
+        Handle a request, awaiting async actions and running sync ones in a thread.
+
+        Mirrors APIView.dispatch.
+
+        Args:
+            request (django.http.HttpRequest): Request object.
+            *args: Positional arguments of the URL.
+            **kwargs: Keyword arguments of the URL.
+
+        Returns:
+            rest_framework.response.Response: The finalized response.
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await sync.sync_to_async(self.initial)(request, *args, **kwargs)
+            method_handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            if sync.iscoroutinefunction(method_handler):
+                response = await method_handler(request, *args, **kwargs)
+            else:
+                response = await sync.sync_to_async(method_handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aget_object(self):
+        """
+        Get the object of a detail action with the async ORM.
+
+        Mirrors GenericAPIView.get_object.
+
+        Returns:
+            Model: The object, checked against the object permissions.
+
+        Raises:
+            Http404: If there is no such object or the lookup value is malformed.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            instance = await aget_object_or_404(
+                queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]},
+            )
+        except (ValidationError, TypeError, ValueError) as error:
+            raise Http404 from error
+        self.check_object_permissions(self.request, instance)
+        return instance
+
+    async def apaginate_queryset(self, queryset):
+        """
+        Fetch the requested page of a listing.
+
+        Args:
+            queryset (QuerySet): The listing.
+
+        Returns:
+            list: Objects of the page.
+        """
+        paginate = getattr(self.paginator, 'apaginate_queryset', None)
+        if paginate is None:
+            return await sync.sync_to_async(self.paginate_queryset)(queryset)
+        return await paginate(queryset, self.request, view=self)
+
+    async def list(self, request, *args, **kwargs):
+        """
+        List objects with the async ORM.
+
+        Args:
+            request (rest_framework.request.Request): Request object.
+            *args: Positional arguments of the URL.
+            **kwargs: Keyword arguments of the URL.
+
+        Returns:
+            rest_framework.response.Response: Serialized objects, paginated if the viewset is.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.paginator is None:
+            instances = [instance async for instance in queryset]
+            return Response(self.get_serializer(instances, many=True).data)
+        page = await self.apaginate_queryset(queryset)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    async def retrieve(self, request, *args, **kwargs):
+        """
+        Retrieve an object with the async ORM.
+
+        Args:
+            request (rest_framework.request.Request): Request object.
+            *args: Positional arguments of the URL.
+            **kwargs: Keyword arguments of the URL.
+
+        Returns:
+            rest_framework.response.Response: The serialized object.
+        """
+        return Response(self.get_serializer(await self.aget_object()).data)
+
+
+class AsyncCachedDetailMixin:
+    """
+    Mixin serving the content of a detail view from the page cache with the async ORM.
+
+    Goes before CachedPageMixin, whose page attributes it uses. On a miss the object
+    is loaded with the relations shown on the page, so that the template is rendered
+    on the event loop without querying the database.
+
+    Attributes:
+        prefetch_related_names (tuple[str, ...]): Relations shown on the page.
+    """
+
+    prefetch_related_names = ()
+
+    async def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests.
+
+        Args:
+            request (django.http.HttpRequest): Request object.
+            args: Positional arguments of the URL.
+            kwargs: Keyword arguments of the URL.
+
+        Returns:
+            django.http.HttpResponse: The page.
+        """
+        request.user = await request.auser()
+        if request.user.is_superuser:
+            page = await self.arender_page()
+        else:
+            page = await acached_page(self.page_kind, kwargs['pk'], 'user', self.arender_page)
+        return render(request, self.page_template_name, {'page': page})
+
+    async def arender_page(self):
+        """
+        Load the object and render the title and the content of the page.
+
+        Returns:
+            dict: Title and HTML content of the page.
+        """
+        queryset = self.get_queryset().prefetch_related(*self.prefetch_related_names)
+        self.object = await aget_object_or_404(queryset, pk=self.kwargs['pk'])
+        response = self.render_to_response(self.get_context_data(object=self.object))
+        return {'title': self.render_title(), 'content': response.rendered_content}
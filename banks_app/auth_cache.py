@@ -0,0 +1,414 @@
+"""
+This module contains the cached authentication, permissions and client of requests.
+
+TokenAuthentication loads the token with its user on every request, the permission
+checks load the permissions of the user and the client views load the client of the
+user. CachedTokenAuthentication keeps, per token, the user with its client in a
+bounded LRU cache of the process with a time to live, and CachedModelBackend keeps the
+permissions of the users the same way, so a repeated request authenticates and checks
+permissions without queries. Every request gets its own copy of the cached user.
+Session requests load the user with its client in one query, and views and forms get
+the client of a request from the user with get_client.
+
+Entries are dropped by signal receivers when a token, a user or a client changes and
+all of them when groups or permissions change, immediately and again when the
+transaction commits. Other processes do not receive the signals, so the receivers also
+bump versions of the user and of the groups kept in the page cache, which every worker
+shares, and an entry is served only while the versions it was stored under are current.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Callable, Hashable, NamedTuple, Optional
+
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Group, Permission, User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from banks_app import config, page_cache
+from banks_app.models import Client
+
+CLIENT_CACHE_NAME = 'client'
+USER_VERSION = 'auth-user'
+GROUPS_VERSION = 'auth-groups'
+
+
+class CachedUser(NamedTuple):
+    """
+    Authentication data of a token.
+
+    Attributes:
+        user (User): The user, with the client in its relation cache.
+        token (Token): The token.
+        version (int): Version of the user when the token was loaded.
+    """
+
+    user: User
+    token: Token
+    version: int
+
+
+class CachedPermissions(NamedTuple):
+    """
+    Permissions of a user.
+
+    Attributes:
+        permissions (frozenset[str]): Permissions as ``app_label.codename``.
+        versions (tuple[int, int]): Versions of the user and of the groups when loaded.
+    """
+
+    permissions: frozenset
+    versions: tuple[int, int]
+
+
+class LRUCache:
+    """
+    Thread-safe mapping keeping the most recently used entries for a limited time.
+
+    Attributes:
+        maxsize (int): Maximum number of entries.
+        ttl (float): Seconds an entry is kept after it was stored.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Initialize an empty cache.
+
+        Args:
+            maxsize (int): Maximum number of entries.
+            ttl (float): Seconds an entry is kept after it was stored.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable):
+        """
+        Get an entry and mark it as recently used.
+
+        Args:
+            key (Hashable): Key of the entry.
+
+        Returns:
+            Any: The entry, None if it is missing or expired.
+        """
+        with self.lock:
+            expires, entry = self.entries.get(key, (0, None))
+            if expires <= time.monotonic():
+                self.entries.pop(key, None)
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key: Hashable, entry) -> None:  # noqa: WPS615
+        """
+        Store an entry, evicting the least recently used ones over maxsize.
+
+        Args:
+            key (Hashable): Key of the entry.
+            entry (Any): The entry.
+        """
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, entry)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def discard(self, matches: Callable[[Hashable, object], bool]) -> None:
+        """
+        Remove the entries matching a predicate.
+
+        Args:
+            matches (Callable[[Hashable, object], bool]): Called with the key and the entry.
+        """
+        with self.lock:
+            stale = [key for key, stored in self.entries.items() if matches(key, stored[1])]
+            for key in stale:
+                del self.entries[key]  # noqa: WPS420
+
+    def __len__(self) -> int:
+        """
+        Count the stored entries, including expired ones not yet removed.
+
+        Returns:
+            int: Number of entries.
+        """
+        return len(self.entries)
+
+
+token_cache = LRUCache(config.AUTH_CACHE_SIZE, config.AUTH_CACHE_TTL)
+permission_cache = LRUCache(config.AUTH_CACHE_SIZE, config.AUTH_CACHE_TTL)
+
+
+def load_user(key: str) -> CachedUser:
+    """
+    Load the user of a token with the client in one query.
+
+    Args:
+        key (str): The token.
+
+    Returns:
+        CachedUser: Authentication data of the token.
+
+    Raises:
+        AuthenticationFailed: If there is no such token.
+    """
+    try:
+        token = Token.objects.select_related('user__client').get(key=key)
+    except Token.DoesNotExist as error:
+        raise exceptions.AuthenticationFailed(_('Invalid token.')) from error
+    token.user._state.fields_cache.setdefault(CLIENT_CACHE_NAME, None)  # noqa: WPS437
+    return CachedUser(token.user, token, page_cache.get_version(USER_VERSION, token.user_id))
+
+
+def permission_versions(user_id: int) -> tuple[int, int]:
+    """
+    Get the current versions of a user and of the groups.
+
+    Args:
+        user_id (int): Id of the user.
+
+    Returns:
+        tuple[int, int]: The versions.
+    """
+    return page_cache.get_version(USER_VERSION, user_id), page_cache.get_version(GROUPS_VERSION)
+
+
+def request_user(cached: CachedUser) -> User:
+    """
+    Copy the cached user and client for a request.
+
+    Args:
+        cached (CachedUser): Authentication data of the token.
+
+    Returns:
+        User: The copy.
+    """
+    user = copy.copy(cached.user)
+    client = getattr(user, CLIENT_CACHE_NAME)
+    if client is not None:
+        user._state.fields_cache[CLIENT_CACHE_NAME] = copy.copy(client)  # noqa: WPS437
+    return user
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication served from the token cache of the process."""
+
+    def authenticate_credentials(self, key):
+        """
+        Authenticate a token, loading it only if it is not cached.
+
+        Args:
+            key (str): The token.
+
+        Returns:
+            tuple: The user and the token.
+
+        Raises:
+            AuthenticationFailed: If the token is unknown or the user is inactive.
+        """
+        cached = token_cache.get(key)
+        if cached is None or cached.version != page_cache.get_version(USER_VERSION, cached.user.pk):
+            cached = load_user(key)
+            token_cache.set(key, cached)
+        if not cached.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        return request_user(cached), cached.token
+
+
+def get_client(request) -> Optional[Client]:
+    """
+    Get the client of the user of a request.
+
+    The client is loaded with the user by the authentication, or by the first call of
+    the request, and cached on the user of the request.
+
+    Args:
+        request (django.http.HttpRequest): Request object, or a DRF request.
+
+    Returns:
+        Optional[Client]: The client, None for anonymous users and users without a client.
+    """
+    if not request.user.is_authenticated:
+        return None
+    try:
+        return getattr(request.user, CLIENT_CACHE_NAME)
+    except Client.DoesNotExist:
+        return None
+
+
+class CachedModelBackend(ModelBackend):
+    """Model backend loading users with the client and resolving permissions from the cache."""
+
+    def get_user(self, user_id):
+        """
+        Load the user of a session with the client in one query.
+
+        Args:
+            user_id (int): Id of the user.
+
+        Returns:
+            Optional[User]: The user, None if it does not exist or may not log in.
+        """
+        try:
+            user = User.objects.select_related(CLIENT_CACHE_NAME).get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+    def get_all_permissions(self, user_obj, obj=None):  # noqa: WPS110
+        """
+        Get the permissions of a user, loading them only if they are not cached.
+
+        Args:
+            user_obj (User): The user.
+            obj (Any): Object of object permissions, which the backend does not support.
+
+        Returns:
+            set[str]: Permissions as ``app_label.codename``.
+        """
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return super().get_all_permissions(user_obj, obj)
+        if not hasattr(user_obj, '_perm_cache'):  # noqa: WPS421
+            cached = permission_cache.get(user_obj.pk)
+            versions = permission_versions(user_obj.pk)
+            if cached is None or cached.versions != versions:
+                cached = CachedPermissions(frozenset(super().get_all_permissions(user_obj)), versions)
+                permission_cache.set(user_obj.pk, cached)
+            user_obj._perm_cache = set(cached.permissions)  # noqa: WPS437
+        return user_obj._perm_cache  # noqa: WPS437
+
+
+def forget(matches: Callable[[Hashable, object], bool], caches: tuple[LRUCache, ...]) -> None:
+    """
+    Remove matching entries now and again after the commit.
+
+    Entries loaded by other requests before the commit see the old rows, the second
+    pass removes them.
+
+    Args:
+        matches (Callable[[Hashable, object], bool]): Called with the key and the entry.
+        caches (tuple[LRUCache, ...]): Caches to remove the entries from.
+    """
+    for cache in caches:
+        cache.discard(matches)
+        transaction.on_commit(partial(cache.discard, matches))
+
+
+def is_key(key: Hashable, entry_key: Hashable, entry) -> bool:
+    """
+    Check that an entry is stored under a key.
+
+    Args:
+        key (Hashable): The key, a token or the id of a user.
+        entry_key (Hashable): Key of the entry.
+        entry (Any): The entry.
+
+    Returns:
+        bool: True for the entry of the key.
+    """
+    return entry_key == key
+
+
+def is_user(user_id: int, entry_key: Hashable, entry) -> bool:
+    """
+    Check that an entry of the token cache or the permission cache belongs to a user.
+
+    Args:
+        user_id (int): Id of the user.
+        entry_key (Hashable): Key of the entry.
+        entry (Any): The entry.
+
+    Returns:
+        bool: True for entries of the user.
+    """
+    if isinstance(entry, CachedUser):
+        return entry.user.pk == user_id
+    return entry_key == user_id
+
+
+def is_any(entry_key: Hashable, entry) -> bool:
+    """
+    Match every entry.
+
+    Args:
+        entry_key (Hashable): Key of the entry.
+        entry (Any): The entry.
+
+    Returns:
+        bool: Always True.
+    """
+    return True
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_token(sender, instance, **kwargs):
+    """
+    Drop a changed or deleted token, in other processes by bumping the version of its user.
+
+    Args:
+        sender (type): The model class.
+        instance (Token): The token.
+        **kwargs: Additional keyword arguments.
+    """
+    forget(partial(is_key, instance.key), (token_cache,))
+    page_cache.invalidate(USER_VERSION, [instance.user_id])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def invalidate_user(sender, instance, **kwargs):
+    """
+    Drop the tokens and permissions of a changed user, or of the user of a changed client.
+
+    Args:
+        sender (type): The model class.
+        instance (User | Client): The user or the client.
+        **kwargs: Additional keyword arguments.
+    """
+    user_id = instance.user_id if sender is Client else instance.pk
+    forget(partial(is_user, user_id), (token_cache, permission_cache))
+    page_cache.invalidate(USER_VERSION, [user_id])
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+def invalidate_groups(sender, **kwargs):
+    """
+    Drop all permissions when groups or permissions change.
+
+    Args:
+        sender (type): The model class.
+        **kwargs: Additional keyword arguments.
+    """
+    forget(is_any, (permission_cache,))
+    page_cache.invalidate(GROUPS_VERSION)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_memberships(sender, **kwargs):
+    """
+    Drop all permissions when group memberships or granted permissions change.
+
+    Args:
+        sender (type): The model class.
+        **kwargs: Additional keyword arguments.
+    """
+    forget(is_any, (permission_cache,))
+    page_cache.invalidate(GROUPS_VERSION)
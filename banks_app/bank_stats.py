@@ -0,0 +1,415 @@
+"""
+This module contains the incrementally maintained statistics of banks.
+
+BankStats keeps the numbers of clients and accounts and the total deposits of every
+bank, BankDailyVolume the number and the amount of transfers sent from its accounts
+per day. Nothing is aggregated on read. Every saved or deleted relation, account or
+transaction withdraws the contribution of its row before the change and adds it back
+after it, and transfers apply their balance deltas, in the same database transaction
+as the change. Each update is a single INSERT ... SELECT ... ON CONFLICT DO UPDATE
+computed by the database, with rows ordered by bank so that concurrent updates lock
+the statistics in the same order. Archived transactions stay counted in the daily
+volumes, rebuilds read them from the archive.
+"""
+
+from datetime import date
+from decimal import Decimal
+from itertools import repeat
+from typing import Iterable, Iterator, NamedTuple
+from uuid import UUID
+
+from django.db import connection
+from django.db.models import Count, QuerySet, Sum, Value, signals
+from django.db.transaction import atomic
+from django.dispatch import receiver
+
+from . import archive, models
+
+ADD = 1
+WITHDRAW = -1
+ZERO = Decimal('0.00')
+STATS_TABLE = models.BankStats._meta.db_table  # noqa: WPS437
+VOLUME_TABLE = models.BankDailyVolume._meta.db_table  # noqa: WPS437
+ACCOUNT_TABLE = models.BankAccount._meta.db_table  # noqa: WPS437
+TOTALS_FIELDS = ('clients', 'accounts', 'deposits')
+VOLUME_FIELDS = ('transfers', 'amount')
+TOTALS_CONFLICT = (
+    'ON CONFLICT (bank_id) DO UPDATE SET '
+    'clients = stats.clients + EXCLUDED.clients, '
+    'accounts = stats.accounts + EXCLUDED.accounts, '
+    'deposits = stats.deposits + EXCLUDED.deposits'
+)
+VOLUME_CONFLICT = (
+    'ON CONFLICT (bank_id, day) DO UPDATE SET '
+    'transfers = volume.transfers + EXCLUDED.transfers, '
+    'amount = volume.amount + EXCLUDED.amount'
+)
+
+
+class Drift(NamedTuple):
+    """
+    Difference between stored and recomputed statistics of a bank.
+
+    Attributes:
+        bank_id (UUID): Id of the bank.
+        field (str): Name of the statistic, with the day for daily volumes.
+        stored (object): The stored value.
+        expected (object): The recomputed value.
+    """
+
+    bank_id: UUID
+    field: str
+    stored: object
+    expected: object
+
+
+def upsert(insert: str, rows: QuerySet, conflict: str) -> None:
+    """
+    Add rows computed by a query to a statistics table.
+
+    Args:
+        insert (str): INSERT INTO clause with the target columns.
+        rows (QuerySet): Query computing the values of the target columns.
+        conflict (str): ON CONFLICT clause adding the values to existing rows.
+    """
+    select, query_params = rows.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'{insert} {select} {conflict}', query_params)
+
+
+def add_totals(rows: QuerySet) -> None:
+    """
+    Add per-bank numbers of clients and accounts and deposits to BankStats.
+
+    Args:
+        rows (QuerySet): Values of bank, clients, accounts and deposits, in this order.
+    """
+    upsert(
+        f'INSERT INTO {STATS_TABLE} AS stats (bank_id, clients, accounts, deposits)',
+        rows.order_by('bank'),
+        TOTALS_CONFLICT,
+    )
+
+
+def count_relations(relations: QuerySet, sign: int) -> None:
+    """
+    Add or withdraw the contribution of relations bank client to the numbers of clients.
+
+    Args:
+        relations (QuerySet): The relations.
+        sign (int): ADD or WITHDRAW.
+    """
+    add_totals(relations.values('bank').annotate(
+        clients=Count('id') * sign,
+        accounts=Value(0),
+        deposits=Value(ZERO),
+    ))
+
+
+def count_accounts(accounts: QuerySet, sign: int) -> None:
+    """
+    Add or withdraw the contribution of bank accounts to the numbers of accounts and deposits.
+
+    Args:
+        accounts (QuerySet): The bank accounts.
+        sign (int): ADD or WITHDRAW.
+    """
+    add_totals(accounts.values('bank').annotate(
+        clients=Value(0),
+        accounts=Count('id') * sign,
+        deposits=Sum('balance') * sign,
+    ))
+
+
+def count_transactions(transactions: QuerySet, sign: int) -> None:
+    """
+    Add or withdraw the contribution of transactions to the daily volumes of their source banks.
+
+    Args:
+        transactions (QuerySet): The transactions.
+        sign (int): ADD or WITHDRAW.
+    """
+    bank = 'from_bank_account_id__bank'
+    upsert(
+        f'INSERT INTO {VOLUME_TABLE} AS volume (bank_id, day, transfers, amount)',
+        transactions.values(bank, 'transaction_date').annotate(
+            transfers=Count('id') * sign,
+            amount=Sum('amount') * sign,
+        ).order_by(bank, 'transaction_date'),
+        VOLUME_CONFLICT,
+    )
+
+
+def move_deposits(deltas: Iterable[tuple[UUID, Decimal]]) -> None:
+    """
+    Apply balance changes of bank accounts made by transfers to the deposits of their banks.
+
+    Banks whose deposits do not change, like both sides of a transfer within one bank,
+    are not touched, so such transfers do not contend for the statistics row.
+
+    Args:
+        deltas (Iterable[tuple[UUID, Decimal]]): Ids of accounts with their balance changes.
+    """
+    deltas = list(deltas)
+    if not deltas:
+        return
+    rows = ', '.join(['(%s::uuid, %s::numeric)'] * len(deltas))  # noqa: WPS435
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {STATS_TABLE} AS stats (bank_id, clients, accounts, deposits) '  # noqa: S608
+            'SELECT account.bank_id, 0, 0, sum(delta.amount) '
+            f'FROM (VALUES {rows}) AS delta (account_id, amount) '
+            f'JOIN {ACCOUNT_TABLE} account ON account.id = delta.account_id '
+            'GROUP BY account.bank_id HAVING sum(delta.amount) <> 0 ORDER BY account.bank_id '
+            f'{TOTALS_CONFLICT}',
+            [delta_value for delta in deltas for delta_value in delta],
+        )
+
+
+COUNTERS = {
+    models.BankClient: count_relations,
+    models.BankAccount: count_accounts,
+    models.Transaction: count_transactions,
+}
+
+
+@receiver([signals.pre_save, signals.pre_delete], sender=models.BankClient)
+@receiver([signals.pre_save, signals.pre_delete], sender=models.BankAccount)
+@receiver([signals.pre_save, signals.pre_delete], sender=models.Transaction)
+def withdraw_row(sender, instance, **kwargs):
+    """
+    Withdraw the contribution of a stored row before it is changed or deleted.
+
+    Args:
+        sender (type): The model class.
+        instance (Model): The saved or deleted object.
+        **kwargs: Additional keyword arguments.
+    """
+    if not instance._state.adding:  # noqa: WPS437
+        COUNTERS[sender](sender.objects.filter(pk=instance.pk), WITHDRAW)
+
+
+@receiver(signals.post_save, sender=models.BankClient)
+@receiver(signals.post_save, sender=models.BankAccount)
+@receiver(signals.post_save, sender=models.Transaction)
+def add_row(sender, instance, **kwargs):
+    """
+    Add the contribution of a saved row.
+
+    Args:
+        sender (type): The model class.
+        instance (Model): The saved object.
+        **kwargs: Additional keyword arguments.
+    """
+    COUNTERS[sender](sender.objects.filter(pk=instance.pk), ADD)
+
+
+@receiver(signals.m2m_changed, sender=models.BankClient)
+def add_relations(sender, instance, action, model, pk_set, **kwargs):  # noqa: WPS211
+    """
+    Add relations created through Bank.clients or Client.banks, which sends no post_save.
+
+    Removed relations are deleted one by one and withdrawn by withdraw_row.
+
+    Args:
+        sender (type): The through model.
+        instance (Bank | Client): The object whose relations changed.
+        action (str): Kind of the change.
+        model (type): The model of the related objects.
+        pk_set (set): Primary keys of the related objects.
+        **kwargs: Additional keyword arguments.
+    """
+    if action != 'post_add' or not pk_set:
+        return
+    side, other_side = ('bank', 'client') if isinstance(instance, models.Bank) else ('client', 'bank')
+    relations = models.BankClient.objects.filter(**{side: instance.pk, f'{other_side}__in': pk_set})
+    count_relations(relations, ADD)
+
+
+def read_stats(bank: models.Bank) -> models.BankStats:
+    """
+    Get the statistics of a bank loaded with select_related('stats').
+
+    Args:
+        bank (models.Bank): The bank.
+
+    Returns:
+        models.BankStats: The statistics, zeros if nothing was counted for the bank yet.
+    """
+    try:
+        return bank.stats
+    except models.BankStats.DoesNotExist:
+        return models.BankStats(bank=bank)
+
+
+def recent_volumes(bank: models.Bank, since: date) -> QuerySet:
+    """
+    Get daily transfer volumes of a bank, read by the (bank, day) unique index.
+
+    Args:
+        bank (models.Bank): The bank.
+        since (date): The first day.
+
+    Returns:
+        QuerySet: Daily volumes with transfers, ordered by day.
+    """
+    return bank.daily_volumes.filter(day__gte=since).exclude(transfers=0).order_by('day')
+
+
+def expected_totals() -> dict[UUID, tuple]:
+    """
+    Compute clients, accounts and deposits of every bank from scratch.
+
+    Returns:
+        dict[UUID, tuple]: Numbers of clients and accounts and deposits by bank.
+    """
+    clients = dict(models.BankClient.objects.values_list('bank').annotate(Count('id')).order_by())
+    accounts = {
+        bank_id: (number, deposits)
+        for bank_id, number, deposits in models.BankAccount.objects.values_list('bank').annotate(
+            Count('id'), Sum('balance'),
+        ).order_by()
+    }
+    return {
+        bank_id: (clients.get(bank_id, 0), *accounts.get(bank_id, (0, ZERO)))
+        for bank_id in models.Bank.objects.values_list('id', flat=True)
+    }
+
+
+def stored_totals() -> dict[UUID, tuple]:
+    """
+    Read clients, accounts and deposits of every bank from BankStats.
+
+    Returns:
+        dict[UUID, tuple]: Numbers of clients and accounts and deposits by bank.
+    """
+    totals = {bank_id: (0, 0, ZERO) for bank_id in models.Bank.objects.values_list('id', flat=True)}
+    totals.update(
+        (bank_id, tuple(stored))
+        for bank_id, *stored in models.BankStats.objects.values_list('bank', *TOTALS_FIELDS)
+    )
+    return totals
+
+
+def expected_volumes() -> dict[tuple[UUID, date], tuple]:
+    """
+    Compute daily transfer volumes of every bank from scratch, archived transactions included.
+
+    Returns:
+        dict[tuple[UUID, date], tuple]: Numbers and amounts of transfers by bank and day.
+    """
+    volumes = {
+        (bank_id, day): (transfers, amount)
+        for bank_id, day, transfers, amount in models.Transaction.objects.values_list(
+            'from_bank_account_id__bank', 'transaction_date',
+        ).annotate(Count('id'), Sum('amount')).order_by()
+    }
+    if not archive.read_manifest():
+        return volumes
+    banks = dict(models.BankAccount.objects.values_list('id', 'bank'))
+    for payment in archive.all_transactions():
+        bank_id = banks.get(payment.from_bank_account_id)
+        if bank_id is not None:
+            transfers, amount = volumes.get((bank_id, payment.transaction_date), (0, ZERO))
+            volumes[bank_id, payment.transaction_date] = (transfers + 1, amount + payment.amount)
+    return volumes
+
+
+def stored_volumes() -> dict[tuple[UUID, date], tuple]:
+    """
+    Read daily transfer volumes of every bank from BankDailyVolume, skipping empty days.
+
+    Returns:
+        dict[tuple[UUID, date], tuple]: Numbers and amounts of transfers by bank and day.
+    """
+    return {
+        (bank_id, day): (transfers, amount)
+        for bank_id, day, transfers, amount in models.BankDailyVolume.objects.exclude(
+            transfers=0, amount=0,
+        ).values_list('bank', 'day', 'transfers', 'amount')
+    }
+
+
+def find_drift(stored: dict, expected: dict, fields: tuple[str, ...]) -> list[Drift]:
+    """
+    Compare stored statistics with recomputed ones.
+
+    Args:
+        stored (dict): Stored values by bank or by bank and day.
+        expected (dict): Recomputed values with the same keys.
+        fields (tuple[str, ...]): Names of the values.
+
+    Returns:
+        list[Drift]: Differing values.
+    """
+    return [
+        value_drift
+        for key in sorted(stored.keys() | expected.keys(), key=str)
+        for value_drift in drift_of(key, stored, expected, fields)
+    ]
+
+
+def drift_of(key, stored: dict, expected: dict, fields: tuple[str, ...]) -> Iterator[Drift]:
+    """
+    Compare stored statistics of a bank or of a bank and day with recomputed ones.
+
+    Args:
+        key (UUID | tuple[UUID, date]): The bank or the bank and the day.
+        stored (dict): Stored values by bank or by bank and day.
+        expected (dict): Recomputed values with the same keys.
+        fields (tuple[str, ...]): Names of the values.
+
+    Yields:
+        Drift: Differing values.
+    """
+    bank_id, day = key if isinstance(key, tuple) else (key, None)
+    suffix = f' on {day}' if day else ''
+    empty = tuple(repeat(0, len(fields)))
+    for field, stored_value, expected_value in zip(fields, stored.get(key, empty), expected.get(key, empty)):
+        if stored_value != expected_value:
+            yield Drift(bank_id, f'{field}{suffix}', stored_value, expected_value)
+
+
+@atomic
+def rebuild(check_only: bool = False) -> list[Drift]:
+    """
+    Recompute all bank statistics from scratch and report the drift of the stored ones.
+
+    The statistics tables are locked first, so transfers committed meanwhile are either
+    counted by the recomputation or applied on top of the rebuilt rows after it.
+
+    Args:
+        check_only (bool): Only report the drift without rewriting the statistics.
+
+    Returns:
+        list[Drift]: Values that differed from the recomputed ones.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {STATS_TABLE}, {VOLUME_TABLE} IN EXCLUSIVE MODE')
+    totals = expected_totals()
+    volumes = expected_volumes()
+    drift = find_drift(stored_totals(), totals, TOTALS_FIELDS)
+    drift.extend(find_drift(stored_volumes(), volumes, VOLUME_FIELDS))
+    if not check_only:
+        write_stats(totals, volumes)
+    return drift
+
+
+def write_stats(totals: dict[UUID, tuple], volumes: dict[tuple[UUID, date], tuple]) -> None:
+    """
+    Replace all bank statistics.
+
+    Args:
+        totals (dict[UUID, tuple]): Numbers of clients and accounts and deposits by bank.
+        volumes (dict[tuple[UUID, date], tuple]): Numbers and amounts of transfers by bank and day.
+    """
+    models.BankStats.objects.all().delete()
+    models.BankDailyVolume.objects.all().delete()
+    models.BankStats.objects.bulk_create(
+        models.BankStats(bank_id=bank_id, **dict(zip(TOTALS_FIELDS, bank_totals)))
+        for bank_id, bank_totals in totals.items()
+    )
+    models.BankDailyVolume.objects.bulk_create(
+        models.BankDailyVolume(bank_id=bank_id, day=day, **dict(zip(VOLUME_FIELDS, day_volume)))
+        for (bank_id, day), day_volume in volumes.items()
+    )
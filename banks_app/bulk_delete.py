@@ -0,0 +1,85 @@
+"""
+This module contains the set-based deletion of banks.
+
+Model.delete collects every account, transaction and relation cascaded from a bank in
+Python and sends pre_delete and post_delete for each of them, so the receivers of bank
+statistics and of relations run a few queries per deleted row while the locks are held.
+delete_bank removes the same rows with one DELETE per table keyed by the bank and does
+the work of those receivers with set-based statements: transfers received from other
+banks are withdrawn from their daily volumes, and cached pages of the clients of the
+bank are invalidated. The bank itself is then deleted by Model.delete, which finds
+nothing left to cascade but its statistics and sends the signals of the bank.
+"""
+
+from collections import Counter
+
+from django.db import connection
+from django.db.models import Model
+from django.db.transaction import atomic
+
+from banks_app import bank_stats, page_cache
+from banks_app.bulk_load import table_of
+
+from . import models
+
+ACCOUNTS = f'SELECT id FROM {table_of(models.BankAccount)} WHERE bank_id = %(bank)s'  # noqa: S608
+TRANSACTION_TABLE = table_of(models.Transaction)
+TRANSACTIONS = (
+    f'SELECT id FROM {TRANSACTION_TABLE} WHERE from_bank_account_id_id IN ({ACCOUNTS}) '  # noqa: S608
+    f'UNION SELECT id FROM {TRANSACTION_TABLE} WHERE to_bank_account_id_id IN ({ACCOUNTS})'
+)
+# Each side of transfers is deleted by its own statement, so both use their index.
+DELETE = 'DELETE FROM {0} WHERE {1}'
+CASCADE = (
+    (models.TransactionClient, f'transaction_id IN ({TRANSACTIONS})'),
+    (models.Transaction, f'from_bank_account_id_id IN ({ACCOUNTS})'),
+    (models.Transaction, f'to_bank_account_id_id IN ({ACCOUNTS})'),
+    (models.LedgerEntry, f'account_id IN ({ACCOUNTS})'),
+    (models.BankAccount, 'bank_id = %(bank)s'),
+)
+DELETE_RELATIONS = (
+    f'DELETE FROM {table_of(models.BankClient)} WHERE bank_id = %(bank)s RETURNING client_id'  # noqa: S608
+)
+
+
+def label_of(model: type[Model]) -> str:
+    """
+    Get the label of a model in the counts of deleted rows.
+
+    Args:
+        model (type[Model]): The model.
+
+    Returns:
+        str: The label, as in the result of Model.delete.
+    """
+    return model._meta.label  # noqa: WPS437
+
+
+@atomic
+def delete_bank(bank: models.Bank) -> tuple[int, dict[str, int]]:
+    """
+    Delete a bank with its accounts, their transactions and its relations in a few statements.
+
+    The row of the bank is locked first, so no account or relation is added to it meanwhile.
+
+    Args:
+        bank (models.Bank): The bank.
+
+    Returns:
+        tuple[int, dict[str, int]]: Numbers of deleted rows, in total and per model, as Model.delete.
+    """
+    list(models.Bank.objects.select_for_update().filter(pk=bank.pk).values_list('pk'))
+    received = models.Transaction.objects.filter(to_bank_account_id__bank=bank)
+    bank_stats.count_transactions(received.exclude(from_bank_account_id__bank=bank), bank_stats.WITHDRAW)
+    deleted = Counter()
+    with connection.cursor() as cursor:
+        for model, condition in CASCADE:
+            cursor.execute(DELETE.format(table_of(model), condition), {'bank': bank.pk})
+            deleted[label_of(model)] += cursor.rowcount
+        cursor.execute(DELETE_RELATIONS, {'bank': bank.pk})
+        client_ids = {row[0] for row in cursor.fetchall()}
+    deleted[label_of(models.BankClient)] += len(client_ids)
+    page_cache.invalidate(page_cache.CLIENT, client_ids)
+    deleted.update(bank.delete()[1])
+    deleted = {label: count for label, count in deleted.items() if count}
+    return sum(deleted.values()), deleted
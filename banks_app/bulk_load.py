@@ -0,0 +1,517 @@
+"""
+This module contains the bulk loader of banking data.
+
+Input rows are streamed with COPY ... FROM STDIN into a temporary staging table shaped
+like the target table. Foreign keys, uniqueness and the validators of the model fields
+are then checked on the staging table with a single set-based query, and the rows are
+moved into the target table with one INSERT ... SELECT. Loading therefore costs a few
+statements whatever the number of rows, and a failed load leaves the tables untouched.
+SQL is composed from table and column names of the models only, input values are
+always sent as COPY data or query parameters.
+"""
+
+import csv
+import json
+import time
+from itertools import chain
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, TextIO
+
+import psycopg
+from django.core import validators
+from django.db import connection, models
+from django.db.models.expressions import RawSQL
+from django.db.transaction import atomic
+
+from banks_app import archive, bank_stats, config, ledger, page_cache
+
+from .models import BankAccount, BankClient, Client, Transaction, check_created
+
+STAGING_TABLE = 'bulk_load_staging'
+MODELS = {
+    'client': Client,
+    'bank_client': BankClient,
+    'bank_account': BankAccount,
+    'transaction': Transaction,
+}
+# Defaults of the model fields are computed in Python, the staging table gets SQL ones.
+COLUMN_DEFAULTS = {
+    'id': 'gen_random_uuid()',
+    'transaction_date': 'CURRENT_DATE',
+    'version': '1',
+    'updated_at': 'now()',
+}
+MIN_ELAPSED = 1e-6
+LIMIT_CONDITIONS = {
+    validators.MinValueValidator: '{0} < %s',
+    validators.MaxValueValidator: '{0} > %s',
+    validators.MinLengthValidator: 'char_length({0}) < %s',
+    validators.MaxLengthValidator: 'char_length({0}) > %s',
+}
+
+
+class BulkLoadError(Exception):
+    """Raised when input cannot be loaded."""
+
+
+class Check(NamedTuple):
+    """
+    Set-based check of staged rows.
+
+    Attributes:
+        name (str): Human readable description of the problem.
+        condition (str): SQL condition matching invalid rows of the staging table ``s``.
+        arguments (tuple): Query parameters of the condition.
+    """
+
+    name: str
+    condition: str
+    arguments: tuple = ()
+
+
+class LoadReport(NamedTuple):
+    """
+    Outcome of a bulk load.
+
+    Attributes:
+        copied (int): Number of rows copied into the staging table.
+        rejected (dict[str, int]): Number of invalid rows per failed check.
+        loaded (int): Number of rows inserted into the target table.
+        elapsed (float): Duration of the load in seconds.
+    """
+
+    copied: int
+    rejected: dict[str, int]
+    loaded: int
+    elapsed: float
+
+
+def quote(name: str) -> str:
+    """
+    Quote a table or column name.
+
+    Args:
+        name (str): The name to quote.
+
+    Returns:
+        str: The quoted name.
+    """
+    return connection.ops.quote_name(name)
+
+
+def table_of(model: type[models.Model]) -> str:
+    """
+    Get the quoted table name of a model.
+
+    Args:
+        model (type[Model]): The model.
+
+    Returns:
+        str: The quoted table name.
+    """
+    return quote(model._meta.db_table)  # noqa: WPS437
+
+
+def columns_of(model: type[models.Model]) -> list[str]:
+    """
+    Get the database columns of a model.
+
+    Args:
+        model (type[Model]): The model.
+
+    Returns:
+        list[str]: The columns.
+    """
+    return [field.column for field in model._meta.concrete_fields]  # noqa: WPS437
+
+
+def read_csv(stream: TextIO) -> tuple[list[str], Iterator[list]]:
+    """
+    Read CSV input with a header line, empty values are read as NULL.
+
+    Args:
+        stream (TextIO): The input.
+
+    Returns:
+        tuple[list[str], Iterator[list]]: Column names and rows.
+    """
+    reader = csv.reader(stream)
+    header = next(reader, [])
+    return header, ([column_value or None for column_value in row] for row in reader)
+
+
+def read_ndjson(stream: TextIO) -> tuple[list[str], Iterator[list]]:
+    """
+    Read newline-delimited JSON objects, columns are the keys of the first object.
+
+    Args:
+        stream (TextIO): The input.
+
+    Returns:
+        tuple[list[str], Iterator[list]]: Column names and rows.
+    """
+    records = (json.loads(line) for line in stream if line.strip())
+    first_record = next(records, None)
+    if first_record is None:
+        return [], iter(())
+    header = list(first_record)
+    return header, (
+        [record.get(column) for column in header]
+        for record in chain([first_record], records)
+    )
+
+
+READERS = {'csv': read_csv, 'ndjson': read_ndjson}
+
+
+def resolve_columns(model: type[models.Model], header: list[str]) -> list[str]:
+    """
+    Map input column names, either field names or database columns, to database columns.
+
+    Args:
+        model (type[Model]): The model to load.
+        header (list[str]): Column names of the input.
+
+    Returns:
+        list[str]: Database columns in the order of the input.
+
+    Raises:
+        BulkLoadError: If the input has no columns or an unknown column.
+    """
+    known = {column: column for column in columns_of(model)}
+    known.update({field.name: field.column for field in model._meta.concrete_fields})  # noqa: WPS437
+    unknown = [column for column in header if column not in known]
+    if not header or unknown:
+        raise BulkLoadError(f'Unknown columns: {unknown}' if unknown else 'The input has no columns')
+    return [known[column] for column in header]
+
+
+def validator_check(field: models.Field, validator: Callable) -> Optional[Check]:
+    """
+    Translate a validator of a model field into a check of staged rows.
+
+    Args:
+        field (Field): The validated field.
+        validator (Callable): One of the validators of the field.
+
+    Returns:
+        Optional[Check]: The check, None if the validator has no SQL counterpart.
+    """
+    column = f's.{quote(field.column)}'
+    if validator is check_created:
+        return Check(f'{field.name} is in the future', f'{column} > CURRENT_DATE')
+    if isinstance(validator, validators.RegexValidator):
+        operator = '~' if validator.inverse_match else '!~'
+        condition = f'{column} {operator} %s'
+        return Check(f'{field.name} fails {validator.code}', condition, (validator.regex.pattern,))
+    template = LIMIT_CONDITIONS.get(type(validator))
+    if template is None:
+        return None
+    return Check(f'{field.name} fails {validator.code}', template.format(column), (validator.limit_value,))
+
+
+def field_checks(field: models.Field) -> Iterator[Check]:
+    """
+    Create the checks of NOT NULL, foreign key and validators of a model field.
+
+    Args:
+        field (Field): The field to check.
+
+    Yields:
+        Check: Checks of the field.
+    """
+    column = f's.{quote(field.column)}'
+    if not field.null:
+        yield Check(f'{field.name} is missing', f'{column} IS NULL')
+    if field.is_relation:
+        target = field.target_field
+        reference = f'r.{quote(target.column)} = {column}'
+        yield Check(
+            f'{field.name} references a missing {target.model.__name__.lower()}',
+            f'NOT EXISTS (SELECT 1 FROM {table_of(target.model)} r WHERE {reference})',  # noqa: S608
+        )
+    yield from filter(None, (validator_check(field, validator) for validator in field.validators))
+
+
+def unique_check(model: type[models.Model], columns: tuple[str, ...]) -> Check:
+    """
+    Create the check of a unique set of columns against the table and within the input.
+
+    Args:
+        model (type[Model]): The loaded model.
+        columns (tuple[str, ...]): Database columns that must be unique together.
+
+    Returns:
+        Check: The check.
+    """
+    quoted = list(map(quote, columns))
+    matches = ' AND '.join(f't.{column} = s.{column}' for column in quoted)
+    staged = ', '.join(f's.{column}' for column in quoted)
+    grouped = ', '.join(quoted)
+    duplicates = f'SELECT {grouped} FROM {STAGING_TABLE} GROUP BY {grouped} HAVING count(*) > 1'
+    existing = f'SELECT 1 FROM {table_of(model)} t WHERE {matches}'  # noqa: S608
+    return Check(
+        f'{", ".join(columns)} is not unique', f'EXISTS ({existing}) OR ({staged}) IN ({duplicates})',
+    )
+
+
+def archive_check(cursor) -> Check:
+    """
+    Create the check of given transaction ids against the archive.
+
+    The primary key of the partitioned transaction table is (id, transaction_date), so
+    the database does not reject an id stored under another date. unique_check
+    compares the ids with every partition, this check with the transactions moved to
+    the archive.
+
+    Args:
+        cursor (CursorWrapper): Database cursor.
+
+    Returns:
+        Check: The check.
+    """
+    with cursor.copy(f'COPY {STAGING_TABLE} (id) TO STDOUT') as copy:
+        copy.set_types(['uuid'])
+        archived = archive.archived_ids(row[0] for row in copy.rows() if row[0] is not None)
+    return Check('id is archived', 's.id = ANY(%s)', (list(archived),))
+
+
+def model_checks(model: type[models.Model]) -> list[Check]:
+    """
+    Create all checks of staged rows of a model.
+
+    Args:
+        model (type[Model]): The loaded model.
+
+    Returns:
+        list[Check]: The checks.
+    """
+    meta = model._meta  # noqa: WPS437
+    unique_sets = [(field.column,) for field in meta.concrete_fields if field.unique]
+    unique_sets.extend(
+        tuple(meta.get_field(name).column for name in together) for together in meta.unique_together
+    )
+    checks = [check for field in meta.concrete_fields for check in field_checks(field)]
+    checks.extend(unique_check(model, columns) for columns in unique_sets)
+    return checks
+
+
+def create_staging_table(cursor, model: type[models.Model]) -> None:
+    """
+    Create the temporary staging table shaped like the table of a model.
+
+    NOT NULL constraints are dropped so that missing values are reported by the checks.
+
+    Args:
+        cursor (CursorWrapper): Database cursor.
+        model (type[Model]): The loaded model.
+    """
+    cursor.execute(f'CREATE TEMPORARY TABLE {STAGING_TABLE} (LIKE {table_of(model)}) ON COMMIT DROP')
+    columns = columns_of(model)
+    alterations = [f'ALTER COLUMN {quote(column)} DROP NOT NULL' for column in columns]
+    alterations.extend(
+        f'ALTER COLUMN {quote(column)} SET DEFAULT {default}'
+        for column, default in COLUMN_DEFAULTS.items()
+        if column in columns
+    )
+    cursor.execute(f'ALTER TABLE {STAGING_TABLE} {", ".join(alterations)}')
+
+
+def copy_rows(
+    cursor, columns: list[str], rows: Iterable[list], progress: Optional[Callable] = None,
+) -> int:
+    """
+    Stream rows into the staging table with COPY ... FROM STDIN.
+
+    Args:
+        cursor (CursorWrapper): Database cursor.
+        columns (list[str]): Database columns of the rows.
+        rows (Iterable[list]): The rows.
+        progress (Optional[Callable]): Progress callback, see load.
+
+    Returns:
+        int: Number of copied rows.
+
+    Raises:
+        BulkLoadError: If a row cannot be converted to the types of the table.
+    """
+    statement = f'COPY {STAGING_TABLE} ({", ".join(map(quote, columns))}) FROM STDIN'
+    started = time.perf_counter()
+    copied = 0
+    try:
+        with cursor.copy(statement) as copy:
+            for row in rows:
+                copy.write_row(row)
+                copied += 1
+                if progress and not copied % config.BULK_LOAD_PROGRESS_ROWS:
+                    progress(copied, time.perf_counter() - started)
+    except psycopg.Error as error:
+        raise BulkLoadError(str(error).strip()) from error
+    return copied
+
+
+def count_invalid(cursor, checks: list[Check]) -> dict[str, int]:
+    """
+    Count invalid staged rows of every check in one scan of the staging table.
+
+    Args:
+        cursor (CursorWrapper): Database cursor.
+        checks (list[Check]): The checks.
+
+    Returns:
+        dict[str, int]: Number of invalid rows per failed check.
+    """
+    counters = ', '.join(f'count(*) FILTER (WHERE {check.condition})' for check in checks)
+    cursor.execute(f'SELECT {counters} FROM {STAGING_TABLE} s', check_arguments(checks))
+    return {
+        check.name: invalid
+        for check, invalid in zip(checks, cursor.fetchone())
+        if invalid
+    }
+
+
+def check_arguments(checks: list[Check]) -> list:
+    """
+    Collect query parameters of checks in the order of their conditions.
+
+    Args:
+        checks (list[Check]): The checks.
+
+    Returns:
+        list: Query parameters.
+    """
+    return [argument for check in checks for argument in check.arguments]
+
+
+def delete_invalid(cursor, checks: list[Check]) -> None:
+    """
+    Delete staged rows failing any of the checks.
+
+    Args:
+        cursor (CursorWrapper): Database cursor.
+        checks (list[Check]): The checks.
+    """
+    conditions = ' OR '.join(f'({check.condition})' for check in checks)
+    cursor.execute(f'DELETE FROM {STAGING_TABLE} s WHERE {conditions}', check_arguments(checks))  # noqa: S608
+
+
+def validate_staged(
+    cursor, model: type[models.Model], columns: list[str], skip_invalid: bool,
+) -> dict[str, int]:
+    """
+    Check staged rows and delete invalid ones when they may be skipped.
+
+    Given transaction ids are also checked against the archive.
+
+    Args:
+        cursor (CursorWrapper): Database cursor.
+        model (type[Model]): The loaded model.
+        columns (list[str]): Database columns of the input.
+        skip_invalid (bool): Delete invalid rows instead of failing.
+
+    Returns:
+        dict[str, int]: Number of invalid rows per failed check.
+
+    Raises:
+        BulkLoadError: If some rows are invalid and skip_invalid is False.
+    """
+    checks = model_checks(model)
+    if model is Transaction and 'id' in columns and archive.read_manifest():
+        checks.append(archive_check(cursor))
+    rejected = count_invalid(cursor, checks)
+    if rejected and not skip_invalid:
+        problems = [f'{name}: {invalid} rows' for name, invalid in rejected.items()]
+        raise BulkLoadError('; '.join(problems))
+    if rejected:
+        delete_invalid(cursor, checks)
+    return rejected
+
+
+def insert_staged(cursor, model: type[models.Model]) -> int:
+    """
+    Move staged rows into the table of a model and drop the staging table.
+
+    COPY sends no signals, so cached pages, bank statistics and opening entries of
+    the ledger are written here.
+
+    Args:
+        cursor (CursorWrapper): Database cursor.
+        model (type[Model]): The loaded model.
+
+    Returns:
+        int: Number of inserted rows.
+    """
+    columns = ', '.join(map(quote, columns_of(model)))
+    target = f'{table_of(model)} ({columns})'
+    cursor.execute(f'INSERT INTO {target} SELECT {columns} FROM {STAGING_TABLE}')
+    inserted = cursor.rowcount
+    if model is BankClient:
+        invalidate_relation_pages(cursor)
+    staged = model.objects.filter(pk__in=RawSQL(f'SELECT id FROM {STAGING_TABLE}', ()))  # noqa: S608, S611
+    counter = bank_stats.COUNTERS.get(model)
+    if counter:
+        counter(staged, bank_stats.ADD)
+    if model is BankAccount:
+        ledger.correct_balances(staged)
+    cursor.execute(f'DROP TABLE {STAGING_TABLE}')
+    return inserted
+
+
+def invalidate_relation_pages(cursor) -> None:
+    """
+    Invalidate cached pages of banks and clients of staged relations, COPY sends no signals.
+
+    Args:
+        cursor (CursorWrapper): Database cursor.
+    """
+    cursor.execute(f'SELECT DISTINCT bank_id, client_id FROM {STAGING_TABLE}')  # noqa: S608
+    relations = cursor.fetchall()
+    page_cache.invalidate(page_cache.BANK, {bank_id for bank_id, _ in relations})
+    page_cache.invalidate(page_cache.CLIENT, {client_id for _, client_id in relations})
+
+
+@atomic
+def load(  # noqa: WPS211
+    model: type[models.Model],
+    header: list[str],
+    rows: Iterable[list],
+    skip_invalid: bool = False,
+    progress: Optional[Callable] = None,
+) -> LoadReport:
+    """
+    Load rows into the table of a model through a staging table.
+
+    BulkLoadError from resolve_columns, copy_rows and validate_staged is propagated
+    to the caller, the whole load is rolled back then.
+
+    Args:
+        model (type[Model]): The model to load.
+        header (list[str]): Column names of the input, field names or database columns.
+        rows (Iterable[list]): The rows, values in the order of the header.
+        skip_invalid (bool): Load valid rows only instead of failing on invalid ones.
+        progress (Optional[Callable]): Called with the number of copied rows and elapsed seconds.
+
+    Returns:
+        LoadReport: Numbers of copied, rejected and loaded rows.
+    """
+    columns = resolve_columns(model, header)
+    started = time.perf_counter()
+    with connection.cursor() as cursor:
+        create_staging_table(cursor, model)
+        copied = copy_rows(cursor, columns, rows, progress)
+        rejected = validate_staged(cursor, model, columns, skip_invalid)
+        loaded = insert_staged(cursor, model)
+    return LoadReport(copied, rejected, loaded, time.perf_counter() - started)
+
+
+def rows_per_second(rows: int, elapsed: float) -> float:
+    """
+    Compute the throughput of a load.
+
+    Args:
+        rows (int): Number of processed rows.
+        elapsed (float): Duration in seconds.
+
+    Returns:
+        float: Rows per second.
+    """
+    return rows / max(elapsed, MIN_ELAPSED)
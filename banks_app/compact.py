@@ -0,0 +1,157 @@
+"""
+This module contains the compact representation of the REST API.
+
+The serializers are hyperlinked, so every object in a listing reverses the URL of
+itself and of every related object, which dominates the time of long listings. A
+request with ``?format=compact`` or ``Accept: application/json; profile=compact`` gets
+the concrete fields of the model instead, with raw UUIDs of related objects. Listings
+are read with values() and emitted without model instances or serializer fields.
+Many-to-many relations are left out, they are listed by their own endpoints.
+"""
+
+from functools import cache
+
+from django.utils.http import parse_header_parameters
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+COMPACT = 'compact'
+COMPACT_ACTIONS = frozenset(('list', 'retrieve'))
+
+
+def is_compact(request) -> bool:
+    """
+    Check that a request asks for the compact representation.
+
+    Args:
+        request (rest_framework.request.Request): Request object.
+
+    Returns:
+        bool: True for ``?format=compact`` or an Accept header with ``profile=compact``.
+    """
+    if request.query_params.get(api_settings.URL_FORMAT_OVERRIDE) == COMPACT:
+        return True
+    return any(
+        parse_header_parameters(media_range)[1].get('profile') == COMPACT
+        for media_range in request.headers.get('Accept', '').split(',')
+    )
+
+
+def compact_fields(serializer_class: type[serializers.ModelSerializer]) -> dict[str, str]:
+    """
+    Map the names of the concrete fields of a serializer to their database columns.
+
+    Args:
+        serializer_class (type[ModelSerializer]): The full serializer of the model.
+
+    Returns:
+        dict[str, str]: Names of the fields, mapped to the attribute names of their values.
+    """
+    meta = serializer_class.Meta
+    excluded = set(getattr(meta, 'exclude', ()))
+    return {
+        field.name: field.attname
+        for field in meta.model._meta.concrete_fields  # noqa: WPS437
+        if field.name not in excluded
+    }
+
+
+class CompactSerializer(serializers.BaseSerializer):
+    """
+    Read-only serializer of the compact representation.
+
+    Serializes model instances and the rows read by compact_queryset.
+
+    Attributes:
+        fields_map (dict[str, str]): Names of the fields, mapped to attribute names.
+    """
+
+    fields_map: dict[str, str] = {}
+
+    def to_representation(self, instance):
+        """
+        Serialize an instance or a row.
+
+        Args:
+            instance (Model | dict): The instance, or a row of compact_queryset.
+
+        Returns:
+            dict: The compact representation.
+        """
+        if isinstance(instance, dict):
+            return {name: instance[attname] for name, attname in self.fields_map.items()}
+        return {name: getattr(instance, attname) for name, attname in self.fields_map.items()}
+
+
+@cache
+def compact_serializer(serializer_class: type[serializers.ModelSerializer]) -> type[CompactSerializer]:
+    """
+    Create the compact serializer of a model serializer.
+
+    Args:
+        serializer_class (type[ModelSerializer]): The full serializer of the model.
+
+    Returns:
+        type[CompactSerializer]: The compact serializer.
+    """
+    return type(
+        f'Compact{serializer_class.__name__}',
+        (CompactSerializer,),
+        {'fields_map': compact_fields(serializer_class)},
+    )
+
+
+def compact_queryset(queryset, fields_map: dict[str, str]):
+    """
+    Read a listing as rows of column values instead of model instances.
+
+    Args:
+        queryset (django.db.models.QuerySet): The listing.
+        fields_map (dict[str, str]): Names of the fields, mapped to attribute names.
+
+    Returns:
+        django.db.models.QuerySet: values() queryset of rows keyed by the attribute names.
+    """
+    return queryset.prefetch_related(None).values(*fields_map.values())
+
+
+class CompactReadMixin:
+    """
+    Viewset mixin serving ``list`` and ``retrieve`` in the compact representation on request.
+
+    Goes before the other mixins of the viewset, the full serializer stays the
+    ``serializer_class`` of the viewset.
+    """
+
+    def compact(self) -> bool:
+        """
+        Check that the action is served in the compact representation.
+
+        Returns:
+            bool: True for read actions of requests asking for it.
+        """
+        return self.action in COMPACT_ACTIONS and is_compact(self.request)
+
+    def get_queryset(self):
+        """
+        Get the queryset, read with values() for compact listings.
+
+        Returns:
+            django.db.models.QuerySet: The queryset of the action.
+        """
+        queryset = super().get_queryset()
+        if self.action == 'list' and self.compact():
+            return compact_queryset(queryset, self.get_serializer_class().fields_map)
+        return queryset
+
+    def get_serializer_class(self):
+        """
+        Get the serializer, the compact one for compact requests.
+
+        Returns:
+            type[Serializer]: The serializer class of the action.
+        """
+        serializer_class = super().get_serializer_class()
+        if self.compact():
+            return compact_serializer(serializer_class)
+        return serializer_class
@@ -8,3 +8,30 @@ MAX_DIGITS_BANK_ACCOUNT = 40
 MAX_LENGTH_PHONE = 12
 MAX_LENGTH_FIRST_NAME = 70
 MAX_LENGTH_LAST_NAME = 100
+MAX_TRANSFER_BATCH = 10000
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+N_PLUS_ONE_THRESHOLD = 5
+STATEMENT_CHUNK_SIZE = 2000
+STATEMENT_LINES_PER_WRITE = 200
+BULK_LOAD_PROGRESS_ROWS = 50000
+PAGE_CACHE_ALIAS = 'pages'
+PAGE_CACHE_TIMEOUT = 600
+MAX_DIGITS_DEPOSITS = 50
+BANK_STATS_DAYS = 30
+MAX_LENGTH_IDEMPOTENCY_KEY = 255
+MAX_LENGTH_IDEMPOTENCY_SCOPE = 50
+MAX_LENGTH_FINGERPRINT = 64
+IDEMPOTENCY_KEY_TTL = 86400
+IDEMPOTENCY_WAIT_TIMEOUT = '10s'
+AUTH_CACHE_SIZE = 10000
+AUTH_CACHE_TTL = 60
+TRANSACTION_PARTITIONS_AHEAD = 3
+ARCHIVE_CHUNK_SIZE = 10000
+ARCHIVE_BLOOM_BITS_PER_KEY = 10
+ARCHIVE_BLOOM_HASHES = 7
+SEARCH_CONFIG = 'simple'
+SEARCH_MIN_LENGTH = 3
+SEARCH_MAX_LENGTH = 100
+ADMIN_EXACT_COUNT_LIMIT = 10000
+ADMIN_INLINE_PAGE_SIZE = 20
@@ -0,0 +1,179 @@
+"""
+This module contains conditional requests of the REST API.
+
+Polling clients send the ETag of the representation they hold in ``If-None-Match``
+and get ``304 Not Modified`` while it did not change. The ETag is computed from the
+``version`` columns of the rendered rows, which database triggers bump on every write,
+instead of from the rendered body: one aggregate query hashes the ids and versions of
+the listed objects and of the expanded related objects, so a conditional request never
+loads or serializes the objects themselves. The ETag is weak, since the order of an
+unordered listing is not part of it, and it covers the request variant (path, query and
+accepted media type).
+"""
+
+import hashlib
+from typing import Optional
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models.functions import MD5, Concat
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+WEAK_PREFIX = 'W/'
+ETAG_HEADER = 'ETag'
+
+
+def version_digest(related: tuple[str, ...] = ()) -> models.Aggregate:
+    """
+    Build the aggregate hashing the ids and versions of rows and of their related rows.
+
+    Args:
+        related (tuple[str, ...]): Relations whose versions are rendered with the rows.
+
+    Returns:
+        models.Aggregate: MD5 of the sorted ids and versions.
+    """
+    parts = []
+    for column in ('pk', 'version', *(f'{name}__version' for name in related)):
+        parts.extend((column, models.Value(':')))
+    row = Concat(*parts, output_field=models.TextField())
+    return MD5(StringAgg(row, delimiter=',', ordering=row, default=models.Value('')))
+
+
+def make_etag(digest: str, request) -> str:
+    """
+    Make the weak ETag of a representation of rows with the given versions.
+
+    Args:
+        digest (str): Digest of the ids and versions of the rows.
+        request (rest_framework.request.Request): Request object.
+
+    Returns:
+        str: The quoted weak ETag.
+    """
+    variant = f'{digest}|{request.accepted_media_type}|{request.get_full_path()}'
+    return WEAK_PREFIX + quote_etag(hashlib.sha256(variant.encode()).hexdigest())
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    """
+    Compare an ETag with the ``If-None-Match`` header with the weak comparison.
+
+    Args:
+        etag (str): The ETag of the current representation.
+        if_none_match (str): Value of the header.
+
+    Returns:
+        bool: True if the header lists the ETag.
+    """
+    opaque = etag.removeprefix(WEAK_PREFIX)
+    return any(
+        candidate.removeprefix(WEAK_PREFIX) == opaque
+        for candidate in parse_etags(if_none_match)
+    )
+
+
+class ConditionalReadMixin:
+    """
+    Viewset mixin answering ``list`` and ``retrieve`` with ETags from row versions.
+
+    Goes before CompactReadMixin, SparseFieldsViewSetMixin and AsyncReadViewSetMixin,
+    whose requests it reads and whose actions it wraps. The model of the viewset must
+    have a ``version`` column, as must the related models that can be expanded.
+    A ``304`` response skips the object permissions, which the viewsets do not use.
+    """
+
+    def versioned_relations(self) -> tuple[str, ...]:
+        """
+        List the relations rendered as nested objects, whose versions the ETag covers.
+
+        Returns:
+            tuple[str, ...]: Names of the expanded relations.
+        """
+        if self.compact():
+            return ()
+        return tuple(self.sparse_request().expand)
+
+    async def aetag(self, queryset: models.QuerySet) -> str:
+        """
+        Compute the ETag of the rows of a queryset with one aggregate query.
+
+        Args:
+            queryset (QuerySet): The rendered rows.
+
+        Returns:
+            str: The quoted weak ETag.
+        """
+        aggregated = await queryset.order_by().aaggregate(digest=version_digest(self.versioned_relations()))
+        return make_etag(aggregated['digest'], self.request)
+
+    async def conditional(self, queryset: models.QuerySet, respond, *args, **kwargs):
+        """
+        Answer ``304`` if the client holds the current representation, else run the action.
+
+        Args:
+            queryset (QuerySet): The rows rendered by the action.
+            respond (Callable): The async action of the viewset.
+            *args: Positional arguments of the URL.
+            **kwargs: Keyword arguments of the URL.
+
+        Returns:
+            rest_framework.response.Response: The response, with the ETag if it succeeded.
+        """
+        etag = await self.aetag(queryset)
+        if etag_matches(etag, self.request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={ETAG_HEADER: etag})
+        response = await respond(self.request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response[ETAG_HEADER] = etag
+        return response
+
+    def lookup_queryset(self) -> Optional[models.QuerySet]:
+        """
+        Filter the queryset by the lookup of a detail action.
+
+        Returns:
+            Optional[QuerySet]: The rows of the object, None if the lookup value is malformed.
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            return self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]},
+            )
+        except (ValidationError, TypeError, ValueError):
+            return None
+
+    async def list(self, request, *args, **kwargs):
+        """
+        List objects, or answer ``304`` if none of them changed.
+
+        Args:
+            request (rest_framework.request.Request): Request object.
+            *args: Positional arguments of the URL.
+            **kwargs: Keyword arguments of the URL.
+
+        Returns:
+            rest_framework.response.Response: The listing or ``304 Not Modified``.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        return await self.conditional(queryset, super().list, *args, **kwargs)
+
+    async def retrieve(self, request, *args, **kwargs):
+        """
+        Retrieve an object, or answer ``304`` if it did not change.
+
+        Args:
+            request (rest_framework.request.Request): Request object.
+            *args: Positional arguments of the URL.
+            **kwargs: Keyword arguments of the URL.
+
+        Returns:
+            rest_framework.response.Response: The object or ``304 Not Modified``.
+        """
+        queryset = self.lookup_queryset()
+        if queryset is None:
+            return await super().retrieve(request, *args, **kwargs)
+        return await self.conditional(queryset, super().retrieve, *args, **kwargs)
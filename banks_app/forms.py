@@ -107,15 +107,15 @@ class InitialTransactionForm(forms.Form):
 
     def __init__(self, *args, **kwargs):
         """
-        Initialize the form with user-specific bank accounts.
+        Initialize the form with client-specific bank accounts.
 
         Args:
             *args: Variable length argument list.
-            **kwargs: Arbitrary keyword arguments.
+            **kwargs: Arbitrary keyword arguments, the client of the request as ``client``.
         """
-        user = kwargs.pop('user', None)
+        client = kwargs.pop('client', None)
         super(InitialTransactionForm, self).__init__(*args, **kwargs)
-        if user:
+        if client:
             self.fields['from_bank_account_id'].queryset = BankAccount.objects.filter(
-                client__user=user,
+                client=client,
             )
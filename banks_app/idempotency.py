@@ -0,0 +1,320 @@
+"""
+This module contains idempotency keys of the endpoints creating transfers.
+
+Clients retry transfers on timeouts, and without a key every retry executes the
+transfer again. A request with an ``Idempotency-Key`` header, or an
+``idempotency_key`` form field which browsers can send, is handled once per user,
+endpoint and key. Its response is stored in the IdempotencyKey table and replayed to
+retries until the key expires, found by one lookup of the unique index.
+
+The key row is inserted in the database transaction of the request and filled in
+with the response before the commit, so other requests never see a key without a
+response. A concurrent duplicate blocks on the unique index until the first request
+commits and then replays its response, or takes over the key if the first request
+raised an error and rolled back.
+"""
+
+import hashlib
+import json
+from datetime import timedelta
+from functools import partial, wraps
+from typing import Callable, Optional
+from uuid import uuid4
+
+from django.db import OperationalError, connection
+from django.db.transaction import atomic
+from django.http import HttpResponse, JsonResponse, QueryDict
+from django.utils import timezone
+from psycopg import errors
+
+from banks_app import config
+from banks_app.models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+FORM_FIELD = 'idempotency_key'
+REPLAY_HEADER = 'Idempotent-Replayed'
+STORED_HEADERS = ('Content-Type', 'Location')
+IGNORED_FIELDS = frozenset(('csrfmiddlewaretoken', FORM_FIELD))
+UNPROCESSABLE_ENTITY = 422
+CONFLICT = 409
+BAD_REQUEST = 400
+KEY_TABLE = IdempotencyKey._meta.db_table  # noqa: WPS437
+CLAIM_KEY = (
+    f'INSERT INTO {KEY_TABLE} AS stored '  # noqa: S608
+    '(id, user_id, scope, key, fingerprint, headers, body, expires) '
+    "VALUES (gen_random_uuid(), %s, %s, %s, %s, jsonb_build_object(), '', %s) "
+    'ON CONFLICT (user_id, scope, key) DO UPDATE SET '
+    'fingerprint = EXCLUDED.fingerprint, status_code = NULL, headers = EXCLUDED.headers, '
+    'body = EXCLUDED.body, expires = EXCLUDED.expires '
+    'WHERE stored.expires <= now() '
+    'RETURNING id'
+)
+
+
+def new_key() -> str:
+    """
+    Generate a key for a form, sent back when the form is submitted.
+
+    Returns:
+        str: A random key.
+    """
+    return str(uuid4())
+
+
+def request_key(request) -> Optional[str]:
+    """
+    Get the idempotency key of a request.
+
+    Args:
+        request (django.http.HttpRequest): Request object, or a DRF request.
+
+    Returns:
+        Optional[str]: The key, None if the request has none.
+    """
+    return request.headers.get(HEADER) or request.POST.get(FORM_FIELD) or None
+
+
+def request_fingerprint(request) -> str:
+    """
+    Hash the method, the path and the payload of a request.
+
+    Args:
+        request (django.http.HttpRequest): Request object, or a DRF request.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    payload = getattr(request, 'data', request.POST)
+    if isinstance(payload, QueryDict):
+        payload = dict(payload.lists())
+    if isinstance(payload, dict):
+        payload = {name: field for name, field in payload.items() if name not in IGNORED_FIELDS}
+    serialized = json.dumps([request.method, request.path, payload], sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def find_response(user_id: int, scope: str, key: str) -> Optional[IdempotencyKey]:
+    """
+    Find the stored response of a key that has not expired.
+
+    Args:
+        user_id (int): Id of the user.
+        scope (str): The endpoint.
+        key (str): The key.
+
+    Returns:
+        Optional[IdempotencyKey]: The stored response, None if there is none.
+    """
+    return IdempotencyKey.objects.filter(
+        user_id=user_id, scope=scope, key=key, expires__gt=timezone.now(),
+    ).first()
+
+
+def claim_key(user_id: int, scope: str, key: str, fingerprint: str):
+    """
+    Insert a key, or take over an expired one, waiting for a request holding it.
+
+    Must be called in a database transaction, which keeps the key locked.
+
+    Args:
+        user_id (int): Id of the user.
+        scope (str): The endpoint.
+        key (str): The key.
+        fingerprint (str): Fingerprint of the request.
+
+    Returns:
+        Optional[UUID]: Id of the claimed key, None if another request stored a response.
+    """
+    expires = timezone.now() + timedelta(seconds=config.IDEMPOTENCY_KEY_TTL)
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL lock_timeout = %s', [config.IDEMPOTENCY_WAIT_TIMEOUT])
+        cursor.execute(CLAIM_KEY, [user_id, scope, key, fingerprint, expires])
+        claimed = cursor.fetchone()
+        cursor.execute('RESET lock_timeout')
+    return claimed[0] if claimed else None
+
+
+def store_response(key_id, response) -> None:
+    """
+    Store the response of a claimed key.
+
+    Args:
+        key_id (UUID): Id of the claimed key.
+        response (django.http.HttpResponse): The rendered response.
+    """
+    IdempotencyKey.objects.filter(pk=key_id).update(
+        status_code=response.status_code,
+        headers={name: response[name] for name in STORED_HEADERS if response.has_header(name)},
+        body=response.content,
+    )
+
+
+def replay_response(stored: IdempotencyKey, fingerprint: str):
+    """
+    Build the response of a retry from the stored one.
+
+    Args:
+        stored (IdempotencyKey): The stored response.
+        fingerprint (str): Fingerprint of the retry.
+
+    Returns:
+        django.http.HttpResponse: The stored response, or an error if the payload differs.
+    """
+    if stored.fingerprint != fingerprint:
+        return JsonResponse(
+            {'detail': f'{HEADER} was already used with another request'}, status=UNPROCESSABLE_ENTITY,
+        )
+    response = HttpResponse(bytes(stored.body), status=stored.status_code, headers=stored.headers)
+    response[REPLAY_HEADER] = 'true'
+    return response
+
+
+def handle_once(request, scope: str, key: str, respond: Callable[[], HttpResponse]):
+    """
+    Handle a request with a key in a transaction holding the key.
+
+    Args:
+        request (django.http.HttpRequest): Request object, or a DRF request.
+        scope (str): The endpoint.
+        key (str): The key.
+        respond (Callable[[], HttpResponse]): Handles the request and returns a rendered response.
+
+    Returns:
+        django.http.HttpResponse: The response of the view, or the stored response.
+    """
+    fingerprint = request_fingerprint(request)
+    stored = find_response(request.user.pk, scope, key)
+    if stored is not None:
+        return replay_response(stored, fingerprint)
+    with atomic():
+        key_id = claim_key(request.user.pk, scope, key, fingerprint)
+        if key_id is None:
+            return replay_response(find_response(request.user.pk, scope, key), fingerprint)
+        response = respond()
+        store_response(key_id, response)
+    return response
+
+
+def run_idempotent(request, scope: str, respond: Callable[[], HttpResponse]):
+    """
+    Handle a request at most once per idempotency key.
+
+    Requests without a key, or of anonymous users, are handled every time.
+
+    Args:
+        request (django.http.HttpRequest): Request object, or a DRF request.
+        scope (str): The endpoint.
+        respond (Callable[[], HttpResponse]): Handles the request and returns a rendered response.
+
+    Returns:
+        django.http.HttpResponse: The response of the view or the replayed one.
+
+    Raises:
+        OperationalError: If the database fails other than by a lock timeout.
+    """
+    key = request_key(request)
+    if key is None or not request.user.is_authenticated:
+        return respond()
+    if len(key) > config.MAX_LENGTH_IDEMPOTENCY_KEY:
+        return JsonResponse(
+            {'detail': f'{HEADER} is longer than {config.MAX_LENGTH_IDEMPOTENCY_KEY} characters'},
+            status=BAD_REQUEST,
+        )
+    try:
+        return handle_once(request, scope, key, respond)
+    except OperationalError as error:
+        if not isinstance(error.__cause__, errors.LockNotAvailable):  # noqa: WPS609
+            raise
+    return JsonResponse({'detail': f'A request with this {HEADER} is in progress'}, status=CONFLICT)
+
+
+def idempotent(scope: str) -> Callable:
+    """
+    Handle POST requests of a function view at most once per idempotency key.
+
+    Args:
+        scope (str): Name of the endpoint the keys belong to.
+
+    Returns:
+        Callable: Decorator of the view.
+    """
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'POST':
+                return view(request, *args, **kwargs)
+            return run_idempotent(request, scope, partial(render_view, view, request, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def render_view(view: Callable, request, *args, **kwargs):
+    """
+    Call a view and render its response, so that the content can be stored.
+
+    Args:
+        view (Callable): The view.
+        request (django.http.HttpRequest): Request object.
+        args: Positional arguments of the view.
+        kwargs: Keyword arguments of the view.
+
+    Returns:
+        django.http.HttpResponse: The rendered response.
+    """
+    response = view(request, *args, **kwargs)
+    if callable(getattr(response, 'render', None)):
+        response.render()
+    return response
+
+
+class IdempotentCreateMixin:
+    """
+    Viewset mixin handling the create action at most once per idempotency key.
+
+    Attributes:
+        idempotency_scope (str): Name of the endpoint the keys belong to.
+    """
+
+    idempotency_scope = ''
+
+    def create(self, request, *args, **kwargs):
+        """
+        Create an object, or replay the response to the first request with the key.
+
+        Args:
+            request (rest_framework.request.Request): Request object.
+            *args: Positional arguments of the URL.
+            **kwargs: Keyword arguments of the URL.
+
+        Returns:
+            django.http.HttpResponse: The rendered response.
+        """
+        return run_idempotent(
+            request, self.idempotency_scope, partial(self.render_create, request, *args, **kwargs),
+        )
+
+    def render_create(self, request, *args, **kwargs):
+        """
+        Create an object and render the response, so that the content can be stored.
+
+        Args:
+            request (rest_framework.request.Request): Request object.
+            *args: Positional arguments of the URL.
+            **kwargs: Keyword arguments of the URL.
+
+        Returns:
+            rest_framework.response.Response: The rendered response.
+        """
+        response = super().create(request, *args, **kwargs)  # noqa: WPS613
+        return self.finalize_response(request, response, *args, **kwargs).render()
+
+
+def purge_expired() -> int:
+    """
+    Delete expired keys.
+
+    Returns:
+        int: Number of deleted keys.
+    """
+    deleted, _ = IdempotencyKey.objects.filter(expires__lte=timezone.now()).delete()
+    return deleted
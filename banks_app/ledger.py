@@ -0,0 +1,189 @@
+"""
+This module contains the ledger of balances.
+
+Every transfer appends a debit entry to its source account and a credit entry to its
+target account in the database transaction that moves the money, and every entry keeps
+the balance of its account after it. BankAccount.balance is the cached projection of
+the ledger, the balance of the last entry of the account. Saving an account with
+another balance, like opening it with a deposit, appends a correction entry for the
+difference. Entries are never updated and are appended under the lock of their account
+row, so the id sequence orders the entries of an account even when the clocks stamping
+them (of the application for transfers, of the database for corrections) disagree.
+The balance of an account at a moment is the balance of its last entry before it, read
+by one backward scan of the (account, id) index, and an audit of accounts walks their
+ranges of the index.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable, NamedTuple, Optional
+from uuid import UUID
+
+from django.db import connection
+from django.db.models import QuerySet, signals
+from django.dispatch import receiver
+
+from . import models
+
+ZERO = Decimal('0.00')
+ENTRY_TABLE = models.LedgerEntry._meta.db_table  # noqa: WPS437
+ACCOUNT_TABLE = models.BankAccount._meta.db_table  # noqa: WPS437
+LAST_ENTRY = (
+    f'LEFT JOIN LATERAL (SELECT entry.balance FROM {ENTRY_TABLE} entry '  # noqa: S608
+    'WHERE entry.account_id = account.id ORDER BY entry.id DESC LIMIT 1) '
+    'AS last ON true'
+)
+CORRECTIONS = (
+    f'INSERT INTO {ENTRY_TABLE} (account_id, transaction_id, amount, balance, created) '  # noqa: S608
+    'SELECT account.id, NULL, account.balance - coalesce(last.balance, 0), account.balance, '
+    f'clock_timestamp() FROM {ACCOUNT_TABLE} account {LAST_ENTRY} '
+    'WHERE account.id IN ({0}) AND account.balance <> coalesce(last.balance, 0) ORDER BY account.id'
+)
+PROJECTION_DRIFT = (
+    'SELECT account.id, NULL, account.balance, coalesce(last.balance, 0) '  # noqa: S608
+    f'FROM {ACCOUNT_TABLE} account {LAST_ENTRY} '
+    'WHERE account.id IN ({0}) AND account.balance <> coalesce(last.balance, 0) ORDER BY account.id'
+)
+CHAIN_DRIFT = (
+    'SELECT chain.account_id, chain.id, chain.balance, chain.previous + chain.amount FROM ('  # noqa: S608
+    'SELECT entry.account_id, entry.id, entry.amount, entry.balance, coalesce(lag(entry.balance) '
+    'OVER (PARTITION BY entry.account_id ORDER BY entry.id), 0) AS previous '
+    f'FROM {ENTRY_TABLE} entry WHERE entry.account_id IN ({{0}})) AS chain '
+    'WHERE chain.balance <> chain.previous + chain.amount ORDER BY chain.account_id, chain.id'
+)
+
+
+class Drift(NamedTuple):
+    """
+    Balance of an account or of a ledger entry that does not follow from the ledger.
+
+    Attributes:
+        account_id (UUID): Id of the bank account.
+        entry_id (Optional[int]): Id of the entry, None for the balance of the account.
+        stored (Decimal): The stored balance.
+        expected (Decimal): The balance following from the ledger.
+    """
+
+    account_id: UUID
+    entry_id: Optional[int]
+    stored: Decimal
+    expected: Decimal
+
+
+def transfer_entries(
+    payments: Iterable[models.Transaction], balances: dict[UUID, Decimal],
+) -> list[models.LedgerEntry]:
+    """
+    Build the debit and the credit entries of executed transfers.
+
+    Args:
+        payments (Iterable[models.Transaction]): The transfers, in the order they were executed.
+        balances (dict[UUID, Decimal]): Balances of the involved accounts before the transfers.
+
+    Returns:
+        list[models.LedgerEntry]: Unsaved entries, two per transfer.
+    """
+    balances = dict(balances)
+    entries = []
+    for payment in payments:
+        legs = (
+            (payment.from_bank_account_id_id, -payment.amount),
+            (payment.to_bank_account_id_id, payment.amount),
+        )
+        for account_id, amount in legs:
+            balances[account_id] += amount
+            entries.append(models.LedgerEntry(
+                account_id=account_id, transaction_id=payment.id, amount=amount, balance=balances[account_id],
+            ))
+    return entries
+
+
+def record_transfers(payments: list[models.Transaction], balances: dict[UUID, Decimal]) -> None:
+    """
+    Append the entries of executed transfers with one bulk INSERT.
+
+    Must be called in the database transaction of the transfers, with their accounts locked.
+
+    Args:
+        payments (list[models.Transaction]): The transfers, in the order they were executed.
+        balances (dict[UUID, Decimal]): Balances of the involved accounts before the transfers.
+    """
+    if payments:
+        models.LedgerEntry.objects.bulk_create(transfer_entries(payments, balances))
+
+
+def run_for_accounts(statement: str, accounts: QuerySet) -> list[tuple]:
+    """
+    Run a statement on the accounts selected by a queryset.
+
+    Args:
+        statement (str): SQL with a placeholder for the subquery of account ids.
+        accounts (QuerySet): The bank accounts.
+
+    Returns:
+        list[tuple]: The returned rows, empty for statements returning none.
+    """
+    subquery, query_params = accounts.values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(statement.format(subquery), query_params)
+        return cursor.fetchall() if cursor.description else []
+
+
+def correct_balances(accounts: QuerySet) -> None:
+    """
+    Append correction entries for accounts whose balance differs from their last entry.
+
+    Args:
+        accounts (QuerySet): The bank accounts.
+    """
+    run_for_accounts(CORRECTIONS, accounts)
+
+
+@receiver(signals.post_save, sender=models.BankAccount)
+def record_balance(sender, instance, update_fields=None, **kwargs):
+    """
+    Record the balance of a saved bank account in the ledger.
+
+    Args:
+        sender (type): The model class.
+        instance (models.BankAccount): The saved account.
+        update_fields (frozenset): Saved fields, None for all of them.
+        **kwargs: Additional keyword arguments.
+    """
+    if update_fields is None or 'balance' in update_fields:
+        correct_balances(sender.objects.filter(pk=instance.pk))
+
+
+def balance_at(account_id: UUID, moment: datetime) -> Decimal:
+    """
+    Get the balance of a bank account at a moment from its last entry before it.
+
+    Args:
+        account_id (UUID): Id of the bank account.
+        moment (datetime): The moment.
+
+    Returns:
+        Decimal: The balance, zero before the first entry.
+    """
+    balance = models.LedgerEntry.objects.filter(
+        account_id=account_id, created__lt=moment,
+    ).order_by('-id').values_list('balance', flat=True).first()
+    return ZERO if balance is None else balance
+
+
+def audit(accounts: QuerySet) -> list[Drift]:
+    """
+    Check balances of accounts and of their entries against the amounts of the entries.
+
+    Every entry must hold the balance of the previous entry of its account plus its
+    amount, and every account the balance of its last entry.
+
+    Args:
+        accounts (QuerySet): The bank accounts.
+
+    Returns:
+        list[Drift]: Balances that do not follow from the ledger.
+    """
+    rows = run_for_accounts(CHAIN_DRIFT, accounts)
+    rows.extend(run_for_accounts(PROJECTION_DRIFT, accounts))
+    return [Drift(*row) for row in rows]
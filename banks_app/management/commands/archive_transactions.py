@@ -0,0 +1,51 @@
+"""Management command moving old transactions to the archive."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from banks_app import archive, config
+
+from .maintain_partitions import date_argument
+
+
+class Command(BaseCommand):
+    """Move the transactions dated before a day to compressed chunk files of the archive."""
+
+    help = 'Move transactions dated before a day to the archive directory.'
+
+    def add_arguments(self, parser) -> None:
+        """
+        Add arguments of the command.
+
+        Args:
+            parser (argparse.ArgumentParser): Parser of the command line.
+        """
+        parser.add_argument(
+            '--before',
+            type=date_argument,
+            required=True,
+            help='Archive the transactions dated before this date.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=config.ARCHIVE_CHUNK_SIZE,
+            help='Maximum number of transactions per chunk file and database transaction.',
+        )
+
+    def handle(self, *args, **options) -> None:  # noqa: WPS110
+        """
+        Archive the transactions.
+
+        Args:
+            args: Positional arguments.
+            options: Parsed options of the command.
+
+        Raises:
+            CommandError: If the chunk size is not positive.
+        """
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+        archived = archive.archive_transactions(options['before'], options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {archived} transactions to {archive.archive_directory()}',
+        ))
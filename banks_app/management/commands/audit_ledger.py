@@ -0,0 +1,50 @@
+"""Management command checking balances against the ledger."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from banks_app import ledger
+from banks_app.models import BankAccount
+
+
+class Command(BaseCommand):
+    """Check that balances of accounts and of ledger entries follow from the amounts of the entries."""
+
+    help = 'Check the balances of bank accounts and of their ledger entries.'
+
+    def add_arguments(self, parser) -> None:
+        """
+        Add arguments of the command.
+
+        Args:
+            parser (argparse.ArgumentParser): Parser of the command line.
+        """
+        parser.add_argument(
+            'accounts',
+            nargs='*',
+            help='Ids of the bank accounts to check, all of them by default.',
+        )
+
+    def handle(self, *args, **options) -> None:  # noqa: WPS110
+        """
+        Audit the accounts and report the balances that do not follow from the ledger.
+
+        Args:
+            args: Positional arguments.
+            options: Parsed options of the command.
+
+        Raises:
+            CommandError: If a balance does not follow from the ledger.
+        """
+        accounts = BankAccount.objects.all()
+        if options['accounts']:
+            accounts = accounts.filter(pk__in=options['accounts'])
+        drift = ledger.audit(accounts)
+        for difference in drift:
+            subject = 'balance' if difference.entry_id is None else f'entry {difference.entry_id}'
+            self.stderr.write(
+                f'Account {difference.account_id}: {subject} is {difference.stored}, '
+                f'expected {difference.expected}',
+            )
+        if drift:
+            raise CommandError(f'Ledger audit found {len(drift)} wrong balances')
+        self.stdout.write(self.style.SUCCESS('Balances follow from the ledger'))
@@ -0,0 +1,107 @@
+"""Management command loading banking data from CSV or NDJSON files with COPY."""
+
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+from typing import ContextManager, TextIO
+
+from django.core.management.base import BaseCommand, CommandError
+
+from banks_app import bulk_load
+
+STDIN_PATH = '-'
+EXTENSION_FORMATS = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+
+
+def open_input(path: str) -> ContextManager[TextIO]:
+    """
+    Open an input file or the standard input.
+
+    Args:
+        path (str): Path of the file, STDIN_PATH for the standard input.
+
+    Returns:
+        ContextManager[TextIO]: The opened input.
+    """
+    if path == STDIN_PATH:
+        return nullcontext(sys.stdin)
+    return open(path, newline='', encoding='utf-8')  # noqa: WPS515
+
+
+class Command(BaseCommand):
+    """Load clients, relations bank client, bank accounts or transactions in bulk."""
+
+    help = 'Load rows of a model from a CSV or NDJSON file through a COPY staging table.'
+
+    def add_arguments(self, parser) -> None:
+        """
+        Add arguments of the command.
+
+        Args:
+            parser (argparse.ArgumentParser): Parser of the command line.
+        """
+        parser.add_argument('model', choices=sorted(bulk_load.MODELS))
+        parser.add_argument('path', help=f'Input file, "{STDIN_PATH}" for the standard input.')
+        parser.add_argument(
+            '--format',
+            choices=sorted(bulk_load.READERS),
+            help='Format of the input, guessed from the file extension by default.',
+        )
+        parser.add_argument(
+            '--skip-invalid',
+            action='store_true',
+            help='Load valid rows and report invalid ones instead of failing.',
+        )
+
+    def handle(self, *args, **options) -> None:  # noqa: WPS110
+        """
+        Load the input and report the numbers of rows.
+
+        Args:
+            args: Positional arguments.
+            options: Parsed options of the command.
+
+        Raises:
+            CommandError: If the format is unknown or the input cannot be loaded.
+        """
+        path = options['path']
+        input_format = options['format'] or EXTENSION_FORMATS.get(Path(path).suffix.lower())
+        if input_format is None:
+            raise CommandError('Cannot guess the format of the input, use --format')
+        with open_input(path) as stream:
+            header, rows = bulk_load.READERS[input_format](stream)
+            try:
+                report = bulk_load.load(
+                    bulk_load.MODELS[options['model']],
+                    header,
+                    rows,
+                    skip_invalid=options['skip_invalid'],
+                    progress=self.progress,
+                )
+            except bulk_load.BulkLoadError as error:
+                raise CommandError(str(error))
+        self.write_report(report)
+
+    def write_report(self, report: bulk_load.LoadReport) -> None:
+        """
+        Report rejected and loaded rows.
+
+        Args:
+            report (bulk_load.LoadReport): Outcome of the load.
+        """
+        for name, rejected in report.rejected.items():
+            self.stderr.write(f'Rejected {rejected} rows: {name}')
+        rate = bulk_load.rows_per_second(report.copied, report.elapsed)
+        summary = f'Loaded {report.loaded} of {report.copied} rows in {report.elapsed:.2f}s'
+        self.stdout.write(self.style.SUCCESS(f'{summary}, {rate:.0f} rows/s'))
+
+    def progress(self, copied: int, elapsed: float) -> None:
+        """
+        Report the progress of copying.
+
+        Args:
+            copied (int): Number of rows copied so far.
+            elapsed (float): Seconds since the copy started.
+        """
+        rate = bulk_load.rows_per_second(copied, elapsed)
+        self.stdout.write(f'Copied {copied} rows, {rate:.0f} rows/s')
@@ -0,0 +1,90 @@
+"""Management command maintaining the monthly partitions of transactions."""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from banks_app import config, partitions
+
+
+def date_argument(raw_date: str) -> date:
+    """
+    Parse a date argument of the command line.
+
+    Args:
+        raw_date (str): The argument.
+
+    Returns:
+        date: The parsed date.
+
+    Raises:
+        CommandError: If the argument is not a valid date.
+    """
+    try:
+        parsed_date = parse_date(raw_date)
+    except ValueError:
+        parsed_date = None
+    if parsed_date is None:
+        raise CommandError(f'Enter a valid date in YYYY-MM-DD format instead of {raw_date!r}')
+    return parsed_date
+
+
+class Command(BaseCommand):
+    """Create the partitions of the coming months and archive and detach the partitions of old ones."""
+
+    help = 'Create future monthly partitions of transactions, archive old ones and detach them.'
+
+    def add_arguments(self, parser) -> None:
+        """
+        Add arguments of the command.
+
+        Args:
+            parser (argparse.ArgumentParser): Parser of the command line.
+        """
+        parser.add_argument(
+            '--ahead',
+            type=int,
+            default=config.TRANSACTION_PARTITIONS_AHEAD,
+            help='Number of months after the current one to create partitions for.',
+        )
+        parser.add_argument(
+            '--since',
+            type=date_argument,
+            help='Date of the first month to create partitions for, the current month by default.',
+        )
+        parser.add_argument(
+            '--detach-before',
+            type=date_argument,
+            help=(
+                'Move the transactions of the months ended before this date to the archive '
+                'and detach their partitions.'
+            ),
+        )
+        parser.add_argument(
+            '--drop',
+            action='store_true',
+            help='Drop the detached, emptied partitions instead of keeping them as tables.',
+        )
+
+    def handle(self, *args, **options) -> None:  # noqa: WPS110
+        """
+        Create and detach the partitions.
+
+        Args:
+            args: Positional arguments.
+            options: Parsed options of the command.
+
+        Raises:
+            CommandError: If the number of months is negative or --drop is given without --detach-before.
+        """
+        if options['ahead'] < 0:
+            raise CommandError('--ahead must not be negative')
+        if options['drop'] and options['detach_before'] is None:
+            raise CommandError('--drop requires --detach-before')
+        created = partitions.create_partitions(options['since'] or date.today(), options['ahead'])
+        self.stdout.write(self.style.SUCCESS(f'Created {len(created)} partitions'))
+        if options['detach_before'] is not None:
+            detached = partitions.detach_partitions(options['detach_before'], drop=options['drop'])
+            action = 'Dropped' if options['drop'] else 'Detached'
+            self.stdout.write(self.style.SUCCESS(f'{action} {len(detached)} partitions'))
@@ -0,0 +1,22 @@
+"""Management command deleting expired idempotency keys."""
+
+from django.core.management.base import BaseCommand
+
+from banks_app import idempotency
+
+
+class Command(BaseCommand):
+    """Delete idempotency keys and stored responses past their expiry."""
+
+    help = 'Delete expired idempotency keys with their stored responses, run it periodically.'
+
+    def handle(self, *args, **options) -> None:  # noqa: WPS110
+        """
+        Delete the expired keys and report their number.
+
+        Args:
+            args: Positional arguments.
+            options: Parsed options of the command.
+        """
+        deleted = idempotency.purge_expired()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired idempotency keys'))
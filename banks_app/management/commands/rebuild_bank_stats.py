@@ -0,0 +1,46 @@
+"""Management command recomputing bank statistics from scratch."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from banks_app import bank_stats
+
+
+class Command(BaseCommand):
+    """Recompute bank statistics and report the drift of the incrementally maintained ones."""
+
+    help = 'Recompute clients, accounts, deposits and daily transfer volumes of every bank.'
+
+    def add_arguments(self, parser) -> None:
+        """
+        Add arguments of the command.
+
+        Args:
+            parser (argparse.ArgumentParser): Parser of the command line.
+        """
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report the drift and fail if there is any, without rewriting the statistics.',
+        )
+
+    def handle(self, *args, **options) -> None:  # noqa: WPS110
+        """
+        Rebuild or check the statistics and report their drift.
+
+        Args:
+            args: Positional arguments.
+            options: Parsed options of the command.
+
+        Raises:
+            CommandError: If the statistics drifted in check mode.
+        """
+        drift = bank_stats.rebuild(check_only=options['check'])
+        for difference in drift:
+            self.stderr.write(
+                f'Bank {difference.bank_id}: {difference.field} is {difference.stored}, '
+                f'expected {difference.expected}',
+            )
+        if drift and options['check']:
+            raise CommandError(f'Statistics of banks drifted in {len(drift)} values')
+        action = 'Checked' if options['check'] else 'Rebuilt'
+        self.stdout.write(self.style.SUCCESS(f'{action} bank statistics, {len(drift)} values drifted'))
@@ -0,0 +1,176 @@
+"""
+Management command running the production server with pre-forked, warmed-up workers.
+
+The workers run the ASGI application on uvicorn event loops by default, so the async
+views wait for their queries without holding a thread. The threaded WSGI workers of
+gunicorn remain available with ``--worker-class gthread``.
+"""
+
+import multiprocessing
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles import handlers
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import get_internal_wsgi_application
+from django.db import connections
+from django.utils.module_loading import import_string
+from gunicorn.app.base import BaseApplication
+
+from banks_app import config, warmup
+
+DEFAULT_WORKERS = multiprocessing.cpu_count() * 2 + 1
+ASGI_WORKER_CLASS = 'uvicorn.workers.UvicornWorker'
+WSGI_WORKER_CLASS = 'gthread'
+
+
+def warm_up_worker(worker) -> None:
+    """
+    Open the database connections of a forked worker before it accepts requests.
+
+    Args:
+        worker (gunicorn.workers.base.Worker): The worker.
+    """
+    databases = warmup.open_connections()
+    worker.log.info('Worker %s connected to %s database(s)', worker.pid, databases)
+
+
+def check_page_cache(workers: int) -> None:
+    """
+    Check that every worker sees the pages invalidated by the others.
+
+    Args:
+        workers (int): Number of worker processes.
+
+    Raises:
+        CommandError: If several workers would keep their own page cache in memory.
+    """
+    if workers > 1 and isinstance(caches[config.PAGE_CACHE_ALIAS], LocMemCache):
+        raise CommandError(
+            'The page cache is local to a process, the other workers would serve invalidated '
+            'pages. Set PAGE_CACHE_BACKEND to a shared backend or run one worker.',
+        )
+
+
+class ServerApplication(BaseApplication):
+    """
+    Gunicorn application serving the ASGI or the WSGI application of the project.
+
+    The application is loaded and warmed up once in the master process before the
+    workers are forked, each worker connects to the databases after the fork.
+    Uvicorn workers serve the ASGI application, the other worker classes the WSGI one.
+
+    Attributes:
+        options (dict): Gunicorn settings.
+        stdout (django.core.management.base.OutputWrapper): Output of the warm-up report.
+    """
+
+    def __init__(self, options, stdout):
+        """
+        Initialize the application.
+
+        Args:
+            options (dict): Gunicorn settings, such as bind, workers, worker_class and threads.
+            stdout (django.core.management.base.OutputWrapper): Output of the warm-up report.
+        """
+        self.options = {
+            'worker_class': ASGI_WORKER_CLASS,
+            **options,
+            'preload_app': True,
+            'post_worker_init': warm_up_worker,
+        }
+        self.stdout = stdout
+        super().__init__()
+
+    def load_config(self) -> None:
+        """Apply the options to the gunicorn configuration."""
+        for key, option_value in self.options.items():
+            self.cfg.set(key, option_value)
+
+    def load(self):
+        """
+        Load the application of the worker class, compile the templates and resolve the routes.
+
+        Returns:
+            Callable: The ASGI or WSGI application, also serving static files in debug mode like runserver.
+        """
+        asgi = self.options['worker_class'] == ASGI_WORKER_CLASS
+        if asgi:
+            application = import_string(settings.ASGI_APPLICATION)
+        else:
+            application = get_internal_wsgi_application()
+        templates = warmup.compile_templates()
+        routes = warmup.resolve_routes()
+        connections.close_all()
+        self.stdout.write(f'Warmed up {templates} templates and {routes} routes')
+        if not settings.DEBUG:
+            return application
+        if asgi:
+            return handlers.ASGIStaticFilesHandler(application)
+        return handlers.StaticFilesHandler(application)
+
+
+class Command(BaseCommand):
+    """Serve the project with a pre-forked multi-process server."""
+
+    help = (
+        'Serve the project with pre-forked gunicorn workers, running the ASGI application on '
+        'uvicorn or the WSGI application on threads. The application is preloaded and warmed up '
+        'before the workers accept requests. Run migrate beforehand.'
+    )
+
+    def add_arguments(self, parser) -> None:
+        """
+        Add arguments of the command.
+
+        Args:
+            parser (argparse.ArgumentParser): Parser of the command line.
+        """
+        parser.add_argument(
+            '--bind', default=os.getenv('SERVE_BIND', '0.0.0.0:8000'), help='Address to listen on.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=int(os.getenv('SERVE_WORKERS', DEFAULT_WORKERS)),
+            help='Number of worker processes.',
+        )
+        parser.add_argument(
+            '--worker-class',
+            choices=(ASGI_WORKER_CLASS, WSGI_WORKER_CLASS),
+            default=os.getenv('SERVE_WORKER_CLASS', ASGI_WORKER_CLASS),
+            help='Gunicorn worker class: uvicorn for the ASGI application, gthread for the WSGI one.',
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=int(os.getenv('SERVE_THREADS', '4')),
+            help='Number of request threads of every gthread worker, at most DB_POOL_MAX_SIZE.',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=int,
+            default=int(os.getenv('SERVE_TIMEOUT', '30')),
+            help='Seconds after which a silent worker is restarted.',
+        )
+
+    def handle(self, *args, **options) -> None:  # noqa: WPS110
+        """
+        Run the server until it is stopped.
+
+        Args:
+            args: Positional arguments.
+            options: Parsed options of the command.
+        """
+        check_page_cache(options['workers'])
+        server_options = {
+            'bind': options['bind'],
+            'workers': options['workers'],
+            'worker_class': options['worker_class'],
+            'threads': options['threads'],
+            'timeout': options['timeout'],
+            'accesslog': '-',
+        }
+        ServerApplication(server_options, self.stdout).run()
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.3 on 2026-10-18 10:00
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('banks_app', '0002_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='transaction',
+            index=models.Index(fields=['transaction_date', 'id'], name='transaction_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.3 on 2026-10-18 11:00
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('banks_app', '0003_transaction_date_id_idx'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='bankaccount',
+            index=models.Index(fields=['client', 'bank'], name='bank_account_client_bank_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='transaction',
+            index=models.Index(
+                fields=['initializer', 'transaction_date', 'id'], name='transaction_initializer_idx',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='transaction',
+            index=models.Index(
+                fields=['from_bank_account_id', 'transaction_date', 'id'], name='transaction_from_account_idx',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='transaction',
+            index=models.Index(
+                fields=['to_bank_account_id', 'transaction_date', 'id'], name='transaction_to_account_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.0.3 on 2026-10-18 12:00
+
+import django.contrib.postgres.functions
+import django.db.models.deletion
+import uuid
+from decimal import Decimal
+from django.db import migrations, models
+
+POPULATE_STATS = '''
+INSERT INTO "banks"."bank_stats" (bank_id, clients, accounts, deposits)
+SELECT bank.id,
+       (SELECT count(*) FROM "banks"."bank_client" relation WHERE relation.bank_id = bank.id),
+       (SELECT count(*) FROM "banks"."bank_account" account WHERE account.bank_id = bank.id),
+       (SELECT coalesce(sum(account.balance), 0) FROM "banks"."bank_account" account
+        WHERE account.bank_id = bank.id)
+FROM "banks"."bank" bank;
+INSERT INTO "banks"."bank_daily_volume" (bank_id, day, transfers, amount)
+SELECT account.bank_id, payment.transaction_date, count(*), sum(payment.amount)
+FROM "banks"."transaction" payment
+JOIN "banks"."bank_account" account ON account.id = payment.from_bank_account_id_id
+GROUP BY account.bank_id, payment.transaction_date;
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banks_app', '0004_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankStats',
+            fields=[
+                ('bank', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='banks_app.bank', verbose_name='bank')),
+                ('clients', models.IntegerField(default=0)),
+                ('accounts', models.IntegerField(default=0)),
+                ('deposits', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=50)),
+            ],
+            options={
+                'verbose_name': 'bank statistics',
+                'verbose_name_plural': 'bank statistics',
+                'db_table': '"banks"."bank_stats"',
+            },
+        ),
+        migrations.CreateModel(
+            name='BankDailyVolume',
+            fields=[
+                ('id', models.UUIDField(db_default=django.contrib.postgres.functions.RandomUUID(), default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('day', models.DateField()),
+                ('transfers', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=50)),
+                ('bank', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_volumes', to='banks_app.bank', verbose_name='bank')),
+            ],
+            options={
+                'verbose_name': 'bank daily volume',
+                'verbose_name_plural': 'bank daily volumes',
+                'db_table': '"banks"."bank_daily_volume"',
+                'unique_together': {('bank', 'day')},
+            },
+        ),
+        migrations.RunSQL(POPULATE_STATS, migrations.RunSQL.noop),
+    ]
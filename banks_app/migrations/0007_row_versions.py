@@ -0,0 +1,101 @@
+# Generated by Django 5.0.3 on 2026-10-18 06:44
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+VERSIONED_TABLES = ('bank', 'client', 'bank_account')
+
+BUMP_VERSION = '''
+CREATE FUNCTION "banks"."bump_version"() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.version := OLD.version + 1;
+    NEW.updated_at := now();
+    RETURN NEW;
+END
+$$;
+'''
+
+VERSION_TRIGGER = '''
+CREATE TRIGGER "{0}_version" BEFORE UPDATE ON "banks"."{0}"
+FOR EACH ROW EXECUTE FUNCTION "banks"."bump_version"();
+'''
+
+BUMP_RELATED_VERSIONS = '''
+CREATE FUNCTION "banks"."bump_bank_client_versions"() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP <> 'DELETE' THEN
+        UPDATE "banks"."bank" SET version = version WHERE id IN (SELECT bank_id FROM new_rows);
+        UPDATE "banks"."client" SET version = version WHERE id IN (SELECT client_id FROM new_rows);
+    END IF;
+    IF TG_OP <> 'INSERT' THEN
+        UPDATE "banks"."bank" SET version = version WHERE id IN (SELECT bank_id FROM old_rows);
+        UPDATE "banks"."client" SET version = version WHERE id IN (SELECT client_id FROM old_rows);
+    END IF;
+    RETURN NULL;
+END
+$$;
+CREATE TRIGGER "bank_client_insert_versions" AFTER INSERT ON "banks"."bank_client"
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION "banks"."bump_bank_client_versions"();
+CREATE TRIGGER "bank_client_update_versions" AFTER UPDATE ON "banks"."bank_client"
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION "banks"."bump_bank_client_versions"();
+CREATE TRIGGER "bank_client_delete_versions" AFTER DELETE ON "banks"."bank_client"
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION "banks"."bump_bank_client_versions"();
+'''
+
+DROP_TRIGGERS = '''
+DROP TRIGGER "bank_client_insert_versions" ON "banks"."bank_client";
+DROP TRIGGER "bank_client_update_versions" ON "banks"."bank_client";
+DROP TRIGGER "bank_client_delete_versions" ON "banks"."bank_client";
+DROP FUNCTION "banks"."bump_bank_client_versions"();
+{0}
+DROP FUNCTION "banks"."bump_version"();
+'''.format(''.join(f'DROP TRIGGER "{table}_version" ON "banks"."{table}";\n' for table in VERSIONED_TABLES))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banks_app', '0006_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bank',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_default=django.db.models.functions.datetime.Now()),
+        ),
+        migrations.AddField(
+            model_name='bank',
+            name='version',
+            field=models.PositiveBigIntegerField(db_default=1, default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='bankaccount',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_default=django.db.models.functions.datetime.Now()),
+        ),
+        migrations.AddField(
+            model_name='bankaccount',
+            name='version',
+            field=models.PositiveBigIntegerField(db_default=1, default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_default=django.db.models.functions.datetime.Now()),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='version',
+            field=models.PositiveBigIntegerField(db_default=1, default=1, editable=False),
+        ),
+        migrations.RunSQL(
+            BUMP_VERSION
+            + ''.join(VERSION_TRIGGER.format(table) for table in VERSIONED_TABLES)
+            + BUMP_RELATED_VERSIONS,
+            DROP_TRIGGERS,
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.0.3 on 2026-10-18 06:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+OPENING_ENTRIES = '''
+INSERT INTO "banks"."ledger_entry" (account_id, transaction_id, amount, balance, created)
+SELECT account.id, NULL, account.balance, account.balance, clock_timestamp()
+FROM "banks"."bank_account" account
+WHERE account.balance <> 0
+ORDER BY account.id;
+'''
+
+APPEND_ONLY = '''
+CREATE FUNCTION "banks"."reject_ledger_update"() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    RAISE EXCEPTION 'ledger entries are append-only';
+END
+$$;
+CREATE TRIGGER "ledger_entry_append_only" BEFORE UPDATE ON "banks"."ledger_entry"
+FOR EACH ROW EXECUTE FUNCTION "banks"."reject_ledger_update"();
+'''
+
+DROP_APPEND_ONLY = '''
+DROP TRIGGER "ledger_entry_append_only" ON "banks"."ledger_entry";
+DROP FUNCTION "banks"."reject_ledger_update"();
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banks_app', '0007_row_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=40)),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=40)),
+                ('created', models.DateTimeField(default=django.utils.timezone.now)),
+                ('account', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='ledger_entries', to='banks_app.bankaccount', verbose_name='bank account')),
+                ('transaction', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='ledger_entries', to='banks_app.transaction', verbose_name='transaction')),
+            ],
+            options={
+                'verbose_name': 'ledger entry',
+                'verbose_name_plural': 'ledger entries',
+                'db_table': '"banks"."ledger_entry"',
+                'indexes': [models.Index(fields=['account', 'created'], name='ledger_account_created_idx')],
+            },
+        ),
+        migrations.RunSQL(OPENING_ENTRIES, migrations.RunSQL.noop),
+        migrations.RunSQL(APPEND_ONLY, DROP_APPEND_ONLY),
+    ]
@@ -0,0 +1,165 @@
+# Generated by Django 5.0.3 on 2026-10-18 07:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Creates the partition of a month, or the default partition for NULL, as a table of
+# its own whose indexes are named after the indexes of the parent, moves the rows of
+# the month out of the default partition and attaches it.
+CREATE_PARTITION_FUNCTION = '''
+CREATE FUNCTION "banks"."create_transaction_partition"(month date) RETURNS text LANGUAGE plpgsql AS $$
+DECLARE
+    suffix text := coalesce(to_char(month, 'YYYY_MM'), 'default');
+    target text := format('"banks".%I', 'transaction_' || suffix);
+    bounds text := 'DEFAULT';
+    parent_index record;
+BEGIN
+    EXECUTE format('CREATE TABLE %s (LIKE "banks"."transaction" INCLUDING DEFAULTS)', target);
+    IF month IS NOT NULL THEN
+        bounds := format('FOR VALUES FROM (%L) TO (%L)', month, (month + interval '1 month')::date);
+        IF to_regclass('"banks"."transaction_default"') IS NOT NULL THEN
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM "banks"."transaction_default" '
+                'WHERE transaction_date >= %L AND transaction_date < %L RETURNING *) '
+                'INSERT INTO %s SELECT * FROM moved',
+                month, (month + interval '1 month')::date, target
+            );
+        END IF;
+    END IF;
+    FOR parent_index IN
+        SELECT index_class.relname AS name,
+               pg_get_indexdef(index_class.oid) AS definition,
+               pg_get_constraintdef(index_constraint.oid) AS constraint_definition
+        FROM pg_index
+        JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid
+        LEFT JOIN pg_constraint index_constraint ON index_constraint.conindid = pg_index.indexrelid
+        WHERE pg_index.indrelid = '"banks"."transaction"'::regclass
+    LOOP
+        IF parent_index.constraint_definition IS NOT NULL THEN
+            EXECUTE format(
+                'ALTER TABLE %s ADD CONSTRAINT %I %s',
+                target, parent_index.name || '_' || suffix, parent_index.constraint_definition
+            );
+        ELSE
+            EXECUTE regexp_replace(
+                parent_index.definition,
+                ' INDEX \\S+ ON ONLY \\S+ ',
+                format(' INDEX %I ON %s ', parent_index.name || '_' || suffix, target)
+            );
+        END IF;
+    END LOOP;
+    EXECUTE format('ALTER TABLE "banks"."transaction" ATTACH PARTITION %s %s', target, bounds);
+    RETURN 'transaction_' || suffix;
+END
+$$;
+'''
+
+# Recreates the indexes and foreign keys of the table {source} on "banks"."transaction"
+# under their names, renaming those of {source} with the suffix _{source}.
+COPY_SCHEMA = '''
+DO $$
+DECLARE
+    source_index record;
+    foreign_key record;
+BEGIN
+    FOR source_index IN
+        SELECT index_class.relname AS name,
+               pg_get_indexdef(index_class.oid) AS definition,
+               pg_index.indisprimary AS is_primary
+        FROM pg_index JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid
+        WHERE pg_index.indrelid = '"banks"."{source}"'::regclass
+    LOOP
+        EXECUTE format('ALTER INDEX "banks".%I RENAME TO %I', source_index.name, source_index.name || '_{source}');
+        IF source_index.is_primary THEN
+            EXECUTE format(
+                'ALTER TABLE "banks"."transaction" ADD CONSTRAINT %I PRIMARY KEY ({primary_key})',
+                source_index.name
+            );
+        ELSE
+            EXECUTE regexp_replace(
+                source_index.definition, ' ON (ONLY )?\\S+ USING ', ' ON "banks"."transaction" USING '
+            );
+        END IF;
+    END LOOP;
+    FOR foreign_key IN
+        SELECT conname AS name, pg_get_constraintdef(oid) AS definition
+        FROM pg_constraint
+        WHERE conrelid = '"banks"."{source}"'::regclass AND contype = 'f'
+    LOOP
+        EXECUTE format(
+            'ALTER TABLE "banks"."transaction" ADD CONSTRAINT %I %s', foreign_key.name, foreign_key.definition
+        );
+    END LOOP;
+END
+$$;
+'''
+
+# A partitioned table can only be referenced by its whole primary key, so the foreign
+# keys to transactions are dropped. AlterField does not find them, since introspection
+# does not see tables of the banks schema.
+DROP_REFERENCES = '''
+DO $$
+DECLARE
+    reference record;
+BEGIN
+    FOR reference IN
+        SELECT conrelid::regclass AS referencing, conname AS name
+        FROM pg_constraint
+        WHERE confrelid = '"banks"."transaction"'::regclass AND contype = 'f'
+    LOOP
+        EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', reference.referencing, reference.name);
+    END LOOP;
+END
+$$;
+'''
+
+# A unique constraint of a partitioned table must include the partition key, so the
+# primary key becomes (id, transaction_date) and the database no longer enforces that
+# id alone is unique: the same id may be stored again under another date. Ids are
+# random UUIDs, and bulk_load checks given ids against the table and the archive.
+PARTITION_TRANSACTIONS = (
+    DROP_REFERENCES
+    + 'ALTER TABLE "banks"."transaction" RENAME TO "transaction_unpartitioned";'
+    'CREATE TABLE "banks"."transaction" (LIKE "banks"."transaction_unpartitioned" INCLUDING DEFAULTS) '
+    'PARTITION BY RANGE (transaction_date);'
+    + COPY_SCHEMA.format(source='transaction_unpartitioned', primary_key='id, transaction_date')
+    + CREATE_PARTITION_FUNCTION
+    + '''
+SELECT "banks"."create_transaction_partition"(NULL);
+SELECT "banks"."create_transaction_partition"(month::date)
+FROM generate_series(
+    date_trunc('month', coalesce((SELECT min(transaction_date) FROM "banks"."transaction_unpartitioned"), current_date)),
+    date_trunc('month', current_date) + interval '3 months',
+    interval '1 month'
+) AS month;
+INSERT INTO "banks"."transaction" SELECT * FROM "banks"."transaction_unpartitioned";
+DROP TABLE "banks"."transaction_unpartitioned";
+'''
+)
+
+UNPARTITION_TRANSACTIONS = (
+    'ALTER TABLE "banks"."transaction" RENAME TO "transaction_partitioned";'
+    'CREATE TABLE "banks"."transaction" (LIKE "banks"."transaction_partitioned" INCLUDING DEFAULTS);'
+    + COPY_SCHEMA.format(source='transaction_partitioned', primary_key='id')
+    + '''
+INSERT INTO "banks"."transaction" SELECT * FROM "banks"."transaction_partitioned";
+DROP TABLE "banks"."transaction_partitioned";
+DROP FUNCTION "banks"."create_transaction_partition"(date);
+'''
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banks_app', '0008_ledger_entry'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transactionclient',
+            name='transaction',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, to='banks_app.transaction', verbose_name='transaction'),
+        ),
+        migrations.RunSQL(PARTITION_TRANSACTIONS, UNPARTITION_TRANSACTIONS),
+    ]
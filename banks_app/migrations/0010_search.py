@@ -0,0 +1,65 @@
+# Generated by Django 5.0.3 on 2026-10-18 07:28
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Partitions get the index under names made by PostgreSQL, renamed to the
+# <index>_<suffix> names of banks.create_transaction_partition.
+RENAME_PARTITION_INDEXES = '''
+DO $$
+DECLARE
+    child record;
+BEGIN
+    FOR child IN
+        SELECT index_class.relname AS name, table_class.relname AS partition
+        FROM pg_inherits
+        JOIN pg_class index_class ON index_class.oid = pg_inherits.inhrelid
+        JOIN pg_index ON pg_index.indexrelid = index_class.oid
+        JOIN pg_class table_class ON table_class.oid = pg_index.indrelid
+        WHERE pg_inherits.inhparent = '"banks"."transaction_search_idx"'::regclass
+    LOOP
+        EXECUTE format(
+            'ALTER INDEX "banks".%I RENAME TO %I',
+            child.name, 'transaction_search_idx' || substr(child.partition, length('transaction') + 1)
+        );
+    END LOOP;
+END
+$$;
+'''
+
+# Fragments of names and phones are matched with UPPER(column) LIKE UPPER('%fragment%'),
+# the SQL of icontains, which a trigram index of the same expressions serves. Servers
+# without the pg_trgm module answer the same queries by sequential scan.
+CREATE_CLIENT_SEARCH_INDEX = '''
+DO $$
+BEGIN
+    IF EXISTS (SELECT FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE INDEX client_search_trgm_idx ON "banks"."client" USING gin (
+            upper(first_name::text) gin_trgm_ops,
+            upper(last_name::text) gin_trgm_ops,
+            upper(phone::text) gin_trgm_ops
+        );
+    END IF;
+END
+$$;
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banks_app', '0009_partition_transaction'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('description', config='simple'), name='transaction_search_idx'),
+        ),
+        migrations.RunSQL(RENAME_PARTITION_INDEXES, migrations.RunSQL.noop),
+        migrations.RunSQL(
+            CREATE_CLIENT_SEARCH_INDEX, 'DROP INDEX IF EXISTS "banks"."client_search_trgm_idx";',
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.3 on 2026-10-18 07:52
+
+from django.db import migrations
+
+# The admin searches banks by a fragment of the title with the SQL of icontains,
+# which a trigram index of the same expression serves, as client_search_trgm_idx
+# does for clients.
+CREATE_BANK_SEARCH_INDEX = '''
+DO $$
+BEGIN
+    IF EXISTS (SELECT FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE INDEX bank_search_trgm_idx ON "banks"."bank" USING gin (upper(title::text) gin_trgm_ops);
+    END IF;
+END
+$$;
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banks_app', '0010_search'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_BANK_SEARCH_INDEX, 'DROP INDEX IF EXISTS "banks"."bank_search_trgm_idx";'),
+    ]
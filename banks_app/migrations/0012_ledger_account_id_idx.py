@@ -0,0 +1,24 @@
+# Generated by Django 5.0.3 on 2026-10-18 12:00
+
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('banks_app', '0011_bank_search'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='ledgerentry',
+            index=models.Index(fields=['account', 'id'], name='ledger_account_id_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='ledgerentry',
+            name='ledger_account_created_idx',
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.3 on 2026-10-18 12:30
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('banks_app', '0012_ledger_account_id_idx'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='client',
+            index=models.Index(fields=['last_name', 'first_name', 'id'], name='client_name_idx'),
+        ),
+    ]
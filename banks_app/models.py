@@ -10,8 +10,13 @@ from uuid import uuid4
 
 import django.core.validators as validators
 from django.contrib.auth.models import User
+from django.contrib.postgres.functions import RandomUUID
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.transaction import atomic
+from django.db.models.functions import Now
 from django.db.models.signals import post_delete
 from django.dispatch import receiver
 from django.utils import timezone
@@ -63,7 +68,55 @@ class UUIDMixin(models.Model):
         abstract = True
 
 
-class Bank(UUIDMixin):
+class AtomicSaveMixin(models.Model):
+    """
+    Abstract model mixin saving the object and running its post_save receivers atomically.
+
+    Bank statistics are updated by signal receivers, this keeps them in the same
+    database transaction as the change of the object.
+    """
+
+    class Meta:
+        """Meta class for AtomicSaveMixin."""
+
+        abstract = True
+
+    @atomic
+    def save(self, *args, **kwargs) -> None:
+        """
+        Save the object in a database transaction.
+
+        Args:
+            args: Positional arguments of Model.save.
+            kwargs: Keyword arguments of Model.save.
+        """
+        super().save(*args, **kwargs)
+
+
+class VersionedMixin(models.Model):
+    """
+    Abstract model mixin for the version of a row, used as the ETag of the REST API.
+
+    Both columns are maintained by database triggers (migration 0007), so that every
+    UPDATE of the row bumps them, including update(), bulk_update() and raw SQL.
+    Adding or removing a relation between a bank and a client bumps both of them.
+    The values of a saved instance are not refreshed.
+
+    Attributes:
+        version (PositiveBigIntegerField): Number of the version, 1 for a new row.
+        updated_at (DateTimeField): Time of the last change.
+    """
+
+    version = models.PositiveBigIntegerField(default=1, db_default=1, editable=False)
+    updated_at = models.DateTimeField(auto_now=True, db_default=Now())
+
+    class Meta:
+        """Meta class for VersionedMixin."""
+
+        abstract = True
+
+
+class Bank(VersionedMixin, UUIDMixin):
     """
     Model represent a bank.
 
@@ -106,10 +159,14 @@ class Bank(UUIDMixin):
         return f'Bank: "{self.title}", foundation_date: {self.foundation_date}'
 
 
-class Client(UUIDMixin):
+class Client(VersionedMixin, UUIDMixin):
     """
     Model represent a client.
 
+    Names and phones are searched by fragment through the trigram GIN index
+    client_search_trgm_idx, created by a migration where pg_trgm is available. The
+    (last_name, first_name, id) index serves the pages of the list of clients.
+
     Attributes:
         user (OneToOneField): The user associated with the client.
         first_name (str): The first name of the client.
@@ -154,6 +211,9 @@ class Client(UUIDMixin):
         """Meta class for model Client."""
 
         db_table = '"banks"."client"'
+        indexes = [
+            models.Index(fields=['last_name', 'first_name', 'id'], name='client_name_idx'),
+        ]
         verbose_name = _('client')
         verbose_name_plural = _('clients')
 
@@ -166,7 +226,7 @@ class Client(UUIDMixin):
         return f'Client: {self.first_name} {self.last_name}, phone: {self.phone}'
 
 
-class BankClient(UUIDMixin):
+class BankClient(AtomicSaveMixin, UUIDMixin):
     """
     Model represent the relationship between a bank and a client.
 
@@ -197,7 +257,7 @@ class BankClient(UUIDMixin):
         return f'{self.bank} - {self.client}'
 
 
-class BankAccount(UUIDMixin):
+class BankAccount(AtomicSaveMixin, VersionedMixin, UUIDMixin):
     """
     Model represent a bank account.
 
@@ -218,6 +278,9 @@ class BankAccount(UUIDMixin):
         """Meta class for model BankAccount."""
 
         db_table = '"banks"."bank_account"'
+        indexes = [
+            models.Index(fields=['client', 'bank'], name='bank_account_client_bank_idx'),
+        ]
         verbose_name = _('bank_account')
         verbose_name_plural = _('bank_accounts')
 
@@ -230,10 +293,15 @@ class BankAccount(UUIDMixin):
         return f'Bank_account: {self.id}, balance: {self.balance}'
 
 
-class Transaction(UUIDMixin):
+class Transaction(AtomicSaveMixin, UUIDMixin):
     """
     Model represent a transaction.
 
+    The table is partitioned by month of transaction_date, see banks_app.partitions.
+    Its primary key in the database is (id, transaction_date), which a partitioned
+    table needs, so foreign keys to transactions are not constraints. Descriptions
+    are searched through a GIN index of their text search vector.
+
     Attributes:
         initializer (ForeignKey): The client who initiated the transaction.
         amount (DecimalField): The amount of the transaction.
@@ -279,6 +347,23 @@ class Transaction(UUIDMixin):
         """Meta class for model Transaction."""
 
         db_table = '"banks"."transaction"'
+        indexes = [
+            models.Index(fields=['transaction_date', 'id'], name='transaction_date_id_idx'),
+            models.Index(
+                fields=['initializer', 'transaction_date', 'id'], name='transaction_initializer_idx',
+            ),
+            models.Index(
+                fields=['from_bank_account_id', 'transaction_date', 'id'],
+                name='transaction_from_account_idx',
+            ),
+            models.Index(
+                fields=['to_bank_account_id', 'transaction_date', 'id'],
+                name='transaction_to_account_idx',
+            ),
+            GinIndex(
+                SearchVector('description', config=config.SEARCH_CONFIG), name='transaction_search_idx',
+            ),
+        ]
         verbose_name = _('transaction')
         verbose_name_plural = _('transactions')
 
@@ -293,10 +378,69 @@ class Transaction(UUIDMixin):
                f"from: {self.from_bank_account_id}, to: {self.to_bank_account_id}"
 
 
+class LedgerEntry(models.Model):
+    """
+    Model represent an entry of the ledger of balances, see banks_app.ledger.
+
+    Entries are only appended. The primary key is a sequence, which orders the entries
+    of an account. The (account, id) index serves the entries of an account, so the
+    foreign key gets no index of its own. The transaction is not
+    a constraint, entries outlive deleted and archived transactions.
+
+    Attributes:
+        id (BigAutoField): Position of the entry in the ledger.
+        account (ForeignKey): The bank account whose balance changed.
+        transaction (ForeignKey): The transfer, null for deposits and corrections of the balance.
+        amount (DecimalField): The change of the balance, negative for debits.
+        balance (DecimalField): The balance of the account after the entry.
+        created (DateTimeField): The moment of the entry.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    account = models.ForeignKey(
+        BankAccount,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name='ledger_entries',
+        verbose_name=_('bank account'),
+    )
+    transaction = models.ForeignKey(
+        Transaction,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name='ledger_entries',
+        verbose_name=_('transaction'),
+    )
+    amount = models.DecimalField(decimal_places=2, max_digits=config.MAX_DIGITS_BANK_ACCOUNT)
+    balance = models.DecimalField(decimal_places=2, max_digits=config.MAX_DIGITS_BANK_ACCOUNT)
+    created = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        """Meta class for model LedgerEntry."""
+
+        db_table = '"banks"."ledger_entry"'
+        indexes = [
+            models.Index(fields=['account', 'id'], name='ledger_account_id_idx'),
+        ]
+        verbose_name = _('ledger entry')
+        verbose_name_plural = _('ledger entries')
+
+    def __str__(self) -> str:
+        """Magic method for displaying short information about LedgerEntry.
+
+        Returns:
+            str: Short information about LedgerEntry.
+        """
+        return f'Entry {self.id} of account {self.account_id}: {self.amount}, balance {self.balance}'
+
+
 class TransactionClient(UUIDMixin):
     """
     Model represent the relationship between a transaction and a client.
 
+    The transaction is not a constraint, the table of transactions is partitioned.
+
     Attributes:
         client (ForeignKey): The client in the relationship.
         transaction (ForeignKey): The transaction in the relationship.
@@ -304,7 +448,7 @@ class TransactionClient(UUIDMixin):
 
     client = models.ForeignKey(Client, verbose_name=_('client'), on_delete=models.CASCADE)
     transaction = models.ForeignKey(
-        Transaction, verbose_name=_('transaction'), on_delete=models.CASCADE,
+        Transaction, verbose_name=_('transaction'), on_delete=models.CASCADE, db_constraint=False,
     )
 
     class Meta:
@@ -326,6 +470,132 @@ class TransactionClient(UUIDMixin):
         return f'Transaction: {self.transaction} - {self.client}'
 
 
+class BankStats(models.Model):
+    """
+    Model represent statistics of a bank, maintained incrementally by banks_app.bank_stats.
+
+    Attributes:
+        bank (OneToOneField): The bank, also the primary key.
+        clients (int): The number of clients of the bank.
+        accounts (int): The number of bank accounts in the bank.
+        deposits (DecimalField): The total balance of the bank accounts.
+    """
+
+    bank = models.OneToOneField(
+        Bank, primary_key=True, on_delete=models.CASCADE, related_name='stats', verbose_name=_('bank'),
+    )
+    clients = models.IntegerField(default=0)
+    accounts = models.IntegerField(default=0)
+    deposits = models.DecimalField(
+        decimal_places=2, max_digits=config.MAX_DIGITS_DEPOSITS, default=Decimal('0.00'),
+    )
+
+    class Meta:
+        """Meta class for model BankStats."""
+
+        db_table = '"banks"."bank_stats"'
+        verbose_name = _('bank statistics')
+        verbose_name_plural = _('bank statistics')
+
+    def __str__(self) -> str:
+        """Magic method for displaying short information about BankStats.
+
+        Returns:
+            str: Short information about BankStats.
+        """
+        return f'Stats of bank {self.bank_id}: {self.clients} clients, {self.accounts} accounts'
+
+
+class BankDailyVolume(UUIDMixin):
+    """
+    Model represent transfers sent from accounts of a bank during one day.
+
+    Attributes:
+        id (UUIDField): Primary key, also generated by the database for upserts.
+        bank (ForeignKey): The bank of the source accounts.
+        day (DateField): The date of the transfers.
+        transfers (int): The number of transfers.
+        amount (DecimalField): The total amount of the transfers.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid4, db_default=RandomUUID(), editable=False)
+    bank = models.ForeignKey(
+        Bank, on_delete=models.CASCADE, related_name='daily_volumes', verbose_name=_('bank'),
+    )
+    day = models.DateField()
+    transfers = models.IntegerField(default=0)
+    amount = models.DecimalField(
+        decimal_places=2, max_digits=config.MAX_DIGITS_DEPOSITS, default=Decimal('0.00'),
+    )
+
+    class Meta:
+        """Meta class for model BankDailyVolume."""
+
+        db_table = '"banks"."bank_daily_volume"'
+        unique_together = (
+            ('bank', 'day'),
+        )
+        verbose_name = _('bank daily volume')
+        verbose_name_plural = _('bank daily volumes')
+
+    def __str__(self) -> str:
+        """Magic method for displaying short information about BankDailyVolume.
+
+        Returns:
+            str: Short information about BankDailyVolume.
+        """
+        return f'Volume of bank {self.bank_id} on {self.day}: {self.amount}'
+
+
+class IdempotencyKey(UUIDMixin):
+    """
+    Model represent a response stored for an idempotency key, see banks_app.idempotency.
+
+    Attributes:
+        id (UUIDField): Primary key, also generated by the database for upserts.
+        user (ForeignKey): The user who sent the request.
+        scope (str): The endpoint the key was used with.
+        key (str): The key chosen by the client.
+        fingerprint (str): Hash of the payload of the request.
+        status_code (int): Status of the stored response, null while the request is handled.
+        headers (JSONField): Stored response headers.
+        body (BinaryField): Stored response body.
+        expires (DateTimeField): Moment after which the key may be reused.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid4, db_default=RandomUUID(), editable=False)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='idempotency_keys', verbose_name=_('user'),
+    )
+    scope = models.CharField(max_length=config.MAX_LENGTH_IDEMPOTENCY_SCOPE)
+    key = models.CharField(max_length=config.MAX_LENGTH_IDEMPOTENCY_KEY)
+    fingerprint = models.CharField(max_length=config.MAX_LENGTH_FINGERPRINT)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    headers = models.JSONField(default=dict)
+    body = models.BinaryField(default=bytes)
+    expires = models.DateTimeField(db_index=True)
+
+    class Meta:
+        """Meta class for model IdempotencyKey."""
+
+        db_table = '"banks"."idempotency_key"'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'scope', 'key'], name='idempotency_key_user_scope_key_uniq',
+            ),
+        ]
+        verbose_name = _('idempotency key')
+        verbose_name_plural = _('idempotency keys')
+
+    def __str__(self) -> str:
+        """Magic method for displaying short information about IdempotencyKey.
+
+        Returns:
+            str: Short information about IdempotencyKey.
+        """
+        return f'Key {self.key} of user {self.user_id} for {self.scope}'
+
+
 @receiver(post_delete, sender=BankAccount)
 def delete_bank_client_relation(sender, instance, **kwargs):
     """
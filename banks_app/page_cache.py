@@ -0,0 +1,292 @@
+"""
+This module contains the cache of rendered bank and client pages.
+
+Every cached page belongs to a kind (the bank list, a bank or a client) and is stored
+under the current version of its object. The versions live in the same cache and are
+bumped by signal receivers whenever a Bank, a Client or a BankClient relation changes,
+so a stale page is never served and there is nothing to delete on invalidation:
+entries of old versions simply expire. banks_app.auth_cache keeps versions of users
+and groups here as well, since this cache is shared by all workers.
+"""
+
+import time
+from contextlib import suppress
+from functools import partial
+from typing import Awaitable, Callable, Iterable
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from banks_app import config
+
+from .models import Bank, BankClient, Client
+
+BANKS = 'banks'
+BANK = 'bank'
+CLIENT = 'client'
+HITS = 'hits'
+MISSES = 'misses'
+RELATED_NAMES = {Bank: 'clients', Client: 'banks'}
+KINDS = {Bank: BANK, Client: CLIENT}
+M2M_ACTIONS = ('post_add', 'post_remove', 'pre_clear')
+
+
+def get_cache():
+    """
+    Get the cache backend of the pages.
+
+    Returns:
+        BaseCache: The cache configured under config.PAGE_CACHE_ALIAS.
+    """
+    return caches[config.PAGE_CACHE_ALIAS]
+
+
+def version_key(kind: str, pk='') -> str:
+    """
+    Build the cache key of the version of an object.
+
+    Args:
+        kind (str): Kind of the page.
+        pk (Any): Primary key of the object, empty for lists.
+
+    Returns:
+        str: The key.
+    """
+    return f'page-version:{kind}:{pk}'
+
+
+def get_version(kind: str, pk='') -> int:
+    """
+    Get the current version of an object.
+
+    A missing version (never set or evicted) starts from the current time in nanoseconds,
+    so it cannot collide with a version under which a page was cached before.
+
+    Args:
+        kind (str): Kind of the page.
+        pk (Any): Primary key of the object, empty for lists.
+
+    Returns:
+        int: The version.
+    """
+    cache = get_cache()
+    key = version_key(kind, pk)
+    cache.add(key, time.time_ns(), timeout=None)
+    return cache.get(key, 0)
+
+
+async def aget_version(kind: str, pk='') -> int:
+    """
+    Get the current version of an object with the async cache API.
+
+    Args:
+        kind (str): Kind of the page.
+        pk (Any): Primary key of the object, empty for lists.
+
+    Returns:
+        int: The version.
+    """
+    cache = get_cache()
+    key = version_key(kind, pk)
+    await cache.aadd(key, time.time_ns(), timeout=None)
+    return await cache.aget(key, 0)
+
+
+def bump_versions(kind: str, pks: list) -> None:
+    """
+    Bump versions of objects that have one.
+
+    Args:
+        kind (str): Kind of the pages.
+        pks (list): Primary keys of the objects.
+    """
+    cache = get_cache()
+    for pk in pks:
+        with suppress(ValueError):
+            cache.incr(version_key(kind, pk))
+
+
+def invalidate(kind: str, pks: Iterable = ('',)) -> None:
+    """
+    Bump versions of objects, making their cached pages unreachable.
+
+    Versions are bumped immediately and once more on commit, so that a page rendered
+    by another request before the commit, from the old data, is not served either.
+
+    Args:
+        kind (str): Kind of the pages.
+        pks (Iterable): Primary keys of the objects, a single empty key for lists.
+    """
+    pks = list(pks)
+    bump_versions(kind, pks)
+    transaction.on_commit(partial(bump_versions, kind, pks))
+
+
+def count(counter: str) -> None:
+    """
+    Increase a hit or miss counter.
+
+    Args:
+        counter (str): HITS or MISSES.
+    """
+    cache = get_cache()
+    key = f'page-cache:{counter}'
+    if not cache.add(key, 1, timeout=None):
+        cache.incr(key)
+
+
+async def acount(counter: str) -> None:
+    """
+    Increase a hit or miss counter with the async cache API.
+
+    Args:
+        counter (str): HITS or MISSES.
+    """
+    cache = get_cache()
+    key = f'page-cache:{counter}'
+    if not await cache.aadd(key, 1, timeout=None):
+        await cache.aincr(key)
+
+
+def get_stats() -> dict[str, int]:
+    """
+    Get the hit and miss counters of the page cache.
+
+    Returns:
+        dict[str, int]: Numbers of hits and misses.
+    """
+    cache = get_cache()
+    return {counter: cache.get(f'page-cache:{counter}', 0) for counter in (HITS, MISSES)}
+
+
+def cached_page(kind: str, pk, variant: str, render: Callable[[], dict]) -> dict:
+    """
+    Get a rendered page from the cache, rendering and caching it on a miss.
+
+    The version is read before rendering, so a page rendered from data that changed
+    meanwhile is stored under an outdated version and never served.
+
+    Args:
+        kind (str): Kind of the page.
+        pk (Any): Primary key of the object, empty for lists.
+        variant (str): Variant of the page, for pages that differ between users.
+        render (Callable[[], dict]): Renders the page.
+
+    Returns:
+        dict: The rendered page.
+    """
+    cache = get_cache()
+    object_version = get_version(kind, pk)
+    key = f'page:{kind}:{pk}:{variant}'
+    page = cache.get(key, version=object_version)
+    if page is not None:
+        count(HITS)
+        return page
+    count(MISSES)
+    page = render()
+    cache.set(key, page, config.PAGE_CACHE_TIMEOUT, version=object_version)
+    return page
+
+
+async def acached_page(kind: str, pk, variant: str, render: Callable[[], Awaitable[dict]]) -> dict:
+    """
+    Get a rendered page from the cache like cached_page, for async views.
+
+    Args:
+        kind (str): Kind of the page.
+        pk (Any): Primary key of the object, empty for lists.
+        variant (str): Variant of the page, for pages that differ between users.
+        render (Callable[[], Awaitable[dict]]): Renders the page.
+
+    Returns:
+        dict: The rendered page.
+    """
+    cache = get_cache()
+    object_version = await aget_version(kind, pk)
+    key = f'page:{kind}:{pk}:{variant}'
+    page = await cache.aget(key, version=object_version)
+    await acount(MISSES if page is None else HITS)
+    if page is None:
+        page = await render()
+        await cache.aset(key, page, config.PAGE_CACHE_TIMEOUT, version=object_version)
+    return page
+
+
+def related_ids(instance) -> list:
+    """
+    Get primary keys of banks of a client or clients of a bank.
+
+    Args:
+        instance (Bank | Client): The object.
+
+    Returns:
+        list: Primary keys of the related objects.
+    """
+    return list(getattr(instance, RELATED_NAMES[type(instance)]).values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Bank)
+@receiver(post_delete, sender=Bank)
+def invalidate_bank(sender, instance, **kwargs):
+    """
+    Invalidate pages showing a bank: the bank list, the bank and its clients.
+
+    Args:
+        sender (type): The model class.
+        instance (Bank): The saved or deleted bank.
+        **kwargs: Additional keyword arguments.
+    """
+    invalidate(BANKS)
+    invalidate(BANK, [instance.pk])
+    invalidate(CLIENT, related_ids(instance))
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def invalidate_client(sender, instance, **kwargs):
+    """
+    Invalidate pages showing a client: the client and its banks.
+
+    Args:
+        sender (type): The model class.
+        instance (Client): The saved or deleted client.
+        **kwargs: Additional keyword arguments.
+    """
+    invalidate(CLIENT, [instance.pk])
+    invalidate(BANK, related_ids(instance))
+
+
+@receiver(post_save, sender=BankClient)
+@receiver(post_delete, sender=BankClient)
+def invalidate_bank_client(sender, instance, **kwargs):
+    """
+    Invalidate pages of both sides of a saved or deleted relation.
+
+    Args:
+        sender (type): The model class.
+        instance (BankClient): The saved or deleted relation.
+        **kwargs: Additional keyword arguments.
+    """
+    invalidate(BANK, [instance.bank_id])
+    invalidate(CLIENT, [instance.client_id])
+
+
+@receiver(m2m_changed, sender=BankClient)
+def invalidate_bank_clients(sender, instance, action, model, pk_set, **kwargs):  # noqa: WPS211
+    """
+    Invalidate pages of both sides of relations changed through Bank.clients or Client.banks.
+
+    Args:
+        sender (type): The through model.
+        instance (Bank | Client): The object whose relations changed.
+        action (str): Kind of the change.
+        model (type): The model of the related objects.
+        pk_set (set): Primary keys of the related objects, None when relations are cleared.
+        **kwargs: Additional keyword arguments.
+    """
+    if action not in M2M_ACTIONS:
+        return
+    invalidate(KINDS[type(instance)], [instance.pk])
+    invalidate(KINDS[model], related_ids(instance) if pk_set is None else pk_set)
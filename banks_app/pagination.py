@@ -0,0 +1,432 @@
+"""
+This module contains keyset (cursor) pagination for large listings.
+
+Pages are selected with a WHERE condition on the ordering columns instead of OFFSET,
+so fetching any page costs one index range scan regardless of its depth.
+"""
+
+import base64
+import json
+from typing import NamedTuple, Optional
+
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.http import Http404
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from banks_app import config
+
+TRANSACTION_ORDERING = ('-transaction_date', '-id')
+CLIENT_ORDERING = ('last_name', 'first_name', 'id')
+CURSOR_QUERY_PARAM = 'cursor'
+PAGE_SIZE_QUERY_PARAM = 'page_size'
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor cannot be decoded."""
+
+
+class KeysetPage(NamedTuple):
+    """
+    One page of a keyset paginated listing.
+
+    Attributes:
+        object_list (list): Objects of the page.
+        next_cursor (str): Cursor of the following page, None on the last page.
+        previous_cursor (str): Cursor of the preceding page, None on the first page.
+    """
+
+    object_list: list
+    next_cursor: Optional[str]
+    previous_cursor: Optional[str]
+
+    def has_other_pages(self) -> bool:
+        """
+        Check if there are pages before or after this one.
+
+        Returns:
+            bool: True if the listing has more than one page.
+        """
+        return bool(self.next_cursor or self.previous_cursor)
+
+
+def encode_cursor(position: list, backwards: bool) -> str:
+    """
+    Encode a position in a listing into an opaque cursor.
+
+    Args:
+        position (list): Values of the ordering fields of the row next to the page.
+        backwards (bool): True if the cursor points to the preceding page.
+
+    Returns:
+        str: URL-safe cursor.
+    """
+    payload = json.dumps([[str(field_value) for field_value in position], backwards])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[list, bool]:
+    """
+    Decode a cursor created by encode_cursor.
+
+    Args:
+        cursor (str): URL-safe cursor.
+
+    Returns:
+        tuple[list, bool]: Raw values of the ordering fields and the direction flag.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed.
+    """
+    padding = '=' * (-len(cursor) % 4)
+    try:
+        position, backwards = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (TypeError, ValueError) as error:
+        raise InvalidCursorError('Invalid cursor') from error
+    if not isinstance(position, list) or not isinstance(backwards, bool):
+        raise InvalidCursorError('Invalid cursor')
+    if not all(isinstance(raw_value, str) for raw_value in position):
+        raise InvalidCursorError('Invalid cursor')
+    return position, backwards
+
+
+def keyset_condition(ordering: tuple[str, ...], position: list) -> models.Q:
+    """
+    Build the condition selecting rows that follow a position in the given ordering.
+
+    For ordering ``(-a, -b)`` and position ``(x, y)`` the condition is
+    ``a <= x AND (a < x OR (a = x AND b < y))``; the redundant first part lets
+    the database use an index range scan on the leading column.
+
+    Args:
+        ordering (tuple[str, ...]): Ordering fields, prefixed with '-' when descending.
+        position (list): Values of the ordering fields at the position.
+
+    Returns:
+        Q: The filter condition.
+    """
+    field, *rest_ordering = ordering
+    pivot, *rest_position = position
+    name = field.lstrip('-')
+    lookup = '{0}__{1}'.format(name, 'lt' if field.startswith('-') else 'gt')
+    if not rest_ordering:
+        return models.Q(**{lookup: pivot})
+    tie = models.Q(**{name: pivot}) & keyset_condition(tuple(rest_ordering), rest_position)
+    strict = models.Q(**{lookup: pivot})
+    return models.Q(**{f'{lookup}e': pivot}) & (strict | tie)
+
+
+def reverse_field(field: str) -> str:
+    """
+    Reverse the direction of an ordering field.
+
+    Args:
+        field (str): Ordering field, prefixed with '-' when descending.
+
+    Returns:
+        str: The field with the opposite direction.
+    """
+    return field.removeprefix('-') if field.startswith('-') else f'-{field}'
+
+
+class KeysetPaginator:
+    """
+    Paginator that selects pages by the values of unique ordering fields.
+
+    Attributes:
+        queryset (QuerySet): The listing to paginate, ordering is applied by the paginator.
+        ordering (tuple[str, ...]): Ordering fields, the last one must be unique.
+        page_size (int): Number of objects on a page.
+    """
+
+    def __init__(self, queryset: models.QuerySet, ordering: tuple[str, ...], page_size: int):
+        """
+        Initialize the paginator.
+
+        Args:
+            queryset (QuerySet): The listing to paginate.
+            ordering (tuple[str, ...]): Ordering fields, the last one must be unique.
+            page_size (int): Number of objects on a page.
+        """
+        self.queryset = queryset
+        self.ordering = ordering
+        self.page_size = page_size
+
+    def page(self, cursor: Optional[str]) -> KeysetPage:
+        """
+        Fetch the page a cursor points to.
+
+        Args:
+            cursor (Optional[str]): Cursor from a previous page, None for the first page.
+
+        Returns:
+            KeysetPage: The requested page with cursors of its neighbours.
+        """
+        position, backwards = self.decode(cursor) if cursor else (None, False)
+        rows = list(self.page_query(position, backwards))
+        return self.build_page(rows, position, backwards)
+
+    async def apage(self, cursor: Optional[str]) -> KeysetPage:
+        """
+        Fetch the page a cursor points to with the async ORM.
+
+        Args:
+            cursor (Optional[str]): Cursor from a previous page, None for the first page.
+
+        Returns:
+            KeysetPage: The requested page with cursors of its neighbours.
+        """
+        position, backwards = self.decode(cursor) if cursor else (None, False)
+        rows = [row async for row in self.page_query(position, backwards)]
+        return self.build_page(rows, position, backwards)
+
+    def page_query(self, position: Optional[list], backwards: bool) -> models.QuerySet:
+        """
+        Build the query of a page, with one row more than the page size.
+
+        Args:
+            position (Optional[list]): Values of the ordering fields next to the page.
+            backwards (bool): True if the page precedes the position.
+
+        Returns:
+            QuerySet: Rows of the page in the order of reading.
+        """
+        ordering = tuple(map(reverse_field, self.ordering)) if backwards else self.ordering
+        queryset = self.queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(keyset_condition(ordering, position))
+        return queryset[:self.page_size + 1]
+
+    def build_page(self, rows: list, position: Optional[list], backwards: bool) -> KeysetPage:
+        """
+        Build a page from the rows read by page_query.
+
+        Args:
+            rows (list): Rows of the page, with one extra row if more follow.
+            position (Optional[list]): Values of the ordering fields next to the page.
+            backwards (bool): True if the page precedes the position.
+
+        Returns:
+            KeysetPage: The page with cursors of its neighbours.
+        """
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if backwards:
+            rows.reverse()
+        has_next = position is not None if backwards else has_more
+        has_previous = has_more if backwards else position is not None
+        return KeysetPage(
+            object_list=rows,
+            next_cursor=self.cursor(rows[-1], backwards=False) if has_next and rows else None,
+            previous_cursor=self.cursor(rows[0], backwards=True) if has_previous and rows else None,
+        )
+
+    def cursor(self, row, backwards: bool) -> str:
+        """
+        Create the cursor of the page next to a row.
+
+        Args:
+            row (Model | dict): The first or the last object of a page, or a values() row.
+            backwards (bool): True for the page preceding the row.
+
+        Returns:
+            str: URL-safe cursor.
+        """
+        names = [field.lstrip('-') for field in self.ordering]
+        if isinstance(row, dict):
+            return encode_cursor([row[name] for name in names], backwards)
+        return encode_cursor([getattr(row, name) for name in names], backwards)
+
+    def field_of(self, name: str) -> models.Field:
+        """
+        Get the field of an ordering name, a model field or an annotation like a search rank.
+
+        Args:
+            name (str): Name of the ordering field.
+
+        Returns:
+            Field: The model field or the output field of the annotation.
+        """
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return self.queryset.model._meta.get_field(name)  # noqa: WPS437
+
+    def decode(self, cursor: str) -> tuple[list, bool]:
+        """
+        Decode a cursor and convert its values to the types of the ordering fields.
+
+        Args:
+            cursor (str): Cursor from a previous page.
+
+        Returns:
+            tuple[list, bool]: Values of the ordering fields and the direction flag.
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed.
+        """
+        raw_position, backwards = decode_cursor(cursor)
+        if len(raw_position) != len(self.ordering):
+            raise InvalidCursorError('Invalid cursor')
+        try:
+            position = [
+                self.field_of(field.lstrip('-')).to_python(raw_value)
+                for field, raw_value in zip(self.ordering, raw_position)
+            ]
+        except (ValidationError, TypeError, ValueError) as error:
+            raise InvalidCursorError('Invalid cursor') from error
+        return position, backwards
+
+
+def cursor_query(query_params, cursor: str) -> str:
+    """
+    Build the query string of a neighbouring page, keeping the other parameters of the request.
+
+    Args:
+        query_params (django.http.QueryDict): Query parameters of the current page.
+        cursor (str): Cursor of the page.
+
+    Returns:
+        str: The query string with the leading ``?``.
+    """
+    page_params = query_params.copy()
+    page_params[CURSOR_QUERY_PARAM] = cursor
+    return f'?{page_params.urlencode()}'
+
+
+def get_page_size(query_params) -> int:
+    """
+    Read the page size requested by the client, bounded by config.MAX_PAGE_SIZE.
+
+    Args:
+        query_params (QueryDict): Query parameters of the request.
+
+    Returns:
+        int: The page size to use.
+    """
+    try:
+        page_size = int(query_params.get(PAGE_SIZE_QUERY_PARAM, config.PAGE_SIZE))
+    except ValueError:
+        return config.PAGE_SIZE
+    return min(max(page_size, 1), config.MAX_PAGE_SIZE)
+
+
+class TransactionKeysetPagination(BasePagination):
+    """DRF pagination of transactions by (transaction_date, id), newest first."""
+
+    ordering = TRANSACTION_ORDERING
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Fetch the page requested by the ``cursor`` query parameter.
+
+        Args:
+            queryset (QuerySet): The listing to paginate.
+            request (rest_framework.request.Request): Request object.
+            view (rest_framework.views.APIView): The view being paginated.
+
+        Returns:
+            list: Objects of the page.
+
+        Raises:
+            NotFound: If the cursor is malformed.
+        """
+        self.request = request
+        paginator = KeysetPaginator(queryset, self.ordering, get_page_size(request.query_params))
+        try:
+            self.page = paginator.page(request.query_params.get(CURSOR_QUERY_PARAM))
+        except InvalidCursorError as error:
+            raise NotFound(str(error))
+        return self.page.object_list
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Fetch the page requested by the ``cursor`` query parameter with the async ORM.
+
+        Args:
+            queryset (QuerySet): The listing to paginate.
+            request (rest_framework.request.Request): Request object.
+            view (rest_framework.views.APIView): The view being paginated.
+
+        Returns:
+            list: Objects of the page.
+
+        Raises:
+            NotFound: If the cursor is malformed.
+        """
+        self.request = request
+        paginator = KeysetPaginator(queryset, self.ordering, get_page_size(request.query_params))
+        try:
+            self.page = await paginator.apage(request.query_params.get(CURSOR_QUERY_PARAM))
+        except InvalidCursorError as error:
+            raise NotFound(str(error))
+        return self.page.object_list
+
+    def get_paginated_response(self, data):  # noqa: WPS110
+        """
+        Wrap serialized objects of the page together with links to its neighbours.
+
+        Args:
+            data (list): Serialized objects of the page.
+
+        Returns:
+            rest_framework.response.Response: Paginated response.
+        """
+        return Response({
+            'next': self.get_link(self.page.next_cursor),
+            'previous': self.get_link(self.page.previous_cursor),
+            'results': data,
+        })
+
+    def get_link(self, cursor: Optional[str]) -> Optional[str]:
+        """
+        Build the absolute URL of a neighbouring page.
+
+        Args:
+            cursor (Optional[str]): Cursor of the page.
+
+        Returns:
+            Optional[str]: URL of the page, None if there is no such page.
+        """
+        if cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), CURSOR_QUERY_PARAM, cursor)
+
+
+def paginate(request, queryset: models.QuerySet, ordering: tuple[str, ...]) -> KeysetPage:
+    """
+    Fetch a page of a listing for an HTML view.
+
+    Args:
+        request (django.http.HttpRequest): Request object with optional cursor and page size.
+        queryset (QuerySet): The listing to paginate.
+        ordering (tuple[str, ...]): Ordering fields, the last one must be unique.
+
+    Returns:
+        KeysetPage: The requested page.
+
+    Raises:
+        Http404: If the cursor is malformed.
+    """
+    paginator = KeysetPaginator(queryset, ordering, get_page_size(request.GET))
+    try:
+        return paginator.page(request.GET.get(CURSOR_QUERY_PARAM))
+    except InvalidCursorError as error:
+        raise Http404(str(error))
+
+
+def paginate_transactions(request, queryset: models.QuerySet) -> KeysetPage:
+    """
+    Fetch a page of transactions for an HTML view.
+
+    Args:
+        request (django.http.HttpRequest): Request object with optional cursor and page size.
+        queryset (QuerySet): Transactions to paginate.
+
+    Returns:
+        KeysetPage: The requested page, newest first.
+    """
+    return paginate(request, queryset, TRANSACTION_ORDERING)
@@ -0,0 +1,63 @@
+"""
+This module contains DRF parsers of the API formats.
+
+They parse the request bodies of the formats rendered by banks_app.renderers and are
+negotiated through the Content-Type header.
+"""
+
+import msgpack
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class ORJSONParser(BaseParser):
+    """Parser of UTF-8 JSON documents built on orjson."""
+
+    media_type = 'application/json'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Parse a JSON document.
+
+        Args:
+            stream (IO[bytes]): Body of the request.
+            media_type (str): Content type of the request.
+            parser_context (dict): Context of the view.
+
+        Returns:
+            Any: The parsed document.
+
+        Raises:
+            ParseError: If the document is malformed.
+        """
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as error:
+            raise ParseError(f'JSON parse error - {error}')
+
+
+class MessagePackParser(BaseParser):
+    """Parser of MessagePack documents."""
+
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Parse a MessagePack document.
+
+        Args:
+            stream (IO[bytes]): Body of the request.
+            media_type (str): Content type of the request.
+            parser_context (dict): Context of the view.
+
+        Returns:
+            Any: The parsed document.
+
+        Raises:
+            ParseError: If the document is malformed.
+        """
+        try:
+            return msgpack.unpackb(stream.read())
+        except ValueError as error:
+            raise ParseError(f'MessagePack parse error - {error}')
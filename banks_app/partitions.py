@@ -0,0 +1,159 @@
+"""
+This module contains the maintenance of the monthly partitions of transactions.
+
+The transaction table is partitioned by range of transaction_date, one partition per
+month and a default partition for dates without one. Queries filtered by date only
+scan the partitions of their range. Old months are moved to the archive before their
+partitions are detached, so their transactions stay readable and counted by the
+statistics of banks. Partitions are created by the create_transaction_partition
+database function of the migration, which names the indexes of a partition after the
+indexes of the table and moves the rows of its month out of the default partition.
+
+The primary key of the partitioned table is (id, transaction_date), since a unique
+constraint of a partitioned table must include its partition key: the database no
+longer enforces the uniqueness of ids alone. Transactions get random UUIDs, and
+inserts of given ids are checked by bulk_load against the table and the archive.
+"""
+
+from datetime import date
+from typing import NamedTuple, Optional
+
+from django.db import connection, transaction
+
+from . import archive, models
+
+TRANSACTION_TABLE = models.Transaction._meta.db_table  # noqa: WPS437
+PARTITIONS = (
+    'SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) '  # noqa: S608
+    'FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+    f"WHERE pg_inherits.inhparent = '{TRANSACTION_TABLE}'::regclass ORDER BY child.relname"
+)
+CREATE_PARTITION = 'SELECT "banks"."create_transaction_partition"(%s)'
+DETACH_PARTITION = 'ALTER TABLE {0} DETACH PARTITION "banks"."{1}"'
+DROP_PARTITION = 'DROP TABLE "banks"."{0}"'
+LOCK_PARTITIONS = 'LOCK TABLE {0} IN SHARE MODE'
+MONTH_BOUNDS = "FOR VALUES FROM ('"
+MONTHS_IN_YEAR = 12
+
+
+class Partition(NamedTuple):
+    """
+    A partition of the transaction table.
+
+    Attributes:
+        name (str): Name of the table of the partition.
+        month (Optional[date]): First day of the month of the partition, None for the default one.
+    """
+
+    name: str
+    month: Optional[date]
+
+
+def month_start(day: date) -> date:
+    """
+    Get the first day of the month of a date.
+
+    Args:
+        day (date): The date.
+
+    Returns:
+        date: The first day of its month.
+    """
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """
+    Get the first day of a month some months after another one.
+
+    Args:
+        month (date): First day of a month.
+        months (int): The number of months, negative for earlier ones.
+
+    Returns:
+        date: The first day of the month.
+    """
+    year, month_index = divmod(month.year * MONTHS_IN_YEAR + month.month - 1 + months, MONTHS_IN_YEAR)
+    return date(year, month_index + 1, 1)
+
+
+def list_partitions() -> list[Partition]:
+    """
+    List the partitions attached to the transaction table.
+
+    Returns:
+        list[Partition]: The partitions, the default one included.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(PARTITIONS)
+        rows = cursor.fetchall()
+    return [
+        Partition(name, date.fromisoformat(bounds[len(MONTH_BOUNDS):][:10]))
+        if bounds.startswith(MONTH_BOUNDS) else Partition(name, None)
+        for name, bounds in rows
+    ]
+
+
+def create_partitions(since: date, ahead: int) -> list[str]:
+    """
+    Create the missing monthly partitions from a month to some months after the current one.
+
+    Rows of the new months already stored in the default partition are moved to them.
+
+    Args:
+        since (date): A date of the first month.
+        ahead (int): The number of months after the current one.
+
+    Returns:
+        list[str]: Names of the created partitions.
+    """
+    existing = {partition.month for partition in list_partitions()}
+    month = month_start(since)
+    last = add_months(month_start(date.today()), ahead)
+    created = []
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            while month <= last:
+                if month not in existing:
+                    cursor.execute(CREATE_PARTITION, [month])
+                    created.append(cursor.fetchone()[0])
+                month = add_months(month, 1)
+    return created
+
+
+def detach_partitions(before: date, drop: bool = False) -> list[str]:
+    """
+    Archive the transactions of the months ended before a date and detach their partitions.
+
+    The transactions are moved to the archive chunk by chunk first. The partitions are
+    then locked against writes, the transactions written meanwhile are archived too and
+    the emptied partitions are detached in the same database transaction, so no row
+    leaves the reads of the API. Transactions of the default partition dated before the
+    end of the last detached month are archived as well.
+
+    Args:
+        before (date): The date, months ending after it are kept.
+        drop (bool): Drop the detached tables.
+
+    Returns:
+        list[str]: Names of the detached partitions.
+    """
+    old = [
+        partition
+        for partition in list_partitions()
+        if partition.month is not None and add_months(partition.month, 1) <= before
+    ]
+    if not old:
+        return []
+    archived_before = add_months(max(partition.month for partition in old), 1)
+    names = [partition.name for partition in old]
+    archive.archive_transactions(archived_before)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(LOCK_PARTITIONS.format(', '.join(f'"banks"."{name}"' for name in names)))
+            archive.archive_transactions(archived_before)
+            for name in names:
+                cursor.execute(DETACH_PARTITION.format(TRANSACTION_TABLE, name))
+                if drop:
+                    cursor.execute(DROP_PARTITION.format(name))
+    return names
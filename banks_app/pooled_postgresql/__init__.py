@@ -0,0 +1 @@
+"""PostgreSQL database backend taking connections from a psycopg connection pool."""
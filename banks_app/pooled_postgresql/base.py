@@ -0,0 +1,164 @@
+"""
+This module contains the PostgreSQL backend of the project with connection pooling.
+
+Without a pool Django opens a connection, authenticates and sets the search path at
+the start of every request and closes the connection at its end, which costs several
+round trips before the first query of the request. The backend keeps one
+psycopg_pool.ConnectionPool per database alias and process: a request borrows an open
+connection and gives it back when Django closes the connection at the end of the
+request. The pool is shared by the threads of a process, so it serves threaded WSGI
+workers as well as the per-request threads the ASGI handler runs database code in.
+
+The pool is configured with the ``pool`` key of the OPTIONS of the database, a dict
+of ConnectionPool arguments such as min_size, max_size, timeout and max_lifetime.
+Without it the backend behaves like django.db.backends.postgresql. Pools are opened
+lazily by the first connection, so a process forked after importing the project
+opens its own pool.
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base, creation
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+try:
+    from psycopg_pool import ConnectionPool
+except ImportError as exc:
+    raise ImproperlyConfigured(f'Error loading psycopg_pool module: {exc}') from exc
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    """Test database creation closing the pool of the database it switches from."""
+
+    def create_test_db(self, *args, **kwargs):
+        """
+        Close the pool of the real database and create the test database.
+
+        Args:
+            args: Positional arguments of BaseDatabaseCreation.create_test_db.
+            kwargs: Keyword arguments of BaseDatabaseCreation.create_test_db.
+
+        Returns:
+            str: Name of the test database.
+        """
+        self.connection.close()
+        self.connection.close_pool()
+        return super().create_test_db(*args, **kwargs)
+
+    def destroy_test_db(self, *args, **kwargs):
+        """
+        Close the pooled connections to the test database, so it can be dropped.
+
+        Args:
+            args: Positional arguments of BaseDatabaseCreation.destroy_test_db.
+            kwargs: Keyword arguments of BaseDatabaseCreation.destroy_test_db.
+        """
+        self.connection.close()
+        self.connection.close_pool()
+        super().destroy_test_db(*args, **kwargs)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL database wrapper borrowing its connection from a pool.
+
+    Attributes:
+        connection_pools (dict[str, ConnectionPool]): Pools of the process by alias.
+    """
+
+    creation_class = DatabaseCreation
+    connection_pools = {}
+
+    @property
+    def pool(self):
+        """
+        Get the pool of the database, creating it on first use.
+
+        Returns:
+            ConnectionPool | None: The pool, None if pooling is not configured.
+
+        Raises:
+            ImproperlyConfigured: If the database also keeps persistent connections.
+        """
+        pool_options = self.settings_dict['OPTIONS'].get('pool')
+        if self.alias == NO_DB_ALIAS or not pool_options:
+            return None
+        if self.alias not in self.connection_pools:
+            if self.settings_dict['CONN_MAX_AGE'] != 0:
+                raise ImproperlyConfigured('Pooled connections cannot be persistent, set CONN_MAX_AGE to 0.')
+            connect_kwargs = self.get_connection_params()
+            connect_kwargs['autocommit'] = True
+            check = ConnectionPool.check_connection if self.settings_dict['CONN_HEALTH_CHECKS'] else None
+            pool = ConnectionPool(
+                kwargs=connect_kwargs,
+                open=False,
+                check=check,
+                name=self.alias,
+                **pool_options,
+            )
+            self.connection_pools.setdefault(self.alias, pool)
+        return self.connection_pools[self.alias]
+
+    def close_pool(self) -> None:
+        """Close the pool of the database and its connections."""
+        pool = self.connection_pools.pop(self.alias, None)
+        if pool is not None:
+            pool.close()
+
+    def get_connection_params(self):
+        """
+        Get the parameters of new connections, without the pool options.
+
+        Returns:
+            dict: Keyword arguments of psycopg.connect.
+        """
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        """
+        Borrow a connection from the pool, or open one if pooling is not configured.
+
+        Args:
+            conn_params (dict): Keyword arguments of psycopg.connect.
+
+        Returns:
+            psycopg.Connection: The connection.
+
+        Raises:
+            ImproperlyConfigured: If the configured isolation level is invalid.
+        """
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        try:
+            self.isolation_level = IsolationLevel(isolation_level or IsolationLevel.READ_COMMITTED)
+        except ValueError as error:
+            message = f'Invalid transaction isolation level {isolation_level} specified.'
+            raise ImproperlyConfigured(message) from error
+        pool.open()
+        connection = pool.getconn()
+        connection.isolation_level = self.isolation_level if isolation_level else None
+        return connection
+
+    def _close(self):
+        """Give the connection back to the pool it was borrowed from, or close it."""
+        pool = getattr(self.connection, '_pool', None)
+        if pool is None:
+            super()._close()
+            return
+        with self.wrap_database_errors:
+            pool.putconn(self.connection)
+        self.connection = None
+
+
+def pool_stats() -> dict[str, dict[str, int]]:
+    """
+    Get the statistics of the open pools of the process.
+
+    Returns:
+        dict[str, dict[str, int]]: Statistics of ConnectionPool.get_stats by database alias.
+    """
+    return {alias: pool.get_stats() for alias, pool in DatabaseWrapper.connection_pools.items()}
@@ -0,0 +1,273 @@
+"""
+This module contains per-view SQL query budgets and N+1 query detection.
+
+QueryBudgetMiddleware records every SQL statement executed while a request is handled.
+Views declare their budget with the query_budget decorator (function views) or with a
+``query_budget`` class attribute (class-based views and viewsets, where it may be a dict
+mapping actions to budgets). Requests over budget and statements repeated with the same
+shape are logged, and raise QueryBudgetExceededError when QUERY_BUDGET_STRICT is enabled.
+The middleware removes itself unless QUERY_BUDGET_ENABLED is set, so production requests
+do not pay for the recording.
+"""
+
+import logging
+import re
+from collections import Counter
+from contextlib import AsyncExitStack
+from typing import Callable, Optional
+
+from asgiref import sync
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from banks_app import config
+
+logger = logging.getLogger(__name__)
+
+IN_LIST_PATTERN = re.compile(r'IN \((?:%s, )*%s\)')
+SERVICE_STATEMENTS = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+
+class QueryBudgetExceededError(AssertionError):
+    """Raised in strict mode when a request exceeds its query budget or runs N+1 queries."""
+
+
+def query_budget(budget: int) -> Callable:
+    """
+    Declare the maximum number of SQL queries a function view may execute.
+
+    Args:
+        budget (int): The maximum number of queries per request.
+
+    Returns:
+        Callable: Decorator storing the budget on the view.
+    """
+    def decorator(view: Callable) -> Callable:
+        view.query_budget = budget
+        return view
+    return decorator
+
+
+def resolve_budget(view_func: Callable, method: str) -> Optional[int]:
+    """
+    Find the query budget declared for a view.
+
+    Args:
+        view_func (Callable): The view function resolved for the request.
+        method (str): HTTP method of the request.
+
+    Returns:
+        Optional[int]: The budget, None if the view declares no budget.
+    """
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is None:
+        view_class = getattr(view_func, 'view_class', None) or getattr(view_func, 'cls', None)
+        budget = getattr(view_class, 'query_budget', None)
+    if isinstance(budget, dict):
+        actions = getattr(view_func, 'actions', None) or {}
+        return budget.get(actions.get(method.lower()))
+    return budget
+
+
+def query_shape(sql: str) -> str:
+    """
+    Normalize a statement so that queries differing only in IN list length look the same.
+
+    Args:
+        sql (str): Parametrized SQL statement.
+
+    Returns:
+        str: The shape of the statement.
+    """
+    return IN_LIST_PATTERN.sub('IN (...)', sql)
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper remembering executed statements.
+
+    Attributes:
+        statements (list[str]): Executed SQL statements.
+    """
+
+    def __init__(self):
+        """Initialize an empty recorder."""
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):  # noqa: WPS211, WPS110
+        """
+        Record a statement and execute it.
+
+        Args:
+            execute (Callable): The next execute function in the chain.
+            sql (str): SQL statement.
+            params (Sequence): Parameters of the statement.
+            many (bool): True for executemany calls.
+            context (dict): Connection and cursor of the call.
+
+        Returns:
+            Any: Result of the execution.
+        """
+        self.statements.append(sql)
+        return execute(sql, params, many, context)
+
+    def repeated_shapes(self) -> dict[str, int]:
+        """
+        Find statements executed with the same shape too many times, a sign of N+1 queries.
+
+        Returns:
+            dict[str, int]: Repeated shapes with the number of their executions.
+        """
+        shapes = Counter(
+            query_shape(sql) for sql in self.statements if not sql.startswith(SERVICE_STATEMENTS)
+        )
+        return {
+            shape: times
+            for shape, times in shapes.items()
+            if times >= config.N_PLUS_ONE_THRESHOLD
+        }
+
+
+def find_problems(recorder: QueryRecorder, budget: Optional[int]) -> list[str]:
+    """
+    Describe budget violations and N+1 patterns of a request.
+
+    Args:
+        recorder (QueryRecorder): Statements executed by the request.
+        budget (Optional[int]): The budget of the view.
+
+    Returns:
+        list[str]: Human readable problems, empty if there are none.
+    """
+    problems = [
+        f'N+1 pattern, {times} queries: {shape}'
+        for shape, times in recorder.repeated_shapes().items()
+    ]
+    if budget is not None and len(recorder.statements) > budget:
+        problems.append(f'{len(recorder.statements)} queries over the budget of {budget}')
+    return problems
+
+
+def add_recorder(recorder: QueryRecorder) -> None:
+    """
+    Install a recorder on the database connection of the current thread.
+
+    Args:
+        recorder (QueryRecorder): The recorder.
+    """
+    connection.execute_wrappers.append(recorder)
+
+
+def remove_recorder(recorder: QueryRecorder) -> None:
+    """
+    Remove a recorder from the database connection of the current thread.
+
+    Args:
+        recorder (QueryRecorder): The recorder.
+    """
+    connection.execute_wrappers.remove(recorder)
+
+
+class QueryBudgetMiddleware:
+    """
+    Middleware counting SQL queries per request and enforcing view query budgets.
+
+    The middleware supports both sync and async handlers. Under ASGI, queries of a
+    request run through sync_to_async in one thread of the request, so the recorder is
+    installed on the connection of that thread.
+
+    Attributes:
+        sync_capable (bool): The middleware handles sync requests.
+        async_capable (bool): The middleware handles async requests.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable):
+        """
+        Initialize the middleware.
+
+        Args:
+            get_response (Callable): The next handler in the chain.
+
+        Raises:
+            MiddlewareNotUsed: If QUERY_BUDGET_ENABLED is off.
+        """
+        if not getattr(settings, 'QUERY_BUDGET_ENABLED', False):
+            raise MiddlewareNotUsed('QUERY_BUDGET_ENABLED is off')
+        self.get_response = get_response
+        if sync.iscoroutinefunction(get_response):
+            sync.markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """
+        Handle a request while recording its queries.
+
+        Args:
+            request (django.http.HttpRequest): Request object.
+
+        Returns:
+            django.http.HttpResponse: The response of the view, a coroutine for async handlers.
+        """
+        if sync.iscoroutinefunction(self):
+            return self.acall(request)
+        recorder = QueryRecorder()
+        request.query_budget = None
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        return self.check_budget(request, recorder, response)
+
+    async def acall(self, request):
+        """
+        Handle a request of an async handler while recording its queries.
+
+        Args:
+            request (django.http.HttpRequest): Request object.
+
+        Returns:
+            django.http.HttpResponse: The response of the view.
+        """
+        recorder = QueryRecorder()
+        request.query_budget = None
+        async with AsyncExitStack() as stack:
+            await sync.sync_to_async(add_recorder)(recorder)
+            stack.push_async_callback(sync.sync_to_async(remove_recorder), recorder)
+            response = await self.get_response(request)
+        return self.check_budget(request, recorder, response)
+
+    def check_budget(self, request, recorder: QueryRecorder, response):
+        """
+        Report problems of a handled request.
+
+        Args:
+            request (django.http.HttpRequest): Request object.
+            recorder (QueryRecorder): Statements executed by the request.
+            response (django.http.HttpResponse): The response of the view.
+
+        Returns:
+            django.http.HttpResponse: The response of the view.
+
+        Raises:
+            QueryBudgetExceededError: In strict mode, if the request has problems.
+        """
+        request.query_count = len(recorder.statements)
+        problems = find_problems(recorder, request.query_budget)
+        for problem in problems:
+            logger.warning('%s %s: %s', request.method, request.path, problem)
+        if problems and getattr(settings, 'QUERY_BUDGET_STRICT', False):
+            raise QueryBudgetExceededError(f'{request.method} {request.path}: {"; ".join(problems)}')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs) -> None:
+        """
+        Remember the budget of the view handling the request.
+
+        Args:
+            request (django.http.HttpRequest): Request object.
+            view_func (Callable): The view function.
+            view_args (list): Positional arguments of the view.
+            view_kwargs (dict): Keyword arguments of the view.
+        """
+        request.query_budget = resolve_budget(view_func, request.method)
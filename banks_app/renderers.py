@@ -0,0 +1,123 @@
+"""
+This module contains DRF renderers of the API formats.
+
+ORJSONRenderer renders JSON with orjson, which encodes UUID and date values natively
+and is several times faster than the json module on long listings; Decimal values
+are encoded as strings, exactly like the serializers coerce them.
+MessagePackRenderer renders the same data as MessagePack for service-to-service
+traffic. Both are negotiated through the Accept header, see banks_app.parsers for
+the request bodies.
+
+Statements are streamed by the view itself, the CSV and NDJSON renderers make DRF
+negotiate ``?format=csv|ndjson`` and the Accept header, and render error responses.
+CompactJSONRenderer makes DRF accept ``?format=compact``, see banks_app.compact.
+"""
+
+import datetime
+import decimal
+import uuid
+
+import msgpack
+import orjson
+from django.db.models import QuerySet
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def encode_default(instance):
+    """
+    Encode values which orjson and msgpack do not support natively.
+
+    Args:
+        instance (Any): The value.
+
+    Returns:
+        Any: A natively supported value.
+
+    Raises:
+        TypeError: If the value cannot be encoded.
+    """
+    if isinstance(instance, (Promise, decimal.Decimal, uuid.UUID)):
+        return force_str(instance)
+    if isinstance(instance, (datetime.date, datetime.time)):
+        return instance.isoformat()
+    if isinstance(instance, datetime.timedelta):
+        return str(instance.total_seconds())
+    if isinstance(instance, (QuerySet, tuple, set, frozenset)):
+        return list(instance)
+    raise TypeError(f'Object of type {type(instance).__name__} is not serializable')
+
+
+class ORJSONRenderer(BaseRenderer):
+    """Renderer of JSON documents built on orjson."""
+
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):  # noqa: WPS110
+        """
+        Render data as JSON, indented if the media type asks for it like the browsable API.
+
+        Args:
+            data (Any): The data.
+            accepted_media_type (str): The negotiated media type.
+            renderer_context (dict): Context of the view.
+
+        Returns:
+            bytes: The document, empty for no data.
+        """
+        if data is None:
+            return b''
+        options = ORJSON_OPTIONS
+        if 'indent' in (accepted_media_type or ''):
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=encode_default, option=options)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renderer of MessagePack documents for service-to-service traffic."""
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):  # noqa: WPS110
+        """
+        Render data as MessagePack.
+
+        Args:
+            data (Any): The data.
+            accepted_media_type (str): The negotiated media type.
+            renderer_context (dict): Context of the view.
+
+        Returns:
+            bytes: The document, empty for no data.
+        """
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default)
+
+
+class CSVRenderer(JSONRenderer):
+    """Renderer negotiating CSV; error responses are rendered as a JSON document."""
+
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class NDJSONRenderer(JSONRenderer):
+    """Renderer negotiating newline-delimited JSON; an error response is a single JSON line."""
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class CompactJSONRenderer(ORJSONRenderer):
+    """Renderer negotiating the compact representation, which is a JSON document."""
+
+    format = 'compact'
@@ -0,0 +1,181 @@
+"""
+This module contains the ``?q=`` search of clients and transactions.
+
+Clients are found by a fragment of their first name, last name or phone with the SQL
+of icontains, served by the trigram GIN index of the upper-cased columns, and ranked
+by an exact match before a prefix before any other match. Transactions are found by
+the words of their description with a websearch query against the text search vector
+that the GIN index transaction_search_idx is built on, and ranked by ts_rank.
+Results are pages of keyset pagination by (rank, id), so every page is one query
+whatever its depth.
+"""
+
+from functools import cached_property
+from typing import Callable, Optional
+
+from django.contrib.postgres import search as postgres
+from django.db import models
+from rest_framework.exceptions import ValidationError
+
+from banks_app import config, pagination
+
+from .models import Client, Transaction
+
+SEARCH_PARAM = 'q'
+SEARCH_ORDERING = ('-rank', '-id')
+CLIENT_FIELDS = ('first_name', 'last_name', 'phone')
+EXACT_MATCH = 3
+PREFIX_MATCH = 2
+FRAGMENT_MATCH = 1
+
+
+def lookups_of(lookup: str, text: str) -> models.Q:
+    """
+    Build the condition of a lookup matching any searched field of clients.
+
+    Args:
+        lookup (str): The lookup.
+        text (str): The searched text.
+
+    Returns:
+        models.Q: The condition.
+    """
+    condition = models.Q()
+    for field in CLIENT_FIELDS:
+        condition |= models.Q(**{f'{field}__{lookup}': text})
+    return condition
+
+
+def search_clients(queryset: models.QuerySet, text: str) -> models.QuerySet:
+    """
+    Find clients by a fragment of a name or of the phone.
+
+    Args:
+        queryset (QuerySet): The clients.
+        text (str): The fragment.
+
+    Returns:
+        QuerySet: Matching clients annotated with their rank.
+    """
+    return queryset.filter(lookups_of('icontains', text)).annotate(rank=models.Case(
+        models.When(lookups_of('iexact', text), then=models.Value(EXACT_MATCH)),
+        models.When(lookups_of('istartswith', text), then=models.Value(PREFIX_MATCH)),
+        default=models.Value(FRAGMENT_MATCH),
+        output_field=models.IntegerField(),
+    ))
+
+
+def search_transactions(queryset: models.QuerySet, text: str) -> models.QuerySet:
+    """
+    Find transactions by words of the description.
+
+    Args:
+        queryset (QuerySet): The transactions.
+        text (str): The words, in the syntax of web search engines.
+
+    Returns:
+        QuerySet: Matching transactions annotated with their rank.
+    """
+    vector = postgres.SearchVector('description', config=config.SEARCH_CONFIG)
+    query = postgres.SearchQuery(text, config=config.SEARCH_CONFIG, search_type='websearch')
+    matches = queryset.alias(document=vector).filter(document=query)
+    return matches.annotate(rank=postgres.SearchRank(vector, query))
+
+
+SEARCHES: dict[type, Callable[[models.QuerySet, str], models.QuerySet]] = {
+    Client: search_clients,
+    Transaction: search_transactions,
+}
+
+
+def search_text(query_params) -> Optional[str]:
+    """
+    Read the searched text from the query parameters.
+
+    Args:
+        query_params (QueryDict): Query parameters of the request.
+
+    Returns:
+        Optional[str]: The stripped text, None if there is no search.
+
+    Raises:
+        ValidationError: If the text is too short to be looked up by the indexes or too long.
+    """
+    text = query_params.get(SEARCH_PARAM, '').strip()
+    if not text:
+        return None
+    if len(text) < config.SEARCH_MIN_LENGTH or len(text) > config.SEARCH_MAX_LENGTH:
+        raise ValidationError({SEARCH_PARAM: [
+            f'Enter from {config.SEARCH_MIN_LENGTH} to {config.SEARCH_MAX_LENGTH} characters.',
+        ]})
+    return text
+
+
+def search_page(request, queryset: models.QuerySet, text: str):
+    """
+    Fetch a page of search results for an HTML view.
+
+    Args:
+        request (django.http.HttpRequest): Request object with optional cursor and page size.
+        queryset (QuerySet): The searched objects.
+        text (str): The searched text.
+
+    Returns:
+        KeysetPage: The requested page, best matches first.
+    """
+    return pagination.paginate(request, SEARCHES[queryset.model](queryset, text), SEARCH_ORDERING)
+
+
+class SearchKeysetPagination(pagination.TransactionKeysetPagination):
+    """DRF pagination of search results by (rank, id), best matches first."""
+
+    ordering = SEARCH_ORDERING
+
+
+class SearchViewSetMixin:
+    """
+    Viewset mixin searching the ``list`` action by ``?q=``.
+
+    Searched listings are ranked and paginated by SearchKeysetPagination, listings
+    without ``?q=`` keep the pagination of the viewset. The model of the viewset must
+    be registered in SEARCHES.
+    """
+
+    @cached_property
+    def search(self) -> Optional[str]:
+        """
+        Get the searched text of the request.
+
+        Returns:
+            Optional[str]: The text, None for other actions and requests without ``?q=``.
+        """
+        if self.action != 'list':
+            return None
+        return search_text(self.request.query_params)
+
+    @cached_property
+    def paginator(self):
+        """
+        Get the paginator, ranking searched listings.
+
+        Returns:
+            BasePagination: The paginator, None for listings without pagination.
+        """
+        if self.search is None:
+            return super().paginator
+        return SearchKeysetPagination()
+
+    def filter_queryset(self, queryset):
+        """
+        Filter and rank the listing by the searched text.
+
+        Args:
+            queryset (django.db.models.QuerySet): Objects of the action.
+
+        Returns:
+            django.db.models.QuerySet: The matching objects.
+        """
+        queryset = super().filter_queryset(queryset)
+        if self.search is None:
+            return queryset
+        return SEARCHES[queryset.model](queryset, self.search)
@@ -1,28 +1,95 @@
 """This file defines serializers for various models related to banking operations."""
 
+from typing import Iterable, Optional
+
 from rest_framework import serializers
 
+from banks_app import config, transfers
+
 from .models import Bank, BankAccount, BankClient, Client, Transaction
 
+ID_FIELD = 'id'
+VERSION_FIELDS = ('version', 'updated_at')
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin rendering only requested fields and expanding requested relations.
 
-class BankSerializer(serializers.HyperlinkedModelSerializer):
+    Expanded relations are rendered by the serializer of the related model registered
+    in EXPANDED_SERIALIZERS instead of hyperlinks. The primary key, which hyperlinked
+    serializers render as the URL, is rendered as ``id`` when it is requested.
+    """
+
+    def __init__(self, *args, fields: Optional[Iterable[str]] = None, expand: Iterable[str] = (), **kwargs):
+        """
+        Initialize the serializer.
+
+        Args:
+            *args: Positional arguments of the serializer.
+            fields (Optional[Iterable[str]]): Names of the rendered fields, None for all of them.
+            expand (Iterable[str]): Names of the expanded relations.
+            **kwargs: Keyword arguments of the serializer.
+        """
+        super().__init__(*args, **kwargs)
+        self.requested_fields = None if fields is None else frozenset(fields)
+        self.expanded_fields = frozenset(expand)
+
+    def get_fields(self):
+        """
+        Select the requested fields and replace expanded relations with nested serializers.
+
+        Returns:
+            dict: Fields of the serializer by name.
+        """
+        fields = super().get_fields()
+        if self.requested_fields is not None:
+            fields = {name: field for name, field in fields.items() if name in self.requested_fields}
+            if ID_FIELD in self.requested_fields:
+                fields.setdefault(ID_FIELD, serializers.ReadOnlyField(source='pk'))
+        model_meta = self.Meta.model._meta  # noqa: WPS437
+        for name in self.expanded_fields & fields.keys():
+            relation = model_meta.get_field(name)
+            nested_class = EXPANDED_SERIALIZERS[relation.related_model]
+            fields[name] = nested_class(read_only=True, many=relation.many_to_many)
+        return fields
+
+
+class BankSerializer(SparseFieldsMixin, serializers.HyperlinkedModelSerializer):
     """Serializer for Bank model."""
 
     class Meta:
         """Meta class for BankSerializer."""
 
         model = Bank
-        fields = '__all__'
+        exclude = VERSION_FIELDS
 
 
-class ClientSerializer(serializers.HyperlinkedModelSerializer):
+class BankDailyVolumeSerializer(serializers.Serializer):
+    """Read-only serializer for transfers sent from accounts of a bank during one day."""
+
+    day = serializers.DateField()
+    transfers = serializers.IntegerField()
+    amount = serializers.DecimalField(max_digits=config.MAX_DIGITS_DEPOSITS, decimal_places=2)
+
+
+class BankStatsSerializer(serializers.Serializer):
+    """Read-only serializer for statistics of a bank with its recent daily transfer volumes."""
+
+    clients = serializers.IntegerField()
+    accounts = serializers.IntegerField()
+    deposits = serializers.DecimalField(max_digits=config.MAX_DIGITS_DEPOSITS, decimal_places=2)
+    daily_volumes = BankDailyVolumeSerializer(many=True)
+
+
+class ClientSerializer(SparseFieldsMixin, serializers.HyperlinkedModelSerializer):
     """Serializer for Client model."""
 
     class Meta:
         """Meta class for ClientSerializer."""
 
         model = Client
-        exclude = ['user']
+        exclude = ('user', *VERSION_FIELDS)
 
     def create(self, validated_data):
         """
@@ -41,17 +108,24 @@ class ClientSerializer(serializers.HyperlinkedModelSerializer):
         )
 
 
-class BankAccountSerializer(serializers.HyperlinkedModelSerializer):
+class BankAccountSerializer(SparseFieldsMixin, serializers.HyperlinkedModelSerializer):
     """Serializer for BankAccount model."""
 
     class Meta:
         """Meta class for BankAccountSerializer."""
 
         model = BankAccount
-        fields = '__all__'
+        exclude = VERSION_FIELDS
+
 
+class AccountBalanceSerializer(serializers.Serializer):
+    """Read-only serializer for the balance of a bank account at a moment, read from the ledger."""
 
-class BankClientSerializer(serializers.HyperlinkedModelSerializer):
+    at = serializers.DateTimeField()
+    balance = serializers.DecimalField(max_digits=config.MAX_DIGITS_BANK_ACCOUNT, decimal_places=2)
+
+
+class BankClientSerializer(SparseFieldsMixin, serializers.HyperlinkedModelSerializer):
     """Serializer for BankClient model."""
 
     class Meta:
@@ -61,7 +135,7 @@ class BankClientSerializer(serializers.HyperlinkedModelSerializer):
         fields = '__all__'
 
 
-class TransactionSerializer(serializers.HyperlinkedModelSerializer):
+class TransactionSerializer(SparseFieldsMixin, serializers.HyperlinkedModelSerializer):
     """Serializer for Transaction model."""
 
     class Meta:
@@ -69,3 +143,89 @@ class TransactionSerializer(serializers.HyperlinkedModelSerializer):
 
         model = Transaction
         fields = '__all__'
+
+    def create(self, validated_data):
+        """
+        Execute the transfer and return the new Transaction instance.
+
+        Args:
+            validated_data (dict): Validated data received for transaction creation.
+
+        Returns:
+            Transaction: Newly created Transaction instance.
+
+        Raises:
+            ValidationError: If the transfer service rejects the transfer.
+        """
+        try:
+            return transfers.transfer(Transaction(**validated_data))
+        except transfers.TransferError as error:
+            raise serializers.ValidationError(str(error))
+
+
+EXPANDED_SERIALIZERS = {
+    Bank: BankSerializer,
+    Client: ClientSerializer,
+    BankAccount: BankAccountSerializer,
+}
+
+
+class LinkedIdField(serializers.UUIDField):
+    """UUID field that also accepts a hyperlink to the object, without querying the database."""
+
+    def to_internal_value(self, link):
+        """
+        Extract the UUID from a hyperlink or a raw UUID string.
+
+        Args:
+            link (str): Hyperlink like ``/api/client/<uuid>/`` or a raw UUID.
+
+        Returns:
+            UUID: The parsed UUID.
+        """
+        if isinstance(link, str):
+            link = link.rstrip('/').rsplit('/', 1)[-1]
+        return super().to_internal_value(link)
+
+
+class TransferItemSerializer(serializers.ModelSerializer):
+    """
+    Serializer for one item of a batch of transfers.
+
+    Related objects are accepted as hyperlinks or UUIDs and are only parsed here,
+    their existence is checked for the whole batch at once by the transfer service.
+    """
+
+    initializer = LinkedIdField(source='initializer_id')
+    from_bank_account_id = LinkedIdField(source='from_bank_account_id_id')
+    to_bank_account_id = LinkedIdField(source='to_bank_account_id_id')
+
+    class Meta:
+        """Meta class for TransferItemSerializer."""
+
+        model = Transaction
+        fields = [
+            'initializer',
+            'amount',
+            'transaction_date',
+            'description',
+            'from_bank_account_id',
+            'to_bank_account_id',
+        ]
+
+    def validate_initializer(self, initializer_id):
+        """
+        Check that a regular user initiates transfers only on behalf of their own client.
+
+        Args:
+            initializer_id (UUID): Id of the client initiating the transfer.
+
+        Returns:
+            UUID: The validated id.
+
+        Raises:
+            ValidationError: If the user may not initiate transfers for this client.
+        """
+        if self.context['is_staff'] or initializer_id == self.context['client_id']:
+            return initializer_id
+        raise serializers.ValidationError('You can only initiate transfers as your own client')
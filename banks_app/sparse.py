@@ -0,0 +1,225 @@
+"""
+This module contains sparse fieldsets and relation expansion of the REST API.
+
+``?fields=id,balance`` renders only the listed fields and ``?expand=bank`` renders the
+listed relations as nested objects instead of hyperlinks. The queryset follows the
+request: only() loads the columns of the requested fields, select_related joins
+expanded foreign keys, and prefetch_related loads the requested many-to-many relations
+and those of expanded objects. The payload and the queries grow with what the caller
+asks for. The compact representation keeps its own columns and ignores both.
+"""
+
+from functools import cache
+from typing import NamedTuple, Optional
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework.exceptions import ValidationError
+
+from banks_app import serializers
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+SPARSE_ACTIONS = frozenset(('list', 'retrieve'))
+
+
+class SparseRequest(NamedTuple):
+    """
+    Fields and expansions requested by a request.
+
+    Attributes:
+        fields (Optional[list[str]]): Requested fields, None for all of them.
+        expand (list[str]): Requested expansions.
+    """
+
+    fields: Optional[list[str]]
+    expand: list[str]
+
+
+def requested_names(query_params, parameter: str) -> Optional[list[str]]:
+    """
+    Read a comma-separated list of names from the query.
+
+    Args:
+        query_params (QueryDict): Query parameters of the request.
+        parameter (str): Name of the query parameter.
+
+    Returns:
+        Optional[list[str]]: The names, None if the parameter is missing.
+    """
+    names = query_params.get(parameter)
+    if names is None:
+        return None
+    return [name.strip() for name in names.split(',') if name.strip()]
+
+
+@cache
+def serializer_names(serializer_class) -> tuple[frozenset[str], frozenset[str]]:
+    """
+    List the fields of a serializer and the relations among them which can be expanded.
+
+    Args:
+        serializer_class (type[ModelSerializer]): The serializer.
+
+    Returns:
+        tuple[frozenset[str], frozenset[str]]: Names of the fields and of the relations.
+    """
+    names = frozenset((*serializer_class().fields, serializers.ID_FIELD))
+    model_meta = serializer_class.Meta.model._meta  # noqa: WPS437
+    expandable = set()
+    for name in names:
+        try:
+            related_model = model_meta.get_field(name).related_model
+        except FieldDoesNotExist:
+            continue
+        if related_model in serializers.EXPANDED_SERIALIZERS:
+            expandable.add(name)
+    return names, frozenset(expandable)
+
+
+def validate_names(serializer_class, fields: Optional[list[str]], expand: list[str]) -> None:
+    """
+    Check that requested fields and expansions exist in a serializer.
+
+    Args:
+        serializer_class (type[ModelSerializer]): The serializer.
+        fields (Optional[list[str]]): Requested fields, None for all of them.
+        expand (list[str]): Requested expansions.
+
+    Raises:
+        ValidationError: If a name is not a field or an expandable relation of the serializer.
+    """
+    available, expandable = serializer_names(serializer_class)
+    errors = {}
+    unknown = sorted(set(fields or ()) - available)
+    if unknown:
+        errors[FIELDS_PARAM] = f'Unknown fields: {", ".join(unknown)}'
+    unknown = sorted(set(expand) - expandable)
+    if unknown:
+        errors[EXPAND_PARAM] = f'Relations that cannot be expanded: {", ".join(unknown)}'
+    if errors:
+        raise ValidationError(errors)
+
+
+def many_to_many_names(serializer_class) -> list[str]:
+    """
+    List the many-to-many relations a serializer renders.
+
+    Args:
+        serializer_class (type[ModelSerializer]): The serializer.
+
+    Returns:
+        list[str]: Names of the relations.
+    """
+    excluded = set(getattr(serializer_class.Meta, 'exclude', ()))
+    return [
+        relation.name
+        for relation in serializer_class.Meta.model._meta.many_to_many  # noqa: WPS437
+        if relation.name not in excluded
+    ]
+
+
+def ordering_columns(model_meta, ordering: tuple[str, ...]) -> list[str]:
+    """
+    Get the columns of the ordering fields read by the pagination.
+
+    Args:
+        model_meta (Options): Options of the model.
+        ordering (tuple[str, ...]): Ordering fields, possibly descending or annotations.
+
+    Returns:
+        list[str]: Names of the ordering fields which are columns of the model.
+    """
+    concrete_names = {field.name for field in model_meta.concrete_fields}
+    return [name.lstrip('-') for name in ordering if name.lstrip('-') in concrete_names]
+
+
+def sparse_queryset(queryset: models.QuerySet, sparse: SparseRequest, ordering: tuple[str, ...]):
+    """
+    Load the columns and the relations rendered for the requested fields and expansions.
+
+    Args:
+        queryset (QuerySet): The queryset of the viewset.
+        sparse (SparseRequest): Requested fields and expansions.
+        ordering (tuple[str, ...]): Ordering fields read by the pagination, annotations are skipped.
+
+    Returns:
+        QuerySet: The optimized queryset.
+    """
+    model_meta = queryset.model._meta  # noqa: WPS437
+    if sparse.fields is not None:
+        model_fields = [model_meta.get_field(name) for name in sparse.fields if name != 'url']
+        columns = [field.name for field in model_fields if field.concrete and not field.many_to_many]
+        queryset = queryset.prefetch_related(None).only(
+            model_meta.pk.name, *columns, *ordering_columns(model_meta, ordering),
+        )
+        queryset = queryset.prefetch_related(*(field.name for field in model_fields if field.many_to_many))
+    for name in sparse.expand:
+        relation = model_meta.get_field(name)
+        if relation.many_to_many:
+            queryset = queryset.prefetch_related(name)
+        else:
+            queryset = queryset.select_related(name)
+        nested_class = serializers.EXPANDED_SERIALIZERS[relation.related_model]
+        queryset = queryset.prefetch_related(*(
+            f'{name}__{nested}' for nested in many_to_many_names(nested_class)
+        ))
+    return queryset
+
+
+class SparseFieldsViewSetMixin:
+    """
+    Viewset mixin serving ``list`` and ``retrieve`` with ``?fields=`` and ``?expand=``.
+
+    The serializer of the viewset must use SparseFieldsMixin.
+    """
+
+    def sparse_request(self) -> SparseRequest:
+        """
+        Read and validate the requested fields and expansions once per request.
+
+        Expanded relations are rendered even if the fields do not list them.
+
+        Returns:
+            SparseRequest: Requested fields and expansions.
+        """
+        sparse = getattr(self, 'sparse', None)
+        if sparse is None:
+            query_params = self.request.query_params
+            fields = requested_names(query_params, FIELDS_PARAM)
+            expand = requested_names(query_params, EXPAND_PARAM) or []
+            validate_names(self.serializer_class, fields, expand)
+            if fields is not None:
+                fields = list(dict.fromkeys([*fields, *expand]))
+            sparse = SparseRequest(fields, expand)
+            self.sparse = sparse
+        return sparse
+
+    def get_queryset(self):
+        """
+        Get the queryset, loading what the requested fields and expansions render.
+
+        Returns:
+            django.db.models.QuerySet: The queryset of the action.
+        """
+        queryset = super().get_queryset()
+        if self.action not in SPARSE_ACTIONS:
+            return queryset
+        return sparse_queryset(queryset, self.sparse_request(), getattr(self.paginator, 'ordering', ()))
+
+    def get_serializer(self, *args, **kwargs):
+        """
+        Get the serializer, rendering the requested fields and expansions.
+
+        Args:
+            *args: Positional arguments of the serializer.
+            **kwargs: Keyword arguments of the serializer.
+
+        Returns:
+            rest_framework.serializers.BaseSerializer: The serializer.
+        """
+        serializer_class = self.get_serializer_class()
+        if self.action in SPARSE_ACTIONS and issubclass(serializer_class, serializers.SparseFieldsMixin):
+            sparse = self.sparse_request()
+            kwargs.update(fields=sparse.fields, expand=sparse.expand)
+        return super().get_serializer(*args, **kwargs)
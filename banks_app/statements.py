@@ -0,0 +1,220 @@
+"""
+This module contains the streaming export of bank account statements.
+
+Sent and received transactions are read through two PostgreSQL server-side cursors,
+each following its (account, transaction_date, id) index, and merged by date in Python.
+Memory use is bounded by the cursor chunk size and the first rows are sent immediately,
+whatever the length of the history. Transactions moved to the archive are read from the
+chunks that may hold the account and merged in the same order.
+"""
+
+import csv
+import heapq
+import json
+from datetime import date
+from decimal import Decimal
+from operator import attrgetter
+from typing import Iterable, Iterator, NamedTuple, Optional
+from uuid import UUID
+
+from banks_app import archive, config
+
+from .models import Transaction
+
+DEBIT = 'debit'
+CREDIT = 'credit'
+COLUMNS = ('transaction_date', 'id', 'direction', 'amount', 'counterparty', 'description')
+
+
+class StatementRow(NamedTuple):
+    """
+    One line of a bank account statement.
+
+    Attributes:
+        transaction_date (date): The date of the transaction.
+        id (UUID): Id of the transaction.
+        direction (str): DEBIT for sent and CREDIT for received money.
+        amount (Decimal): The amount of the transaction.
+        counterparty (UUID): Id of the other bank account.
+        description (Optional[str]): The description of the transaction.
+    """
+
+    transaction_date: date
+    id: UUID
+    direction: str
+    amount: Decimal
+    counterparty: UUID
+    description: Optional[str]
+
+
+def account_transactions(
+    account_id: UUID, direction: str, date_from: Optional[date], date_to: Optional[date],
+) -> Iterator[StatementRow]:
+    """
+    Stream the transactions of one direction of an account in (date, id) order.
+
+    Args:
+        account_id (UUID): Id of the bank account.
+        direction (str): DEBIT for sent, CREDIT for received transactions.
+        date_from (Optional[date]): First date to include.
+        date_to (Optional[date]): Last date to include.
+
+    Returns:
+        Iterator[StatementRow]: Lines of the statement.
+    """
+    own_field, other_field = 'from_bank_account_id', 'to_bank_account_id'
+    if direction == CREDIT:
+        own_field, other_field = other_field, own_field
+    queryset = Transaction.objects.filter(**{own_field: account_id})
+    if date_from:
+        queryset = queryset.filter(transaction_date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(transaction_date__lte=date_to)
+    rows = queryset.order_by('transaction_date', 'id').values_list(
+        'transaction_date', 'id', 'amount', other_field, 'description',
+    ).iterator(chunk_size=config.STATEMENT_CHUNK_SIZE)
+    return (
+        StatementRow(transaction_date, transaction_id, direction, *rest)
+        for transaction_date, transaction_id, *rest in rows
+    )
+
+
+def archived_transactions(
+    account_id: UUID, date_from: Optional[date], date_to: Optional[date],
+) -> Iterator[StatementRow]:
+    """
+    Stream the archived transactions of an account in (date, id) order.
+
+    Args:
+        account_id (UUID): Id of the bank account.
+        date_from (Optional[date]): First date to include.
+        date_to (Optional[date]): Last date to include.
+
+    Yields:
+        StatementRow: Lines of the statement, the debit before the credit of a transfer to itself.
+    """
+    for payment in archive.account_transactions(account_id, date_from, date_to):
+        if payment.from_bank_account_id == account_id:
+            yield StatementRow(
+                payment.transaction_date, payment.id, DEBIT, payment.amount,
+                payment.to_bank_account_id, payment.description,
+            )
+        if payment.to_bank_account_id == account_id:
+            yield StatementRow(
+                payment.transaction_date, payment.id, CREDIT, payment.amount,
+                payment.from_bank_account_id, payment.description,
+            )
+
+
+def distinct_rows(rows: Iterable[StatementRow]) -> Iterator[StatementRow]:
+    """
+    Drop repeated lines of transactions found both in the database and in the archive.
+
+    Args:
+        rows (Iterable[StatementRow]): Lines ordered by date and id.
+
+    Yields:
+        StatementRow: Lines of the statement without repetitions.
+    """
+    current_id = None
+    directions = set()
+    for row in rows:
+        if row.id != current_id:
+            current_id = row.id
+            directions = set()
+        if row.direction not in directions:
+            directions.add(row.direction)
+            yield row
+
+
+def statement_rows(
+    account_id: UUID, date_from: Optional[date] = None, date_to: Optional[date] = None,
+) -> Iterator[StatementRow]:
+    """
+    Stream sent, received and archived transactions of an account merged in (date, id) order.
+
+    Args:
+        account_id (UUID): Id of the bank account.
+        date_from (Optional[date]): First date to include.
+        date_to (Optional[date]): Last date to include.
+
+    Returns:
+        Iterator[StatementRow]: Lines of the statement.
+    """
+    return distinct_rows(heapq.merge(
+        account_transactions(account_id, DEBIT, date_from, date_to),
+        account_transactions(account_id, CREDIT, date_from, date_to),
+        archived_transactions(account_id, date_from, date_to),
+        key=attrgetter('transaction_date', 'id'),
+    ))
+
+
+class LineBuffer:
+    """File-like object whose write returns the written line, for csv.writer."""
+
+    def write(self, line: str) -> str:
+        """
+        Return the line instead of storing it.
+
+        Args:
+            line (str): A formatted CSV line.
+
+        Returns:
+            str: The same line.
+        """
+        return line
+
+
+def csv_lines(rows: Iterable[StatementRow]) -> Iterator[str]:
+    """
+    Format statement lines as CSV with a header.
+
+    Args:
+        rows (Iterable[StatementRow]): Lines of the statement.
+
+    Yields:
+        str: CSV lines.
+    """
+    writer = csv.writer(LineBuffer())
+    yield writer.writerow(COLUMNS)
+    yield from map(writer.writerow, rows)
+
+
+def ndjson_lines(rows: Iterable[StatementRow]) -> Iterator[str]:
+    """
+    Format statement lines as newline-delimited JSON objects.
+
+    Args:
+        rows (Iterable[StatementRow]): Lines of the statement.
+
+    Returns:
+        Iterator[str]: JSON lines, amounts are strings to keep their precision.
+    """
+    return (f'{json.dumps(row._asdict(), default=str)}\n' for row in rows)  # noqa: WPS437
+
+
+def chunked(lines: Iterable[str], size: int) -> Iterator[str]:
+    """
+    Join lines into chunks so that the response is not sent one line per write.
+
+    Args:
+        lines (Iterable[str]): Lines to send.
+        size (int): Number of lines in a chunk.
+
+    Yields:
+        str: Chunks of joined lines.
+    """
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= size:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+FORMATTERS = {
+    'csv': csv_lines,
+    'ndjson': ndjson_lines,
+}
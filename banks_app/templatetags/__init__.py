@@ -0,0 +1 @@
+"""Template tags of the banks application."""
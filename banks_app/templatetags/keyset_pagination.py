@@ -0,0 +1,22 @@
+"""Template tags linking the pages of keyset paginated listings."""
+
+from django import template
+
+from banks_app import pagination
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def cursor_query(context, cursor: str) -> str:
+    """
+    Build the query string of a neighbouring page, keeping the search and the page size.
+
+    Args:
+        context (django.template.Context): Context of the template, with the request.
+        cursor (str): Cursor of the page.
+
+    Returns:
+        str: The query string with the leading ``?``.
+    """
+    return pagination.cursor_query(context['request'].GET, cursor)
@@ -0,0 +1,279 @@
+"""
+This module contains the money transfer service.
+
+Both the HTML transaction flow and the REST API create transfers through it, so balances
+are always changed in one atomic block with the involved accounts locked in a fixed order,
+together with the entries of the transfers in the ledger (see banks_app.ledger).
+"""
+
+from decimal import Decimal
+from typing import Iterable, Optional
+from uuid import UUID
+
+from django.db import models
+from django.db.transaction import atomic
+
+from banks_app import bank_stats, ledger
+
+from .models import BankAccount, Client, Transaction
+
+
+class TransferError(Exception):
+    """Base class for errors that prevent a transfer from being executed."""
+
+
+class NegativeAmountError(TransferError):
+    """Raised when the amount of a transfer is negative."""
+
+    def __init__(self):
+        """Initialize the error with a user-facing message."""
+        super().__init__('Amount cannot be negative')
+
+
+class InsufficientFundsError(TransferError):
+    """Raised when the source account does not hold enough money."""
+
+    def __init__(self):
+        """Initialize the error with a user-facing message."""
+        super().__init__('Insufficient funds in your account')
+
+
+class InitializerNotFoundError(TransferError):
+    """Raised when the client initiating a transfer does not exist."""
+
+    def __init__(self):
+        """Initialize the error with a user-facing message."""
+        super().__init__('Client does not exist')
+
+
+class AccountNotFoundError(TransferError):
+    """Raised when one of the accounts of a transfer does not exist anymore."""
+
+    def __init__(self):
+        """Initialize the error with a user-facing message."""
+        super().__init__('Bank account does not exist')
+
+
+def lock_accounts(account_ids: Iterable[UUID]) -> dict[UUID, Decimal]:
+    """
+    Lock bank accounts with SELECT ... FOR UPDATE in ascending id order.
+
+    Locking rows in one global order guarantees that two concurrent transfers touching
+    the same accounts (in any direction) wait for each other instead of deadlocking.
+    Must be called inside an atomic block.
+
+    Args:
+        account_ids (Iterable[UUID]): Ids of the accounts to lock.
+
+    Returns:
+        dict[UUID, Decimal]: Balances of the accounts that exist and are now locked.
+    """
+    return dict(
+        BankAccount.objects.select_for_update().filter(
+            id__in=set(account_ids),
+        ).order_by('id').values_list('id', 'balance'),
+    )
+
+
+def move_funds(from_account_id: UUID, to_account_id: UUID, amount: Decimal) -> None:
+    """
+    Debit one locked account and credit another with F() expressions.
+
+    The debit is conditional on the balance, so an account can never go below zero
+    even if the caller did not check the balance beforehand.
+
+    Args:
+        from_account_id (UUID): Id of the account to debit.
+        to_account_id (UUID): Id of the account to credit.
+        amount (Decimal): The amount of money to move.
+
+    Raises:
+        InsufficientFundsError: If the source account balance is lower than the amount.
+    """
+    debited = BankAccount.objects.filter(
+        id=from_account_id, balance__gte=amount,
+    ).update(balance=models.F('balance') - amount)
+    if not debited:
+        raise InsufficientFundsError()
+    BankAccount.objects.filter(id=to_account_id).update(balance=models.F('balance') + amount)
+
+
+@atomic
+def transfer(payment: Transaction) -> Transaction:
+    """
+    Execute a transfer and store it as a Transaction.
+
+    Locks both accounts, moves the money and inserts the Transaction row and its
+    ledger entries in one database transaction, so either everything is applied or
+    nothing is.
+    InsufficientFundsError from move_funds is propagated to the caller.
+
+    Args:
+        payment (Transaction): Unsaved transaction with initializer, amount and both accounts set.
+
+    Returns:
+        Transaction: The saved transaction.
+
+    Raises:
+        NegativeAmountError: If the amount is negative.
+        AccountNotFoundError: If one of the accounts does not exist.
+    """
+    if payment.amount < 0:
+        raise NegativeAmountError()
+    account_ids = {payment.from_bank_account_id_id, payment.to_bank_account_id_id}
+    balances = lock_accounts(account_ids)
+    if balances.keys() != account_ids:
+        raise AccountNotFoundError()
+    move_funds(payment.from_bank_account_id_id, payment.to_bank_account_id_id, payment.amount)
+    bank_stats.move_deposits([
+        (payment.from_bank_account_id_id, -payment.amount),
+        (payment.to_bank_account_id_id, payment.amount),
+    ])
+    payment.save(force_insert=True)
+    ledger.record_transfers([payment], balances)
+    return payment
+
+
+def check_references(
+    payment: Transaction, balances: dict[UUID, Decimal], client_ids: set[UUID],
+) -> None:
+    """
+    Check the amount and the referenced objects of a transfer from a batch.
+
+    Args:
+        payment (Transaction): The transfer to check.
+        balances (dict[UUID, Decimal]): Balances of the locked accounts.
+        client_ids (set[UUID]): Ids of the existing clients.
+
+    Raises:
+        NegativeAmountError: If the amount is negative.
+        InitializerNotFoundError: If the initializer does not exist.
+        AccountNotFoundError: If one of the accounts does not exist.
+    """
+    if payment.amount < 0:
+        raise NegativeAmountError()
+    if payment.initializer_id not in client_ids:
+        raise InitializerNotFoundError()
+    if {payment.from_bank_account_id_id, payment.to_bank_account_id_id} - balances.keys():
+        raise AccountNotFoundError()
+
+
+def apply_to_balances(
+    payment: Transaction, balances: dict[UUID, Decimal], client_ids: set[UUID],
+) -> None:
+    """
+    Apply a transfer to in-memory balances of locked accounts.
+
+    Errors of check_references are propagated to the caller.
+
+    Args:
+        payment (Transaction): The transfer to apply.
+        balances (dict[UUID, Decimal]): Balances of the locked accounts, changed in place.
+        client_ids (set[UUID]): Ids of the existing clients.
+
+    Raises:
+        InsufficientFundsError: If the source account balance is lower than the amount.
+    """
+    check_references(payment, balances, client_ids)
+    if balances[payment.from_bank_account_id_id] < payment.amount:
+        raise InsufficientFundsError()
+    balances[payment.from_bank_account_id_id] -= payment.amount
+    balances[payment.to_bank_account_id_id] += payment.amount
+
+
+def apply_all(
+    payments: list[Transaction], balances: dict[UUID, Decimal], client_ids: set[UUID],
+) -> list[Optional[TransferError]]:
+    """
+    Apply transfers to in-memory balances in the given order, skipping failing ones.
+
+    Args:
+        payments (list[Transaction]): The transfers to apply.
+        balances (dict[UUID, Decimal]): Balances of the locked accounts, changed in place.
+        client_ids (set[UUID]): Ids of the existing clients.
+
+    Returns:
+        list[Optional[TransferError]]: For every payment, None if it was applied
+            or the error that prevented it.
+    """
+    errors = []
+    for payment in payments:
+        try:
+            apply_to_balances(payment, balances, client_ids)
+        except TransferError as error:
+            errors.append(error)
+        else:
+            errors.append(None)
+    return errors
+
+
+def write_balances(balances: dict[UUID, Decimal], initial_balances: dict[UUID, Decimal]) -> None:
+    """
+    Store changed balances of locked accounts and apply them to the bank statistics.
+
+    Args:
+        balances (dict[UUID, Decimal]): Balances of the locked accounts after the transfers.
+        initial_balances (dict[UUID, Decimal]): Balances of the locked accounts before them.
+    """
+    deltas = {
+        account_id: balance - initial_balances[account_id]
+        for account_id, balance in balances.items()
+        if balance != initial_balances[account_id]
+    }
+    BankAccount.objects.bulk_update(
+        [BankAccount(id=account_id, balance=balances[account_id]) for account_id in deltas],
+        ['balance'],
+    )
+    bank_stats.move_deposits(deltas.items())
+
+
+def write_transactions(executed: list[Transaction]) -> None:
+    """
+    Insert executed transfers and count them in the daily volumes of their banks.
+
+    Args:
+        executed (list[Transaction]): The executed transfers.
+    """
+    if not executed:
+        return
+    Transaction.objects.bulk_create(executed)
+    bank_stats.count_transactions(
+        Transaction.objects.filter(id__in=[payment.id for payment in executed]), bank_stats.ADD,
+    )
+
+
+@atomic
+def transfer_many(payments: list[Transaction]) -> list[Optional[TransferError]]:
+    """
+    Execute a batch of transfers in one database transaction.
+
+    Every account of the batch is locked once in id order, the transfers are applied
+    to the locked balances in the given order, and the results are written with one
+    bulk UPDATE of balances, one bulk INSERT of Transaction rows and one of their
+    ledger entries, followed by one update of the bank statistics for each. A transfer
+    that cannot be executed is skipped without affecting the others.
+
+    Args:
+        payments (list[Transaction]): Unsaved transactions with all fields set.
+
+    Returns:
+        list[Optional[TransferError]]: For every payment, None if it was executed
+            or the error that prevented it.
+    """
+    balances = lock_accounts(
+        account_id
+        for payment in payments
+        for account_id in (payment.from_bank_account_id_id, payment.to_bank_account_id_id)
+    )
+    client_ids = set(
+        Client.objects.filter(
+            id__in={payment.initializer_id for payment in payments},
+        ).values_list('id', flat=True),
+    )
+    initial_balances = dict(balances)
+    errors = apply_all(payments, balances, client_ids)
+    executed = [payment for payment, error in zip(payments, errors) if error is None]
+    write_balances(balances, initial_balances)
+    write_transactions(executed)
+    ledger.record_transfers(executed, initial_balances)
+    return errors
@@ -38,6 +38,8 @@ urlpatterns = [
     path('create_client/', views.create_client, name='create_client'),
     path('create_bank/', views.create_bank_view, name='create_bank'),
     path('delete_bank/<uuid:pk>/', views.delete_bank_view, name='delete_bank'),
+    path('page_cache_stats/', views.page_cache_stats_view, name='page_cache_stats'),
+    path('db_pool_stats/', views.db_pool_stats_view, name='db_pool_stats'),
     path('create_transaction/', views.create_transaction, name='create_transaction'),
     path('confirm_transaction/', views.confirm_transaction, name='confirm_transaction'),
     path('transactions/', views.transactions_view, name='transactions'),
@@ -1,17 +1,40 @@
 """This file contains Django views."""
 
+from datetime import datetime, time, timedelta
+
+from asgiref import sync
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.views import LoginView
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.views.generic import DetailView, ListView
 from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
 from .models import Bank, BankAccount, BankClient, Client, Transaction
-from banks_app import forms, serializers
+from banks_app import config, forms, ledger, pagination, serializers, transfers
+from banks_app.archive import find_transaction
+from banks_app.bank_stats import read_stats, recent_volumes
+from banks_app.bulk_delete import delete_bank
+from banks_app.async_views import AsyncCachedDetailMixin, AsyncReadViewSetMixin
+from banks_app.auth_cache import get_client
+from banks_app.compact import CompactReadMixin
+from banks_app.etags import ConditionalReadMixin
+from banks_app.idempotency import IdempotentCreateMixin, idempotent, new_key
+from banks_app.page_cache import BANK, BANKS, CLIENT, cached_page, get_stats
+from banks_app.pooled_postgresql.base import pool_stats
+from banks_app.query_budget import query_budget
+from banks_app.renderers import CSVRenderer, NDJSONRenderer
+from banks_app.search import SearchViewSetMixin, search_page, search_text
+from banks_app.sparse import SparseFieldsViewSetMixin
+from banks_app.statements import FORMATTERS, chunked, statement_rows
 
 
 def is_admin(user):
@@ -27,6 +50,51 @@ def is_admin(user):
     return user.is_superuser
 
 
+def batch_item_result(entry, payment, error):
+    """
+    Describe the outcome of one item of a batch of transfers.
+
+    Args:
+        entry (TransferItemSerializer): Validated serializer of the item.
+        payment (Transaction): The transaction built from the entry, None if it is invalid.
+        error (TransferError): The error of the transfer service, None if it was executed.
+
+    Returns:
+        dict: Status of the item with the id of the created transaction or the errors.
+    """
+    if payment is None:
+        return {'status': 'rejected', 'errors': entry.errors}
+    if error is not None:
+        return {'status': 'rejected', 'errors': {'non_field_errors': [str(error)]}}
+    return {'status': 'created', 'id': payment.id}
+
+
+def parse_date_param(query_params, name):
+    """
+    Parse an optional ISO date from the query parameters.
+
+    Args:
+        query_params (django.http.QueryDict): Query parameters of the request.
+        name (str): Name of the parameter.
+
+    Returns:
+        datetime.date: The parsed date, None if the parameter is missing.
+
+    Raises:
+        ValidationError: If the parameter is not a valid date.
+    """
+    raw_date = query_params.get(name)
+    if not raw_date:
+        return None
+    try:
+        parsed_date = parse_date(raw_date)
+    except ValueError:
+        parsed_date = None
+    if parsed_date is None:
+        raise ValidationError({name: ['Enter a valid date in YYYY-MM-DD format.']})
+    return parsed_date
+
+
 def logout_view(request):
     """
     Log out the user and redirects to the homepage.
@@ -41,6 +109,7 @@ def logout_view(request):
     return redirect('homepage')
 
 
+@query_budget(7)
 @login_required
 def profile_view(request):
     """
@@ -55,9 +124,8 @@ def profile_view(request):
     Returns:
         django.http.HttpResponse: Renders profile.html with context data.
     """
-    try:
-        client = Client.objects.get(user=request.user)
-    except Client.DoesNotExist:
+    client = get_client(request)
+    if client is None:
         return redirect('create_client')
 
     if request.method == 'POST':
@@ -71,7 +139,7 @@ def profile_view(request):
         form = forms.ClientForm(instance=client)
 
     banks = Bank.objects.filter(bankclient__client=client) if client else []
-    bank_accounts = BankAccount.objects.filter(client=client) if client else []
+    bank_accounts = BankAccount.objects.filter(client=client).select_related('bank') if client else []
     transactions = Transaction.objects.filter(initializer=client) if client else []
 
     context = {
@@ -85,10 +153,11 @@ def profile_view(request):
     return render(request, 'pages/profile.html', context)
 
 
+@query_budget(3)
 @login_required
 def clients_view(request):
     """
-    Render a list of clients.
+    Render a page of clients by name, or of the clients found by the ``?q=`` search box.
 
     Args:
         request (django.http.HttpRequest): Request object.
@@ -96,10 +165,18 @@ def clients_view(request):
     Returns:
         django.http.HttpResponse: Renders clients.html with context data.
     """
-    clients = Client.objects.all()
-    context = {
-        'clients': clients,
-    }
+    clients = Client.objects.select_related('user')
+    context = {'query': request.GET.get('q', '').strip()}
+    try:
+        text = search_text(request.GET)
+    except ValidationError as error:
+        context['search_errors'] = error.detail['q']
+        text = None
+    if text is None:
+        page = pagination.paginate(request, clients, pagination.CLIENT_ORDERING)
+    else:
+        page = search_page(request, clients, text)
+    context.update(clients=page.object_list, page_obj=page, searching=text is not None)
     return render(request, 'pages/clients.html', context)
 
 
@@ -180,12 +257,15 @@ def delete_transaction_view(request, pk):
 
 
 @login_required
+@idempotent('confirm_transaction')
 def confirm_transaction(request):
     """
     Confirm a transaction.
 
-    Retrieves from and to bank accounts, validates the transaction,
-    and updates balances accordingly.
+    Retrieves from and to bank accounts, validates the transaction
+    and executes it through the transfer service. The form carries a new
+    idempotency key, so a resubmitted form does not repeat the transfer.
+    Users without a client are redirected to create one.
 
     Args:
         request (django.http.HttpRequest): Request object.
@@ -193,6 +273,10 @@ def confirm_transaction(request):
     Returns:
         django.http.HttpResponse: Renders confirm_transaction.html with form and context data.
     """
+    client = get_client(request)
+    if client is None:
+        return redirect('create_client')
+
     from_account_id = request.session.get('from_account_id')
     to_account_id = request.session.get('to_account_id')
 
@@ -208,18 +292,13 @@ def confirm_transaction(request):
             transaction = form.save(commit=False)
             transaction.from_bank_account_id = from_account
             transaction.to_bank_account_id = to_account
-            transaction.initializer = request.user.client
+            transaction.initializer = client
 
-            if from_account.balance < transaction.amount:
-                form.add_error('amount', 'Insufficient funds in your account')
-            elif transaction.amount < 0:
-                form.add_error('amount', 'Amount cannot be negative')
+            try:
+                transfers.transfer(transaction)
+            except transfers.TransferError as error:
+                form.add_error('amount', str(error))
             else:
-                from_account.balance -= transaction.amount
-                to_account.balance += transaction.amount
-                from_account.save()
-                to_account.save()
-                transaction.save()
                 return redirect('profile')
     else:
         form = forms.ConfirmTransactionForm()
@@ -231,6 +310,7 @@ def confirm_transaction(request):
             'form': form,
             'from_account': from_account,
             'to_account': to_account,
+            'idempotency_key': new_key(),
         },
     )
 
@@ -247,7 +327,7 @@ def create_transaction(request):
         django.http.HttpResponse: Renders create_transaction.html with form.
     """
     if request.method == 'POST':
-        form = forms.InitialTransactionForm(request.POST, user=request.user)
+        form = forms.InitialTransactionForm(request.POST, client=get_client(request))
         if form.is_valid():
             from_account = form.cleaned_data['from_bank_account_id']
             to_account_uuid = form.cleaned_data['to_bank_account_uuid']
@@ -264,7 +344,7 @@ def create_transaction(request):
                 )
         return render(request, 'pages/create_transaction.html', {'form': form})
     else:
-        form = forms.InitialTransactionForm(user=request.user)
+        form = forms.InitialTransactionForm(client=get_client(request))
         return render(request, 'pages/create_transaction.html', {'form': form})
 
 
@@ -278,11 +358,15 @@ class UserTransactionListView(ListView):
         model (django.db.models.Model): Django model for transactions.
         template_name (str): Template name for rendering the transaction list.
         context_object_name (str): Name of the context variable to use in the template.
+        paginate_by (int): Enables keyset pagination of the transactions.
+        query_budget (int): Maximum number of SQL queries per request.
     """
 
+    query_budget = 4
     model = Transaction
     template_name = 'pages/user_transactions.html'
     context_object_name = 'transactions'
+    paginate_by = config.PAGE_SIZE
 
     def get_queryset(self):
         """
@@ -294,7 +378,24 @@ class UserTransactionListView(ListView):
         Returns:
             django.db.models.query.QuerySet: Filtered queryset of Transaction objects.
         """
-        return Transaction.objects.filter(initializer=self.request.user.client)
+        return Transaction.objects.filter(initializer=get_client(self.request)).select_related(
+            'initializer', 'from_bank_account_id', 'to_bank_account_id',
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Paginate the transactions by (transaction_date, id) instead of OFFSET.
+
+        Args:
+            queryset (django.db.models.query.QuerySet): Transactions of the user.
+            page_size (int): Ignored, the page size is read from the request.
+
+        Returns:
+            tuple: Paginator (None for keyset pagination), page, objects of the page
+                and whether there are other pages.
+        """
+        page = pagination.paginate_transactions(self.request, queryset)
+        return None, page, page.object_list, page.has_other_pages()
 
 
 class TransactionDetailView(DetailView):
@@ -305,17 +406,23 @@ class TransactionDetailView(DetailView):
         model (django.db.models.Model): Django model class for the transaction.
         template_name (str): Template name for rendering the transaction detail page.
         context_object_name (str): Name of the context variable containing the transaction object.
+        query_budget (int): Maximum number of SQL queries per request.
     """
 
+    query_budget = 3
     model = Transaction
+    queryset = Transaction.objects.select_related(
+        'initializer', 'from_bank_account_id', 'to_bank_account_id',
+    )
     template_name = 'pages/transaction_detail.html'
     context_object_name = 'transaction'
 
 
+@query_budget(3)
 @login_required
 def transactions_view(request):
     """
-    Render a list of transactions for authenticated users.
+    Render a page of transactions for authenticated users, newest first.
 
     Args:
         request (django.http.HttpRequest): Request object.
@@ -323,13 +430,17 @@ def transactions_view(request):
     Returns:
         django.http.HttpResponse: Renders transactions.html with context data.
     """
-    transactions = Transaction.objects.all()
+    page = pagination.paginate_transactions(
+        request, Transaction.objects.select_related('from_bank_account_id', 'to_bank_account_id'),
+    )
     context = {
-        'transactions': transactions,
+        'transactions': page.object_list,
+        'page_obj': page,
     }
     return render(request, 'pages/transactions.html', context)
 
 
+@query_budget(3)
 @login_required
 def bank_accounts_view(request):
     """
@@ -341,7 +452,7 @@ def bank_accounts_view(request):
     Returns:
         django.http.HttpResponse: Renders bank_accounts.html with context data.
     """
-    bank_accounts = BankAccount.objects.all()
+    bank_accounts = BankAccount.objects.select_related('bank')
     context = {
         'bank_accounts': bank_accounts,
     }
@@ -353,17 +464,22 @@ def create_bank_account_view(request):
     """
     Handle creation of a bank account.
 
+    Users without a client are redirected to create one.
+
     Args:
         request (django.http.HttpRequest): Request object.
 
     Returns:
         django.http.HttpResponse: Renders create_bank_account.html with form.
     """
+    client = get_client(request)
+    if client is None:
+        return redirect('create_client')
+
     if request.method == 'POST':
         form = forms.BankAccountForm(request.POST)
         if form.is_valid():
             bank_account = form.save(commit=False)
-            client = Client.objects.get(user=request.user)
             bank_account.client = client
             bank_account.save()
 
@@ -432,7 +548,7 @@ def create_bank_view(request):
 @user_passes_test(is_admin)
 def delete_bank_view(request, pk):
     """
-    Delete a bank if user is admin.
+    Delete a bank with its accounts and relations by set-based statements, admins only.
 
     Args:
         request (django.http.HttpRequest): Request object.
@@ -441,71 +557,225 @@ def delete_bank_view(request, pk):
     Returns:
         django.http.HttpResponseRedirect: Redirects to 'banks' or specified next URL.
     """
-    bank = get_object_or_404(Bank, pk=pk)
-    if request.user.is_superuser:
-        bank.delete()
+    delete_bank(get_object_or_404(Bank, pk=pk))
     return redirect(request.GET.get('next', 'banks'))
 
 
-class BankListView(ListView):
+@login_required
+@user_passes_test(is_admin)
+def page_cache_stats_view(request):
+    """
+    Show hit and miss counters of the page cache to admins.
+
+    Args:
+        request (django.http.HttpRequest): Request object.
+
+    Returns:
+        django.http.JsonResponse: Numbers of hits and misses.
+    """
+    return JsonResponse(get_stats())
+
+
+@login_required
+@user_passes_test(is_admin)
+def db_pool_stats_view(request):
+    """
+    Show statistics of the database connection pools of the process to admins.
+
+    Args:
+        request (django.http.HttpRequest): Request object.
+
+    Returns:
+        django.http.JsonResponse: Counters of ConnectionPool.get_stats by database alias.
+    """
+    return JsonResponse(pool_stats())
+
+
+class CachedPageMixin:
+    """
+    Mixin serving the content of a list or detail view from the page cache.
+
+    The template of the view renders the content block only, it is wrapped into
+    page_template_name together with the title. Superusers see admin controls with
+    CSRF tokens, so their pages are rendered without the cache.
+
+    Attributes:
+        page_template_name (str): Template of the page wrapping the cached content.
+        page_kind (str): Kind of the page in the page cache.
+        page_title (str): Title of the page.
+    """
+
+    page_template_name = 'pages/cached_page.html'
+    page_kind = None
+    page_title = ''
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests.
+
+        Args:
+            request (django.http.HttpRequest): Request object.
+            args: Positional arguments of the URL.
+            kwargs: Keyword arguments of the URL.
+
+        Returns:
+            django.http.HttpResponse: The page.
+        """
+        if request.user.is_superuser:
+            page = self.render_page()
+        else:
+            page = cached_page(self.page_kind, kwargs.get('pk', ''), 'user', self.render_page)
+        return render(request, self.page_template_name, {'page': page})
+
+    def render_page(self):
+        """
+        Render the title and the content of the page.
+
+        Returns:
+            dict: Title and HTML content of the page.
+        """
+        response = super().get(self.request, *self.args, **self.kwargs)  # noqa: WPS613
+        return {'title': self.render_title(), 'content': response.rendered_content}
+
+    def render_title(self):
+        """
+        Get the title of the page, called after the objects of the view are loaded.
+
+        Returns:
+            str: The title.
+        """
+        return self.page_title
+
+
+class BankListView(CachedPageMixin, ListView):
     """
     ListView for listing banks.
 
     Attributes:
         model (django.db.models.Model): Django model class for banks.
-        template_name (str): Template name for rendering the bank list page.
+        template_name (str): Template name for rendering the bank list content.
         context_object_name (str): Name of the context variable containing the list of banks.
+        query_budget (int): Maximum number of SQL queries per request.
+        page_kind (str): Kind of the page in the page cache.
+        page_title (str): Title of the page.
     """
 
+    query_budget = 3
+    page_kind = BANKS
     model = Bank
     template_name = 'pages/banks.html'
     context_object_name = 'banks'
+    page_title = 'Banks'
 
 
-class BankDetailView(DetailView):
+class BankDetailView(AsyncCachedDetailMixin, CachedPageMixin, DetailView):
     """
     DetailView for displaying details of a bank.
 
     Attributes:
         model (django.db.models.Model): Django model class for the bank.
-        template_name (str): Template name for rendering the bank detail page.
+        template_name (str): Template name for rendering the bank detail content.
         context_object_name (str): Name of the context variable containing the bank object.
+        query_budget (int): Maximum number of SQL queries per request.
+        page_kind (str): Kind of the page in the page cache.
+        prefetch_related_names (tuple[str, ...]): Relations shown on the page.
     """
 
+    query_budget = 4
+    page_kind = BANK
+    prefetch_related_names = ('clients',)
     model = Bank
     template_name = 'pages/bank_detail.html'
     context_object_name = 'bank'
 
+    def render_title(self):
+        """
+        Get the title of the page.
+
+        Returns:
+            str: The title.
+        """
+        return f'{self.object.title} Details'
 
-class ClientDetailView(DetailView):
+
+class ClientDetailView(AsyncCachedDetailMixin, CachedPageMixin, DetailView):
     """
     DetailView for displaying details of a client.
 
     Attributes:
         model (django.db.models.Model): Django model class for the client.
-        template_name (str): Template name for rendering the client detail page.
+        template_name (str): Template name for rendering the client detail content.
         context_object_name (str): Name of the context variable containing the client object.
+        query_budget (int): Maximum number of SQL queries per request.
+        page_kind (str): Kind of the page in the page cache.
+        prefetch_related_names (tuple[str, ...]): Relations shown on the page.
     """
 
+    query_budget = 4
+    page_kind = CLIENT
+    prefetch_related_names = ('banks',)
     model = Client
     template_name = 'pages/client_detail.html'
     context_object_name = 'client'
 
+    def render_title(self):
+        """
+        Get the title of the page.
+
+        Returns:
+            str: The title.
+        """
+        return f'{self.object.first_name} {self.object.last_name} Details'
+
 
-class BankViewSet(viewsets.ModelViewSet):
+class BankViewSet(  # noqa: WPS215
+    ConditionalReadMixin, CompactReadMixin, SparseFieldsViewSetMixin, AsyncReadViewSetMixin,
+    viewsets.ModelViewSet,
+):
     """
     ViewSet for CRUD operations on Bank model.
 
-    Provides API endpoints for interacting with Bank model.
+    Provides API endpoints for interacting with Bank model. Banks are deleted
+    by set-based statements, see banks_app.bulk_delete.
 
     Attributes:
-        queryset (django.db.models.QuerySet): QuerySet of all Bank objects.
+        queryset (django.db.models.QuerySet): QuerySet of all Bank objects with prefetched clients.
         serializer_class (BankSerializer): Serializer class for Bank model.
+        query_budget (dict): Maximum number of SQL queries per request of read actions.
     """
 
-    queryset = Bank.objects.all()
+    query_budget = {'list': 4, 'retrieve': 4, 'stats': 3}
+    queryset = Bank.objects.prefetch_related('clients')
     serializer_class = serializers.BankSerializer
 
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        """
+        Get the statistics of a bank with its daily transfer volumes of the last days.
+
+        The statistics are maintained incrementally by banks_app.bank_stats, so they are
+        read with one join and one index range scan whatever the size of the bank.
+
+        Args:
+            request (rest_framework.request.Request): Request object.
+            pk (str): Primary key of the bank.
+
+        Returns:
+            rest_framework.response.Response: Numbers of clients and accounts, deposits
+                and daily volumes.
+        """
+        bank = get_object_or_404(Bank.objects.select_related('stats'), pk=pk)
+        self.check_object_permissions(request, bank)
+        stats = read_stats(bank)
+        since = timezone.now().date() - timedelta(days=config.BANK_STATS_DAYS)
+        serializer = serializers.BankStatsSerializer({
+            'clients': stats.clients,
+            'accounts': stats.accounts,
+            'deposits': stats.deposits,
+            'daily_volumes': recent_volumes(bank, since),
+        })
+        return Response(serializer.data)
+
     def get_permissions(self):
         """
         Return the list of permissions that this view requires.
@@ -522,19 +792,34 @@ class BankViewSet(viewsets.ModelViewSet):
             permission_classes = [IsAdminUser]
         return [permission() for permission in permission_classes]
 
+    def perform_destroy(self, instance):
+        """
+        Delete the bank with its accounts and relations by set-based statements.
+
+        Args:
+            instance (Bank): The bank to delete.
+        """
+        delete_bank(instance)
+
 
-class ClientViewSet(viewsets.ModelViewSet):
+class ClientViewSet(  # noqa: WPS215
+    SearchViewSetMixin, ConditionalReadMixin, CompactReadMixin, SparseFieldsViewSetMixin,
+    AsyncReadViewSetMixin, viewsets.ModelViewSet,
+):
     """
     ViewSet for CRUD operations on Client model.
 
-    Provides API endpoints for interacting with Client model.
+    Provides API endpoints for interacting with Client model. The listing is searched
+    by a fragment of a name or of the phone with ``?q=``.
 
     Attributes:
-        queryset (django.db.models.QuerySet): QuerySet of all Client objects.
+        queryset (django.db.models.QuerySet): QuerySet of all Client objects with prefetched banks.
         serializer_class (ClientSerializer): Serializer class for Client model.
+        query_budget (dict): Maximum number of SQL queries per request of read actions.
     """
 
-    queryset = Client.objects.all()
+    query_budget = {'list': 4, 'retrieve': 4}
+    queryset = Client.objects.prefetch_related('banks')
     serializer_class = serializers.ClientSerializer
 
     def destroy(self, request, *args, **kwargs):
@@ -564,7 +849,10 @@ class ClientViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
 
 
-class BankAccountViewSet(viewsets.ModelViewSet):
+class BankAccountViewSet(  # noqa: WPS215
+    ConditionalReadMixin, CompactReadMixin, SparseFieldsViewSetMixin, AsyncReadViewSetMixin,
+    viewsets.ModelViewSet,
+):
     """
     ViewSet for CRUD operations on BankAccount model.
 
@@ -573,8 +861,10 @@ class BankAccountViewSet(viewsets.ModelViewSet):
     Attributes:
         queryset (django.db.models.QuerySet): QuerySet of all BankAccount objects.
         serializer_class (BankAccountSerializer): Serializer class for BankAccount model.
+        query_budget (dict): Maximum number of SQL queries per request of read actions.
     """
 
+    query_budget = {'list': 3, 'retrieve': 3, 'balance': 2}
     queryset = BankAccount.objects.all()
     serializer_class = serializers.BankAccountSerializer
 
@@ -594,8 +884,71 @@ class BankAccountViewSet(viewsets.ModelViewSet):
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
 
+    @action(detail=True, methods=['get'])
+    def balance(self, request, pk=None):
+        """
+        Get the balance of a bank account at the end of a day, read from the ledger.
+
+        The balance is the one of the last ledger entry of the account before the end of
+        the ``?at=`` date, found by one backward scan of the (account, id) index.
+        Without the date it is the current balance.
+
+        Args:
+            request (rest_framework.request.Request): Request object.
+            pk (str): Primary key of the bank account.
 
-class BankClientViewSet(viewsets.ModelViewSet):
+        Returns:
+            rest_framework.response.Response: The moment and the balance.
+        """
+        account = self.get_object()
+        day = parse_date_param(request.query_params, 'at')
+        if day is None:
+            moment = timezone.now()
+        else:
+            moment = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+        serializer = serializers.AccountBalanceSerializer({
+            'at': moment,
+            'balance': ledger.balance_at(account.id, moment),
+        })
+        return Response(serializer.data)
+
+    @action(
+        detail=True,
+        methods=['get'],
+        renderer_classes=[CSVRenderer, NDJSONRenderer],
+    )
+    def statement(self, request, pk=None):
+        """
+        Stream the statement of a bank account as CSV or NDJSON.
+
+        Sent and received transactions are read through server-side cursors and sent while
+        they are read, so memory use does not depend on the length of the history.
+        The format is chosen by ``?format=csv|ndjson`` or the Accept header, the period
+        by the optional ``?from=`` and ``?to=`` dates.
+
+        Args:
+            request (rest_framework.request.Request): Request object.
+            pk (str): Primary key of the bank account.
+
+        Returns:
+            django.http.StreamingHttpResponse: The statement, ordered by date.
+        """
+        account = self.get_object()
+        rows = statement_rows(
+            account.id,
+            parse_date_param(request.query_params, 'from'),
+            parse_date_param(request.query_params, 'to'),
+        )
+        export_format = request.accepted_renderer.format
+        response = StreamingHttpResponse(
+            chunked(FORMATTERS[export_format](rows), config.STATEMENT_LINES_PER_WRITE),
+            content_type=request.accepted_renderer.media_type,
+        )
+        response['Content-Disposition'] = f'attachment; filename="statement-{account.id}.{export_format}"'
+        return response
+
+
+class BankClientViewSet(CompactReadMixin, SparseFieldsViewSetMixin, viewsets.ModelViewSet):
     """
     ViewSet for CRUD operations on BankClient model.
 
@@ -626,42 +979,162 @@ class BankClientViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
 
 
-class TransactionViewSet(viewsets.ModelViewSet):
+class TransactionViewSet(  # noqa: WPS215
+    SearchViewSetMixin,
+    IdempotentCreateMixin,
+    CompactReadMixin,
+    SparseFieldsViewSetMixin,
+    AsyncReadViewSetMixin,
+    viewsets.ModelViewSet,
+):
     """
     ViewSet for CRUD operations on Transaction model.
 
-    Provides API endpoints for interacting with Transaction model.
+    Provides API endpoints for interacting with Transaction model. Creation accepts
+    an Idempotency-Key header, retries with the same key get the stored response.
+    Archived transactions are still retrieved by id, from the archive. The listing
+    is searched by words of the description with ``?q=``.
 
     Attributes:
         queryset (django.db.models.QuerySet): QuerySet of all Transaction objects.
         serializer_class (TransactionSerializer): Serializer class for Transaction model.
+        pagination_class (TransactionKeysetPagination): Keyset pagination by date and id.
+        query_budget (dict): Maximum number of SQL queries per request of read actions.
+        idempotency_scope (str): Name of the endpoint idempotency keys of creation belong to.
     """
 
+    query_budget = {'list': 2, 'retrieve': 2}
+    idempotency_scope = 'transaction-create'
     queryset = Transaction.objects.all()
     serializer_class = serializers.TransactionSerializer
+    pagination_class = pagination.TransactionKeysetPagination
 
     def get_permissions(self):
         """
         Return the list of permissions that this view requires based on the action.
 
-        For 'list' and 'retrieve' actions, requires IsAuthenticated permission.
+        For 'list', 'retrieve' and 'batch' actions, requires IsAuthenticated permission.
         For 'create' action, checks if the initializer matches the authenticated client.
         For other actions, requires IsAdminUser permission.
 
         Returns:
             list: List of permission instances.
         """
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'batch']:
             permission_classes = [IsAuthenticated]
         elif self.action == 'create':
             initializer_id = self.request.data.get(
                 'initializer',
             ).removeprefix('/api/client/').removesuffix('/')
-            id_sender = self.request.user.client.id
-            if str(id_sender) == str(initializer_id):
+            client = get_client(self.request)
+            if client is not None and str(client.id) == str(initializer_id):
                 permission_classes = [IsAuthenticated]
             else:
                 permission_classes = [IsAdminUser]
         else:
             permission_classes = [IsAdminUser]
         return [permission() for permission in permission_classes]
+
+    def filter_queryset(self, queryset):
+        """
+        Filter the listing by the optional ``?from=`` and ``?to=`` dates.
+
+        The transaction table is partitioned by month of the date, so a listing of a
+        period only scans the partitions of its months.
+
+        Args:
+            queryset (django.db.models.QuerySet): Transactions of the action.
+
+        Returns:
+            django.db.models.QuerySet: The filtered transactions.
+        """
+        queryset = super().filter_queryset(queryset)
+        if self.action != 'list':
+            return queryset
+        date_from = parse_date_param(self.request.query_params, 'from')
+        date_to = parse_date_param(self.request.query_params, 'to')
+        if date_from:
+            queryset = queryset.filter(transaction_date__gte=date_from)
+        if date_to:
+            queryset = queryset.filter(transaction_date__lte=date_to)
+        return queryset
+
+    async def retrieve(self, request, *args, **kwargs):
+        """
+        Retrieve a transaction, reading it from the archive if it is not in the database.
+
+        Args:
+            request (rest_framework.request.Request): Request object.
+            *args: Positional arguments of the URL.
+            **kwargs: Keyword arguments of the URL.
+
+        Returns:
+            rest_framework.response.Response: The serialized transaction.
+
+        Raises:
+            Http404: If the transaction is neither in the database nor in the archive.
+        """
+        try:
+            return await super().retrieve(request, *args, **kwargs)
+        except Http404:
+            payment = await sync.sync_to_async(find_transaction)(kwargs[self.lookup_field])
+            if payment is None:
+                raise
+        return Response(await sync.sync_to_async(self.serialized)(payment))
+
+    def serialized(self, instance):
+        """
+        Serialize a transaction.
+
+        Args:
+            instance (Transaction): The transaction.
+
+        Returns:
+            dict: The representation of the transaction.
+        """
+        return self.get_serializer(instance).data
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """
+        Execute a batch of transfers in one database transaction.
+
+        Accepts a list of transfers in the format of the create action. Items are validated
+        without database queries and all valid ones are executed by the transfer service
+        with one lock query, one balance update and one bulk insert.
+
+        Args:
+            request (rest_framework.request.Request): Request object.
+
+        Returns:
+            rest_framework.response.Response: Counters and per-item results of the batch.
+        """
+        if not isinstance(request.data, list) or len(request.data) > config.MAX_TRANSFER_BATCH:
+            return Response(
+                {'detail': f'Expected a list of at most {config.MAX_TRANSFER_BATCH} transfers'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        context = {
+            'is_staff': request.user.is_staff,
+            'client_id': getattr(get_client(request), 'id', None),
+        }
+        entries = [
+            serializers.TransferItemSerializer(data=raw_entry, context=context)
+            for raw_entry in request.data
+        ]
+        payments = {
+            index: Transaction(**entry.validated_data)
+            for index, entry in enumerate(entries)
+            if entry.is_valid()
+        }
+        errors = dict(zip(payments, transfers.transfer_many(list(payments.values()))))
+        outcomes = [
+            batch_item_result(entry, payments.get(index), errors.get(index))
+            for index, entry in enumerate(entries)
+        ]
+        created = sum(outcome['status'] == 'created' for outcome in outcomes)
+        return Response({
+            'created': created,
+            'rejected': len(outcomes) - created,
+            'results': outcomes,
+        })
@@ -0,0 +1,118 @@
+"""
+This module contains the warm-up of a server process before it accepts requests.
+
+The first request of a fresh process would otherwise build the URL resolvers, compile
+every template it renders and open the database connections. The templates and the
+routes are warmed up once in the master process of the server, whose memory the forked
+workers share; every worker opens its own database connections after the fork, since
+connections cannot be shared between processes.
+"""
+
+from pathlib import Path
+from typing import Iterator
+from uuid import UUID
+
+from django.apps import apps
+from django.db import connections
+from django.template.loader import get_template
+from django.urls import Resolver404, URLResolver, get_resolver, resolve
+from django.urls.converters import IntConverter, UUIDConverter
+
+CONVERTER_SAMPLES = {IntConverter: 1, UUIDConverter: UUID(int=0)}
+ARGUMENT_SAMPLES = {'format': 'json'}
+DEFAULT_SAMPLE = 'sample'
+
+
+def compile_templates() -> int:
+    """
+    Compile the templates of banks_app into the template cache.
+
+    Returns:
+        int: Number of compiled templates.
+    """
+    directory = Path(apps.get_app_config('banks_app').path) / 'templates'
+    names = [path.relative_to(directory).as_posix() for path in directory.rglob('*.html')]
+    for name in names:
+        get_template(name)
+    return len(names)
+
+
+def sample_kwargs(arguments: list[str], converters: dict) -> dict[str, str]:
+    """
+    Build URL arguments matching the converters of a route.
+
+    Args:
+        arguments (list[str]): Names of the arguments of the route.
+        converters (dict): Converters of the arguments by name.
+
+    Returns:
+        dict[str, str]: Arguments converted to their URL form.
+    """
+    kwargs = {}
+    for argument in arguments:
+        converter = converters.get(argument)
+        if converter is None:
+            kwargs[argument] = ARGUMENT_SAMPLES.get(argument, DEFAULT_SAMPLE)
+        else:
+            sample = ARGUMENT_SAMPLES.get(argument, CONVERTER_SAMPLES.get(type(converter), DEFAULT_SAMPLE))
+            kwargs[argument] = converter.to_url(sample)
+    return kwargs
+
+
+def sample_paths(resolver: URLResolver, prefix: str = '/') -> Iterator[str]:
+    """
+    Generate a path for every route of a resolver and of its namespaces.
+
+    Args:
+        resolver (URLResolver): The resolver.
+        prefix (str): Path the routes of the resolver are included at.
+
+    Yields:
+        str: Path of a route.
+    """
+    for name in resolver.reverse_dict:
+        if not isinstance(name, str):
+            continue
+        for possibilities, _, _, converters in resolver.reverse_dict.getlist(name):
+            yield from (
+                prefix + format_string % sample_kwargs(arguments, converters)
+                for format_string, arguments in possibilities
+            )
+    for namespace_prefix, namespace_resolver in resolver.namespace_dict.values():
+        yield from sample_paths(namespace_resolver, prefix + namespace_prefix.replace('\\', ''))
+
+
+def resolve_routes() -> int:
+    """
+    Populate the URL resolvers and resolve a path of every route.
+
+    Routes accepting only specific values, like the application labels of the
+    admin, are populated but not resolved.
+
+    Returns:
+        int: Number of resolved paths.
+    """
+    resolved = 0
+    for path in set(sample_paths(get_resolver())):
+        try:
+            resolve(path)
+        except Resolver404:
+            continue
+        resolved += 1
+    return resolved
+
+
+def open_connections() -> int:
+    """
+    Open the database connections of the process and fill the connection pools.
+
+    Returns:
+        int: Number of databases connected to.
+    """
+    for connection in connections.all():
+        connection.ensure_connection()
+        connection.close()
+        pool = getattr(connection, 'pool', None)
+        if pool is not None:
+            pool.wait()
+    return len(connections.all())
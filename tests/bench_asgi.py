@@ -0,0 +1,254 @@
+"""
+Benchmarks of the read endpoints served by the WSGI and by the ASGI application.
+
+Run them with ``./tests/test.sh tests.bench_asgi``. Both applications of the project are
+called in-process without a web server. The WSGI application is driven by a fixed pool
+of worker threads, like a threaded WSGI server, the ASGI application by one event loop
+with many requests in flight. Every query is delayed by QUERY_LATENCY seconds to emulate
+slow queries of a remote database, which is what ties up a WSGI worker: the benchmark
+reports how many of the same requests each application completes per second.
+"""
+
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from itertools import cycle, islice, repeat
+
+from django.contrib.auth.models import User
+from django.db.backends.signals import connection_created
+from django.test import TransactionTestCase
+from rest_framework.authtoken.models import Token
+
+from banks.asgi import application as asgi_application
+from banks.wsgi import application as wsgi_application
+from banks_app.models import Bank, BankAccount, Client
+
+WSGI_WORKERS = 4
+CLIENTS = 32
+REQUESTS = 128
+QUERY_LATENCY = 0.05
+ACCOUNTS = 20
+
+
+def slow_execute(execute, sql, params, many, context):  # noqa: WPS110, WPS211
+    """
+    Execute a statement after a delay emulating a slow database.
+
+    Args:
+        execute (Callable): The next execute function in the chain.
+        sql (str): SQL statement.
+        params (Sequence): Parameters of the statement.
+        many (bool): True for executemany calls.
+        context (dict): Connection and cursor of the call.
+
+    Returns:
+        Any: Result of the execution.
+    """
+    time.sleep(QUERY_LATENCY)
+    return execute(sql, params, many, context)
+
+
+def add_latency(sender, connection, **kwargs):
+    """
+    Delay every statement of a new database connection.
+
+    Args:
+        sender (type): The database wrapper class.
+        connection (BaseDatabaseWrapper): The new connection.
+        **kwargs: Additional keyword arguments.
+    """
+    connection.execute_wrappers.append(slow_execute)
+
+
+def wsgi_get(path: str, authorization: str) -> int:
+    """
+    Send a GET request to the WSGI application.
+
+    Args:
+        path (str): Path of the request.
+        authorization (str): Value of the Authorization header.
+
+    Returns:
+        int: Status code.
+    """
+    statuses = []
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'HTTP_HOST': 'testserver',
+        'HTTP_AUTHORIZATION': authorization,
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http',
+    }
+    response = wsgi_application(environ, lambda status, headers: statuses.append(status))
+    b''.join(response)
+    response.close()
+    return int(statuses[0].split()[0])
+
+
+class Exchange:
+    """
+    Messages of one ASGI request without a body.
+
+    Attributes:
+        requests (list[dict]): Messages still to be received by the application.
+        messages (list[dict]): Messages sent by the application.
+        disconnected (asyncio.Future): Never completed, the client does not disconnect.
+    """
+
+    def __init__(self):
+        """Initialize the exchange with the request message."""
+        self.requests = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+        self.messages = []
+        self.disconnected = asyncio.get_running_loop().create_future()
+
+    async def receive(self) -> dict:
+        """
+        Receive the request, then wait for a disconnect that never comes.
+
+        Returns:
+            dict: The request message.
+        """
+        if self.requests:
+            return self.requests.pop()
+        return await self.disconnected
+
+    async def send(self, message: dict) -> None:
+        """
+        Remember a message of the response.
+
+        Args:
+            message (dict): The message.
+        """
+        self.messages.append(message)
+
+
+async def asgi_get(path: str, authorization: str) -> int:
+    """
+    Send a GET request to the ASGI application.
+
+    Args:
+        path (str): Path of the request.
+        authorization (str): Value of the Authorization header.
+
+    Returns:
+        int: Status code.
+    """
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'testserver'), (b'authorization', authorization.encode())],
+        'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+    }
+    exchange = Exchange()
+    await asgi_application(scope, exchange.receive, exchange.send)
+    return exchange.messages[0]['status']
+
+
+async def limited_get(clients: asyncio.Semaphore, path: str, authorization: str) -> int:
+    """
+    Send a GET request to the ASGI application once a client is free.
+
+    Args:
+        clients (asyncio.Semaphore): The free clients.
+        path (str): Path of the request.
+        authorization (str): Value of the Authorization header.
+
+    Returns:
+        int: Status code.
+    """
+    async with clients:
+        return await asgi_get(path, authorization)
+
+
+async def run_asgi(paths: list[str], authorization: str) -> list[int]:
+    """
+    Send requests to the ASGI application from CLIENTS concurrent clients.
+
+    Args:
+        paths (list[str]): Paths of the requests.
+        authorization (str): Value of the Authorization header.
+
+    Returns:
+        list[int]: Status codes.
+    """
+    clients = asyncio.Semaphore(CLIENTS)
+    return await asyncio.gather(*(limited_get(clients, path, authorization) for path in paths))
+
+
+def report(label: str, requests: int, elapsed: float) -> float:
+    """
+    Print the throughput of a benchmark.
+
+    Args:
+        label (str): Name of the measured application.
+        requests (int): Number of served requests.
+        elapsed (float): Duration in seconds.
+
+    Returns:
+        float: Requests per second.
+    """
+    rate = requests / elapsed
+    summary = f'{label}: {requests} requests in {elapsed:.2f}s'
+    sys.stdout.write(f'\n{summary}, {rate:.0f} requests/s\n')
+    return rate
+
+
+class AsgiBenchmark(TransactionTestCase):
+    """Benchmark of concurrent reads under WSGI and ASGI."""
+
+    available_apps = [
+        'banks_app', 'django.contrib.auth', 'django.contrib.contenttypes', 'rest_framework.authtoken',
+    ]
+
+    def setUp(self):
+        """Create a bank with clients and accounts, and delay the queries of new connections."""
+        user = User.objects.create_user(username='bench', password='bench')
+        self.authorization = f'Token {Token.objects.create(user=user).key}'
+        self.bank = Bank.objects.create(title='Bench bank')
+        client_instance = Client.objects.create(
+            user=user, first_name='Bench', last_name='Mark', phone='+70000000000',
+        )
+        self.bank.clients.add(client_instance)
+        self.account_ids = [
+            BankAccount.objects.create(balance=1, bank=self.bank, client=client_instance).id
+            for _ in range(ACCOUNTS)
+        ]
+        connection_created.connect(add_latency)
+
+    def tearDown(self):
+        """Stop delaying queries and delete the bank, the flush does not see the banks schema."""
+        connection_created.disconnect(add_latency)
+        Bank.objects.all().delete()
+
+    def test_concurrent_reads(self):
+        """Compare requests per second of the WSGI worker pool and the ASGI event loop."""
+        paths = [f'/api/bank/{self.bank.id}/', '/api/bank/'] + [
+            f'/api/bank_account/{account_id}/' for account_id in self.account_ids
+        ]
+        paths = list(islice(cycle(paths), REQUESTS))
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=WSGI_WORKERS) as executor:
+            wsgi_statuses = list(executor.map(wsgi_get, paths, repeat(self.authorization)))
+        wsgi_rate = report(f'WSGI, {WSGI_WORKERS} workers', REQUESTS, time.perf_counter() - started)
+
+        started = time.perf_counter()
+        asgi_statuses = asyncio.run(run_asgi(paths, self.authorization))
+        asgi_rate = report(f'ASGI, {CLIENTS} clients', REQUESTS, time.perf_counter() - started)
+        sys.stdout.write(f'speedup: {asgi_rate / wsgi_rate:.1f}x\n')
+
+        self.assertEqual(set(wsgi_statuses + asgi_statuses), {200})
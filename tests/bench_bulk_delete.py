@@ -0,0 +1,127 @@
+"""
+Benchmark of the deletion of a large bank.
+
+Run it with ``./tests/test.sh tests.bench_bulk_delete``. A bank with 100k accounts, a
+transfer from every account and its entries in the ledger is deleted with
+bulk_delete.delete_bank. Model.delete, which sends signals for every cascaded row, is
+measured on a smaller bank built the same way and its time is scaled to the large one.
+"""
+
+import sys
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TransactionTestCase
+
+from banks_app import bank_stats, ledger, models
+from banks_app.bulk_delete import delete_bank
+
+ACCOUNTS = 100000
+MODEL_DELETE_ACCOUNTS = 2000
+CLIENTS = 1000
+BATCH_SIZE = 5000
+BALANCE = Decimal('100.00')
+AMOUNT = Decimal('1.00')
+
+
+def report(label: str, accounts: int, elapsed: float) -> float:
+    """
+    Print the throughput of a deletion.
+
+    Args:
+        label (str): Name of the measured operation.
+        accounts (int): Number of deleted accounts.
+        elapsed (float): Duration in seconds.
+
+    Returns:
+        float: Deleted accounts per second.
+    """
+    rate = accounts / elapsed
+    summary = f'{label}: {accounts} accounts in {elapsed:.2f}s'
+    sys.stdout.write(f'\n{summary}, {rate:.0f} accounts/s\n')
+    return rate
+
+
+class BulkDeleteBenchmark(TransactionTestCase):
+    """Benchmark of set-based and per-row deletion of banks."""
+
+    available_apps = ['banks_app', 'django.contrib.auth', 'django.contrib.contenttypes']
+
+    def setUp(self):
+        """Create the clients owning the accounts."""
+        users = User.objects.bulk_create(User(username=f'bench{number}') for number in range(CLIENTS))
+        self.clients = models.Client.objects.bulk_create(
+            models.Client(user=user, first_name='Bench', last_name='Mark', phone=f'+7{number:010d}')
+            for number, user in enumerate(users)
+        )
+
+    def tearDown(self):
+        """Delete the banks and the clients, the flush between tests does not see the banks schema."""
+        for bank in models.Bank.objects.all():
+            delete_bank(bank)
+        models.Client.objects.all().delete()
+
+    def create_bank(self, title: str, accounts: int) -> models.Bank:
+        """
+        Create a bank with accounts of the clients, a transfer from every account and the ledger.
+
+        Rows are bulk created without signals, the statistics are rebuilt at the end.
+
+        Args:
+            title (str): Title of the bank.
+            accounts (int): Number of accounts.
+
+        Returns:
+            models.Bank: The bank.
+        """
+        bank = models.Bank.objects.create(title=title)
+        models.BankClient.objects.bulk_create(
+            models.BankClient(bank=bank, client=client_instance) for client_instance in self.clients
+        )
+        created = models.BankAccount.objects.bulk_create(
+            (
+                models.BankAccount(balance=BALANCE, bank=bank, client=self.clients[number % CLIENTS])
+                for number in range(accounts)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        payments = models.Transaction.objects.bulk_create(
+            (
+                models.Transaction(
+                    initializer=account.client,
+                    amount=AMOUNT,
+                    from_bank_account_id=account,
+                    to_bank_account_id=created[(number + 1) % accounts],
+                )
+                for number, account in enumerate(created)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        relations = (
+            models.TransactionClient(transaction=payment, client=payment.initializer) for payment in payments
+        )
+        models.TransactionClient.objects.bulk_create(relations, batch_size=BATCH_SIZE)
+        ledger.correct_balances(models.BankAccount.objects.filter(bank=bank))
+        bank_stats.rebuild()
+        return bank
+
+    def test_delete_large_bank(self):
+        """Compare delete_bank on a bank with 100k accounts with Model.delete scaled to its size."""
+        bank = self.create_bank('Small bank', MODEL_DELETE_ACCOUNTS)
+        started = time.perf_counter()
+        bank.delete()
+        model_rate = report('Model.delete', MODEL_DELETE_ACCOUNTS, time.perf_counter() - started)
+        sys.stdout.write(f'Model.delete of {ACCOUNTS} accounts, estimated: {ACCOUNTS / model_rate:.0f}s\n')
+
+        bank = self.create_bank('Large bank', ACCOUNTS)
+        started = time.perf_counter()
+        total, counts = delete_bank(bank)
+        bulk_rate = report('delete_bank', ACCOUNTS, time.perf_counter() - started)
+        sys.stdout.write(f'speedup: {bulk_rate / model_rate:.0f}x, {total} rows deleted\n')
+
+        self.assertEqual(counts['banks_app.BankAccount'], ACCOUNTS)
+        self.assertEqual(counts['banks_app.Transaction'], ACCOUNTS)
+        self.assertEqual(counts['banks_app.BankClient'], CLIENTS)
+        self.assertFalse(models.TransactionClient.objects.exists())
+        self.assertEqual(bank_stats.rebuild(check_only=True), [])
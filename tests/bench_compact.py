@@ -0,0 +1,110 @@
+"""
+Benchmarks of the full and the compact representation of long listings.
+
+Run them with ``./tests/test.sh tests.bench_compact``. The account listing is requested
+through the API, the transaction listing, which the API pages, is serialized directly.
+Both report rows per second of the best of ROUNDS runs.
+"""
+
+import sys
+import time
+from datetime import date
+from decimal import Decimal
+from typing import Callable
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from banks_app import compact, serializers
+from banks_app.models import Bank, BankAccount, Client, Transaction
+
+ROWS = 10000
+ROUNDS = 3
+
+
+def best_rate(measure: Callable[[], int]) -> float:
+    """
+    Run a measurement a few times and keep the fastest run.
+
+    Args:
+        measure (Callable[[], int]): Produces the listing and returns the number of rows.
+
+    Returns:
+        float: Rows per second of the fastest run.
+    """
+    rates = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        rows = measure()
+        rates.append(rows / (time.perf_counter() - started))
+    return max(rates)
+
+
+def report(label: str, full_rate: float, compact_rate: float) -> None:
+    """
+    Print the throughput of both representations.
+
+    Args:
+        label (str): Name of the listing.
+        full_rate (float): Rows per second of the full representation.
+        compact_rate (float): Rows per second of the compact representation.
+    """
+    sys.stdout.write(
+        f'\n{label}: full {full_rate:.0f} rows/s, compact {compact_rate:.0f} rows/s, '
+        f'speedup {compact_rate / full_rate:.1f}x\n',
+    )
+
+
+class CompactBenchmark(TestCase):
+    """Benchmarks of listings of ROWS rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create ROWS accounts and ROWS transfers between them."""
+        cls.user = User.objects.create_superuser(username='bench', password='bench')
+        client = Client.objects.create(
+            user=cls.user, first_name='Bench', last_name='Mark', phone='+70000000000',
+        )
+        bank = Bank.objects.create(title='Bench bank')
+        accounts = BankAccount.objects.bulk_create(
+            BankAccount(balance=Decimal('100.00'), bank=bank, client=client) for _ in range(ROWS)
+        )
+        Transaction.objects.bulk_create(
+            Transaction(
+                initializer=client,
+                amount=Decimal('1.00'),
+                transaction_date=date.today(),
+                from_bank_account_id=accounts[index],
+                to_bank_account_id=accounts[index - 1],
+            )
+            for index in range(ROWS)
+        )
+
+    def test_account_listing(self):
+        """Compare rows per second of the account listing endpoint."""
+        api_client = APIClient()
+        api_client.force_authenticate(user=self.user)
+
+        def fetch(query):  # noqa: WPS430
+            return len(api_client.get('/api/bank_account/', query).json())
+
+        full_rate = best_rate(lambda: fetch({}))
+        compact_rate = best_rate(lambda: fetch({'format': 'compact'}))
+        report('account listing endpoint', full_rate, compact_rate)
+        self.assertGreater(compact_rate, full_rate)
+
+    def test_transaction_listing(self):
+        """Compare rows per second of serializing the transactions."""
+        request = Request(APIRequestFactory().get('/api/transaction/'))
+        queryset = Transaction.objects.all()
+        serializer_class = compact.compact_serializer(serializers.TransactionSerializer)
+        compact_rows = compact.compact_queryset(queryset, serializer_class.fields_map)
+        full_serializer = serializers.TransactionSerializer
+        full_rate = best_rate(
+            lambda: len(full_serializer(queryset.all(), many=True, context={'request': request}).data),
+        )
+        compact_rate = best_rate(lambda: len(serializer_class(compact_rows.all(), many=True).data))
+        report('transaction serialization', full_rate, compact_rate)
+        self.assertGreater(compact_rate, full_rate)
@@ -0,0 +1,169 @@
+"""
+Benchmarks of request latency with and without the database connection pool.
+
+Run them with ``./tests/test.sh tests.bench_pool``. The same detail and list requests are
+sent to the WSGI application by a fixed pool of worker threads and to the ASGI
+application by many concurrent clients, once with a new connection per request and
+once with connections borrowed from the pool. The benchmark reports the p50 and p99
+latency of the requests in each setup.
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice, repeat
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TransactionTestCase
+from rest_framework.authtoken.models import Token
+
+from banks_app.models import Bank, BankAccount, Client
+from tests import config
+from tests.bench_asgi import asgi_get, wsgi_get
+
+WSGI_WORKERS = 4
+CLIENTS = 8
+REQUESTS = 400
+ACCOUNTS = 20
+PERCENTILES = 100
+MEDIAN = 50
+TAIL = 99
+MILLISECONDS = 1000
+
+
+def timed_wsgi_get(path: str, authorization: str) -> float:
+    """
+    Send a GET request to the WSGI application and measure its latency.
+
+    Args:
+        path (str): Path of the request.
+        authorization (str): Value of the Authorization header.
+
+    Returns:
+        float: Latency in seconds.
+
+    Raises:
+        AssertionError: If the request failed.
+    """
+    started = time.perf_counter()
+    if wsgi_get(path, authorization) != config.OK:
+        raise AssertionError(f'GET {path} failed')
+    return time.perf_counter() - started
+
+
+async def timed_asgi_get(clients: asyncio.Semaphore, path: str, authorization: str) -> float:
+    """
+    Send a GET request to the ASGI application once a client is free and measure its latency.
+
+    Args:
+        clients (asyncio.Semaphore): The free clients.
+        path (str): Path of the request.
+        authorization (str): Value of the Authorization header.
+
+    Returns:
+        float: Latency in seconds.
+
+    Raises:
+        AssertionError: If the request failed.
+    """
+    async with clients:
+        started = time.perf_counter()
+        if await asgi_get(path, authorization) != config.OK:
+            raise AssertionError(f'GET {path} failed')
+        return time.perf_counter() - started
+
+
+async def run_asgi(paths: list[str], authorization: str) -> list[float]:
+    """
+    Send requests to the ASGI application from CLIENTS concurrent clients.
+
+    Args:
+        paths (list[str]): Paths of the requests.
+        authorization (str): Value of the Authorization header.
+
+    Returns:
+        list[float]: Latencies in seconds.
+    """
+    clients = asyncio.Semaphore(CLIENTS)
+    return await asyncio.gather(*(timed_asgi_get(clients, path, authorization) for path in paths))
+
+
+def run_wsgi(paths: list[str], authorization: str) -> list[float]:
+    """
+    Send requests to the WSGI application from WSGI_WORKERS worker threads.
+
+    Args:
+        paths (list[str]): Paths of the requests.
+        authorization (str): Value of the Authorization header.
+
+    Returns:
+        list[float]: Latencies in seconds.
+    """
+    with ThreadPoolExecutor(max_workers=WSGI_WORKERS) as executor:
+        return list(executor.map(timed_wsgi_get, paths, repeat(authorization)))
+
+
+def report(label: str, latencies: list[float]) -> float:
+    """
+    Print the p50 and p99 latency of a benchmark.
+
+    Args:
+        label (str): Name of the measured setup.
+        latencies (list[float]): Latencies in seconds.
+
+    Returns:
+        float: The p99 latency in seconds.
+    """
+    quantiles = statistics.quantiles(latencies, n=PERCENTILES)
+    p50, p99 = quantiles[MEDIAN - 1], quantiles[TAIL - 1]
+    summary = f'p50 {p50 * MILLISECONDS:.1f}ms, p99 {p99 * MILLISECONDS:.1f}ms'
+    sys.stdout.write(f'\n{label}: {summary}')
+    return p99
+
+
+class PoolBenchmark(TransactionTestCase):
+    """Benchmark of request latency with a connection per request and with the pool."""
+
+    available_apps = [
+        'banks_app', 'django.contrib.auth', 'django.contrib.contenttypes', 'rest_framework.authtoken',
+    ]
+
+    def setUp(self):
+        """Create a bank with clients and accounts."""
+        user = User.objects.create_user(username='bench', password='bench')
+        self.authorization = f'Token {Token.objects.create(user=user).key}'
+        self.bank = Bank.objects.create(title='Bench bank')
+        client_instance = Client.objects.create(
+            user=user, first_name='Bench', last_name='Mark', phone='+70000000000',
+        )
+        self.bank.clients.add(client_instance)
+        account_ids = [
+            BankAccount.objects.create(balance=1, bank=self.bank, client=client_instance).id
+            for _ in range(ACCOUNTS)
+        ]
+        paths = [f'/api/bank/{self.bank.id}/', '/api/bank/'] + [
+            f'/api/bank_account/{account_id}/' for account_id in account_ids
+        ]
+        self.paths = list(islice(cycle(paths), REQUESTS))
+
+    def tearDown(self):
+        """Delete the bank, the flush does not see the banks schema."""
+        Bank.objects.all().delete()
+
+    def test_latency(self):
+        """Compare p50 and p99 latency of WSGI and ASGI requests without and with the pool."""
+        with patch.dict(connection.settings_dict['OPTIONS']):
+            del connection.settings_dict['OPTIONS']['pool']  # noqa: WPS420
+            wsgi_p99 = report('WSGI, connection per request', run_wsgi(self.paths, self.authorization))
+            asgi_latencies = asyncio.run(run_asgi(self.paths, self.authorization))
+            asgi_p99 = report('ASGI, connection per request', asgi_latencies)
+        pooled_wsgi_p99 = report('WSGI, pooled connections', run_wsgi(self.paths, self.authorization))
+        asgi_latencies = asyncio.run(run_asgi(self.paths, self.authorization))
+        pooled_asgi_p99 = report('ASGI, pooled connections', asgi_latencies)
+        sys.stdout.write(f'\npool stats: {connection.pool.get_stats()}\n')
+        self.assertLess(pooled_wsgi_p99, wsgi_p99)
+        self.assertLess(pooled_asgi_p99, asgi_p99)
@@ -0,0 +1,107 @@
+"""
+Benchmarks of the renderers and parsers of the API formats.
+
+Run them with ``./tests/test.sh tests.bench_renderers``. A listing of ROWS compact
+transfer rows, with UUID, Decimal and date values, is rendered and parsed by the
+json-based DRF classes, by orjson and by MessagePack. The benchmark reports rows per
+second of the best of ROUNDS runs and the size of the documents.
+"""
+
+import sys
+import time
+from datetime import date
+from decimal import Decimal
+from functools import partial
+from io import BytesIO
+from typing import Callable
+from uuid import uuid4
+
+from django.test import SimpleTestCase
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from banks_app.parsers import MessagePackParser, ORJSONParser
+from banks_app.renderers import MessagePackRenderer, ORJSONRenderer
+
+ROWS = 10000
+ROUNDS = 5
+ACCOUNTS = 100
+
+
+def best_rate(measure: Callable[[], object]) -> float:
+    """
+    Run a measurement a few times and keep the fastest run.
+
+    Args:
+        measure (Callable[[], object]): Renders or parses the listing.
+
+    Returns:
+        float: Rows per second of the fastest run.
+    """
+    durations = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        measure()
+        durations.append(time.perf_counter() - started)
+    return ROWS / min(durations)
+
+
+def listing() -> list[dict]:
+    """
+    Build compact rows of transfers between a few accounts.
+
+    Returns:
+        list[dict]: The rows.
+    """
+    accounts = [uuid4() for _ in range(ACCOUNTS)]
+    return [
+        {
+            'id': uuid4(),
+            'initializer': accounts[index % ACCOUNTS],
+            'amount': Decimal(index) / 100,
+            'transaction_date': date.today(),
+            'description': f'Transfer {index}',
+            'from_bank_account_id': accounts[index % ACCOUNTS],
+            'to_bank_account_id': accounts[(index + 1) % ACCOUNTS],
+        }
+        for index in range(ROWS)
+    ]
+
+
+def parse(parser, document: bytes):
+    """
+    Parse a document like a request body.
+
+    Args:
+        parser (rest_framework.parsers.BaseParser): The parser.
+        document (bytes): The document.
+
+    Returns:
+        Any: The parsed document.
+    """
+    return parser.parse(BytesIO(document))
+
+
+class RendererBenchmark(SimpleTestCase):
+    """Benchmarks of rendering and parsing ROWS rows."""
+
+    def test_render_and_parse(self):
+        """Compare the json module with orjson and MessagePack."""
+        rows = listing()
+        formats = (
+            ('json', JSONRenderer(), JSONParser()),
+            ('orjson', ORJSONRenderer(), ORJSONParser()),
+            ('msgpack', MessagePackRenderer(), MessagePackParser()),
+        )
+        render_rates = {}
+        for label, renderer, parser in formats:
+            document = renderer.render(rows)
+            render_rates[label] = best_rate(partial(renderer.render, rows))
+            parse_rate = best_rate(partial(parse, parser, document))
+            sys.stdout.write(
+                f'\n{label}: render {render_rates[label]:.0f} rows/s, '
+                f'parse {parse_rate:.0f} rows/s, {len(document)} bytes',
+            )
+            self.assertEqual(len(parse(parser, document)), ROWS)
+        sys.stdout.write(f'\norjson speedup: {render_rates["orjson"] / render_rates["json"]:.1f}x\n')
+        self.assertGreater(render_rates['orjson'], render_rates['json'])
@@ -0,0 +1,167 @@
+"""
+Benchmarks of the transfer service and the transfer endpoints.
+
+Run them with ``./tests/test.sh tests.bench_transfers``. In the multi-threaded benchmark
+every worker thread uses its own database connection and sends transfers in both
+directions between a small set of accounts, which is the worst case for lock contention
+and deadlocks. The endpoint benchmark compares the batch endpoint with a loop over the
+single-item endpoint.
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from itertools import repeat
+from uuid import UUID
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Sum
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
+
+from banks_app import transfers
+from banks_app.models import Bank, BankAccount, Client, Transaction
+
+THREADS = 8
+TRANSFERS_PER_THREAD = 200
+ACCOUNTS = 10
+INITIAL_BALANCE = Decimal('1000.00')
+AMOUNT = Decimal('7.00')
+ENDPOINT_TRANSFERS = 500
+
+
+def try_transfer(initializer: Client, source: UUID, target: UUID) -> bool:
+    """
+    Execute one transfer, skipping it when the source account is empty.
+
+    Args:
+        initializer (Client): Client that initiates the transfer.
+        source (UUID): Id of the account to debit.
+        target (UUID): Id of the account to credit.
+
+    Returns:
+        bool: True if the transfer was executed.
+    """
+    try:
+        transfers.transfer(Transaction(
+            initializer=initializer,
+            amount=AMOUNT,
+            from_bank_account_id_id=source,
+            to_bank_account_id_id=target,
+        ))
+    except transfers.InsufficientFundsError:
+        return False
+    return True
+
+
+def run_worker(worker: int, initializer: Client, account_ids: list) -> int:
+    """
+    Execute transfers between pairs of accounts from one thread.
+
+    Args:
+        worker (int): Number of the worker, used to vary the pairs of accounts.
+        initializer (Client): Client that initiates the transfers.
+        account_ids (list): Ids of the accounts taking part in the benchmark.
+
+    Returns:
+        int: Number of transfers that were executed.
+    """
+    executed = sum(
+        try_transfer(
+            initializer,
+            account_ids[(worker + step) % ACCOUNTS],
+            account_ids[(worker * 3 + step * 7 + 1) % ACCOUNTS],
+        )
+        for step in range(TRANSFERS_PER_THREAD)
+    )
+    connection.close()
+    return executed
+
+
+def report(label: str, executed: int, elapsed: float) -> float:
+    """
+    Print the throughput of a benchmark.
+
+    Args:
+        label (str): Name of the measured operation.
+        executed (int): Number of executed transfers.
+        elapsed (float): Duration in seconds.
+
+    Returns:
+        float: Transfers per second.
+    """
+    rate = executed / elapsed
+    summary = f'{label}: {executed} transfers in {elapsed:.2f}s'
+    sys.stdout.write(f'\n{summary}, {rate:.0f} transfers/s\n')
+    return rate
+
+
+class TransferBenchmark(TransactionTestCase):
+    """Benchmarks for concurrent and batched transfers."""
+
+    available_apps = ['banks_app', 'django.contrib.auth', 'django.contrib.contenttypes']
+
+    def setUp(self):
+        """Create a bank, a client and the accounts taking part in the benchmark."""
+        self.user = User.objects.create_superuser(username='bench', password='bench')
+        self.client_instance = Client.objects.create(
+            user=self.user, first_name='Bench', last_name='Mark', phone='+70000000000',
+        )
+        bank = Bank.objects.create(title='Bench bank')
+        self.account_ids = [
+            BankAccount.objects.create(
+                balance=INITIAL_BALANCE, bank=bank, client=self.client_instance,
+            ).id
+            for _ in range(ACCOUNTS)
+        ]
+
+    def tearDown(self):
+        """Delete the bank, the flush between tests does not see tables of the banks schema."""
+        Bank.objects.all().delete()
+
+    def test_concurrent_transfers(self):
+        """Measure transfers per second and check that total money is conserved."""
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            executed = sum(executor.map(
+                run_worker,
+                range(THREADS),
+                repeat(self.client_instance, THREADS),
+                repeat(self.account_ids, THREADS),
+            ))
+        report('threads', executed, time.perf_counter() - started)
+
+        total = BankAccount.objects.aggregate(total=Sum('balance'))['total']
+        self.assertEqual(total, INITIAL_BALANCE * ACCOUNTS)
+        self.assertEqual(Transaction.objects.count(), executed)
+        self.assertFalse(BankAccount.objects.filter(balance__lt=0).exists())
+
+    def test_batch_endpoint(self):
+        """Compare the batch endpoint with a loop over the single-item endpoint."""
+        api_client = APIClient()
+        api_client.force_authenticate(user=self.user)
+        body = [
+            {
+                'initializer': f'/api/client/{self.client_instance.id}/',
+                'amount': '1.00',
+                'from_bank_account_id': f'/api/bank_account/{self.account_ids[step % ACCOUNTS]}/',
+                'to_bank_account_id': f'/api/bank_account/{self.account_ids[(step + 1) % ACCOUNTS]}/',
+            }
+            for step in range(ENDPOINT_TRANSFERS)
+        ]
+        started = time.perf_counter()
+        for transfer in body:
+            api_client.post('/api/transaction/', transfer, format='json')
+        single_rate = report('single-item endpoint', ENDPOINT_TRANSFERS, time.perf_counter() - started)
+
+        started = time.perf_counter()
+        response = api_client.post('/api/transaction/batch/', body, format='json')
+        batch_rate = report('batch endpoint', response.data['created'], time.perf_counter() - started)
+        sys.stdout.write(f'speedup: {batch_rate / single_rate:.1f}x\n')
+
+        self.assertEqual(response.data['created'], ENDPOINT_TRANSFERS)
+        self.assertEqual(Transaction.objects.count(), ENDPOINT_TRANSFERS * 2)
+        total = BankAccount.objects.aggregate(total=Sum('balance'))['total']
+        self.assertEqual(total, INITIAL_BALANCE * ACCOUNTS)
@@ -1,11 +1,14 @@
 """File with constants."""
 TEST_TITLE = 'Sigma'
 FORBIDDEN = 403
+UNAUTHORIZED = 401
 BAD_REQUEST = 400
 CREATED = 201
 OK = 200
 NO_CONTENT = 204
 METOD_NOT_ALLOWED = 405
+NOT_FOUND = 404
+NOT_MODIFIED = 304
 CLIENT_BUSIK = {
     'first_name': 'Busik',
     'last_name': 'Koshechkin',
@@ -21,3 +24,6 @@ TEMPORARY_REDIRECT = 302
 TEST_PASSWORD = '12345'
 BALANCE = 500
 NEW_BALANCE = 2000.0
+MANY_ROWS = 6
+CORRUPTED_CLIENTS = 99
+MAX_KEY_LENGTH = 255
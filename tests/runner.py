@@ -3,10 +3,14 @@
 from types import MethodType
 from typing import Any
 
+from django.conf import settings
+from django.core.cache import caches
 from django.db import connections
 from django.db.backends.base.base import BaseDatabaseWrapper
 from django.test.runner import DiscoverRunner
 
+from banks_app import config
+
 
 def prepare_db(self):
     """
@@ -24,9 +28,25 @@ class PostgresSchemaRunner(DiscoverRunner):
     A custom test runner that ensures the `banks_data` schema is created.
 
     Methods:
+        setup_test_environment: Enforces query budgets and empties the shared page cache.
         setup_databases: Sets up the databases for testing.
     """
 
+    def setup_test_environment(self, **kwargs: Any) -> None:
+        """
+        Set up the test environment with enforced, strict query budgets.
+
+        Pages left in the shared page cache by an earlier run are dropped, since the
+        test database reuses their primary keys.
+
+        Args:
+            **kwargs: Additional keyword arguments.
+        """
+        super().setup_test_environment(**kwargs)
+        settings.QUERY_BUDGET_ENABLED = True
+        settings.QUERY_BUDGET_STRICT = True
+        caches[config.PAGE_CACHE_ALIAS].clear()
+
     def setup_databases(
         self, **kwargs: Any,
     ) -> list[tuple[BaseDatabaseWrapper, str, bool]]:
@@ -0,0 +1,122 @@
+"""File with tests of the admin of large tables."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from banks_app import config as app_config
+from banks_app import models
+from tests import config
+
+FIRST_DAY = date.fromisoformat('2024-01-01')
+TRANSACTIONS_URL = '/admin/banks_app/transaction/'
+PAGE_PARAM = 'transactionclient_set-page'
+
+
+def initial_forms(response):
+    """
+    Count the existing objects in the first inline of a change form.
+
+    Args:
+        response (django.http.HttpResponse): Response with the change form.
+
+    Returns:
+        int: Number of the forms of existing objects.
+    """
+    formset = response.context['inline_admin_formsets'][0].formset
+    return formset.initial_form_count()
+
+
+class AdminTest(TestCase):
+    """Tests of joined change lists, estimated counts, indexed search and paginated inlines."""
+
+    def setUp(self):
+        """Create a client with an account and a page and a half of transfers."""
+        self.user = User.objects.create_superuser(username='admin', password=config.TEST_PASSWORD)
+        self.client_instance = models.Client.objects.create(user=self.user, **config.CLIENT_BUSIK)
+        self.account = models.BankAccount.objects.create(
+            balance=Decimal('100.00'), bank=models.Bank.objects.create(title=config.TEST_TITLE),
+            client=self.client_instance,
+        )
+        self.add_transfers(app_config.ADMIN_INLINE_PAGE_SIZE + 1)
+        self.client.login(username='admin', password=config.TEST_PASSWORD)
+
+    def add_transfers(self, count):
+        """
+        Create transfers of the client and their relationships with the client.
+
+        Args:
+            count (int): Number of transfers.
+        """
+        payments = models.Transaction.objects.bulk_create(
+            models.Transaction(
+                initializer=self.client_instance,
+                amount=Decimal('1.00'),
+                transaction_date=FIRST_DAY + timedelta(days=day),
+                description=f'coffee number {day}',
+                from_bank_account_id=self.account,
+                to_bank_account_id=self.account,
+            )
+            for day in range(count)
+        )
+        models.TransactionClient.objects.bulk_create(
+            models.TransactionClient(transaction=payment, client=self.client_instance) for payment in payments
+        )
+
+    def get(self, path, query=None):
+        """
+        Get an admin page and capture the queries.
+
+        Args:
+            path (str): Path of the page.
+            query (dict): Query parameters.
+
+        Returns:
+            tuple: The response and the SQL of the queries.
+        """
+        queries = CaptureQueriesContext(connection)
+        with queries:
+            response = self.client.get(path, query)
+        self.assertEqual(response.status_code, config.OK)
+        return response, [query_info['sql'] for query_info in queries.captured_queries]
+
+    def test_change_list_queries(self):
+        """Test that queries of a change list do not grow with its rows and skip COUNT(*) of large ones."""
+        statements = self.get(TRANSACTIONS_URL)[1]
+        self.add_transfers(config.MANY_ROWS)
+        self.assertEqual(len(self.get(TRANSACTIONS_URL)[1]), len(statements))
+        self.assertTrue(any('COUNT(' in statement for statement in statements))
+        with patch.object(app_config, 'ADMIN_EXACT_COUNT_LIMIT', 0):
+            response, statements = self.get(TRANSACTIONS_URL)
+        self.assertFalse(any('COUNT(' in statement for statement in statements))
+        self.assertGreater(response.context['cl'].result_count, 0)
+
+    def test_search(self):
+        """Test that change lists are searched by words, fragments and pasted ids."""
+        response = self.get(TRANSACTIONS_URL, {'q': 'number 3'})[0]
+        self.assertEqual(response.context['cl'].result_count, 1)
+        response = self.get('/admin/banks_app/bankaccount/', {'q': str(self.account.id)})[0]
+        self.assertEqual(list(response.context['cl'].result_list), [self.account])
+        response = self.get('/admin/banks_app/bankaccount/', {'q': 'oshech'})[0]
+        self.assertEqual(list(response.context['cl'].result_list), [self.account])
+        autocomplete = {'app_label': 'banks_app', 'model_name': 'transaction', 'field_name': 'initializer'}
+        response = self.get('/admin/autocomplete/', {'term': 'busik', **autocomplete})[0]
+        self.assertEqual([row['id'] for row in response.json()['results']], [str(self.client_instance.id)])
+
+    def test_paginated_inline(self):
+        """Test that the change form of a client edits its transfers one page at a time."""
+        path = f'/admin/banks_app/client/{self.client_instance.id}/change/'
+        response = self.get(path)[0]
+        self.assertEqual(initial_forms(response), app_config.ADMIN_INLINE_PAGE_SIZE)
+        self.assertContains(response, f'?{PAGE_PARAM}=2')
+        response, statements = self.get(path, {PAGE_PARAM: 2})
+        self.assertEqual(initial_forms(response), 1)
+        self.assertEqual(len(self.get(path)[1]), len(statements))
+        payment = models.Transaction.objects.first()
+        self.get(f'/admin/banks_app/transaction/{payment.id}/change/')
+        self.get(f'/admin/banks_app/bank/{self.account.bank_id}/change/')
@@ -1,10 +1,11 @@
 """File with tests for API."""
 
+import base64
 import json
 from decimal import Decimal
 
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.test import AsyncClient, TestCase
 from django.utils import timezone
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
@@ -439,3 +440,247 @@ class TransactionAPITest(TestCase):
         }
         response = self.api_client.post('/api/transaction/', body)
         self.assertEqual(response.status_code, config.FORBIDDEN)
+
+    def test_transaction_creation_moves_funds(self):
+        """Test that creating a transaction debits and credits the bank accounts."""
+        self.api_client.force_authenticate(user=self.superuser, token=self.superuser_token)
+        body = {
+            'initializer': f'/api/client/{self.client_instance_1.id}/',
+            'amount': '500.00',
+            'transaction_date': timezone.now().date(),
+            'from_bank_account_id': f'/api/bank_account/{self.bank_account_1.id}/',
+            'to_bank_account_id': f'/api/bank_account/{self.bank_account_2.id}/',
+        }
+        response = self.api_client.post('/api/transaction/', body)
+        self.assertEqual(response.status_code, config.CREATED)
+        self.bank_account_1.refresh_from_db()
+        self.bank_account_2.refresh_from_db()
+        self.assertEqual(self.bank_account_1.balance, Decimal('500.00'))
+        self.assertEqual(self.bank_account_2.balance, Decimal('2500.00'))
+
+    def test_transaction_insufficient_funds(self):
+        """Test that a transaction bigger than the balance is rejected without side effects."""
+        self.api_client.force_authenticate(user=self.superuser, token=self.superuser_token)
+        body = {
+            'initializer': f'/api/client/{self.client_instance_1.id}/',
+            'amount': '5000.00',
+            'transaction_date': timezone.now().date(),
+            'from_bank_account_id': f'/api/bank_account/{self.bank_account_1.id}/',
+            'to_bank_account_id': f'/api/bank_account/{self.bank_account_2.id}/',
+        }
+        response = self.api_client.post('/api/transaction/', body)
+        self.assertEqual(response.status_code, config.BAD_REQUEST)
+        self.bank_account_1.refresh_from_db()
+        self.bank_account_2.refresh_from_db()
+        self.assertEqual(self.bank_account_1.balance, Decimal('1000.00'))
+        self.assertEqual(self.bank_account_2.balance, Decimal('2000.00'))
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_transaction_batch(self):
+        """Test that a batch executes valid transfers and reports rejected ones per item."""
+        self.api_client.force_authenticate(user=self.superuser, token=self.superuser_token)
+        transfer = {
+            'initializer': f'/api/client/{self.client_instance_1.id}/',
+            'amount': '400.00',
+            'from_bank_account_id': f'/api/bank_account/{self.bank_account_1.id}/',
+            'to_bank_account_id': f'/api/bank_account/{self.bank_account_2.id}/',
+        }
+        body = [transfer, transfer, transfer, {**transfer, 'amount': '-1'}]
+        response = self.api_client.post('/api/transaction/batch/', body, format='json')
+        self.assertEqual(response.status_code, config.OK)
+        resp_body = json.loads(response.content.decode())
+        self.assertEqual(resp_body['created'], 2)
+        self.assertEqual(
+            [outcome['status'] for outcome in resp_body['results']],
+            ['created', 'created', 'rejected', 'rejected'],
+        )
+        self.assertEqual(
+            resp_body['results'][2]['errors'], {'non_field_errors': ['Insufficient funds in your account']},
+        )
+        self.assertIn('amount', resp_body['results'][3]['errors'])
+        self.bank_account_1.refresh_from_db()
+        self.bank_account_2.refresh_from_db()
+        self.assertEqual(self.bank_account_1.balance, Decimal('200.00'))
+        self.assertEqual(self.bank_account_2.balance, Decimal('2800.00'))
+        self.assertEqual(Transaction.objects.count(), 2)
+
+    def test_transaction_batch_foreign_initializer(self):
+        """Test that a regular user cannot initiate transfers of another client in a batch."""
+        self.api_client.force_authenticate(user=self.user, token=self.user_token)
+        body = [{
+            'initializer': str(self.client_instance_1.id),
+            'amount': '100.00',
+            'from_bank_account_id': str(self.bank_account_1.id),
+            'to_bank_account_id': str(self.bank_account_2.id),
+        }]
+        response = self.api_client.post('/api/transaction/batch/', body, format='json')
+        self.assertEqual(response.status_code, config.OK)
+        resp_body = json.loads(response.content.decode())
+        self.assertEqual(resp_body['created'], 0)
+        self.assertIn('initializer', resp_body['results'][0]['errors'])
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_transaction_batch_not_list(self):
+        """Test that a batch must be a list of transfers."""
+        self.api_client.force_authenticate(user=self.superuser, token=self.superuser_token)
+        response = self.api_client.post('/api/transaction/batch/', {'amount': '1'}, format='json')
+        self.assertEqual(response.status_code, config.BAD_REQUEST)
+
+    def test_transaction_list_keyset_pagination(self):
+        """Test that transaction pages follow each other by date and id without gaps or repeats."""
+        for day in range(5):
+            Transaction.objects.create(
+                initializer=self.client_instance_1,
+                amount=Decimal('1.00'),
+                transaction_date=timezone.now().date() - timezone.timedelta(days=day % 2),
+                from_bank_account_id=self.bank_account_1,
+                to_bank_account_id=self.bank_account_2,
+            )
+        expected = list(
+            Transaction.objects.order_by('-transaction_date', '-id').values_list('id', flat=True),
+        )
+        self.api_client.force_authenticate(user=self.superuser, token=self.superuser_token)
+        url, pages = '/api/transaction/?page_size=2', []
+        while url:
+            resp_body = json.loads(self.api_client.get(url).content.decode())
+            pages.append(resp_body)
+            url = resp_body['next']
+        seen = [
+            transaction['url'].rstrip('/').rsplit('/', 1)[-1]
+            for page in pages
+            for transaction in page['results']
+        ]
+        self.assertEqual(seen, [str(transaction_id) for transaction_id in expected])
+        self.assertIsNone(pages[0]['previous'])
+        # возврат на предыдущую страницу
+        resp_body = json.loads(self.api_client.get(pages[-1]['previous']).content.decode())
+        self.assertEqual(resp_body['results'], pages[-2]['results'])
+
+    def test_transaction_list_invalid_cursor(self):
+        """Test that a malformed cursor is rejected."""
+        self.api_client.force_authenticate(user=self.superuser, token=self.superuser_token)
+        response = self.api_client.get('/api/transaction/?cursor=garbage')
+        self.assertEqual(response.status_code, config.NOT_FOUND)
+        for payload in ([[{}, 1], False], [[None, 'x'], True]):
+            cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+            response = self.api_client.get('/api/transaction/', {'cursor': cursor})
+            self.assertEqual(response.status_code, config.NOT_FOUND)
+
+    def test_bank_account_statement(self):
+        """Test the streamed statement of a bank account in both formats and with a period."""
+        today = timezone.now().date()
+        sent = Transaction.objects.create(
+            initializer=self.client_instance_1, amount=Decimal('10.00'), transaction_date=today,
+            from_bank_account_id=self.bank_account_1, to_bank_account_id=self.bank_account_2,
+        )
+        received = Transaction.objects.create(
+            initializer=self.client_instance_1, amount=Decimal('20.00'),
+            transaction_date=today - timezone.timedelta(days=3),
+            from_bank_account_id=self.bank_account_2, to_bank_account_id=self.bank_account_1,
+        )
+        self.api_client.force_authenticate(user=self.superuser, token=self.superuser_token)
+        url = f'/api/bank_account/{self.bank_account_1.id}/statement/'
+
+        response = self.api_client.get(url, {'format': 'csv'})
+        self.assertEqual(response.status_code, config.OK)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'transaction_date,id,direction,amount,counterparty,description')
+        self.assertEqual(
+            [line.split(',')[1:4] for line in lines[1:]],
+            [[str(received.id), 'credit', '20.00'], [str(sent.id), 'debit', '10.00']],
+        )
+
+        response = self.api_client.get(url, {'format': 'ndjson', 'from': str(today)})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(rows, [{
+            'transaction_date': str(today),
+            'id': str(sent.id),
+            'direction': 'debit',
+            'amount': '10.00',
+            'counterparty': str(self.bank_account_2.id),
+            'description': None,
+        }])
+
+        response = self.api_client.get(url, {'format': 'ndjson', 'to': 'yesterday'})
+        self.assertEqual(response.status_code, config.BAD_REQUEST)
+
+
+class QueryBudgetAPITest(TestCase):
+    """Test that the read endpoints stay within their query budgets with many rows."""
+
+    def setUp(self):
+        """Create a token authenticated client and several rows of every model."""
+        self.api_client = APIClient()
+        self.user = User.objects.create_user(username='user', password='user')
+        self.authorization = f'Token {Token.objects.create(user=self.user).key}'
+        self.api_client.credentials(HTTP_AUTHORIZATION=self.authorization)
+        self.bank = Bank.objects.create(title=config.TEST_TITLE)
+        self.client_instance = Client.objects.create(
+            user=self.user, first_name='Test', last_name='Testovich', phone='+79000000000',
+        )
+        self.bank_account = BankAccount.objects.create(
+            balance=Decimal('1000.00'), bank=self.bank, client=self.client_instance,
+        )
+        for number in range(config.MANY_ROWS):
+            user = User.objects.create_user(username=f'user{number}', password='user')
+            other_client = Client.objects.create(
+                user=user, first_name='Other', last_name='Testovich', phone='+79000000001',
+            )
+            other_client.banks.add(self.bank, Bank.objects.create(title=f'Bank {number}'))
+            Transaction.objects.create(
+                initializer=self.client_instance,
+                amount=Decimal('1.00'),
+                from_bank_account_id=self.bank_account,
+                to_bank_account_id=BankAccount.objects.create(
+                    balance=Decimal('1000.00'), bank=self.bank, client=other_client,
+                ),
+            )
+
+    def test_read_endpoints_within_budget(self):
+        """Test list and retrieve of every viewset, a budget violation or an N+1 pattern fails the request."""
+        details = {
+            'bank': self.bank.id,
+            'client': self.client_instance.id,
+            'bank_account': self.bank_account.id,
+            'transaction': Transaction.objects.first().id,
+        }
+        for resource, pk in details.items():
+            self.assertEqual(self.api_client.get(f'/api/{resource}/').status_code, config.OK)
+            self.assertEqual(self.api_client.get(f'/api/{resource}/{pk}/').status_code, config.OK)
+
+    async def aget(self, path, **headers):
+        """
+        Request a path through the async handler with the token of the user.
+
+        Args:
+            path (str): The path.
+            headers: Headers replacing the default ones.
+
+        Returns:
+            django.http.HttpResponse: The response.
+        """
+        return await AsyncClient().get(path, headers={'Authorization': self.authorization, **headers})
+
+    async def test_async_read_endpoints(self):
+        """Test list and retrieve of every viewset through the async handler, within the same budgets."""
+        details = {
+            'bank': self.bank.id,
+            'client': self.client_instance.id,
+            'bank_account': self.bank_account.id,
+            'transaction': (await Transaction.objects.afirst()).id,
+        }
+        for resource, pk in details.items():
+            self.assertEqual((await self.aget(f'/api/{resource}/')).status_code, config.OK)
+            response = await self.aget(f'/api/{resource}/{pk}/')
+            self.assertEqual(json.loads(response.content)['url'], f'http://testserver/api/{resource}/{pk}/')
+            self.assertGreater(response.asgi_request.query_count, 0)
+
+    async def test_async_pagination_and_errors(self):
+        """Test keyset pages and error responses of the async handler."""
+        page = json.loads((await self.aget('/api/transaction/?page_size=2')).content)
+        self.assertEqual(len(json.loads((await self.aget(page['next'])).content)['results']), 2)
+        response = await self.aget(f'/api/bank/{self.client_instance.id}/')
+        self.assertEqual(response.status_code, config.NOT_FOUND)
+        self.assertEqual((await self.aget('/api/bank/', Authorization='')).status_code, config.UNAUTHORIZED)
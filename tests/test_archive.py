@@ -0,0 +1,141 @@
+"""File with tests of the archive of old transactions."""
+
+import tempfile
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from banks_app import archive, bank_stats, bulk_load, models
+from tests import config
+
+BLOOM_KEYS = 1000
+MAX_FALSE_POSITIVES = 50
+LOADED_FIELDS = (
+    'id', 'amount', 'transaction_date', 'from_bank_account_id', 'to_bank_account_id', 'initializer',
+)
+
+
+class ArchiveTest(TestCase):
+    """Tests of archiving transactions and of reading them back through the API."""
+
+    def setUp(self):
+        """Create two accounts of a client, three old transfers and a recent one."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(TRANSACTION_ARCHIVE_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_superuser(username='admin', password=config.TEST_PASSWORD)
+        self.client_instance = models.Client.objects.create(user=self.user, **config.CLIENT_BUSIK)
+        bank = models.Bank.objects.create(title=config.TEST_TITLE)
+        accounts = [
+            models.BankAccount.objects.create(
+                balance=Decimal('100.00'), bank=bank, client=self.client_instance,
+            )
+            for _ in range(2)
+        ]
+        self.first = accounts[0]
+        self.second = accounts[1]
+        self.today = timezone.now().date()
+        self.cutoff = self.today - timedelta(days=10)
+        days = [self.cutoff - timedelta(days=offset) for offset in (30, 20, 20)] + [self.today]
+        self.payments = models.Transaction.objects.bulk_create(
+            models.Transaction(
+                initializer=self.client_instance,
+                amount=Decimal(index + 1),
+                transaction_date=day,
+                from_bank_account_id=self.first if index % 2 else self.second,
+                to_bank_account_id=self.second if index % 2 else self.first,
+            )
+            for index, day in enumerate(days)
+        )
+        models.TransactionClient.objects.create(transaction=self.payments[0], client=self.client_instance)
+        bank_stats.rebuild()
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(user=self.user)
+
+    def archive(self):
+        """Archive the old transfers in chunks of two."""
+        call_command(
+            'archive_transactions', '--before', str(self.cutoff), '--chunk-size', '2', stdout=StringIO(),
+        )
+
+    def statement(self, date_from=None):
+        """
+        Get the statement of the first account.
+
+        Args:
+            date_from (date): First date of the statement.
+
+        Returns:
+            list[list[str]]: Ids, directions and amounts of the lines.
+        """
+        response = self.api_client.get(
+            f'/api/bank_account/{self.first.id}/statement/', {'format': 'csv', 'from': date_from or ''},
+        )
+        lines = b''.join(response.streaming_content).decode().splitlines()[1:]
+        return [line.split(',')[1:4] for line in lines]
+
+    def test_archive_and_read_through(self):
+        """Test that old transfers move to chunks and are still found by id and in statements."""
+        before = self.statement()
+        self.archive()
+        self.assertEqual(list(models.Transaction.objects.all()), [self.payments[3]])
+        self.assertFalse(models.TransactionClient.objects.exists())
+        chunks = archive.read_manifest()
+        self.assertEqual([chunk.rows for chunk in chunks], [2, 1])
+        self.assertEqual(chunks[0].date_from, self.payments[0].transaction_date)
+        self.assertIn(self.first.id, chunks[0].accounts)
+        response = self.api_client.get(f'/api/transaction/{self.payments[1].id}/')
+        self.assertEqual(response.status_code, config.OK)
+        self.assertEqual(response.json()['amount'], '2.00')
+        self.assertEqual(response.json()['transaction_date'], str(self.payments[1].transaction_date))
+        response = self.api_client.get(f'/api/transaction/{uuid.uuid4()}/')
+        self.assertEqual(response.status_code, config.NOT_FOUND)
+        self.assertEqual(self.statement(), before)
+        self.assertEqual(len(self.statement(self.payments[1].transaction_date)), 3)
+        self.assertEqual(bank_stats.rebuild(check_only=True), [])
+
+    def test_duplicates_and_arguments(self):
+        """Test that transfers both in the database and in the archive are listed once."""
+        before = self.statement()
+        self.archive()
+        models.Transaction.objects.bulk_create(
+            payment.to_model() for payment in archive.all_transactions()
+        )
+        self.assertEqual(self.statement(), before)
+        with self.assertRaises(CommandError):
+            call_command('archive_transactions', '--before', str(self.cutoff), '--chunk-size', '0')
+
+    def test_bulk_load_rejects_stored_ids(self):
+        """Test that loaded transfers may not reuse the ids of archived transfers or of stored ones."""
+        self.archive()
+        transfer = [str(self.first.id), str(self.second.id), str(self.client_instance.id)]
+        rows = [
+            [str(payment_id), '1.00', str(self.cutoff), *transfer]
+            for payment_id in (self.payments[0].id, self.payments[3].id, uuid.uuid4())
+        ]
+        problems = 'id is not unique: 1 rows; id is archived: 1 rows'
+        with self.assertRaisesMessage(bulk_load.BulkLoadError, problems):
+            bulk_load.load(models.Transaction, list(LOADED_FIELDS), rows)
+        report = bulk_load.load(models.Transaction, list(LOADED_FIELDS), rows, skip_invalid=True)
+        self.assertEqual(report.loaded, 1)
+        archived = archive.archived_ids(payment.id for payment in self.payments)
+        self.assertEqual(archived, {payment.id for payment in self.payments[:3]})
+        self.assertEqual(bank_stats.rebuild(check_only=True), [])
+
+    def test_bloom_filter(self):
+        """Test that filters of ids have no false negatives and few false positives."""
+        keys = [uuid.uuid4() for _ in range(BLOOM_KEYS)]
+        bloom = archive.BloomFilter.decode(archive.BloomFilter.build(keys, len(keys)).encode())
+        self.assertTrue(all(key in bloom for key in keys))
+        false_positives = sum(uuid.uuid4() in bloom for _ in range(BLOOM_KEYS))
+        self.assertLess(false_positives, MAX_FALSE_POSITIVES)
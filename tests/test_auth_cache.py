@@ -0,0 +1,147 @@
+"""File with tests of the cached authentication and the client of requests."""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+import django
+from django.contrib.auth.models import Group, Permission, User
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from banks_app import auth_cache
+from banks_app.models import Client
+from tests import config
+
+AUTH_TABLES = ('authtoken_token', 'auth_user', 'auth_permission', 'auth_group', 'user_id')
+CACHE_SIZE = 2
+CACHE_TTL = 60
+
+
+class CachedTokenAuthenticationTest(TestCase):
+    """Tests of authenticated API requests served from the token cache."""
+
+    def setUp(self):
+        """Create a user with a client and a token."""
+        auth_cache.token_cache.discard(auth_cache.is_any)
+        auth_cache.permission_cache.discard(auth_cache.is_any)
+        self.user = User.objects.create_user(username='user', password=config.TEST_PASSWORD)
+        self.client_instance = Client.objects.create(user=self.user, **config.CLIENT_BUSIK)
+        self.token = Token.objects.create(user=self.user)
+        self.api_client = APIClient()
+        self.api_client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def get_transactions(self):
+        """
+        Get the transactions of the client.
+
+        Returns:
+            rest_framework.response.Response: The response.
+        """
+        return self.api_client.get('/api/transaction/')
+
+    def test_repeated_request_skips_auth(self):
+        """Test that a repeated request loads neither the token, the user, the client nor permissions."""
+        self.assertEqual(self.get_transactions().status_code, config.OK)
+        queries = CaptureQueriesContext(connection)
+        with queries:
+            self.assertEqual(self.get_transactions().status_code, config.OK)
+        statements = [query['sql'] for query in queries.captured_queries]
+        self.assertTrue(statements)
+        self.assertFalse([sql for sql in statements if any(table in sql for table in AUTH_TABLES)])
+
+    def test_token_deletion_and_user_change(self):
+        """Test that deleted tokens and deactivated users are rejected at once."""
+        self.assertEqual(self.get_transactions().status_code, config.OK)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get_transactions().status_code, config.UNAUTHORIZED)
+        self.user.is_active = True
+        self.user.save()
+        self.assertEqual(self.get_transactions().status_code, config.OK)
+        self.token.delete()
+        self.assertEqual(self.get_transactions().status_code, config.UNAUTHORIZED)
+
+    def test_revocation_seen_by_other_workers(self):
+        """Test that a token revoked by another worker process is rejected at once."""
+        self.assertEqual(self.get_transactions().status_code, config.OK)
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM authtoken_token WHERE key = %s', [self.token.key])
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=django.setup) as worker:
+            worker.submit(auth_cache.invalidate_token, Token, self.token).result()
+        self.assertEqual(self.get_transactions().status_code, config.UNAUTHORIZED)
+
+    def test_group_change(self):
+        """Test that permissions granted through a group apply to cached users."""
+        self.assertEqual(self.api_client.post('/api/bank/', {'title': 'New'}).status_code, config.FORBIDDEN)
+        self.assertEqual(self.api_client.get('/api/bank/').status_code, config.OK)
+        group = Group.objects.create(name='managers')
+        self.user.groups.add(group)
+        self.assertFalse(self.request_user().has_perm('banks_app.add_bank'))
+        self.assertEqual(auth_cache.permission_cache.get(self.user.pk).permissions, frozenset())
+        group.permissions.add(Permission.objects.get(codename='add_bank'))
+        self.assertIsNone(auth_cache.permission_cache.get(self.user.pk))
+        self.assertTrue(self.request_user().has_perm('banks_app.add_bank'))
+        with self.assertNumQueries(0):
+            self.assertTrue(self.request_user().has_perm('banks_app.add_bank'))
+            self.assertEqual(self.request_user().client, self.client_instance)
+
+    def request_user(self):
+        """
+        Authenticate the token like a request does.
+
+        Returns:
+            User: The user of the request.
+        """
+        user, _ = auth_cache.CachedTokenAuthentication().authenticate_credentials(self.token.key)
+        return user
+
+
+class LRUCacheTest(SimpleTestCase):
+    """Tests of the bounded cache."""
+
+    def test_eviction_and_expiry(self):
+        """Test that the least recently used entry is evicted and entries expire."""
+        cache = auth_cache.LRUCache(CACHE_SIZE, CACHE_TTL)
+        cache.set('first', 1)
+        cache.set('second', 2)
+        cache.get('first')
+        cache.set('third', 3)
+        self.assertEqual((cache.get('first'), cache.get('second'), cache.get('third')), (1, None, 3))
+        self.assertEqual(len(cache), CACHE_SIZE)
+        with patch.object(auth_cache.time, 'monotonic', return_value=auth_cache.time.monotonic() + CACHE_TTL):
+            self.assertIsNone(cache.get('first'))
+        self.assertEqual(len(cache), 1)
+
+
+class RequestClientTest(TestCase):
+    """Tests of the client of session requests."""
+
+    def setUp(self):
+        """Create a user with a client and a user without one."""
+        self.user = User.objects.create_user(username='user', password=config.TEST_PASSWORD)
+        self.client_instance = Client.objects.create(user=self.user, **config.CLIENT_BUSIK)
+        User.objects.create_user(username='newcomer', password=config.TEST_PASSWORD)
+
+    def test_client_loaded_with_user(self):
+        """Test that pages of a client load the user and the client in one query."""
+        self.client.login(username='user', password=config.TEST_PASSWORD)
+        for name in ('profile', 'create_transaction', 'user_transactions', 'create_bank_account'):
+            queries = CaptureQueriesContext(connection)
+            with queries:
+                self.assertEqual(self.client.get(reverse(name)).status_code, config.OK)
+            statements = [query['sql'] for query in queries.captured_queries]
+            self.assertEqual(len([sql for sql in statements if 'FROM "auth_user"' in sql]), 1, name)
+            self.assertFalse([sql for sql in statements if '"client"."user_id" =' in sql], name)
+
+    def test_user_without_client(self):
+        """Test that users without a client are sent to create one."""
+        self.client.login(username='newcomer', password=config.TEST_PASSWORD)
+        for name in ('profile', 'confirm_transaction', 'create_bank_account'):
+            response = self.client.get(reverse(name))
+            self.assertEqual(response['Location'], reverse('create_client'), name)
@@ -0,0 +1,129 @@
+"""File with tests of incrementally maintained bank statistics."""
+
+import json
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from banks_app.models import Bank, BankAccount, BankClient, BankStats, Client
+from tests import config
+
+
+class BankStatsTest(TestCase):
+    """Tests of the bank statistics rollup, its endpoint and its rebuild."""
+
+    def setUp(self):
+        """Create two banks with accounts of one client in both."""
+        self.api_client = APIClient()
+        self.user = User.objects.create_user(username='user', password=config.TEST_PASSWORD)
+        self.superuser = User.objects.create_superuser(username='admin', password=config.TEST_PASSWORD)
+        self.superuser_token = Token.objects.create(user=self.superuser)
+        self.client_instance = Client.objects.create(user=self.superuser, **config.CLIENT_BUSIK)
+        self.bank = Bank.objects.create(title=config.TEST_TITLE)
+        self.other_bank = Bank.objects.create(title='Omega')
+        self.account = BankAccount.objects.create(
+            balance=Decimal('1000.00'), bank=self.bank, client=self.client_instance,
+        )
+        self.other_account = BankAccount.objects.create(
+            balance=Decimal('500.00'), bank=self.other_bank, client=self.client_instance,
+        )
+        self.bank.clients.add(self.client_instance)
+
+    def get_stats(self, bank):
+        """
+        Get the statistics of a bank through the API.
+
+        Args:
+            bank (Bank): The bank.
+
+        Returns:
+            dict: The statistics.
+        """
+        self.api_client.force_authenticate(user=self.superuser, token=self.superuser_token)
+        response = self.api_client.get(f'/api/bank/{bank.id}/stats/')
+        self.assertEqual(response.status_code, config.OK)
+        return json.loads(response.content.decode())
+
+    def transfer(self, amount, from_account, to_account):
+        """
+        Create transfers through the batch API.
+
+        Args:
+            amount (str): Amount of every transfer.
+            from_account (BankAccount): The source account.
+            to_account (BankAccount): The destination account.
+        """
+        self.api_client.force_authenticate(user=self.superuser, token=self.superuser_token)
+        transfer = {
+            'initializer': str(self.client_instance.id),
+            'amount': amount,
+            'from_bank_account_id': str(from_account.id),
+            'to_bank_account_id': str(to_account.id),
+        }
+        response = self.api_client.post('/api/transaction/batch/', [transfer, transfer], format='json')
+        self.assertEqual(response.status_code, config.OK)
+
+    def test_stats_follow_changes(self):
+        """Test that accounts, relations and transfers are reflected in the statistics."""
+        self.assertEqual(self.get_stats(self.bank), {
+            'clients': 1, 'accounts': 1, 'deposits': '1000.00', 'daily_volumes': [],
+        })
+        self.api_client.force_authenticate(user=self.superuser, token=self.superuser_token)
+        response = self.api_client.post('/api/transaction/', {
+            'initializer': f'/api/client/{self.client_instance.id}/',
+            'amount': '100.00',
+            'transaction_date': timezone.now().date(),
+            'from_bank_account_id': f'/api/bank_account/{self.account.id}/',
+            'to_bank_account_id': f'/api/bank_account/{self.other_account.id}/',
+        })
+        self.assertEqual(response.status_code, config.CREATED)
+        self.transfer('50.00', self.account, self.other_account)
+        stats = self.get_stats(self.bank)
+        self.assertEqual(stats['deposits'], '800.00')
+        self.assertEqual(stats['daily_volumes'], [
+            {'day': str(timezone.now().date()), 'transfers': 3, 'amount': '200.00'},
+        ])
+        other_stats = self.get_stats(self.other_bank)
+        self.assertEqual((other_stats['clients'], other_stats['deposits']), (0, '700.00'))
+        self.assertEqual(other_stats['daily_volumes'], [])
+        self.account.balance = Decimal('10.00')
+        self.account.save()
+        BankAccount.objects.create(balance=Decimal('5.00'), bank=self.bank, client=self.client_instance)
+        self.other_account.delete()
+        self.assertEqual(
+            (self.get_stats(self.bank)['accounts'], self.get_stats(self.bank)['deposits']), (2, '15.00'),
+        )
+        self.assertEqual(self.get_stats(self.other_bank)['accounts'], 0)
+        BankClient.objects.filter(bank=self.bank).delete()
+        self.assertEqual(self.get_stats(self.bank)['clients'], 0)
+        call_command('rebuild_bank_stats', '--check', stdout=StringIO(), stderr=StringIO())
+
+    def test_stats_require_admin(self):
+        """Test that regular users cannot read the statistics."""
+        self.api_client.force_authenticate(user=self.user)
+        response = self.api_client.get(f'/api/bank/{self.bank.id}/stats/')
+        self.assertEqual(response.status_code, config.FORBIDDEN)
+
+    def test_rebuild_fixes_drift(self):
+        """Test that the rebuild reports corrupted statistics and recomputes them."""
+        self.transfer('10.00', self.other_account, self.account)
+        BankStats.objects.filter(bank=self.bank).update(clients=config.CORRUPTED_CLIENTS)
+        BankStats.objects.filter(bank=self.other_bank).delete()
+        errors = StringIO()
+        with self.assertRaisesMessage(CommandError, 'drifted in 3 values'):
+            call_command('rebuild_bank_stats', '--check', stdout=StringIO(), stderr=errors)
+        drift = f'Bank {self.bank.id}: clients is {config.CORRUPTED_CLIENTS}, expected 1'
+        self.assertIn(drift, errors.getvalue())
+        self.assertEqual(BankStats.objects.get(bank=self.bank).clients, config.CORRUPTED_CLIENTS)
+        call_command('rebuild_bank_stats', stdout=StringIO(), stderr=StringIO())
+        output = StringIO()
+        call_command('rebuild_bank_stats', '--check', stdout=output, stderr=StringIO())
+        self.assertIn('0 values drifted', output.getvalue())
+        self.assertEqual(self.get_stats(self.other_bank)['deposits'], '480.00')
@@ -0,0 +1,119 @@
+"""File with tests of the set-based deletion of banks."""
+
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from banks_app import bank_stats, models, transfers
+from banks_app.bulk_delete import delete_bank
+from tests import config
+
+BALANCE = Decimal('100.00')
+SNAPSHOT_MODELS = (
+    models.BankClient,
+    models.BankAccount,
+    models.Transaction,
+    models.TransactionClient,
+    models.LedgerEntry,
+    models.BankStats,
+    models.BankDailyVolume,
+)
+
+
+def snapshot():
+    """
+    Read the rows of the tables a deleted bank cascades to.
+
+    Returns:
+        dict: Primary keys of the rows of every model, with the statistics of banks.
+    """
+    rows = {model: set(model.objects.values_list('pk', flat=True)) for model in SNAPSHOT_MODELS}
+    rows['stats'] = set(models.BankStats.objects.values_list('bank', 'clients', 'accounts', 'deposits'))
+    rows['volumes'] = set(models.BankDailyVolume.objects.values_list('bank', 'day', 'transfers', 'amount'))
+    return rows
+
+
+class BulkDeleteTest(TestCase):
+    """Tests of the end state, the statements and the callers of delete_bank."""
+
+    def setUp(self):
+        """Create two banks with accounts of two clients and transfers within and between them."""
+        self.user = User.objects.create_superuser(username='admin', password=config.TEST_PASSWORD)
+        self.clients = [
+            models.Client.objects.create(user=self.user, **config.CLIENT_BUSIK),
+            models.Client.objects.create(
+                user=User.objects.create_user(username='stesha', password=config.TEST_PASSWORD),
+                **config.CLIENT_STESHA,
+            ),
+        ]
+        self.bank = self.create_bank(config.TEST_TITLE, accounts=2)
+        self.other_bank = self.create_bank('Other', accounts=1)
+        own = list(self.bank.bankaccount_set.all())
+        other = self.other_bank.bankaccount_set.first()
+        for source, target in ((own[0], own[1]), (other, own[0]), (own[1], other), (other, other)):
+            payment = transfers.transfer(models.Transaction(
+                initializer=self.clients[0],
+                amount=Decimal('1.00'),
+                from_bank_account_id=source,
+                to_bank_account_id=target,
+            ))
+            models.TransactionClient.objects.create(transaction=payment, client=self.clients[0])
+
+    def create_bank(self, title, accounts):
+        """
+        Create a bank with accounts of every client and their relations.
+
+        Args:
+            title (str): Title of the bank.
+            accounts (int): Number of accounts of every client.
+
+        Returns:
+            Bank: The bank.
+        """
+        bank = models.Bank.objects.create(title=title)
+        for client_instance in self.clients:
+            models.BankClient.objects.create(bank=bank, client=client_instance)
+            for _ in range(accounts):
+                models.BankAccount.objects.create(balance=BALANCE, bank=bank, client=client_instance)
+        return bank
+
+    def test_same_end_state_as_model_delete(self):
+        """Test that the rows, counts and statistics left are those of Model.delete."""
+        with transaction.atomic():
+            expected_total, expected_counts = models.Bank.objects.get(pk=self.bank.pk).delete()
+            expected_rows = snapshot()
+            transaction.set_rollback(True)
+        self.assertEqual(
+            delete_bank(self.bank),
+            (expected_total, {label: count for label, count in expected_counts.items() if count}),
+        )
+        self.assertEqual(snapshot(), expected_rows)
+        self.assertEqual(bank_stats.rebuild(check_only=True), [])
+        self.assertTrue(models.BankClient.objects.filter(bank=self.other_bank).exists())
+
+    def test_statements_do_not_grow_with_rows(self):
+        """Test that deleting a bank runs as many statements whatever the number of its rows."""
+        queries = CaptureQueriesContext(connection)
+        with queries:
+            delete_bank(self.other_bank)
+        statements = len(queries.captured_queries)
+        with queries:
+            delete_bank(self.bank)
+        self.assertEqual(len(queries.captured_queries), statements)
+
+    def test_views_delete_in_bulk(self):
+        """Test that the HTML view and the API delete banks with their accounts."""
+        self.client.login(username='admin', password=config.TEST_PASSWORD)
+        response = self.client.get(f'/delete_bank/{self.bank.id}/')
+        self.assertEqual(response.status_code, config.TEMPORARY_REDIRECT)
+        self.assertFalse(models.BankAccount.objects.filter(bank=self.bank).exists())
+        api_client = APIClient()
+        api_client.force_authenticate(user=self.user)
+        response = api_client.delete(f'/api/bank/{self.other_bank.id}/')
+        self.assertEqual(response.status_code, config.NO_CONTENT)
+        self.assertFalse(models.BankAccount.objects.exists())
+        self.assertFalse(models.Transaction.objects.exists())
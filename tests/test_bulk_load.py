@@ -0,0 +1,145 @@
+"""File with tests of the bulk_load management command."""
+
+import json
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+
+from banks_app import ledger
+from banks_app.models import Bank, BankAccount, BankClient, BankStats, Client
+from tests import config
+
+
+class BulkLoadTest(TestCase):
+    """Tests of loading rows through a COPY staging table."""
+
+    def setUp(self):
+        """Create users, a bank and a client referenced by the loaded rows."""
+        self.users = [
+            User.objects.create_user(username=f'user{number}', password=config.TEST_PASSWORD)
+            for number in range(3)
+        ]
+        self.bank = Bank.objects.create(title=config.TEST_TITLE)
+        self.client_instance = Client.objects.create(user=self.users[0], **config.CLIENT_BUSIK)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write_input(self, name, text):
+        """
+        Write an input file.
+
+        Args:
+            name (str): Name of the file.
+            text (str): Content of the file.
+
+        Returns:
+            str: Path of the file.
+        """
+        path = Path(self.directory.name) / name
+        path.write_text(text, encoding='utf-8')
+        return str(path)
+
+    def load(self, *args):
+        """
+        Run the command.
+
+        Args:
+            args: Arguments of the command.
+
+        Returns:
+            str: Output of the command.
+        """
+        out = StringIO()
+        call_command('bulk_load', *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_load_clients_from_csv(self):
+        """Test loading clients with generated ids from a CSV file."""
+        path = self.write_input('clients.csv', (
+            'user,first_name,last_name,phone\n'
+            f'{self.users[1].id},Stesha,Ptichkina,+79195169405\n'
+            f'{self.users[2].id},Kesha,Popugaev,+79195169406\n'
+        ))
+        output = self.load('client', path)
+        self.assertIn('Loaded 2 of 2 rows', output)
+        self.assertEqual(
+            set(Client.objects.values_list('first_name', flat=True)), {'Busik', 'Stesha', 'Kesha'},
+        )
+
+    def test_load_bank_accounts_from_ndjson(self):
+        """Test loading bank accounts and relations from NDJSON files, updating bank pages and stats."""
+        accounts = [
+            {'balance': '100.50', 'bank_id': str(self.bank.id), 'client_id': str(self.client_instance.id)},
+            {'balance': 0, 'bank': str(self.bank.id), 'client': str(self.client_instance.id)},
+        ]
+        path = self.write_input('accounts.ndjson', '\n'.join(map(json.dumps, accounts[:1])))
+        self.load('bank_account', path)
+        path = self.write_input('accounts.jsonl', json.dumps(accounts[1]))
+        self.load('bank_account', path)
+        path = self.write_input('relations.ndjson', json.dumps(accounts[1]))
+        with self.assertRaises(CommandError):
+            self.load('bank_client', path)
+        path = self.write_input('relations.txt', json.dumps(
+            {'bank': str(self.bank.id), 'client': str(self.client_instance.id)},
+        ))
+        bank_page = reverse('bank_detail', args=[self.bank.pk])
+        self.client.force_login(self.users[0])
+        self.assertNotIn(config.CLIENT_BUSIK['phone'], self.client.get(bank_page).content.decode())
+        self.load('bank_client', path, '--format', 'ndjson')
+        self.assertIn(config.CLIENT_BUSIK['phone'], self.client.get(bank_page).content.decode())
+        self.assertEqual(
+            sorted(BankAccount.objects.values_list('balance', flat=True)),
+            [Decimal('0.00'), Decimal('100.50')],
+        )
+        self.assertEqual(BankClient.objects.count(), 1)
+        stats = BankStats.objects.get(bank=self.bank)
+        self.assertEqual((stats.clients, stats.accounts, stats.deposits), (1, 2, Decimal('100.50')))
+        self.assertEqual(ledger.audit(BankAccount.objects.all()), [])
+
+    def test_invalid_rows_are_rejected(self):
+        """Test that invalid phones, balances and references fail the whole load."""
+        path = self.write_input('clients.csv', (
+            'user,first_name,last_name,phone\n'
+            f'{self.users[1].id},Stesha,Ptichkina,89195169405\n'
+            f'{self.users[0].id},Kesha,Popugaev,+79195169406\n'
+        ))
+        problems = 'phone fails invalid: 1 rows; user_id is not unique: 1 rows'
+        with self.assertRaisesMessage(CommandError, problems):
+            self.load('client', path)
+        path = self.write_input('accounts.csv', (
+            'balance,bank,client\n'
+            f'-1,{self.bank.id},{self.client_instance.id}\n'
+            f'1,{self.client_instance.id},{self.client_instance.id}\n'
+        ))
+        with self.assertRaisesRegex(CommandError, 'balance fails min_value.*bank references a missing bank'):
+            self.load('bank_account', path)
+        self.assertEqual(Client.objects.count(), 1)
+        self.assertFalse(BankAccount.objects.exists())
+
+    def test_skip_invalid_rows(self):
+        """Test that only valid rows are loaded with --skip-invalid."""
+        path = self.write_input('accounts.csv', (
+            'balance,bank,client\n'
+            f'-1,{self.bank.id},{self.client_instance.id}\n'
+            f'1,{self.bank.id},{self.client_instance.id}\n'
+            f'1,{self.bank.id},\n'
+        ))
+        output = self.load('bank_account', path, '--skip-invalid')
+        self.assertIn('Loaded 1 of 3 rows', output)
+        self.assertEqual(BankAccount.objects.get().balance, Decimal('1.00'))
+
+    def test_malformed_input(self):
+        """Test that unknown columns and values of a wrong type fail the load."""
+        with self.assertRaisesRegex(CommandError, 'Unknown columns'):
+            self.load('bank_account', self.write_input('accounts.csv', 'balance,owner\n1,2\n'))
+        with self.assertRaises(CommandError):
+            self.load('bank_account', self.write_input('accounts.csv', 'balance\nmany\n'))
+        with self.assertRaisesRegex(CommandError, 'format'):
+            self.load('bank_account', self.write_input('accounts.xml', ''))
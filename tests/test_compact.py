@@ -0,0 +1,71 @@
+"""File with tests of the compact representation of the REST API."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from banks_app.models import Bank, BankAccount, Client, Transaction
+from tests import config
+
+PAGE_SIZE = 2
+COMPACT_ACCEPT = 'application/json; profile=compact'
+FIRST_DAY = date.fromisoformat('2024-01-01')
+
+
+class CompactRepresentationTest(TestCase):
+    """Tests of listings and objects requested in the compact representation."""
+
+    def setUp(self):
+        """Create accounts of a client with a few transfers between them."""
+        self.user = User.objects.create_superuser(username='admin', password=config.TEST_PASSWORD)
+        self.client_instance = Client.objects.create(user=self.user, **config.CLIENT_BUSIK)
+        self.bank = Bank.objects.create(title=config.TEST_TITLE)
+        self.accounts = [
+            BankAccount.objects.create(balance=Decimal('100.00'), bank=self.bank, client=self.client_instance)
+            for _ in range(2)
+        ]
+        Transaction.objects.bulk_create(
+            Transaction(
+                initializer=self.client_instance,
+                amount=Decimal('1.00'),
+                transaction_date=FIRST_DAY + timedelta(days=day),
+                from_bank_account_id=self.accounts[0],
+                to_bank_account_id=self.accounts[1],
+            )
+            for day in range(config.MANY_ROWS)
+        )
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(user=self.user)
+
+    def test_compact_listing_pages(self):
+        """Test that compact pages carry raw ids and follow the same cursors as full pages."""
+        full = self.api_client.get('/api/transaction/', {'page_size': PAGE_SIZE}).json()
+        compact_query = {'page_size': PAGE_SIZE, 'format': 'compact'}
+        compact = self.api_client.get('/api/transaction/', compact_query).json()
+        self.assertEqual(
+            [row['id'] for row in compact['results']],
+            [row['url'].rstrip('/').rsplit('/', 1)[-1] for row in full['results']],
+        )
+        row = compact['results'][0]
+        self.assertNotIn('url', row)
+        self.assertEqual(row['initializer'], str(self.client_instance.id))
+        self.assertEqual(row['from_bank_account_id'], str(self.accounts[0].id))
+        self.assertEqual(row['transaction_date'], '2024-01-06')
+        next_page = self.api_client.get(compact['next']).json()
+        self.assertEqual(next_page['results'][0]['transaction_date'], '2024-01-04')
+
+    def test_accept_profile_and_objects(self):
+        """Test the Accept profile and compact objects, and that clients hide their user."""
+        response = self.api_client.get('/api/bank_account/', headers={'Accept': COMPACT_ACCEPT})
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(
+            sorted(row['id'] for row in response.json()),
+            sorted(str(account.id) for account in self.accounts),
+        )
+        self.assertEqual(response.json()[0]['bank'], str(self.bank.id))
+        client = self.api_client.get(f'/api/client/{self.client_instance.id}/?format=compact').json()
+        self.assertEqual(client, {'id': str(self.client_instance.id), **config.CLIENT_BUSIK})
+        self.assertIn('url', self.api_client.get('/api/bank/').json()[0])
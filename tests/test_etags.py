@@ -0,0 +1,127 @@
+"""File with tests of row versions and conditional requests of the REST API."""
+
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from banks_app import transfers
+from banks_app.models import Bank, BankAccount, BankClient, Client, Transaction
+from tests import config
+
+
+class RowVersionTest(TestCase):
+    """Tests of the version columns bumped by the database."""
+
+    def setUp(self):
+        """Create two accounts of a client in a bank."""
+        self.user = User.objects.create_user(username='user', password=config.TEST_PASSWORD)
+        self.client_instance = Client.objects.create(user=self.user, **config.CLIENT_BUSIK)
+        self.bank = Bank.objects.create(title=config.TEST_TITLE)
+        self.accounts = [
+            BankAccount.objects.create(balance=Decimal('100.00'), bank=self.bank, client=self.client_instance)
+            for _ in range(2)
+        ]
+
+    def version_of(self, instance):
+        """
+        Read the version of an object from the database.
+
+        Args:
+            instance (Model): The object.
+
+        Returns:
+            int: The version.
+        """
+        return type(instance).objects.values_list('version', flat=True).get(pk=instance.pk)
+
+    def test_writes_bump_versions(self):
+        """Test that saves, F() updates and bulk updates of balances bump the versions."""
+        self.assertEqual(self.version_of(self.bank), 1)
+        self.bank.title = 'Renamed'
+        self.bank.save()
+        self.assertEqual(self.version_of(self.bank), 2)
+        transfers.transfer(Transaction(
+            initializer=self.client_instance,
+            amount=Decimal('10.00'),
+            from_bank_account_id=self.accounts[0],
+            to_bank_account_id=self.accounts[1],
+        ))
+        self.assertEqual([self.version_of(account) for account in self.accounts], [2, 2])
+        transfers.transfer_many([Transaction(
+            initializer=self.client_instance,
+            amount=Decimal('5.00'),
+            from_bank_account_id=self.accounts[1],
+            to_bank_account_id=self.accounts[0],
+        )])
+        self.assertEqual([self.version_of(account) for account in self.accounts], [3, 3])
+
+    def test_relations_bump_versions(self):
+        """Test that adding and removing a client of a bank bumps both of them."""
+        relation = BankClient.objects.create(bank=self.bank, client=self.client_instance)
+        self.assertEqual((self.version_of(self.bank), self.version_of(self.client_instance)), (2, 2))
+        relation.delete()
+        self.assertEqual((self.version_of(self.bank), self.version_of(self.client_instance)), (3, 3))
+
+
+class ConditionalRequestTest(TestCase):
+    """Tests of ETags and If-None-Match of listings and objects."""
+
+    def setUp(self):
+        """Create an account of a client in a bank."""
+        self.user = User.objects.create_superuser(username='admin', password=config.TEST_PASSWORD)
+        self.client_instance = Client.objects.create(user=self.user, **config.CLIENT_BUSIK)
+        self.bank = Bank.objects.create(title=config.TEST_TITLE)
+        self.account = BankAccount.objects.create(
+            balance=Decimal('100.00'), bank=self.bank, client=self.client_instance,
+        )
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(user=self.user)
+
+    def get(self, path, etag, query=None):
+        """
+        Get a resource conditionally and capture the queries.
+
+        Args:
+            path (str): Path of the resource.
+            etag (str): ETag sent in If-None-Match.
+            query (dict): Query parameters.
+
+        Returns:
+            tuple: The response and the SQL of the queries.
+        """
+        queries = CaptureQueriesContext(connection)
+        with queries:
+            response = self.api_client.get(path, query, headers={'If-None-Match': etag})
+        return response, [query_info['sql'] for query_info in queries.captured_queries]
+
+    def test_not_modified(self):
+        """Test that unchanged resources are answered with one query and no body."""
+        for path in ('/api/bank/', f'/api/bank/{self.bank.id}/', '/api/client/', '/api/bank_account/'):
+            etag = self.api_client.get(path)['ETag']
+            self.assertTrue(etag.startswith('W/"'))
+            response, statements = self.get(path, etag)
+            self.assertEqual(response.status_code, config.NOT_MODIFIED)
+            self.assertEqual(response['ETag'], etag)
+            self.assertFalse(response.content)
+            self.assertEqual(len(statements), 1)
+            self.assertNotIn('title', statements[0])
+
+    def test_changes_and_variants(self):
+        """Test that writes, expanded relations and representations change the ETag."""
+        path = f'/api/bank_account/{self.account.id}/'
+        etag = self.api_client.get(path)['ETag']
+        self.assertNotEqual(self.api_client.get(path, {'format': 'compact'})['ETag'], etag)
+        self.api_client.patch(path, {'balance': '50.00'})
+        response, _ = self.get(path, etag)
+        self.assertEqual(response.status_code, config.OK)
+        self.assertEqual(response.json()['balance'], '50.00')
+        expanded = {'expand': 'bank'}
+        etag = self.api_client.get(path, expanded)['ETag']
+        self.assertEqual(self.get(path, etag, expanded)[0].status_code, config.NOT_MODIFIED)
+        Bank.objects.filter(pk=self.bank.pk).update(title='Renamed')
+        self.assertEqual(self.get(path, etag, expanded)[0].status_code, config.OK)
+        self.assertEqual(self.api_client.get('/api/bank_account/not-a-uuid/').status_code, config.NOT_FOUND)
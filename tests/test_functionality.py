@@ -1,15 +1,22 @@
 """File with tests on functionality."""
 
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from decimal import Decimal
 
+import django
 from bs4 import BeautifulSoup
 from django.contrib.auth.models import User
+from django.db import connection
+from django.test import AsyncClient
 from django.test import Client as TestClient
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
-from banks_app.models import Bank, BankAccount, Client, Transaction
+from banks_app import page_cache
+from banks_app.models import Bank, BankAccount, BankClient, Client, Transaction
 from tests import config
 
 
@@ -57,6 +64,22 @@ class ViewsTestCase(TestCase):
         )
         self.client.login(username='testuser', password=config.TEST_PASSWORD)
 
+    def test_clients_view_paginated(self):
+        """Test that the list of clients is shown a page at a time, ordered by name."""
+        for username, last_name in (('second', 'Adams'), ('third', 'Zimmer')):
+            Client.objects.create(
+                user=User.objects.create_user(username=username, password=config.TEST_PASSWORD),
+                first_name='Test', last_name=last_name, phone='+70000000000',
+            )
+        response = self.client.get(reverse('clients'), {'page_size': 2})
+        self.assertEqual([client.last_name for client in response.context['clients']], ['Adams', 'User'])
+        next_cursor = response.context['page_obj'].next_cursor
+        self.assertContains(response, f'?page_size=2&amp;cursor={next_cursor}')
+        response = self.client.get(reverse('clients'), {'page_size': 2, 'cursor': next_cursor})
+        self.assertEqual([client.last_name for client in response.context['clients']], ['Zimmer'])
+        self.assertIsNone(response.context['page_obj'].next_cursor)
+        self.assertEqual(self.client.get(reverse('clients'), {'cursor': 'bad'}).status_code, config.NOT_FOUND)
+
     def test_profile_view(self):
         """Test profile view to ensure it returns correct status code, template, and data."""
         response = self.client.get(reverse('profile'))
@@ -180,6 +203,34 @@ class ViewsTestCase(TestCase):
             BankAccount.objects.get(pk=self.to_bank_account.id).balance, Decimal('600.0'),
         )
 
+    def test_confirm_transaction_insufficient_funds(self):
+        """Test the confirm transaction view to ensure an overdraft is rejected."""
+        self.new_user = User.objects.create_user(username='newuser', password=config.TEST_PASSWORD)
+        self.client_user2 = Client.objects.create(
+            user=self.new_user, first_name='Test', last_name='User', phone='+70000000000',
+        )
+        self.to_bank_account = BankAccount.objects.create(
+            balance=config.BALANCE, bank=self.bank, client=self.client_user2,
+        )
+        self.client.post(
+            reverse('create_transaction'), {
+                'from_bank_account_id': self.bank_account.id,
+                'to_bank_account_uuid': self.to_bank_account.id,
+            },
+        )
+        response = self.client.post(
+            reverse('confirm_transaction'), {
+                'transaction_date': timezone.now().date(),
+                'amount': '5000.0',
+            },
+        )
+        self.assertEqual(response.status_code, config.OK)
+        self.assertFormError(response.context['form'], 'amount', 'Insufficient funds in your account')
+        self.assertEqual(
+            BankAccount.objects.get(pk=self.bank_account.id).balance, Decimal('1000.0'),
+        )
+        self.assertFalse(Transaction.objects.exists())
+
     def test_user_transaction_list_view(self):
         """Test the user transaction list view to ensure it returns the correct status code and template."""
         response = self.client.get(reverse('user_transactions'))
@@ -205,6 +256,27 @@ class ViewsTestCase(TestCase):
         self.assertEqual(response.status_code, config.OK)
         self.assertTemplateUsed(response, 'pages/transactions.html')
 
+    def test_transactions_view_pagination(self):
+        """Test the transactions view to ensure it renders one page with a link to the next one."""
+        for _ in range(3):
+            Transaction.objects.create(
+                initializer=self.client_user,
+                amount=100,
+                transaction_date='2023-01-01',
+                from_bank_account_id=self.bank_account,
+                to_bank_account_id=self.bank_account,
+            )
+        response = self.client.get(reverse('transactions'), {'page_size': 2})
+        self.assertEqual(len(response.context['transactions']), 2)
+        self.assertIsNone(response.context['page_obj'].previous_cursor)
+        next_cursor = response.context['page_obj'].next_cursor
+        self.assertContains(response, f'?page_size=2&amp;cursor={next_cursor}')
+        response = self.client.get(reverse('transactions'), {'page_size': 2, 'cursor': next_cursor})
+        self.assertEqual(len(response.context['transactions']), 1)
+        self.assertIsNone(response.context['page_obj'].next_cursor)
+        response = self.client.get(reverse('transactions'), {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, config.NOT_FOUND)
+
     def test_bank_accounts_view(self):
         """Test the bank accounts view to ensure it returns the correct status code and template."""
         response = self.client.get(reverse('bank_accounts'))
@@ -282,3 +354,156 @@ class ViewsTestCase(TestCase):
         response = self.client.get(reverse('client_detail', args=[self.client_user.pk]))
         self.assertEqual(response.status_code, config.OK)
         self.assertTemplateUsed(response, 'pages/client_detail.html')
+
+
+class QueryBudgetTestCase(TestCase):
+    """Test that the HTML views stay within their query budgets with many rows."""
+
+    def setUp(self):
+        """Create a logged in client and several rows of every model."""
+        self.client = TestClient()
+        self.user = User.objects.create_user(username='testuser', password=config.TEST_PASSWORD)
+        self.bank = Bank.objects.create(title='Test Bank', foundation_date='2023-01-01')
+        self.client_user = Client.objects.create(
+            user=self.user, first_name='Test', last_name='User', phone='+70000000000',
+        )
+        self.bank_account = BankAccount.objects.create(
+            balance=1000, bank=self.bank, client=self.client_user,
+        )
+        self.client_user.banks.add(self.bank)
+        for number in range(config.MANY_ROWS):
+            user = User.objects.create_user(username=f'user{number}', password=config.TEST_PASSWORD)
+            other_client = Client.objects.create(
+                user=user, first_name='Other', last_name='User', phone='+70000000001',
+            )
+            other_client.banks.add(self.bank, Bank.objects.create(title=f'Bank {number}'))
+            account = BankAccount.objects.create(balance=1000, bank=self.bank, client=other_client)
+            BankAccount.objects.create(balance=1000, bank=self.bank, client=self.client_user)
+            Transaction.objects.create(
+                initializer=self.client_user,
+                amount=1,
+                from_bank_account_id=self.bank_account,
+                to_bank_account_id=account,
+            )
+        self.client.login(username='testuser', password=config.TEST_PASSWORD)
+
+    def test_list_views_within_budget(self):
+        """Test the list views, a budget violation or an N+1 pattern fails the request."""
+        for name in ('profile', 'clients', 'transactions', 'user_transactions', 'bank_accounts', 'banks'):
+            response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, config.OK)
+
+    def test_detail_views_within_budget(self):
+        """Test the detail views, a budget violation or an N+1 pattern fails the request."""
+        views = {
+            'bank_detail': self.bank.pk,
+            'client_detail': self.client_user.pk,
+            'transaction_detail': Transaction.objects.first().pk,
+        }
+        for name, pk in views.items():
+            response = self.client.get(reverse(name, args=[pk]))
+            self.assertEqual(response.status_code, config.OK)
+
+
+class PageCacheTestCase(TestCase):
+    """Test the signal-invalidated cache of bank and client pages."""
+
+    def setUp(self):
+        """Create a logged in client related to a bank and start with an empty page cache."""
+        page_cache.get_cache().clear()
+        self.client = TestClient()
+        self.user = User.objects.create_user(username='testuser', password=config.TEST_PASSWORD)
+        self.bank = Bank.objects.create(title='Test Bank', foundation_date='2023-01-01')
+        self.client_user = Client.objects.create(user=self.user, **config.CLIENT_BUSIK)
+        self.client_user.banks.add(self.bank)
+        self.client.login(username='testuser', password=config.TEST_PASSWORD)
+
+    def get_page(self, name, *args):
+        """
+        Request a page and return its text.
+
+        Args:
+            name (str): Name of the URL.
+            args: Arguments of the URL.
+
+        Returns:
+            str: Content of the page.
+        """
+        response = self.client.get(reverse(name, args=args))
+        self.assertEqual(response.status_code, config.OK)
+        return response.content.decode()
+
+    def test_pages_are_cached(self):
+        """Test that repeated requests are served from the cache without querying banks tables."""
+        pages = (('banks',), ('bank_detail', self.bank.pk), ('client_detail', self.client_user.pk))
+        for page in pages:
+            self.get_page(*page)
+        with CaptureQueriesContext(connection) as queries:
+            cached = [self.get_page(*cached_page) for cached_page in pages]
+            self.assertFalse([
+                query for query in queries.captured_queries
+                if '"banks".' in query['sql'] and 'FROM "auth_user"' not in query['sql']
+            ])
+        self.assertEqual(page_cache.get_stats(), {'hits': 3, 'misses': 3})
+        self.assertIn('<title>Test Bank Details</title>', cached[1])
+        self.assertIn(config.CLIENT_BUSIK['phone'], cached[1])
+
+    def test_changes_invalidate_pages(self):
+        """Test that saving and deleting banks, clients and relations invalidates their pages."""
+        self.get_page('banks')
+        self.get_page('bank_detail', self.bank.pk)
+        self.get_page('client_detail', self.client_user.pk)
+
+        self.bank.title = 'Renamed Bank'
+        self.bank.save()
+        self.assertIn('Renamed Bank', self.get_page('banks'))
+        self.assertIn('Renamed Bank', self.get_page('client_detail', self.client_user.pk))
+
+        self.client_user.first_name = 'Barsik'
+        self.client_user.save()
+        self.assertIn('Barsik', self.get_page('bank_detail', self.bank.pk))
+
+        other_user = User.objects.create_user(username='other', password=config.TEST_PASSWORD)
+        other_client = Client.objects.create(user=other_user, **config.CLIENT_STESHA)
+        self.bank.clients.add(other_client)
+        self.assertIn('Stesha', self.get_page('bank_detail', self.bank.pk))
+        BankClient.objects.filter(client=other_client).delete()
+        self.assertNotIn('Stesha', self.get_page('bank_detail', self.bank.pk))
+
+        self.client_user.banks.clear()
+        self.assertNotIn('Renamed Bank', self.get_page('client_detail', self.client_user.pk))
+        Bank.objects.create(title='New Bank')
+        self.assertIn('New Bank', self.get_page('banks'))
+
+    def test_invalidation_seen_by_other_workers(self):
+        """Test that a page invalidated by another worker process is not served from the cache."""
+        self.get_page('bank_detail', self.bank.pk)
+        Bank.objects.filter(pk=self.bank.pk).update(title='Renamed Bank')
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=django.setup) as worker:
+            worker.submit(page_cache.invalidate, page_cache.BANK, [self.bank.pk]).result()
+        self.assertIn('Renamed Bank', self.get_page('bank_detail', self.bank.pk))
+
+    def test_superuser_pages_and_stats(self):
+        """Test that superusers bypass the cache and can read its counters."""
+        User.objects.create_superuser(username='admin', password=config.TEST_PASSWORD)
+        self.client.login(username='admin', password=config.TEST_PASSWORD)
+        self.assertIn('Delete Bank', self.get_page('banks'))
+        self.assertIn('Delete Bank', self.get_page('banks'))
+        response = self.client.get(reverse('page_cache_stats'))
+        self.assertEqual(response.json(), {'hits': 0, 'misses': 0})
+
+    async def test_detail_pages_through_async_handler(self):
+        """Test that detail pages are rendered and cached by the async handler."""
+        async_client = AsyncClient()
+        await async_client.aforce_login(self.user)
+        for _ in range(2):
+            response = await async_client.get(reverse('bank_detail', args=[self.bank.pk]))
+            self.assertEqual(response.status_code, config.OK)
+            self.assertIn(config.CLIENT_BUSIK['phone'], response.content.decode())
+            self.assertIn('Logout', response.content.decode())
+        response = await async_client.get(reverse('client_detail', args=[self.client_user.pk]))
+        self.assertIn('Test Bank', response.content.decode())
+        response = await async_client.get(reverse('client_detail', args=[self.bank.pk]))
+        self.assertEqual(response.status_code, config.NOT_FOUND)
+        self.assertEqual(page_cache.get_stats(), {'hits': 1, 'misses': 3})
@@ -0,0 +1,196 @@
+"""File with tests of idempotency keys of transfers."""
+
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection, connections
+from django.db.transaction import atomic
+from django.http import HttpResponse
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from banks_app import idempotency
+from banks_app.models import Bank, BankAccount, Client, Transaction
+from tests import config
+
+IN_FLIGHT_SECONDS = 0.5
+
+
+class IdempotencyTestMixin:
+    """Accounts of a client and a helper posting transfers through the API."""
+
+    def create_accounts(self):
+        """Create a user with a client and two accounts."""
+        self.user = User.objects.create_user(username='user', password=config.TEST_PASSWORD)
+        self.client_instance = Client.objects.create(user=self.user, **config.CLIENT_BUSIK)
+        self.bank = Bank.objects.create(title=config.TEST_TITLE)
+        self.from_account = BankAccount.objects.create(
+            balance=Decimal('1000.00'), bank=self.bank, client=self.client_instance,
+        )
+        self.to_account = BankAccount.objects.create(
+            balance=Decimal('0.00'), bank=self.bank, client=self.client_instance,
+        )
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(user=self.user)
+
+    def transfer_body(self, amount='100.00'):
+        """
+        Build the body of a transfer between the accounts.
+
+        Args:
+            amount (str): Amount of the transfer.
+
+        Returns:
+            dict: The body.
+        """
+        return {
+            'initializer': f'/api/client/{self.client_instance.id}/',
+            'amount': amount,
+            'transaction_date': str(timezone.now().date()),
+            'from_bank_account_id': f'/api/bank_account/{self.from_account.id}/',
+            'to_bank_account_id': f'/api/bank_account/{self.to_account.id}/',
+        }
+
+    def post_transfer(self, key, amount='100.00'):
+        """
+        Post a transfer with an idempotency key.
+
+        Args:
+            key (str): The key.
+            amount (str): Amount of the transfer.
+
+        Returns:
+            rest_framework.response.Response: The response.
+        """
+        return self.api_client.post(
+            '/api/transaction/', self.transfer_body(amount), format='json', headers={'Idempotency-Key': key},
+        )
+
+
+class IdempotencyKeyTest(IdempotencyTestMixin, TestCase):
+    """Tests of stored responses of the transfer endpoints."""
+
+    def setUp(self):
+        """Create the accounts."""
+        self.create_accounts()
+
+    def test_retry_replays_stored_response(self):
+        """Test that a retry gets the stored response from one lookup without a second transfer."""
+        first = self.post_transfer('retry-key')
+        self.assertEqual(first.status_code, config.CREATED)
+        queries = CaptureQueriesContext(connection)
+        with queries:
+            retry = self.post_transfer('retry-key')
+        self.assertEqual((retry.status_code, retry.content), (config.CREATED, first.content))
+        self.assertEqual(retry[idempotency.REPLAY_HEADER], 'true')
+        statements = [query['sql'] for query in queries.captured_queries]
+        self.assertEqual(len([sql for sql in statements if 'idempotency_key' in sql]), 1)
+        self.assertFalse(any(sql.startswith('INSERT') for sql in statements))
+        self.assertEqual(Transaction.objects.count(), 1)
+        self.assertEqual(BankAccount.objects.get(pk=self.to_account.pk).balance, Decimal('100.00'))
+
+    def test_key_reuse_and_requests_without_key(self):
+        """Test that a key cannot be reused with another payload and requests without a key all run."""
+        self.assertEqual(self.post_transfer('reused-key').status_code, config.CREATED)
+        response = self.post_transfer('reused-key', amount='5.00')
+        self.assertEqual(response.status_code, idempotency.UNPROCESSABLE_ENTITY)
+        response = self.post_transfer('k' * (config.MAX_KEY_LENGTH + 1))
+        self.assertEqual(response.status_code, config.BAD_REQUEST)
+        for _ in range(2):
+            response = self.api_client.post('/api/transaction/', self.transfer_body(), format='json')
+            self.assertEqual(response.status_code, config.CREATED)
+        self.assertEqual(Transaction.objects.count(), 3)
+
+    def test_failed_request_and_expired_key_run_again(self):
+        """Test that errors are not stored and expired keys are taken over."""
+        response = self.post_transfer('failing-key', amount='5000.00')
+        self.assertEqual(response.status_code, config.BAD_REQUEST)
+        self.assertFalse(idempotency.IdempotencyKey.objects.exists())
+        self.assertEqual(self.post_transfer('failing-key').status_code, config.CREATED)
+        idempotency.IdempotencyKey.objects.update(expires=timezone.now() - timedelta(seconds=1))
+        response = self.post_transfer('failing-key')
+        self.assertNotIn(idempotency.REPLAY_HEADER, response)
+        self.assertEqual(Transaction.objects.count(), 2)
+        self.assertEqual(idempotency.purge_expired(), 0)
+        idempotency.IdempotencyKey.objects.update(expires=timezone.now())
+        self.assertEqual(idempotency.purge_expired(), 1)
+
+    def test_resubmitted_confirmation_form(self):
+        """Test that a resubmitted confirmation form transfers once and pages carry new keys."""
+        self.client.login(username='user', password=config.TEST_PASSWORD)
+        self.client.post(reverse('create_transaction'), {
+            'from_bank_account_id': self.from_account.id,
+            'to_bank_account_uuid': self.to_account.id,
+        })
+        page = self.client.get(reverse('confirm_transaction'))
+        form_key = page.context['idempotency_key']
+        self.assertIn(f'value="{form_key}"', page.content.decode())
+        next_page = self.client.get(reverse('confirm_transaction'))
+        self.assertNotEqual(next_page.context['idempotency_key'], form_key)
+        form = {
+            'transaction_date': timezone.now().date(),
+            'amount': '100.0',
+            'idempotency_key': form_key,
+        }
+        for _ in range(2):
+            response = self.client.post(reverse('confirm_transaction'), form)
+            self.assertEqual(response.status_code, config.TEMPORARY_REDIRECT)
+            self.assertEqual(response['Location'], reverse('profile'))
+        self.assertEqual(Transaction.objects.count(), 1)
+
+
+class ConcurrentIdempotencyTest(IdempotencyTestMixin, TransactionTestCase):
+    """Tests of duplicates sent while the first request is still handled."""
+
+    available_apps = [
+        'banks_app', 'django.contrib.auth', 'django.contrib.contenttypes', 'rest_framework.authtoken',
+    ]
+
+    def setUp(self):
+        """Create the accounts."""
+        self.create_accounts()
+
+    def tearDown(self):
+        """Delete the bank, the flush does not see the banks schema."""
+        Bank.objects.all().delete()
+
+    def hold_key(self, key, claimed):
+        """
+        Claim a key like a slow request does, and store a response after a while.
+
+        Args:
+            key (str): The key.
+            claimed (threading.Event): Set once the key is claimed.
+        """
+        request = APIRequestFactory().post('/api/transaction/', self.transfer_body(), format='json')
+        request = Request(request, parsers=[JSONParser()])
+        with atomic():
+            key_id = idempotency.claim_key(
+                self.user.pk, 'transaction-create', key, idempotency.request_fingerprint(request),
+            )
+            claimed.set()
+            time.sleep(IN_FLIGHT_SECONDS)
+            response = HttpResponse(b'{"first": true}', status=config.CREATED)
+            idempotency.store_response(key_id, response)
+        connections.close_all()
+
+    def test_duplicate_waits_for_in_flight_request(self):
+        """Test that a duplicate waits for the first request and replays its response."""
+        claimed = threading.Event()
+        holder = threading.Thread(target=self.hold_key, args=('in-flight-key', claimed))
+        holder.start()
+        claimed.wait()
+        started = time.monotonic()
+        response = self.post_transfer('in-flight-key')
+        holder.join()
+        self.assertGreaterEqual(time.monotonic() - started, IN_FLIGHT_SECONDS / 2)
+        self.assertEqual((response.status_code, response.content), (config.CREATED, b'{"first": true}'))
+        self.assertFalse(Transaction.objects.exists())
@@ -0,0 +1,98 @@
+"""File with EXPLAIN regression tests for the hot queries."""
+
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+
+from banks_app.models import Bank, BankAccount, BankClient, Client, Transaction
+from banks_app.pagination import TRANSACTION_ORDERING, keyset_condition
+
+LIST_LIMIT = 50
+
+
+class HotQueryPlanTest(TestCase):
+    """Check that the hot queries are answered by index scans."""
+
+    def setUp(self):
+        """Create a few rows and forbid sequential scans wherever an index can be used."""
+        user = User.objects.create_user(username='user', password='user')
+        self.client_instance = Client.objects.create(
+            user=user, first_name='Test', last_name='User', phone='+70000000000',
+        )
+        self.bank = Bank.objects.create(title='Test Bank')
+        self.account = BankAccount.objects.create(
+            balance=Decimal('1000.00'), bank=self.bank, client=self.client_instance,
+        )
+        self.transaction = Transaction.objects.create(
+            initializer=self.client_instance,
+            amount=Decimal('1.00'),
+            from_bank_account_id=self.account,
+            to_bank_account_id=self.account,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assert_index_scan(self, queryset, index_name=None):
+        """
+        Assert that the plan of a query has no sequential scan.
+
+        Args:
+            queryset (QuerySet): The query to explain.
+            index_name (str): Name of an index that the plan must use.
+        """
+        plan = queryset.explain()
+        self.assertNotIn('Seq Scan', plan, plan)
+        if index_name:
+            self.assertIn(index_name, plan, plan)
+
+    def test_transactions_by_initializer(self):
+        """Test the listing of transactions initiated by a client."""
+        self.assert_index_scan(
+            Transaction.objects.filter(
+                initializer=self.client_instance,
+            ).order_by(*TRANSACTION_ORDERING)[:LIST_LIMIT],
+            'transaction_initializer_idx',
+        )
+
+    def test_transactions_by_from_account(self):
+        """Test the listing of transactions sent from an account."""
+        self.assert_index_scan(
+            Transaction.objects.filter(
+                from_bank_account_id=self.account,
+            ).order_by(*TRANSACTION_ORDERING)[:LIST_LIMIT],
+            'transaction_from_account_idx',
+        )
+
+    def test_transactions_by_to_account(self):
+        """Test the listing of transactions received by an account."""
+        self.assert_index_scan(
+            Transaction.objects.filter(
+                to_bank_account_id=self.account,
+            ).order_by(*TRANSACTION_ORDERING)[:LIST_LIMIT],
+            'transaction_to_account_idx',
+        )
+
+    def test_transactions_keyset_page(self):
+        """Test a page of the keyset paginated transaction listing."""
+        position = [self.transaction.transaction_date, self.transaction.id]
+        self.assert_index_scan(
+            Transaction.objects.filter(
+                keyset_condition(TRANSACTION_ORDERING, position),
+            ).order_by(*TRANSACTION_ORDERING)[:LIST_LIMIT],
+            'transaction_date_id_idx',
+        )
+
+    def test_bank_accounts_by_client_and_bank(self):
+        """Test the lookup of the delete_bank_client_relation signal."""
+        self.assert_index_scan(
+            BankAccount.objects.filter(client=self.client_instance, bank=self.bank)[:1],
+            'bank_account_client_bank_idx',
+        )
+
+    def test_bank_client_by_client_and_bank(self):
+        """Test the relation lookup of the delete_bank_client_relation signal."""
+        self.assert_index_scan(
+            BankClient.objects.filter(client=self.client_instance, bank=self.bank),
+        )
@@ -0,0 +1,124 @@
+"""File with tests of the ledger of balances."""
+
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DatabaseError, transaction
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from banks_app import ledger, models, transfers
+from tests import config
+
+
+class LedgerTest(TestCase):
+    """Tests of the entries of transfers and of the balances read from them."""
+
+    def setUp(self):
+        """Create two accounts of a client, opened with deposits."""
+        self.user = User.objects.create_superuser(username='admin', password=config.TEST_PASSWORD)
+        self.client_instance = models.Client.objects.create(user=self.user, **config.CLIENT_BUSIK)
+        bank = models.Bank.objects.create(title=config.TEST_TITLE)
+        accounts = [
+            models.BankAccount.objects.create(
+                balance=Decimal(balance), bank=bank, client=self.client_instance,
+            )
+            for balance in ('100.00', '0.00')
+        ]
+        self.first = accounts[0]
+        self.second = accounts[1]
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(user=self.user)
+
+    def payment(self, amount, from_account, to_account):
+        """
+        Build an unsaved transfer.
+
+        Args:
+            amount (str): The amount.
+            from_account (BankAccount): The source account.
+            to_account (BankAccount): The target account.
+
+        Returns:
+            Transaction: The transfer.
+        """
+        return models.Transaction(
+            initializer=self.client_instance,
+            amount=Decimal(amount),
+            from_bank_account_id=from_account,
+            to_bank_account_id=to_account,
+        )
+
+    def entries(self):
+        """
+        List the entries in the order they were appended.
+
+        Returns:
+            list[tuple]: Accounts, amounts and balances of the entries.
+        """
+        return list(models.LedgerEntry.objects.order_by('id').values_list('account', 'amount', 'balance'))
+
+    def test_transfers_append_entries(self):
+        """Test opening entries and the debit and credit entries of single and batched transfers."""
+        self.assertEqual(self.entries(), [(self.first.id, Decimal('100.00'), Decimal('100.00'))])
+        payment = transfers.transfer(self.payment('30.00', self.first, self.second))
+        transfers.transfer_many([
+            self.payment('10.00', self.second, self.first),
+            self.payment('500.00', self.first, self.second),
+            self.payment('5.00', self.second, self.second),
+        ])
+        self.assertEqual(self.entries()[1:], [
+            (self.first.id, Decimal('-30.00'), Decimal('70.00')),
+            (self.second.id, Decimal('30.00'), Decimal('30.00')),
+            (self.second.id, Decimal('-10.00'), Decimal('20.00')),
+            (self.first.id, Decimal('10.00'), Decimal('80.00')),
+            (self.second.id, Decimal('-5.00'), Decimal('15.00')),
+            (self.second.id, Decimal('5.00'), Decimal('20.00')),
+        ])
+        payment_id = payment.id
+        payment.delete()
+        self.assertEqual(models.LedgerEntry.objects.filter(transaction_id=payment_id).count(), 2)
+        self.assertEqual(ledger.audit(models.BankAccount.objects.all()), [])
+
+    def test_corrections_and_balance_at(self):
+        """Test that saved balances append corrections and that past balances are read from entries."""
+        response = self.api_client.patch(f'/api/bank_account/{self.second.id}/', {'balance': '25.00'})
+        self.assertEqual(response.status_code, config.OK)
+        self.assertEqual(self.entries()[-1], (self.second.id, Decimal('25.00'), Decimal('25.00')))
+        path = f'/api/bank_account/{self.second.id}/balance/'
+        self.assertEqual(self.api_client.get(path).json()['balance'], '25.00')
+        yesterday = timezone.now().date() - timedelta(days=1)
+        self.assertEqual(self.api_client.get(path, {'at': yesterday.isoformat()}).json()['balance'], '0.00')
+        self.assertEqual(self.api_client.get(path, {'at': 'never'}).status_code, config.BAD_REQUEST)
+
+    def test_entries_ordered_by_append(self):
+        """Test that the entries of an account follow their ids, not the clocks that stamped them."""
+        skewed = timezone.now() + timedelta(hours=1)
+        models.LedgerEntry.objects.create(
+            account=self.second, amount=Decimal('10.00'), balance=Decimal('10.00'), created=skewed,
+        )
+        models.BankAccount.objects.filter(pk=self.second.pk).update(balance=Decimal('10.00'))
+        response = self.api_client.patch(f'/api/bank_account/{self.second.id}/', {'balance': '25.00'})
+        self.assertEqual(response.status_code, config.OK)
+        self.assertEqual(self.entries()[-1], (self.second.id, Decimal('15.00'), Decimal('25.00')))
+        self.assertEqual(ledger.audit(models.BankAccount.objects.all()), [])
+        self.assertEqual(ledger.balance_at(self.second.id, skewed + timedelta(hours=1)), Decimal('25.00'))
+
+    def test_audit_and_append_only(self):
+        """Test that balances changed behind the ledger are reported and entries cannot be changed."""
+        call_command('audit_ledger', stdout=StringIO())
+        models.BankAccount.objects.filter(pk=self.first.pk).update(balance=Decimal('1.00'))
+        self.assertEqual(
+            ledger.audit(models.BankAccount.objects.all()),
+            [ledger.Drift(self.first.id, None, Decimal('1.00'), Decimal('100.00'))],
+        )
+        with self.assertRaises(CommandError):
+            call_command('audit_ledger', str(self.first.id), stderr=StringIO())
+        with self.assertRaises(DatabaseError):
+            with transaction.atomic():
+                models.LedgerEntry.objects.update(amount=Decimal('0.00'))
@@ -0,0 +1,164 @@
+"""File with tests of the monthly partitions of transactions."""
+
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from banks_app import bank_stats, models, partitions
+from tests import config
+
+PARTITION_OF = (
+    'SELECT child.relname FROM "banks"."transaction" payment '
+    'JOIN pg_class child ON child.oid = payment.tableoid WHERE payment.id = %s'
+)
+PARTITION_ROWS = 'SELECT count(*) FROM "banks"."{0}"'  # noqa: S608
+MID_MONTH_DAYS = 14
+
+
+def partition_name(month):
+    """
+    Get the name of the partition of a month.
+
+    Args:
+        month (date): A day of the month.
+
+    Returns:
+        str: Name of the partition table.
+    """
+    return f'transaction_{month:%Y_%m}'
+
+
+class PartitionTest(TestCase):
+    """Tests of routing of transactions to partitions, of their maintenance and of pruning."""
+
+    def setUp(self):
+        """Create an account of a client and transfers of this month, of an old and of a future month."""
+        self.user = User.objects.create_superuser(username='admin', password=config.TEST_PASSWORD)
+        client_instance = models.Client.objects.create(user=self.user, **config.CLIENT_BUSIK)
+        self.account = models.BankAccount.objects.create(
+            balance=Decimal('100.00'), bank=models.Bank.objects.create(title=config.TEST_TITLE),
+            client=client_instance,
+        )
+        self.today = timezone.now().date()
+        self.this_month = partitions.month_start(self.today)
+        self.old_day = partitions.add_months(self.this_month, -2) + timedelta(days=MID_MONTH_DAYS)
+        self.future_day = partitions.add_months(self.this_month, 6) + timedelta(days=2)
+        self.payments = models.Transaction.objects.bulk_create(
+            models.Transaction(
+                initializer=client_instance,
+                amount=Decimal('1.00'),
+                transaction_date=day,
+                from_bank_account_id=self.account,
+                to_bank_account_id=self.account,
+            )
+            for day in (self.today, self.old_day, self.future_day)
+        )
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(user=self.user)
+
+    def partitions_of_payments(self):
+        """
+        Get the partitions storing the transfers.
+
+        Returns:
+            list[str]: Names of the partitions, in the order of the transfers.
+        """
+        names = []
+        with connection.cursor() as cursor:
+            for payment in self.payments:
+                cursor.execute(PARTITION_OF, [payment.id])
+                names.append(cursor.fetchone()[0])
+        return names
+
+    def scanned_partitions(self, statements):
+        """
+        Explain the statements reading transactions and collect the scanned partitions.
+
+        Args:
+            statements (list[str]): SQL of executed statements.
+
+        Returns:
+            set[str]: Names of the partitions in the plans.
+        """
+        names = {partition.name for partition in partitions.list_partitions()}
+        plans = []
+        with connection.cursor() as cursor:
+            for statement in statements:
+                if '"banks"."transaction"' in statement and 'SELECT' in statement:
+                    cursor.execute(f'EXPLAIN {statement[statement.index("SELECT"):]}')
+                    plans.extend(row[0] for row in cursor.fetchall())
+        return {name for name in names if any(f' {name} ' in line for line in plans)}
+
+    def test_routing_and_maintenance(self):
+        """Test that months without partitions go to the default one until their partitions are created."""
+        self.assertEqual(
+            self.partitions_of_payments(),
+            [partition_name(self.today), 'transaction_default', 'transaction_default'],
+        )
+        output = StringIO()
+        call_command('maintain_partitions', '--since', str(self.old_day), '--ahead', '6', stdout=output)
+        self.assertIn('Created 5 partitions', output.getvalue())
+        self.assertEqual(
+            self.partitions_of_payments(),
+            [partition_name(self.today), partition_name(self.old_day), partition_name(self.future_day)],
+        )
+        call_command('maintain_partitions', '--ahead', '6', stdout=output)
+        self.assertIn('Created 0 partitions', output.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('maintain_partitions', '--drop')
+        with self.assertRaises(CommandError):
+            call_command('maintain_partitions', '--since', 'never')
+
+    def test_detach_old_partitions(self):
+        """Test that transfers of ended months are archived before their partitions are detached."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        call_command('maintain_partitions', '--since', str(self.old_day), stdout=StringIO())
+        bank_stats.rebuild()
+        with override_settings(TRANSACTION_ARCHIVE_DIR=directory.name):
+            detached = partitions.detach_partitions(self.this_month)
+            response = self.api_client.get(f'/api/transaction/{self.payments[1].id}/')
+            self.assertEqual(bank_stats.rebuild(check_only=True), [])
+            call_command(
+                'maintain_partitions', '--detach-before', str(self.today), '--drop', stdout=StringIO(),
+            )
+        self.assertEqual(response.status_code, config.OK)
+        self.assertIn(partition_name(self.old_day), detached)
+        self.assertNotIn(partition_name(self.today), detached)
+        self.assertFalse(models.Transaction.objects.filter(pk=self.payments[1].pk).exists())
+        months = {partition.month for partition in partitions.list_partitions()}
+        self.assertNotIn(partitions.month_start(self.old_day), months)
+        with connection.cursor() as cursor:
+            cursor.execute(PARTITION_ROWS.format(partition_name(self.old_day)))
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_date_filtered_queries_are_pruned(self):
+        """Test that the listing and the statement of a period only scan the partitions of its months."""
+        period = {'from': str(self.this_month), 'to': str(self.today)}
+        queries = CaptureQueriesContext(connection)
+        with queries:
+            response = self.api_client.get('/api/transaction/', period)
+        self.assertEqual(response.status_code, config.OK)
+        self.assertEqual([row['transaction_date'] for row in response.json()['results']], [str(self.today)])
+        statements = [query_info['sql'] for query_info in queries.captured_queries]
+        self.assertEqual(self.scanned_partitions(statements), {partition_name(self.today)})
+        with queries:
+            response = self.api_client.get(
+                f'/api/bank_account/{self.account.id}/statement/', {'format': 'csv', **period},
+            )
+            lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), 3)
+        statements = [query_info['sql'] for query_info in queries.captured_queries]
+        self.assertEqual(self.scanned_partitions(statements), {partition_name(self.today)})
+        response = self.api_client.get('/api/transaction/', {'from': 'never'})
+        self.assertEqual(response.status_code, config.BAD_REQUEST)
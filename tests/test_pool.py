@@ -0,0 +1,68 @@
+"""File with tests of the pooled database backend."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, connections
+from django.test import TestCase
+from django.urls import reverse
+
+from banks_app.pooled_postgresql.base import DatabaseWrapper
+from tests import config
+
+CHECKOUTS = 5
+
+
+def borrow_connection() -> int:
+    """
+    Run a query on the connection of the current thread and close it.
+
+    Returns:
+        int: Process id of the server backend of the connection.
+    """
+    with connections['default'].cursor() as cursor:
+        cursor.execute('SELECT pg_backend_pid()')
+        backend_pid = cursor.fetchone()[0]
+    connections['default'].close()
+    return backend_pid
+
+
+class PooledBackendTest(TestCase):
+    """Tests of connection reuse, pool configuration and pool statistics."""
+
+    def test_closed_connections_are_reused(self):
+        """Test that connections closed by requests go back to the pool and are borrowed again."""
+        requests_before = connection.pool.get_stats().get('requests_num', 0)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            backend_pids = [executor.submit(borrow_connection).result() for _ in range(CHECKOUTS)]
+        stats = connection.pool.get_stats()
+        self.assertEqual(stats['requests_num'] - requests_before, CHECKOUTS)
+        self.assertLessEqual(len(set(backend_pids)), stats['pool_size'])
+        self.assertLessEqual(stats['pool_size'], stats['pool_max'])
+
+    def test_pool_configuration(self):
+        """Test that pooling is optional and refuses persistent connections."""
+        settings_dict = {**connection.settings_dict, 'CONN_MAX_AGE': 60}
+        with self.assertRaisesMessage(ImproperlyConfigured, 'CONN_MAX_AGE'):
+            DatabaseWrapper(settings_dict, alias='persistent').pool  # noqa: WPS428
+        options = {
+            key: option_value
+            for key, option_value in connection.settings_dict['OPTIONS'].items()
+            if key != 'pool'
+        }
+        unpooled = DatabaseWrapper({**settings_dict, 'OPTIONS': options}, alias='unpooled')
+        self.assertIsNone(unpooled.pool)
+        self.assertNotIn('pool', unpooled.get_connection_params())
+
+    def test_stats_view(self):
+        """Test that admins can read the statistics of the pool."""
+        User.objects.create_user(username='user', password=config.TEST_PASSWORD)
+        self.client.login(username='user', password=config.TEST_PASSWORD)
+        self.assertEqual(self.client.get(reverse('db_pool_stats')).status_code, config.TEMPORARY_REDIRECT)
+        User.objects.create_superuser(username='admin', password=config.TEST_PASSWORD)
+        self.client.login(username='admin', password=config.TEST_PASSWORD)
+        stats = self.client.get(reverse('db_pool_stats')).json()
+        pool_options = connection.settings_dict['OPTIONS']['pool']
+        self.assertEqual(stats['default']['pool_max'], pool_options['max_size'])
+        self.assertGreaterEqual(stats['default']['pool_size'], 1)
@@ -0,0 +1,111 @@
+"""File with tests of the query budgets of views and of the detection of N+1 queries."""
+
+from django.http import HttpResponse
+from django.test import Client, TestCase, override_settings
+from django.urls import path
+
+from banks_app import config as app_config
+from banks_app.models import Bank
+from banks_app.query_budget import QueryBudgetExceededError, query_budget
+from tests import config
+
+LOGGER = 'banks_app.query_budget'
+
+
+@query_budget(1)
+def within_budget_view(request):
+    """
+    Run one query, as the budget allows.
+
+    Args:
+        request (django.http.HttpRequest): Request object.
+
+    Returns:
+        django.http.HttpResponse: Number of banks.
+    """
+    return HttpResponse(Bank.objects.count())
+
+
+@query_budget(1)
+def over_budget_view(request):
+    """
+    Run two queries with a budget of one.
+
+    Args:
+        request (django.http.HttpRequest): Request object.
+
+    Returns:
+        django.http.HttpResponse: Number of banks.
+    """
+    Bank.objects.exists()
+    return HttpResponse(Bank.objects.count())
+
+
+def n_plus_one_view(request):
+    """
+    Run the same query for every bank, without a budget.
+
+    Args:
+        request (django.http.HttpRequest): Request object.
+
+    Returns:
+        django.http.HttpResponse: Number of found banks.
+    """
+    found = [
+        Bank.objects.filter(title=f'{config.TEST_TITLE} {number}').exists()
+        for number in range(app_config.N_PLUS_ONE_THRESHOLD)
+    ]
+    return HttpResponse(sum(found))
+
+
+urlpatterns = [
+    path('within/', within_budget_view),
+    path('over/', over_budget_view),
+    path('n-plus-one/', n_plus_one_view),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class QueryBudgetTest(TestCase):
+    """Tests of QueryBudgetMiddleware in strict and in logging mode."""
+
+    def test_within_budget(self):
+        """Test that a view within its budget neither raises nor logs."""
+        with self.assertNoLogs(LOGGER):
+            response = self.client.get('/within/')
+        self.assertEqual(response.status_code, config.OK)
+
+    def test_strict_mode_raises(self):
+        """Test that going over the budget and N+1 queries raise in strict mode."""
+        with self.assertRaisesMessage(QueryBudgetExceededError, '2 queries over the budget of 1'):
+            self.client.get('/over/')
+        with self.assertRaisesMessage(QueryBudgetExceededError, 'N+1 pattern'):
+            self.client.get('/n-plus-one/')
+
+    def get_warnings(self, url):
+        """
+        Get a page and capture the warnings about its queries.
+
+        Args:
+            url (str): Path of the page.
+
+        Returns:
+            list[str]: The logged warnings.
+        """
+        with self.assertLogs(LOGGER, 'WARNING') as logs:
+            self.assertEqual(self.client.get(url).status_code, config.OK)
+            return logs.output
+
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_logging_mode_warns(self):
+        """Test that going over the budget and N+1 queries are only logged outside strict mode."""
+        self.assertIn('GET /over/: 2 queries over the budget of 1', self.get_warnings('/over/')[0])
+        warnings = self.get_warnings('/n-plus-one/')
+        self.assertIn(f'N+1 pattern, {app_config.N_PLUS_ONE_THRESHOLD} queries', warnings[0])
+
+    @override_settings(QUERY_BUDGET_ENABLED=False)
+    def test_disabled(self):
+        """Test that the middleware records nothing when query budgets are not enabled."""
+        with self.assertNoLogs(LOGGER):
+            response = Client().get('/over/')
+        self.assertEqual(response.status_code, config.OK)
@@ -0,0 +1,73 @@
+"""File with tests of the JSON and MessagePack renderers and parsers of the API."""
+
+import json
+from decimal import Decimal
+
+import msgpack
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from banks_app.models import Bank, BankAccount, Client, Transaction
+from tests import config
+
+MSGPACK = 'application/msgpack'
+
+
+class RenderersTest(TestCase):
+    """Tests of the negotiated formats of requests and responses."""
+
+    def setUp(self):
+        """Create accounts of a client."""
+        self.user = User.objects.create_superuser(username='admin', password=config.TEST_PASSWORD)
+        self.client_instance = Client.objects.create(user=self.user, **config.CLIENT_BUSIK)
+        self.bank = Bank.objects.create(title=config.TEST_TITLE)
+        self.accounts = [
+            BankAccount.objects.create(balance=Decimal('100.00'), bank=self.bank, client=self.client_instance)
+            for _ in range(2)
+        ]
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(user=self.user)
+
+    def transfer_body(self):
+        """
+        Build the body of a transfer between the accounts.
+
+        Returns:
+            dict: The body.
+        """
+        return {
+            'initializer': f'/api/client/{self.client_instance.id}/',
+            'amount': '10.00',
+            'transaction_date': str(timezone.now().date()),
+            'from_bank_account_id': f'/api/bank_account/{self.accounts[0].id}/',
+            'to_bank_account_id': f'/api/bank_account/{self.accounts[1].id}/',
+        }
+
+    def test_json_and_msgpack_documents(self):
+        """Test that both formats carry the same documents, with exact decimals in compact rows."""
+        as_json = self.api_client.get('/api/bank_account/')
+        self.assertEqual(as_json['Content-Type'], 'application/json')
+        as_msgpack = self.api_client.get('/api/bank_account/', headers={'Accept': MSGPACK})
+        self.assertEqual(as_msgpack['Content-Type'], MSGPACK)
+        self.assertEqual(msgpack.unpackb(as_msgpack.content), json.loads(as_json.content))
+        compact = self.api_client.get('/api/bank_account/?format=compact').json()
+        self.assertEqual(compact[0]['balance'], '100.00')
+        compact = self.api_client.get('/api/bank_account/', headers={'Accept': f'{MSGPACK}; profile=compact'})
+        self.assertEqual(msgpack.unpackb(compact.content)[0]['bank'], str(self.bank.id))
+        browsable = self.api_client.get('/api/bank/', headers={'Accept': 'text/html'})
+        self.assertContains(browsable, config.TEST_TITLE)
+
+    def test_request_bodies(self):
+        """Test transfers sent as JSON and as MessagePack, and malformed bodies."""
+        response = self.api_client.post(
+            '/api/transaction/', msgpack.packb(self.transfer_body()), content_type=MSGPACK,
+        )
+        self.assertEqual(response.status_code, config.CREATED)
+        response = self.api_client.post('/api/transaction/batch/', [self.transfer_body()], format='json')
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(Transaction.objects.count(), 2)
+        for body, content_type in ((b'{"amount": ', 'application/json'), (b'\xc1', MSGPACK)):
+            response = self.api_client.post('/api/bank/', body, content_type=content_type)
+            self.assertEqual(response.status_code, config.BAD_REQUEST)
@@ -0,0 +1,118 @@
+"""File with tests of the ``?q=`` search of clients and transactions."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from banks_app.models import Bank, BankAccount, Client, Transaction
+from tests import config
+
+PAGE_SIZE = 2
+FIRST_DAY = date.fromisoformat('2024-01-01')
+CLIENT_NAMES = (
+    ('Kosh', 'Exact', '+70000000001'),
+    ('Busik', 'Koshechkin', '+70000000002'),
+    ('Marusya', 'Makoshina', '+70000000003'),
+    ('Stesha', 'Ptichkina', '+79195169405'),
+)
+DESCRIPTIONS = (
+    'coffee beans',
+    'coffee and coffee again',
+    'green tea',
+    'coffee with tea',
+)
+
+
+class SearchTest(TestCase):
+    """Tests of matching, ranking and pagination of searched listings."""
+
+    def setUp(self):
+        """Create clients with similar names and transfers with descriptions."""
+        self.user = User.objects.create_superuser(username='admin', password=config.TEST_PASSWORD)
+        self.clients = [
+            Client.objects.create(
+                user=User.objects.create_user(username=last_name, password=config.TEST_PASSWORD),
+                first_name=first_name,
+                last_name=last_name,
+                phone=phone,
+            )
+            for first_name, last_name, phone in CLIENT_NAMES
+        ]
+        account = BankAccount.objects.create(
+            balance=Decimal('100.00'), bank=Bank.objects.create(title=config.TEST_TITLE),
+            client=self.clients[0],
+        )
+        self.payments = Transaction.objects.bulk_create(
+            Transaction(
+                initializer=self.clients[0],
+                amount=Decimal('1.00'),
+                transaction_date=FIRST_DAY + timedelta(days=day),
+                description=description,
+                from_bank_account_id=account,
+                to_bank_account_id=account,
+            )
+            for day, description in enumerate(DESCRIPTIONS)
+        )
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(user=self.user)
+
+    def test_clients_ranked_by_match(self):
+        """Test that clients are found by fragments, exact matches first, and paginated by rank."""
+        response = self.api_client.get('/api/client/', {'q': 'KOSH', 'page_size': PAGE_SIZE})
+        self.assertEqual(response.status_code, config.OK)
+        first_page = response.json()
+        self.assertEqual([row['last_name'] for row in first_page['results']], ['Exact', 'Koshechkin'])
+        second_page = self.api_client.get(first_page['next']).json()
+        self.assertEqual([row['last_name'] for row in second_page['results']], ['Makoshina'])
+        self.assertIsNone(second_page['next'])
+        response = self.api_client.get('/api/client/', {'q': '5169', 'fields': 'first_name'})
+        self.assertEqual(response.json()['results'], [{'first_name': 'Stesha'}])
+        response = self.api_client.get('/api/client/', {'q': 'ko'})
+        self.assertEqual(response.status_code, config.BAD_REQUEST)
+        self.assertIn('q', response.json())
+        self.assertEqual(len(self.api_client.get('/api/client/').json()), len(CLIENT_NAMES))
+
+    def test_transactions_ranked_by_words(self):
+        """Test that transactions are found by words of web search syntax and ranked by frequency."""
+        response = self.api_client.get('/api/transaction/', {'q': 'coffee', 'fields': 'description'})
+        self.assertEqual(response.status_code, config.OK)
+        descriptions = [row['description'] for row in response.json()['results']]
+        self.assertEqual(descriptions[0], 'coffee and coffee again')
+        self.assertEqual(sorted(descriptions[1:]), ['coffee beans', 'coffee with tea'])
+        response = self.api_client.get('/api/transaction/', {'q': 'coffee -tea', 'fields': 'description'})
+        self.assertEqual(len(response.json()['results']), 2)
+        self.assertNotIn({'description': 'coffee with tea'}, response.json()['results'])
+        response = self.api_client.get('/api/transaction/', {'q': '"green tea"', 'fields': 'description'})
+        self.assertEqual(response.json()['results'], [{'description': 'green tea'}])
+        response = self.api_client.get('/api/transaction/', {'q': 'coffee', 'cursor': 'broken'})
+        self.assertEqual(response.status_code, config.NOT_FOUND)
+
+    def test_transaction_search_uses_index(self):
+        """Test that the search of descriptions is planned on the GIN index of the partitions."""
+        queries = CaptureQueriesContext(connection)
+        with queries:
+            self.api_client.get('/api/transaction/', {'q': 'coffee'})
+        statement = queries.captured_queries[-1]['sql']
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {statement}')
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+        self.assertIn('transaction_search_idx', plan)
+
+    def test_search_box(self):
+        """Test that the HTML list of clients is filtered by the search box and keeps it filled."""
+        self.client.login(username='admin', password=config.TEST_PASSWORD)
+        response = self.client.get('/clients/', {'q': 'kosh', 'page_size': PAGE_SIZE})
+        self.assertEqual(response.status_code, config.OK)
+        self.assertContains(response, 'value="kosh"')
+        self.assertContains(response, 'Koshechkin')
+        self.assertNotContains(response, 'Makoshina')
+        self.assertContains(response, '?q=kosh&amp;page_size=2&amp;cursor=')
+        response = self.client.get('/clients/', {'q': 'ko'})
+        self.assertContains(response, 'Enter from')
+        self.assertContains(response, 'Ptichkina')
@@ -0,0 +1,71 @@
+"""File with tests of the serve command and the warm-up of server processes."""
+
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from pathlib import Path
+from uuid import UUID
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import get_resolver, reverse
+
+from banks_app import warmup
+from banks_app.management.commands import serve
+
+TEMPLATES = Path(__file__).resolve().parent.parent / 'banks_app' / 'templates'
+WORKERS = 3
+THREADS = 2
+
+
+class WarmUpTest(TestCase):
+    """Tests of the warm-up steps."""
+
+    def test_templates_and_routes(self):
+        """Test that every template is compiled and every route of banks_app is resolved."""
+        self.assertEqual(warmup.compile_templates(), len(list(TEMPLATES.rglob('*.html'))))
+        paths = set(warmup.sample_paths(get_resolver()))
+        self.assertIn(reverse('bank_detail', args=[UUID(int=0)]), paths)
+        self.assertIn('/api/bank_account/sample/statement/', paths)
+        self.assertIn(reverse('rest_framework:login'), paths)
+        self.assertGreaterEqual(warmup.resolve_routes(), len(paths) // 2)
+
+    def test_open_connections(self):
+        """Test that a worker fills the connection pool before accepting requests."""
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            self.assertEqual(executor.submit(warmup.open_connections).result(), 1)
+        stats = connection.pool.get_stats()
+        self.assertGreaterEqual(stats['pool_size'], stats['pool_min'])
+
+
+class ServerApplicationTest(SimpleTestCase):
+    """Tests of the configuration of the pre-forked server."""
+
+    def test_configuration(self):
+        """Test that both worker classes preload their application and run the warm-up, ASGI by default."""
+        worker_classes = (
+            ({}, serve.ASGI_WORKER_CLASS, ASGIHandler),
+            ({'worker_class': serve.WSGI_WORKER_CLASS}, serve.WSGI_WORKER_CLASS, WSGIHandler),
+        )
+        for options, worker_class, handler_class in worker_classes:
+            with self.subTest(worker_class=worker_class):
+                output = StringIO()
+                application = serve.ServerApplication(
+                    {'bind': '127.0.0.1:0', 'workers': WORKERS, 'threads': THREADS, **options}, output,
+                )
+                self.assertEqual(application.cfg.worker_class_str, worker_class)
+                self.assertEqual((application.cfg.workers, application.cfg.threads), (WORKERS, THREADS))
+                self.assertTrue(application.cfg.preload_app)
+                self.assertIs(application.cfg.post_worker_init, serve.warm_up_worker)
+                self.assertIsInstance(application.load(), handler_class)
+                self.assertIn('Warmed up', output.getvalue())
+        serve.check_page_cache(WORKERS)
+
+    @override_settings(CACHES={'pages': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_refuses_workers_without_shared_cache(self):
+        """Test that several workers are not started with a page cache local to every process."""
+        with self.assertRaisesMessage(CommandError, 'The page cache is local to a process'):
+            call_command('serve', workers=WORKERS)
+        serve.check_page_cache(1)
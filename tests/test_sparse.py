@@ -0,0 +1,104 @@
+"""File with tests of sparse fieldsets and relation expansion of the REST API."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from banks_app.models import Bank, BankAccount, BankClient, Client, Transaction
+from tests import config
+
+PAGE_SIZE = 2
+FIRST_DAY = date.fromisoformat('2024-01-01')
+
+
+class SparseFieldsTest(TestCase):
+    """Tests of requested fields and expanded relations."""
+
+    def setUp(self):
+        """Create accounts of a client in two banks with a few transfers between them."""
+        self.user = User.objects.create_superuser(username='admin', password=config.TEST_PASSWORD)
+        self.client_instance = Client.objects.create(user=self.user, **config.CLIENT_BUSIK)
+        self.accounts = [
+            BankAccount.objects.create(
+                balance=Decimal('100.00'), bank=Bank.objects.create(title=title), client=self.client_instance,
+            )
+            for title in ('First', 'Second')
+        ]
+        for account in self.accounts:
+            BankClient.objects.create(bank=account.bank, client=self.client_instance)
+        Transaction.objects.bulk_create(
+            Transaction(
+                initializer=self.client_instance,
+                amount=Decimal('1.00'),
+                transaction_date=FIRST_DAY + timedelta(days=day),
+                from_bank_account_id=self.accounts[0],
+                to_bank_account_id=self.accounts[1],
+            )
+            for day in range(config.MANY_ROWS)
+        )
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(user=self.user)
+
+    def get(self, path, query):
+        """
+        Get a resource and capture the queries.
+
+        Args:
+            path (str): Path of the resource.
+            query (dict): Query parameters.
+
+        Returns:
+            tuple: The response and the SQL of the queries.
+        """
+        queries = CaptureQueriesContext(connection)
+        with queries:
+            response = self.api_client.get(path, query)
+        return response, [query_info['sql'] for query_info in queries.captured_queries]
+
+    def test_fields_select_columns(self):
+        """Test that only the requested fields are rendered and loaded."""
+        response, statements = self.get('/api/bank_account/', {'fields': 'id,balance'})
+        self.assertEqual(
+            sorted(response.json(), key=lambda row: row['id']),
+            sorted(({'id': str(account.id), 'balance': '100.00'} for account in self.accounts), key=str),
+        )
+        self.assertEqual(len(statements), 2)
+        self.assertNotIn('client_id', statements[-1])
+        response, statements = self.get('/api/transaction/', {'fields': 'amount', 'page_size': PAGE_SIZE})
+        self.assertEqual(response.json()['results'], [{'amount': '1.00'} for _ in range(PAGE_SIZE)])
+        next_page = self.api_client.get(response.json()['next']).json()
+        self.assertEqual(len(next_page['results']), PAGE_SIZE)
+        self.assertEqual(len(statements), 1)
+
+    def test_expand_relations(self):
+        """Test that expanded relations are nested and loaded without a query per object."""
+        response, statements = self.get('/api/bank_account/', {'expand': 'bank', 'fields': 'balance'})
+        self.assertEqual(
+            sorted(row['bank']['title'] for row in response.json()), ['First', 'Second'],
+        )
+        self.assertEqual(set(response.json()[0]), {'balance', 'bank'})
+        self.assertEqual(len(statements), 3)
+        client_path = f'/api/client/{self.client_instance.id}/'
+        response, statements = self.get(client_path, {'expand': 'banks'})
+        self.assertEqual(sorted(bank['title'] for bank in response.json()['banks']), ['First', 'Second'])
+        self.assertEqual(len(statements), 4)
+        response, statements = self.get('/api/transaction/', {'expand': 'from_bank_account_id,initializer'})
+        row = response.json()['results'][0]
+        self.assertEqual(row['initializer']['first_name'], config.CLIENT_BUSIK['first_name'])
+        self.assertEqual(row['from_bank_account_id']['balance'], '100.00')
+        self.assertTrue(row['to_bank_account_id'].endswith(f'/api/bank_account/{self.accounts[1].id}/'))
+        self.assertEqual(len(statements), 2)
+
+    def test_unknown_names(self):
+        """Test that unknown fields and relations that cannot be expanded are rejected."""
+        response = self.api_client.get('/api/bank/', {'fields': 'title,secret'})
+        self.assertEqual(response.status_code, config.BAD_REQUEST)
+        self.assertIn('secret', response.json()['fields'])
+        response = self.api_client.get('/api/bank_account/', {'expand': 'balance'})
+        self.assertEqual(response.status_code, config.BAD_REQUEST)
+        self.assertIn('expand', response.json())